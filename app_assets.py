@@ -0,0 +1,89 @@
+"""
+Streamlit 화면 정적 자원 (CSS / 아이콘 / 로고)
+
+표준 라이브러리만 사용하므로 세션 시작 시 가볍게 import 됩니다.
+이미지 파일은 프로세스당 한 번만 읽어 메모리에 보관합니다.
+"""
+import os
+import time
+from functools import lru_cache
+
+ICON_PATH = "blue-white.png"
+LOGO_PATH = "JNPMEDI_original.jpg"
+
+APP_CSS = """
+    <style>
+    .stApp { background-color: #F4F7F6; color: #333333; }
+    h1, h2, h3, h4, h5, h6, p, span, div, label {
+        color: #2c3e50 !important;
+        font-family: 'Segoe UI', Tahoma, Geneva, Verdana, sans-serif;
+    }
+    .stTextInput > div > div > input,
+    .stNumberInput > div > div > input,
+    .stSelectbox > div > div {
+        background-color: #ffffff !important; color: #333333 !important;
+        border: 1px solid #dcdcdc; border-radius: 8px;
+    }
+    ul[data-testid="stSelectboxVirtualDropdown"] li {
+        color: #333333 !important; background-color: #ffffff !important;
+    }
+    .stFileUploader, div[data-testid="stExpander"], div[data-testid="stVerticalBlock"] > div {
+        background-color: #ffffff; color: #333333 !important;
+        border-radius: 10px; padding: 5px;
+    }
+    .stFileUploader label { font-weight: bold; font-size: 1.1em; }
+    .stButton > button, .stDownloadButton > button {
+        width: 100%; background-color: #008fd4; color: #ffffff !important;
+        font-weight: bold; border: none; padding: 0.6rem; border-radius: 8px;
+        transition: all 0.3s ease; box-shadow: 0 2px 4px rgba(0,143,212,0.3);
+    }
+    .stButton > button:hover, .stDownloadButton > button:hover {
+        background-color: #006fa3; color: #ffffff !important;
+        box-shadow: 0 4px 8px rgba(0,111,163,0.4); transform: translateY(-1px);
+    }
+    .stButton > button:active { transform: translateY(0px); }
+    .success-box {
+        padding: 15px; background-color: #e3f2fd; color: #0d47a1 !important;
+        border-left: 5px solid #008fd4; border-radius: 4px;
+        margin-bottom: 15px; font-weight: 600;
+    }
+    .error-box {
+        padding: 15px; background-color: #ffebee; color: #b71c1c !important;
+        border-left: 5px solid #d32f2f; border-radius: 4px;
+        margin-bottom: 15px; font-weight: 600;
+    }
+    </style>
+"""
+
+
+@lru_cache(maxsize=8)
+def load_asset(path) -> bytes:
+    """정적 파일을 바이트로 읽어 프로세스 단위로 캐시"""
+    with open(path, 'rb') as f:
+        return f.read()
+
+
+def warm_up(engine=True) -> dict:
+    """
+    서버 기동 시 캐시 채우기 (serve.py --warmup).
+      - 아이콘/로고 이미지 캐시 적재
+      - engine=True이면 검증 엔진(pandas/openpyxl) import 및 템플릿 캐시 적재
+    단계별 소요 시간(초)을 반환합니다.
+    """
+    timings = {}
+
+    t0 = time.perf_counter()
+    for path in (ICON_PATH, LOGO_PATH):
+        if os.path.exists(path):
+            load_asset(path)
+    timings['assets'] = time.perf_counter() - t0
+
+    if engine:
+        t0 = time.perf_counter()
+        import edc_engine
+        timings['engine_import'] = time.perf_counter() - t0
+
+        t0 = time.perf_counter()
+        edc_engine.warm_up()
+        timings['template'] = time.perf_counter() - t0
+    return timings
@@ -0,0 +1,56 @@
+"""
+화면(bm_app)용 백그라운드 검증 실행
+
+Streamlit은 버튼 콜백을 '다음' 재실행을 시작할 때 호출하므로, 스크립트 안에서 검증 제너레이터를 돌리면
+'검증 중지'를 누르는 순간 그 실행이 먼저 끊기고 콜백이 중지시킬 실행이 남아 있지 않습니다.
+
+BackgroundRun은 진행 이벤트(edc_engine.Progress)를 내는 제너레이터를 별도 스레드에서 끝까지 소비합니다.
+객체는 세션 상태에 보관되므로 화면은 재실행마다 진행 상황을 읽고(progress / stages / done),
+중지 콜백은 같은 CancelToken을 중지 상태로 바꿔 실행 중인 엔진이 다음 확인 시점에 멈춥니다.
+"""
+import threading
+
+
+class BackgroundRun:
+    """
+    steps 제너레이터를 데몬 스레드에서 실행.
+
+    progress : 마지막 진행 이벤트 (시작 전이면 None)
+    stages   : 지금까지 시작한 단계 이름 (순서대로 — 마지막 단계 외에는 완료)
+    result   : 제너레이터의 return 값 / error : 실행 중 발생한 예외 (중지는 ValidationCancelled)
+    info     : 화면 표시에 쓸 부가 정보 (입력 조합 등)
+    """
+
+    def __init__(self, steps, cancel, **info):
+        self.cancel   = cancel
+        self.info     = info
+        self.progress = None
+        self.stages   = []
+        self.result   = None
+        self.error    = None
+        self.done     = threading.Event()
+        self._thread  = threading.Thread(target=self._run, args=(steps,), name="edc-ui-run", daemon=True)
+        self._thread.start()
+
+    @property
+    def running(self) -> bool:
+        return not self.done.is_set()
+
+    def _run(self, steps):
+        try:
+            try:
+                while True:
+                    try:
+                        event = next(steps)
+                    except StopIteration as stop:
+                        self.result = stop.value
+                        break
+                    if not self.stages or self.stages[-1] != event.stage:
+                        self.stages.append(event.stage)
+                    self.progress = event
+            finally:
+                steps.close()
+        except BaseException as e:
+            self.error = e
+        finally:
+            self.done.set()
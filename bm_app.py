@@ -1,561 +1,368 @@
 import streamlit as st
-import pandas as pd
-import io
 import os
-from openpyxl import load_workbook
-from openpyxl.styles import PatternFill, Border, Side, Alignment
-from openpyxl.cell.cell import MergedCell
+import shutil
+import hashlib
+import tempfile
+import time
+import uuid
+import weakref
 
-# ============================================================
-# 1. 페이지 설정
-# ============================================================
-icon_path = "blue-white.png"
-st.set_page_config(page_title="JNPMEDI EDC Validation", page_icon=icon_path, layout="wide")
+import app_assets
+import run_metrics
 
-TEMPLATE_PATH = 'EDC Validation_template.xlsx'
+# pandas / openpyxl 을 쓰는 검증 엔진(edc_engine)과 검증 이력(validation_history)은
+# 세션 시작 시가 아니라 파일이 업로드된 뒤에 import 합니다. (첫 화면 표시 지연 방지)
 
 # ============================================================
-# [유지보수 포인트] SYS_ 레이아웃 제외 시 포함 예외 목록 (ITEM ID 기준)
-# 추후 비교에 포함시켜야 할 ITEM ID가 생기면 이 리스트에 추가하세요.
+# 1. 페이지 설정
 # ============================================================
-SYS_LAYOUT_WHITELIST = [
-    "SUBJID",
-    # "SITEID",  # 예시: 추후 추가할 경우 이런 식으로 등록
-]
+st.set_page_config(page_title="JNPMEDI EDC Validation",
+                   page_icon=app_assets.load_asset(app_assets.ICON_PATH), layout="wide")
 
+# 템플릿 경로, SYS_ 예외 목록, 비교 규칙 등 [유지보수 포인트]는 edc_engine.py 상단에 있습니다.
 
-
-st.markdown("""
-    <style>
-    .stApp { background-color: #F4F7F6; color: #333333; }
-    h1, h2, h3, h4, h5, h6, p, span, div, label {
-        color: #2c3e50 !important;
-        font-family: 'Segoe UI', Tahoma, Geneva, Verdana, sans-serif;
-    }
-    .stTextInput > div > div > input,
-    .stNumberInput > div > div > input,
-    .stSelectbox > div > div {
-        background-color: #ffffff !important; color: #333333 !important;
-        border: 1px solid #dcdcdc; border-radius: 8px;
-    }
-    ul[data-testid="stSelectboxVirtualDropdown"] li {
-        color: #333333 !important; background-color: #ffffff !important;
-    }
-    .stFileUploader, div[data-testid="stExpander"], div[data-testid="stVerticalBlock"] > div {
-        background-color: #ffffff; color: #333333 !important;
-        border-radius: 10px; padding: 5px;
-    }
-    .stFileUploader label { font-weight: bold; font-size: 1.1em; }
-    .stButton > button, .stDownloadButton > button {
-        width: 100%; background-color: #008fd4; color: #ffffff !important;
-        font-weight: bold; border: none; padding: 0.6rem; border-radius: 8px;
-        transition: all 0.3s ease; box-shadow: 0 2px 4px rgba(0,143,212,0.3);
-    }
-    .stButton > button:hover, .stDownloadButton > button:hover {
-        background-color: #006fa3; color: #ffffff !important;
-        box-shadow: 0 4px 8px rgba(0,111,163,0.4); transform: translateY(-1px);
-    }
-    .stButton > button:active { transform: translateY(0px); }
-    .success-box {
-        padding: 15px; background-color: #e3f2fd; color: #0d47a1 !important;
-        border-left: 5px solid #008fd4; border-radius: 4px;
-        margin-bottom: 15px; font-weight: 600;
-    }
-    .error-box {
-        padding: 15px; background-color: #ffebee; color: #b71c1c !important;
-        border-left: 5px solid #d32f2f; border-radius: 4px;
-        margin-bottom: 15px; font-weight: 600;
-    }
-    </style>
-""", unsafe_allow_html=True)
+st.markdown(app_assets.APP_CSS, unsafe_allow_html=True)
 
 
 # ============================================================
 # 2. 공통 유틸 함수
 # ============================================================
 
-@st.cache_resource
-def load_excel_file(file):
-    """파일을 메모리에 로드 (속도 향상)"""
-    return pd.ExcelFile(file)
-
-
-def get_dynamic_preview(excel_file, sheet_name, header_row):
-    """사용자가 선택한 행을 헤더로 적용하여 미리보기 생성"""
-    try:
-        return pd.read_excel(excel_file, sheet_name=sheet_name, header=header_row, nrows=5, dtype=str)
-    except Exception:
-        return pd.DataFrame()
-
-
-def check_columns_status(df):
-    """필수 컬럼이 식별되는지 진단"""
-    if df.empty:
-        return False, "데이터 없음", []
-
-    current_cols = [str(c).upper().strip() for c in df.columns]
-
-    rename_map = {
-        'VAR NAME': 'ITEM ID', 'VARIABLE NAME': 'ITEM ID', 'VARIABLE': 'ITEM ID',
-        'OID': 'ITEM ID', 'ITEMOID': 'ITEM ID', 'QUESTION OID': 'ITEM ID',
-        'FORM': 'PAGE', 'FORM OID': 'PAGE', 'FORM NAME': 'PAGE', 'CRF PAGE': 'PAGE',
-        'FOLDER': 'VISIT', 'FOLDER OID': 'VISIT', 'EVENT': 'VISIT', 'VISIT NAME': 'VISIT',
-        'DATASET': 'DOMAIN', 'LB DOMAIN': 'DOMAIN', 'DOMAIN NAME': 'DOMAIN',
-        'VER.': 'VERSION', 'VER': 'VERSION', 'CRF_VERSION': 'VERSION', 'CRF VERSION': 'VERSION',
-    }
-
-    mapped_cols = set()
-    for col in current_cols:
-        if col in rename_map:
-            mapped_cols.add(rename_map[col])
-        elif col in {'DOMAIN', 'PAGE', 'VISIT', 'ITEM ID'}:
-            mapped_cols.add(col)
+# ── 업로드 파일 디스크 스풀 ───────────────────────────────────
+# 업로드된 엑셀은 세션별 임시 폴더의 내용 해시(SHA-256) 폴더에 한 번만 기록하고,
+# 이후 모든 읽기는 메모리 매핑(mmap)으로 수행합니다.
+# 업로드 용량 상한은 .streamlit/config.toml 의 server.maxUploadSize 로 조정합니다.
+UPLOAD_SPOOL_ROOT    = os.path.join(tempfile.gettempdir(), "edc_validation_uploads")
+UPLOAD_SPOOL_MAX_AGE = 24 * 60 * 60  # 종료 처리되지 못한 세션 폴더 보관 시간(초)
+SPOOL_CHUNK_SIZE     = 8 * 1024 * 1024
 
-    required = {'DOMAIN', 'PAGE', 'VISIT', 'ITEM ID'}
-    missing = required - mapped_cols
 
-    if not missing:
-        return True, "✅ 필수 컬럼 자동 인식 성공!", []
-    else:
-        return False, f"⚠️ 필수 컬럼 미식별: {', '.join(missing)}", list(missing)
+def _remove_spool(path, excel_files):
+    """스풀 정리 — 열린 ExcelFile(메모리 매핑)을 먼저 닫은 뒤 폴더 삭제 (열린 매핑이 있으면 디스크가 반환되지 않음)"""
+    for excel_file in list(excel_files.values()):
+        try:
+            excel_file.close()
+        except Exception:
+            pass
+    excel_files.clear()
+    shutil.rmtree(path, True)
 
 
-def apply_sys_layout_filter(df, whitelist):
+class UploadSpool:
     """
-    DB Spec에서 SYS_ 레이아웃 행을 필터링합니다.
-    - LAYOUT이 'SYS_'로 시작하면 제외
-    - 단 ITEM ID가 whitelist에 있으면 포함 유지
+    세션 단위 업로드 스풀 폴더.
+    스풀 파일을 연 ExcelFile도 세션별로 보관하며(open_excel),
+    객체가 해제되면(세션 종료) 또는 프로세스 종료 시 핸들을 닫고 폴더를 삭제합니다.
     """
-    if 'LAYOUT' not in df.columns:
-        return df, pd.DataFrame()
 
-    whitelist_upper = [item.upper().strip() for item in whitelist]
-    is_sys = df['LAYOUT'].str.upper().str.startswith('SYS_')
-    is_whitelisted = df['ITEM ID'].str.upper().isin(whitelist_upper)
-    exclude_mask = is_sys & ~is_whitelisted
+    def __init__(self, root=UPLOAD_SPOOL_ROOT):
+        self.path = os.path.join(root, uuid.uuid4().hex)
+        os.makedirs(self.path, exist_ok=True)
+        self._excel_files = {}   # 스풀 경로 → 메모리 매핑 ExcelFile
+        self._finalizer   = weakref.finalize(self, _remove_spool, self.path, self._excel_files)
+
+    def add(self, uploaded_file) -> str:
+        """업로드 파일을 기록하고 경로를 반환 (같은 이름의 동일 내용은 재기록하지 않음)"""
+        buf    = uploaded_file.getbuffer()
+        digest = hashlib.sha256()
+        for start in range(0, len(buf), SPOOL_CHUNK_SIZE):
+            digest.update(buf[start:start + SPOOL_CHUNK_SIZE])
+
+        # 내용 해시 폴더 아래 원래 파일 이름으로 기록 (여러 파일 DB Spec의 조각 이름 / 중복 키 출처 표시용)
+        name = os.path.basename(uploaded_file.name) or 'upload'
+        if not os.path.splitext(name)[1]:
+            name += '.xlsx'
+        folder = os.path.join(self.path, digest.hexdigest())
+        path   = os.path.join(folder, name)
+        if not os.path.exists(path):
+            os.makedirs(folder, exist_ok=True)
+            tmp_path = f"{path}.part"
+            with open(tmp_path, 'wb') as f:
+                for start in range(0, len(buf), SPOOL_CHUNK_SIZE):
+                    f.write(buf[start:start + SPOOL_CHUNK_SIZE])
+            os.replace(tmp_path, path)
+        return path
+
+    def open_excel(self, path):
+        """스풀된 파일을 메모리 매핑으로 열어 ExcelFile로 로드 (세션 내 경로 단위 재사용)"""
+        if path not in self._excel_files:
+            import edc_engine
+            self._excel_files[path] = edc_engine.open_excel(path)
+        return self._excel_files[path]
+
+    def cleanup(self):
+        self._finalizer()
 
-    return df[~exclude_mask].reset_index(drop=True), df[exclude_mask].reset_index(drop=True)
 
+@st.cache_resource
+def sweep_stale_spools(root=UPLOAD_SPOOL_ROOT, max_age=UPLOAD_SPOOL_MAX_AGE):
+    """비정상 종료 등으로 남은 오래된 세션 스풀 폴더를 프로세스당 한 번 정리"""
+    if not os.path.isdir(root):
+        return
+    now = time.time()
+    for name in os.listdir(root):
+        path = os.path.join(root, name)
+        try:
+            if now - os.path.getmtime(path) > max_age:
+                shutil.rmtree(path, ignore_errors=True)
+        except OSError:
+            continue
 
-def process_data_final(excel_file, sheet_name, header_row):
-    """DB Spec 파일을 읽어 표준화된 DataFrame으로 반환"""
-    try:
-        df = pd.read_excel(excel_file, sheet_name=sheet_name, header=header_row, dtype=str)
-        df.columns = [str(c).upper().strip() for c in df.columns]
-
-        rename_map = {
-            'VAR NAME': 'ITEM ID', 'VARIABLE NAME': 'ITEM ID', 'VARIABLE': 'ITEM ID',
-            'OID': 'ITEM ID', 'ITEMOID': 'ITEM ID',
-            'FORM': 'PAGE', 'FORM OID': 'PAGE', 'FORM NAME': 'PAGE', 'CRF PAGE': 'PAGE',
-            'FOLDER': 'VISIT', 'FOLDER OID': 'VISIT', 'EVENT': 'VISIT',
-            'DATASET': 'DOMAIN', 'LB DOMAIN': 'DOMAIN',
-            'VER.': 'VERSION', 'VER': 'VERSION', 'CRF_VERSION': 'VERSION', 'CRF VERSION': 'VERSION',
-        }
-        df = df.rename(columns=rename_map)
-
-        std_cols = ['DOMAIN', 'DOMAIN LABEL', 'PAGE', 'PAGE LABEL', 'VISIT',
-                    'ITEM ID', 'ITEM LABEL', 'ITEM SEQ', 'VERSION', 'CODE',
-                    'LAYOUT', 'TYPE', 'MAX_LEN', 'MIN_VAL', 'MAX_VAL']
-
-        for col in std_cols:
-            if col not in df.columns:
-                df[col] = ""
-            df[col] = (df[col].fillna("").astype(str)
-                       .apply(lambda x: x.replace('.0', '').strip() if x.endswith('.0') else x.strip()))
 
-        df['JOIN_KEY'] = (df['DOMAIN'] + df['PAGE'] + df['VISIT'] + df['ITEM ID']
-                          ).str.replace(r'\s+', '', regex=True).str.upper()
+def get_upload_spool() -> UploadSpool:
+    """현재 세션의 스풀 객체 (세션 상태에 보관되어 세션과 수명을 같이함)"""
+    if 'upload_spool' not in st.session_state:
+        st.session_state['upload_spool'] = UploadSpool()
+    return st.session_state['upload_spool']
 
-        df = df[df['JOIN_KEY'].str.len() > 1]
-        df = df.drop_duplicates(subset=['JOIN_KEY'])
-        return df
-    except Exception:
-        return pd.DataFrame()
 
+# 진행 중인 백그라운드 검증의 화면 갱신 주기(초)
+VALIDATION_POLL_S = 0.5
 
-# ============================================================
-# 3. [신규] Data Structure Validation 관련 함수
-# ============================================================
 
-def parse_item_id(col_name: str) -> str:
+def request_cancel():
     """
-    'ITEMID:LABEL' 형태의 컬럼명에서 ITEM ID 부분만 추출합니다.
-    ':' 가 없으면 컬럼명 그대로 반환합니다.
+    '검증 중지' 버튼 콜백 — 세션에 보관된 백그라운드 실행(BackgroundRun)의 CancelToken을 중지 상태로 바꿈.
+    콜백은 다음 재실행 시작 시 호출되지만 검증은 별도 스레드에서 계속 돌고 있으므로,
+    엔진이 다음 청크 경계나 작업 대기 주기(worker_pool.WORKER_POLL_S)에 토큰을 확인해 중단합니다.
     """
-    return col_name.split(':')[0].strip().upper()
+    run = st.session_state.get('validation_run')
+    if run is not None:
+        run.cancel.cancel()
 
 
-def dtype_to_type_str(dtype) -> str:
-    """
-    pandas dtype을 사람이 읽기 쉬운 Type 문자열로 변환합니다.
-    DB Spec의 TYPE 컬럼과 비교하기 위한 참고값입니다.
-    """
-    dtype_str = str(dtype)
-    if 'datetime' in dtype_str:
-        return 'datetime'
-    elif 'int' in dtype_str:
-        return 'integer'
-    elif 'float' in dtype_str:
-        return 'float'
-    else:
-        return 'text'
+@st.cache_data(max_entries=64, show_spinner=False)
+def load_workbook_meta(path):
+    """시트 이름 / 범위 / 행 수만 워크북 색인 파트에서 읽기 (시트 데이터 미로드, 경로 단위 캐시)"""
+    import xlsx_meta
+    return xlsx_meta.read_workbook_meta(path)
 
 
-def build_dataset_long(dataset_excel: pd.ExcelFile) -> pd.DataFrame:
+def save_history(metrics, study, ver_info, result, file_names):
     """
-    CDMS Dataset 엑셀의 모든 도메인 시트를 읽어 Long format DataFrame으로 변환합니다.
-
-    변환 규칙:
-    - 시트명 = DOMAIN
-    - 컬럼명 'ITEMID:LABEL' → ITEM ID는 ':' 앞 부분만 추출
-    - 모든 컬럼을 Item ID로 처리 (제외 없음)
-    - 각 Item ID에 대해 값이 실제로 존재하는(non-null) 첫 번째 행의
-      실제 셀 값을 Type으로, 해당 행의 SUBJID를 참조 대상자로 기록
-    - 모든 대상자에게 값이 없는 경우 DS_TYPE = '', DS_SUBJID = '' 으로 기록
-
-    Returns:
-        DataFrame with columns: [DOMAIN, ITEM ID, DS_TYPE, DS_SUBJID]
+    검증 결과를 이력 DB에 저장 (새 실행 / 캐시 적중 공통).
+    실패해도 결과 제공에는 영향이 없도록 경고 문구만 반환 (성공 시 None — 백그라운드 스레드에서도 호출되므로 표시는 호출 측에서)
     """
-    skip_sheets = {'SUBJECT_INFO'}
-    records = []
-
-    for sheet in dataset_excel.sheet_names:
-        if sheet.upper() in skip_sheets:
-            continue
-
-        domain = sheet.strip().upper()
-
-        try:
-            df = pd.read_excel(dataset_excel, sheet_name=sheet)
-        except Exception:
-            continue
+    try:
+        import validation_history
+        with metrics.stage('history'):
+            validation_history.record_run(
+                validation_history.HISTORY_DB_PATH, study or "UNKNOWN", ver_info,
+                df_spec=result['df_doc_full'], df_export=result['df_edc'],
+                df_dataset_long=result['df_dataset_long'], merged=result['merged'],
+                meta=file_names,
+            )
+    except Exception as e:
+        return f"⚠️ 검증 이력 저장 실패: {e}"
+    return None
 
-        if df.empty:
-            continue
 
-        # SUBJID 컬럼 원본명 찾기 (SUBJID:xxx 형태일 수 있음)
-        subjid_col_raw = None
-        for c in df.columns:
-            if parse_item_id(c) == 'SUBJID':
-                subjid_col_raw = c
-                break
-
-        # 모든 컬럼을 Item ID로 처리
-        for raw_col in df.columns:
-            item_id = parse_item_id(raw_col)
-
-            col_series   = df[raw_col]
-            found_subjid = ''
-            found_type   = ''
-
-            for idx in df.index:
-                val = col_series.iloc[idx]
-                if pd.isna(val) or str(val).strip() == '' or str(val).strip().lower() == 'nan':
-                    continue
-                # 값이 있는 첫 번째 대상자의 실제 셀 값을 그대로 사용
-                found_type = str(val).strip()
-                if subjid_col_raw is not None:
-                    subj_val = df[subjid_col_raw].iloc[idx]
-                    found_subjid = str(subj_val).strip() if pd.notna(subj_val) else ''
-                break
-
-            records.append({
-                'DOMAIN'   : domain,
-                'ITEM ID'  : item_id,
-                'DS_TYPE'  : found_type,
-                'DS_SUBJID': found_subjid,
-            })
-
-    return pd.DataFrame(records)
-
-
-def save_data_structure_to_template(wb, df_doc_full: pd.DataFrame, df_dataset_long: pd.DataFrame):
+def validation_steps(metrics, sources, study, ver_info, file_names, cache, cache_key, cancel):
     """
-    템플릿 워크북의 'Data Structure Validation' 시트에
-    DB Spec(전체, 필터 없음)과 CDMS Dataset Long format을 비교하여 기입합니다.
-
-    템플릿 구조 (확인된 실제 구조):
-        행3: 'Database Specifications'(A~D 병합) | 'Dataset'(E~G 병합) | '확인 결과'(H) | 'Comment'(I)
-        행4: Domain | Item ID | Item Label | Type | Domain | Item ID | Type | (병합) | (병합)
-        행5~: 데이터 입력 시작
-
-    추가 열 (코드에서 동적 삽입):
-        J열: SUBJID (참조 대상자) — 템플릿에는 없지만 J열에 동적으로 추가
-
-    색상 규칙:
-        - Dataset에서 해당 값이 아예 없는 경우(DS_TYPE이 빈값) → 연분홍(FFD7E9) 하이라이트
-        - 확인 결과: 값이 없는 경우 'FALSE', 있는 경우 빈칸(human validation)
+    백그라운드 스레드(BackgroundRun)에서 실행할 검증 작업 — iter_validation → 이력 저장 → 리포트 캐시 기록.
+    지표 레코드도 여기서 마무리하므로 화면 재실행과 관계없이 실제 실행 결과대로 남습니다.
+    sources는 iter_validation의 입력 6개(경로/시트/헤더) + Dataset 경로입니다.
     """
-    sheet_name = 'Data Structure Validation'
-    if sheet_name not in wb.sheetnames:
-        return wb
-
-    ws = wb[sheet_name]
-
-    # ── 스타일 정의 ──────────────────────────────────────────
-    thin_border    = Border(
-        left=Side(style='thin'), right=Side(style='thin'),
-        top=Side(style='thin'),  bottom=Side(style='thin')
-    )
-    align_center   = Alignment(horizontal='center', vertical='center', wrap_text=True)
-    align_left     = Alignment(horizontal='left',   vertical='center', wrap_text=True)
-
-    # 연분홍: 아무 대상자도 값이 없는 경우
-    light_pink_fill = PatternFill(start_color="FFD7E9", end_color="FFD7E9", fill_type="solid")
-    # 흰색: 기본 배경
-    white_fill      = PatternFill(start_color="FFFFFF", end_color="FFFFFF", fill_type="solid")
-
-    # ── 열 위치 상수 (템플릿 고정 구조 기반) ─────────────────
-    # A=1, B=2, C=3, D=4 → DB Spec 영역 (Domain, Item ID, Item Label, Type)
-    # E=5, F=6, G=7      → Dataset 영역  (Domain, Item ID, Type)
-    # H=8                → 확인 결과
-    # I=9                → Comment
-    # J=10               → SUBJID (동적 추가)
-    COL_DOC_DOMAIN    = 1   # A: DB Spec - Domain
-    COL_DOC_ITEM_ID   = 2   # B: DB Spec - Item ID
-    COL_DOC_ITEM_LABEL= 3   # C: DB Spec - Item Label
-    COL_DOC_TYPE      = 4   # D: DB Spec - Type
-    COL_DS_DOMAIN     = 5   # E: Dataset - Domain
-    COL_DS_ITEM_ID    = 6   # F: Dataset - Item ID
-    COL_DS_TYPE       = 7   # G: Dataset - Type
-    COL_RESULT        = 8   # H: 확인 결과
-    COL_COMMENT       = 9   # I: Comment
-    COL_SUBJID        = 10  # J: 참조 대상자 (동적 추가)
-
-    # ── J열 헤더 추가 ─────────────────────────────────────────
-    # 3행: 병합 없이 단순 레이블
-    hdr3 = ws.cell(row=3, column=COL_SUBJID)
-    hdr3.value     = 'SUBJID'
-    hdr3.border    = thin_border
-    hdr3.alignment = align_center
-
-    # 4행: 세부 레이블
-    hdr4 = ws.cell(row=4, column=COL_SUBJID)
-    hdr4.value     = '참조 대상자'
-    hdr4.border    = thin_border
-    hdr4.alignment = align_center
-
-    # ── Dataset Long format을 (DOMAIN, ITEM ID) 복합키로 dict화 ──
-    # key: (DOMAIN, ITEM_ID)  value: {'DS_TYPE': ..., 'DS_SUBJID': ...}
-    ds_lookup = {}
-    for _, r in df_dataset_long.iterrows():
-        key = (str(r['DOMAIN']).strip().upper(), str(r['ITEM ID']).strip().upper())
-        ds_lookup[key] = {
-            'DS_TYPE'  : str(r['DS_TYPE']).strip(),
-            'DS_SUBJID': str(r['DS_SUBJID']).strip(),
-        }
-
-    # ── DB Spec 기준으로 행 기입 (행 수 = DB Spec 행 수와 동일) ──
-    START_ROW = 5  # 데이터 시작 행
+    import edc_engine as engine
 
-    for i, doc_row in df_doc_full.reset_index(drop=True).iterrows():
-        r = START_ROW + i
-
-        doc_domain     = str(doc_row.get('DOMAIN',     '')).strip()
-        doc_item_id    = str(doc_row.get('ITEM ID',    '')).strip()
-        doc_item_label = str(doc_row.get('ITEM LABEL', '')).strip()
-        doc_type       = str(doc_row.get('TYPE',       '')).strip()
-
-        # Dataset 매칭 조회
-        lookup_key = (doc_domain.upper(), doc_item_id.upper())
-        ds_info    = ds_lookup.get(lookup_key, None)
-
-        ds_domain  = doc_domain  if ds_info else ''
-        ds_item_id = doc_item_id if ds_info else ''
-        ds_type    = ds_info['DS_TYPE']   if ds_info else ''
-        ds_subjid  = ds_info['DS_SUBJID'] if ds_info else ''
-
-        # 값이 없는 경우(아무 대상자도 해당 item에 데이터 없음) 판별
-        no_data = (ds_type == '')
-
-        # 적용할 배경색 결정
-        fill = light_pink_fill if no_data else white_fill
-
-        # ── 셀 기입 헬퍼 ──────────────────────────────────────
-        def write_cell(col, value, align=align_center, apply_fill=False):
-            cell           = ws.cell(row=r, column=col)
-            cell.value     = value if value != '' else None
-            cell.border    = thin_border
-            cell.alignment = align
-            if apply_fill:
-                cell.fill = fill
-
-        # A~D: DB Spec 영역 (배경색 없음 — 기준 문서이므로)
-        write_cell(COL_DOC_DOMAIN,     doc_domain)
-        write_cell(COL_DOC_ITEM_ID,    doc_item_id)
-        write_cell(COL_DOC_ITEM_LABEL, doc_item_label, align=align_left)
-        write_cell(COL_DOC_TYPE,       doc_type)
-
-        # E~G: Dataset 영역 (no_data이면 연분홍)
-        write_cell(COL_DS_DOMAIN,  ds_domain,  apply_fill=True)
-        write_cell(COL_DS_ITEM_ID, ds_item_id, apply_fill=True)
-        write_cell(COL_DS_TYPE,    ds_type,    apply_fill=True)
-
-        # H: 확인 결과 — 값 없으면 FALSE, 있으면 빈칸
-        result_cell           = ws.cell(row=r, column=COL_RESULT)
-        result_cell.value     = 'FALSE' if no_data else None
-        result_cell.border    = thin_border
-        result_cell.alignment = align_center
-        if no_data:
-            result_cell.fill = light_pink_fill
-
-        # I: Comment — 빈칸 (human validation)
-        comment_cell           = ws.cell(row=r, column=COL_COMMENT)
-        comment_cell.value     = None
-        comment_cell.border    = thin_border
-        comment_cell.alignment = align_center
+    *inputs, dataset_source = sources
+    with metrics:
+        try:
+            result = yield from engine.iter_validation(*inputs, dataset_source=dataset_source, ver_info=ver_info,
+                                                       metrics=metrics, cancel=cancel)
+        except engine.ValidationInputError as e:
+            metrics.finish(run_metrics.STATUS_INVALID, str(e))
+            raise
+        except engine.ValidationCancelled as e:
+            metrics.finish(run_metrics.STATUS_CANCELLED, str(e))
+            raise
+        if not result['report']:
+            metrics.finish(run_metrics.STATUS_FAILED, "결과 파일 생성 실패")
+            return result
+
+        result['history_error'] = save_history(metrics, study, ver_info, result, file_names)
+        if cache_key:
+            cache.put(cache_key, result['report'].getvalue(),
+                      {'summary': engine.summarize_result(result), 'source': 'ui'}, result)
+        result['explorer'] = engine.build_explorer_frame(result['merged'])
+    return result
+
+
+@st.fragment(run_every=VALIDATION_POLL_S)
+def render_validation_progress():
+    """진행 중인 백그라운드 검증 표시 — 이 영역만 주기적으로 다시 실행해 진행률을 갱신하고, 끝나면 화면 전체를 다시 실행"""
+    from edc_engine import PIPELINE_STAGES, pipeline_fraction
+
+    run = st.session_state.get('validation_run')
+    if run is None or not run.running:
+        st.rerun()
+
+    with st.status("검증 실행 중 — 잠시 기다려 주세요.", expanded=True):
+        for stage in run.stages[:-1]:
+            st.write(f"{PIPELINE_STAGES[stage]} - 완료")
+        if run.cancel.cancelled:
+            st.button("⏹ 중지하는 중...", disabled=True, key="stop_validation")
+        else:
+            st.button("⏹ 검증 중지", on_click=request_cancel, key="stop_validation")
+        event = run.progress
+        if event is None:
+            st.progress(0.0, text="준비 중")
+        else:
+            st.progress(pipeline_fraction(event),
+                        text=f"{PIPELINE_STAGES[event.stage]} ({event.done:,} / {event.total:,})")
+
+
+def show_run_outcome(run):
+    """끝난 백그라운드 검증의 결과 안내 (한 번만 표시 — 결과 다운로드/탐색기는 last_run으로 재실행 후에도 유지)"""
+    import edc_engine as engine
+
+    if isinstance(run.error, engine.ValidationCancelled):
+        st.warning("⏹ 검증을 중지했습니다. 설정을 확인한 뒤 다시 시작하세요.")
+        return
+    if isinstance(run.error, engine.ValidationInputError):
+        st.error(f"❌ 입력 데이터 로드 실패 — {run.error}")
+        return
+    if run.error is not None:
+        st.exception(run.error)
+        return
+
+    result = run.result
+    if not result['report']:
+        st.error("결과 파일 생성 중 오류가 발생했습니다.")
+        return
+
+    # ── Entry Screen: SYS_ 등 제외 규칙 적용 결과 ──────
+    doc_excluded = result['doc_excluded']
+    edc_excluded = result['edc_excluded']
+    if not doc_excluded.empty:
+        st.info(
+            f"ℹ️ SYS_ 레이아웃으로 인해 Entry Screen 비교에서 제외된 항목: "
+            f"**{engine.excluded_count(doc_excluded)}건** (Whitelist 항목은 포함 유지)"
+        )
+        with st.expander("제외된 항목 확인 (SYS_ 필터 — DOMAIN / PAGE / LAYOUT별 건수)"):
+            st.dataframe(doc_excluded, use_container_width=True, hide_index=True)
+    if not edc_excluded.empty:
+        st.info(
+            f"ℹ️ EDC Export에서도 SYS_ 레이아웃으로 제외된 항목: "
+            f"**{engine.excluded_count(edc_excluded)}건**"
+        )
+    spec_duplicates = result['spec_duplicates']
+    if spec_duplicates is not None and not spec_duplicates.empty:
+        st.warning(
+            f"⚠️ DB Spec 시트/파일 간 중복 키: **{spec_duplicates['JOIN_KEY'].nunique()}건** — "
+            f"처음 나온 행만 비교에 사용 (결과 리포트 '{engine.SPEC_DUPLICATES_SHEET}' 시트)"
+        )
+        with st.expander("시트/파일 간 중복 키 확인"):
+            st.dataframe(spec_duplicates, use_container_width=True, hide_index=True)
+
+    df_dataset_long = result['df_dataset_long']
+    summary_parts = ["✅ **Entry Screen Validation** 완료"]
+    if df_dataset_long is not None:
+        st.write(f"🔄 CDMS Dataset: 총 **{len(df_dataset_long)}개** Domain-Item ID 조합 추출")
+        no_data_cnt = (df_dataset_long['DS_TYPE'] == '').sum() if not df_dataset_long.empty else 0
+        summary_parts.append(
+            f"✅ **Data Structure Validation** 완료 "
+            f"(데이터 없는 항목: {no_data_cnt}건 → 연분홍 표시 + FALSE)"
+        )
+    else:
+        summary_parts.append("⚠️ CDMS Dataset 미업로드 → Data Structure Validation 건너뜀")
+    st.success("🎉 완료!\n\n" + "\n\n".join(summary_parts))
 
-        # J: 참조 대상자 SUBJID (no_data이면 연분홍)
-        write_cell(COL_SUBJID, ds_subjid, apply_fill=True)
+    if result['history_error']:
+        st.warning(result['history_error'])
 
-    return wb
+    st.session_state['last_run'] = {
+        'inputs'   : run.info['inputs'],
+        'report'   : result['report'].getvalue(),
+        'file_name': f"EDC Validation List_{time.strftime('%Y%m%d')}.xlsx",
+        'explorer' : result['explorer'],
+    }
 
 
 # ============================================================
-# 4. Entry Screen Validation 저장 함수 (기존 유지)
+# 3. 결과 탐색기 (서버 측 필터/정렬/페이지 처리 — edc_engine.query_explorer)
 # ============================================================
 
-def save_to_template(template_path, df_doc, df_edc, ver_info,
-                     df_doc_full=None, df_dataset_long=None):
-    """
-    템플릿에 두 가지 시트 결과를 모두 저장합니다.
-      - Entry Screen Validation  : 기존 로직 (df_doc / df_edc 사용)
-      - Data Structure Validation: 신규 로직 (df_doc_full / df_dataset_long 사용)
-
-    df_doc_full / df_dataset_long 이 None이면 Data Structure 시트는 건너뜁니다.
-    """
-    if not os.path.exists(template_path):
-        return None
-
-    wb = load_workbook(template_path)
-
-    # ── 버전 정보 기입 ────────────────────────────────────────
-    # Entry Screen Validation 시트: A2(Blank), A3(DB Spec), A4(Annotated)
-    # Data Structure Validation 시트: A2(DB Spec)
-    # 형식 예시: "Blank eCRF Version: V1.1" → "V" + 입력값으로 치환
-    def write_version(ws, row, col, label_prefix, ver_value):
-        """기존 셀 텍스트에서 버전 부분만 교체하여 기입"""
-        cell = ws.cell(row=row, column=col)
-        ver_str = f"V{ver_value}" if not str(ver_value).upper().startswith('V') else str(ver_value)
-        cell.value = f"{label_prefix}{ver_str}"
-
-    entry_ws = wb['Entry Screen Validation'] if 'Entry Screen Validation' in wb.sheetnames else None
-    ds_ws    = wb['Data Structure Validation'] if 'Data Structure Validation' in wb.sheetnames else None
-
-    if entry_ws:
-        write_version(entry_ws, row=2, col=1,
-                      label_prefix="Blank eCRF Version: ",
-                      ver_value=ver_info.get('blank', ''))
-        write_version(entry_ws, row=3, col=1,
-                      label_prefix="Database Specifications Version: ",
-                      ver_value=ver_info.get('db', ''))
-        write_version(entry_ws, row=4, col=1,
-                      label_prefix="Annotated CRF Version: ",
-                      ver_value=ver_info.get('annotated', ''))
-
-    if ds_ws:
-        write_version(ds_ws, row=2, col=1,
-                      label_prefix="Database Specifications Version: ",
-                      ver_value=ver_info.get('db', ''))
-    # ─────────────────────────────────────────────────────────
-
-    # ── Entry Screen Validation ───────────────────────────────
-    target_sheet = 'Entry Screen Validation'
-    if target_sheet in wb.sheetnames:
-        ws = wb[target_sheet]
-
-        template_header_row = 6
-        doc_col_map = {}
-        edc_col_map = {}
-
-        for col_idx in range(1, 31):
-            col_name = ws.cell(row=template_header_row, column=col_idx).value
-            if col_name:
-                col_name = str(col_name).strip().upper()
-                if col_idx <= 15:
-                    doc_col_map[col_name] = col_idx
-                else:
-                    edc_col_map[col_name] = col_idx
-
-        res_col_idx = 31
-        for col_idx in range(31, ws.max_column + 1):
-            if ("확인 결과" in str(ws.cell(row=5, column=col_idx).value or "") or
-                    "확인 결과" in str(ws.cell(row=6, column=col_idx).value or "")):
-                res_col_idx = col_idx
-                break
-
-        red_fill   = PatternFill(start_color="FFC7CE", end_color="FFC7CE", fill_type="solid")
-        thin_border = Border(
-            left=Side(style='thin'), right=Side(style='thin'),
-            top=Side(style='thin'),  bottom=Side(style='thin')
+@st.fragment
+def render_result_explorer(df):
+    """Entry Screen 비교 결과 탐색기 (위젯 조작 시 이 영역만 다시 실행)"""
+    from edc_engine import (ENTRY_COMPARE_COLS, EXPLORER_KEY_COLS, EXPLORER_PAGE_SIZES,
+                            EXPLORER_STATUS, query_explorer)
+
+    st.subheader("🔎 결과 탐색기 (Entry Screen)")
+
+    f1, f2, f3, f4 = st.columns(4)
+    domains = f1.multiselect("DOMAIN", sorted(df['DOMAIN'].cat.categories), key="ex_domain")
+    page_options = (df.loc[df['DOMAIN'].isin(domains), 'PAGE'] if domains else df['PAGE'])
+    pages   = f2.multiselect("PAGE", sorted(page_options.dropna().unique()), key="ex_page")
+    statuses = f3.multiselect("상태", list(EXPLORER_STATUS.values()), key="ex_status")
+    mismatch_cols = f4.multiselect("불일치 컬럼", ENTRY_COMPARE_COLS, key="ex_mismatch")
+
+    s1, s2, s3 = st.columns([2, 1, 1])
+    sort_by   = s1.selectbox("정렬 기준", ["(DB Spec 순서)"] + EXPLORER_KEY_COLS + ['STATUS'],
+                             key="ex_sort")
+    ascending = s2.radio("정렬 방향", ["오름차순", "내림차순"], horizontal=True,
+                         key="ex_asc") == "오름차순"
+    page_size = s3.selectbox("페이지당 행 수", EXPLORER_PAGE_SIZES, key="ex_size")
+
+    page_df, total, total_pages = query_explorer(
+        df, domains, pages, statuses, mismatch_cols,
+        sort_by=None if sort_by.startswith("(") else sort_by,
+        ascending=ascending, page=st.session_state.get("ex_page_no", 1), page_size=page_size,
+    )
+    # 필터 변경으로 페이지 수가 줄어든 경우 위젯 생성 전에 현재 페이지를 보정
+    if st.session_state.get("ex_page_no", 1) > total_pages:
+        st.session_state["ex_page_no"] = total_pages
+    page = st.number_input(f"페이지 (1 ~ {total_pages})", min_value=1, max_value=total_pages,
+                           step=1, key="ex_page_no")
+
+    start = (page - 1) * page_size
+    st.caption(f"필터 결과 {total:,}건 중 {min(total, start + 1):,}–{min(total, start + page_size):,}번째 표시")
+    st.dataframe(page_df, use_container_width=True, hide_index=True)
+
+
+@st.fragment
+def render_report_diff(current_report: bytes):
+    """이전 결과 리포트를 올리면 현재 리포트와 비교 (report_diff — 스트리밍 읽기)"""
+    with st.expander("🔁 이전 리포트와 비교", expanded=False):
+        prev_up = st.file_uploader("이전 결과 리포트 (EDC Validation List_*.xlsx)", type=["xlsx"],
+                                   key="diff_prev")
+        if not prev_up:
+            return
+        import io
+        import report_diff
+
+        df_diff = report_diff.diff_reports(prev_up.getvalue(), current_report)
+        if df_diff.empty:
+            st.info("변경 사항이 없습니다.")
+            return
+        st.dataframe(report_diff.summarize_diff(df_diff), hide_index=True)
+        st.dataframe(df_diff, use_container_width=True, hide_index=True)
+
+        buffer = io.BytesIO()
+        report_diff.save_diff(df_diff, buffer)
+        st.download_button(
+            label="📥 비교 결과 다운로드",
+            data=buffer.getvalue(),
+            file_name=f"EDC Validation Diff_{time.strftime('%Y%m%d')}.xlsx",
+            mime="application/vnd.openxmlformats-officedocument.spreadsheetml.sheet"
         )
-        align_center = Alignment(horizontal='center', vertical='center', wrap_text=True)
-
-        df_doc['ORIGINAL_ORDER'] = range(len(df_doc))
-        merged = pd.merge(df_doc, df_edc, on='JOIN_KEY', how='outer',
-                          suffixes=('_Doc', '_EDC'), indicator=True)
-        merged = (merged.sort_values(by=['ORIGINAL_ORDER'], na_position='last')
-                        .drop(columns=['ORIGINAL_ORDER']))
-
-        start_row = 7
-        for i, row in merged.reset_index(drop=True).iterrows():
-            curr_r = start_row + i
-            status = row['_merge']
-            cols_to_fill = list(doc_col_map.keys())
-
-            mismatches = []
-            if status == 'both':
-                for cname in cols_to_fill:
-                    d_val = str(row.get(f"{cname}_Doc", "")).strip()
-                    e_val = str(row.get(f"{cname}_EDC", "")).strip()
-                    if d_val != e_val:
-                        mismatches.append(cname)
-
-            for cname, col_idx in doc_col_map.items():
-                cell           = ws.cell(row=curr_r, column=col_idx)
-                cell.value     = row.get(f"{cname}_Doc", "") if status != 'right_only' else ""
-                cell.border    = thin_border
-                cell.alignment = align_center
-                if status == 'left_only' or (status == 'both' and cname in mismatches):
-                    cell.fill = red_fill
-
-            for cname, col_idx in edc_col_map.items():
-                cell           = ws.cell(row=curr_r, column=col_idx)
-                cell.value     = row.get(f"{cname}_EDC", "") if status != 'left_only' else ""
-                cell.border    = thin_border
-                cell.alignment = align_center
-                if status == 'right_only' or (status == 'both' and cname in mismatches):
-                    cell.fill = red_fill
-
-            res_text               = "True" if (status == 'both' and not mismatches) else "False"
-            cell_res               = ws.cell(row=curr_r, column=res_col_idx)
-            cell_res.value         = res_text
-            cell_res.border        = thin_border
-            cell_res.alignment     = align_center
-
-    # ── Data Structure Validation ─────────────────────────────
-    if df_doc_full is not None and df_dataset_long is not None:
-        wb = save_data_structure_to_template(wb, df_doc_full, df_dataset_long)
-
-    output = io.BytesIO()
-    wb.save(output)
-    output.seek(0)
-    return output
 
 
 # ============================================================
-# 5. UI 구성
+# 4. UI 구성
 # ============================================================
 
 col1, col2 = st.columns([4, 15], vertical_alignment="center")
-logo_path = "JNPMEDI_original.jpg"
 
 with col1:
-    st.image(logo_path, width=200)
+    st.image(app_assets.load_asset(app_assets.LOGO_PATH), width=200)
 
 with col2:
     st.title("EDC Validation")
 
+sweep_stale_spools()
+
 st.info("실시간 프리뷰를 통해 컬럼이 올바르게 인식되는지 확인 후 검증을 시작하세요.")
 
 # ── 파일 업로더 3개 ───────────────────────────────────────────
@@ -571,11 +378,18 @@ with col_u3:
 
 # ── 최소 조건: DB Spec + Entry Screen Export ──────────────────
 if doc_file_up and edc_file_up:
+    import edc_engine as engine
+
     st.markdown("---")
 
     try:
-        doc_excel = load_excel_file(doc_file_up)
-        edc_excel = load_excel_file(edc_file_up)
+        spool     = get_upload_spool()
+        doc_path  = spool.add(doc_file_up)
+        edc_path  = spool.add(edc_file_up)
+        doc_sheets = [m.name for m in load_workbook_meta(doc_path)]
+        edc_sheets = [m.name for m in load_workbook_meta(edc_path)]
+        doc_excel = spool.open_excel(doc_path)
+        edc_excel = spool.open_excel(edc_path)
     except Exception as e:
         st.error(f"엑셀 파일 로드 중 오류: {e}")
         st.stop()
@@ -585,31 +399,72 @@ if doc_file_up and edc_file_up:
     # DB Spec 설정
     with c1:
         st.subheader("📄 DB Spec 설정")
-        doc_sheet  = st.selectbox("시트 선택", doc_excel.sheet_names, key="s1")
+        doc_sheet  = st.selectbox("시트 선택", doc_sheets, key="s1")
         doc_header = st.number_input("헤더 행 (Row Index)", min_value=0, value=1, step=1, key="h1")
 
-        doc_df = get_dynamic_preview(doc_excel, doc_sheet, doc_header)
+        doc_df = engine.get_dynamic_preview(doc_excel, doc_sheet, doc_header)
         st.caption(f"▼ '{doc_sheet}' 시트의 {doc_header}번 행을 헤더로 인식한 결과:")
         st.dataframe(doc_df.head(3), use_container_width=True, hide_index=True)
 
-        is_ok, msg, _ = check_columns_status(doc_df)
+        is_ok, msg, _ = engine.check_columns_status(doc_df)
         st.markdown(
             f'<div class="{"success-box" if is_ok else "error-box"}">{msg}</div>',
             unsafe_allow_html=True
         )
         doc_ready = is_ok
 
+        # CRF 모듈별로 여러 시트에 나뉜 DB Spec — 선택 순서대로 이어 붙이고 시트 간 중복 키는 따로 보고
+        doc_extra = st.multiselect("추가 시트 (DB Spec이 여러 시트로 나뉜 경우)",
+                                   [s for s in doc_sheets if s != doc_sheet], key="s1_extra",
+                                   help="같은 헤더 행을 사용하며, 선택한 순서대로 첫 시트 뒤에 이어 붙입니다.")
+        for extra_sheet in doc_extra:
+            is_ok, msg, _ = engine.check_columns_status(
+                engine.get_dynamic_preview(doc_excel, extra_sheet, doc_header))
+            if not is_ok:
+                st.markdown(f"<div class=\"error-box\">'{extra_sheet}' 시트: {msg}</div>",
+                            unsafe_allow_html=True)
+                doc_ready = False
+        doc_sheet_sel = [doc_sheet] + doc_extra if doc_extra else doc_sheet
+
+        # 여러 파일로 나뉜 DB Spec — 파일마다 시트를 고르고 헤더 행은 위 설정 공통, 위 시트들 뒤에 업로드 순서대로 이어 붙임
+        doc_more_up = st.file_uploader("추가 DB Spec 파일 (DB Spec이 여러 파일로 나뉜 경우)", type=['xlsx', 'xls'],
+                                       accept_multiple_files=True, key="doc_more")
+        doc_parts = [engine.SpecPart(doc_path, sheet, doc_header) for sheet in [doc_sheet] + doc_extra]
+        for more_up in doc_more_up or []:
+            try:
+                more_path   = get_upload_spool().add(more_up)
+                more_sheets = [m.name for m in load_workbook_meta(more_path)]
+                more_excel  = get_upload_spool().open_excel(more_path)
+            except Exception as e:
+                st.markdown(f"<div class=\"error-box\">'{more_up.name}' 로드 실패: {e}</div>",
+                            unsafe_allow_html=True)
+                doc_ready = False
+                continue
+            more_sheet = st.selectbox(f"'{more_up.name}' 시트", more_sheets, key=f"s1_more_{more_up.name}")
+            is_ok, msg, _ = engine.check_columns_status(
+                engine.get_dynamic_preview(more_excel, more_sheet, doc_header))
+            if not is_ok:
+                st.markdown(f"<div class=\"error-box\">'{more_up.name}' / '{more_sheet}' 시트: {msg}</div>",
+                            unsafe_allow_html=True)
+                doc_ready = False
+            doc_parts.append(engine.SpecPart(more_path, more_sheet, doc_header))
+
+        # 엔진 / 사전 점검 / 리포트 캐시에 넘길 DB Spec 입력 (여러 파일이면 SpecPart 목록)
+        doc_source = doc_parts if doc_more_up else doc_path
+        if doc_more_up:
+            doc_sheet_sel = None
+
     # Entry Screen Export 설정
     with c2:
         st.subheader("📄 EDC Export 설정 (Entry Screen)")
-        edc_sheet  = st.selectbox("시트 선택", edc_excel.sheet_names, key="s2")
+        edc_sheet  = st.selectbox("시트 선택", edc_sheets, key="s2")
         edc_header = st.number_input("헤더 행 (Row Index)", min_value=0, value=0, step=1, key="h2")
 
-        edc_df = get_dynamic_preview(edc_excel, edc_sheet, edc_header)
+        edc_df = engine.get_dynamic_preview(edc_excel, edc_sheet, edc_header)
         st.caption(f"▼ '{edc_sheet}' 시트의 {edc_header}번 행을 헤더로 인식한 결과:")
         st.dataframe(edc_df.head(3), use_container_width=True, hide_index=True)
 
-        is_ok, msg, _ = check_columns_status(edc_df)
+        is_ok, msg, _ = engine.check_columns_status(edc_df)
         st.markdown(
             f'<div class="{"success-box" if is_ok else "error-box"}">{msg}</div>',
             unsafe_allow_html=True
@@ -618,17 +473,21 @@ if doc_file_up and edc_file_up:
 
     # Dataset 파일 상태 표시
     dataset_ready = False
+    dataset_path  = None
     if dataset_file_up:
         st.markdown("---")
         st.subheader("📄 CDMS Dataset 확인")
         try:
-            dataset_excel  = load_excel_file(dataset_file_up)
-            domain_sheets  = [s for s in dataset_excel.sheet_names
-                              if s.upper() != 'SUBJECT_INFO']
+            dataset_path   = get_upload_spool().add(dataset_file_up)
+            domain_sheets  = [m for m in load_workbook_meta(dataset_path)
+                              if m.name.upper() != 'SUBJECT_INFO']
+            known_rows     = [m.max_row - 1 for m in domain_sheets if m.max_row]
+            rows_text      = (f' (데이터 약 {sum(known_rows):,}행)'
+                              if len(known_rows) == len(domain_sheets) and domain_sheets else '')
             st.markdown(
                 f'<div class="success-box">✅ Dataset 로드 성공 — '
-                f'도메인 시트 {len(domain_sheets)}개 인식: '
-                f'{", ".join(domain_sheets)}</div>',
+                f'도메인 시트 {len(domain_sheets)}개 인식{rows_text}: '
+                f'{", ".join(m.name for m in domain_sheets)}</div>',
                 unsafe_allow_html=True
             )
             dataset_ready = True
@@ -643,113 +502,127 @@ if doc_file_up and edc_file_up:
     st.markdown("---")
 
     # 버전 정보
-    with st.expander("📌 버전 정보 (Optional)", expanded=False):
+    with st.expander("📌 스터디 / 버전 정보 (Optional)", expanded=False):
+        study = st.text_input("Study (검증 이력 저장용)", os.path.splitext(doc_file_up.name)[0])
         v1, v2, v3 = st.columns(3)
         bv = v1.text_input("Blank Ver.", "1.0")
         dv = v2.text_input("DB Spec Ver.", "1.0")
         av = v3.text_input("Annotated Ver.", "1.0")
 
-    if not os.path.exists(TEMPLATE_PATH):
-        st.error(f"🚨 중요: 실행 경로에 '{TEMPLATE_PATH}' 파일이 없습니다.")
+    if not os.path.exists(engine.TEMPLATE_PATH):
+        st.error(f"🚨 중요: 실행 경로에 '{engine.TEMPLATE_PATH}' 파일이 없습니다.")
         btn_disabled = True
     else:
         btn_disabled = not (doc_ready and edc_ready)
 
-    if st.button("🚀 검증 시작 (Start Validation)", type="primary", disabled=btn_disabled):
-        with st.status("검증 실행 중 — 잠시 기다려 주세요.", expanded=True) as status:
-
-            # ── DB Spec 로드 ──────────────────────────────────
-            df_doc_full = process_data_final(doc_excel, doc_sheet, doc_header)  # 전체 (필터 없음)
-
-            if df_doc_full.empty:
-                status.update(label="❌ DB Spec 로드 실패", state="error")
-                st.error("DB Spec 데이터를 불러올 수 없습니다.")
-                st.stop()
-
-            st.write("📖 DB Spec 로드 - 완료")
-
-            # ── Entry Screen: SYS_ 필터 적용 ─────────────────
-            df_doc_entry, df_excluded = apply_sys_layout_filter(df_doc_full.copy(), SYS_LAYOUT_WHITELIST)
-            st.write("🔍 Entry Screen SYS_ 필터 적용 - 완료")
-
-            if not df_excluded.empty:
-                st.info(
-                    f"ℹ️ SYS_ 레이아웃으로 인해 Entry Screen 비교에서 제외된 항목: "
-                    f"**{len(df_excluded)}건** (Whitelist 항목은 포함 유지)"
-                )
-                with st.expander("제외된 항목 확인 (SYS_ 필터)"):
-                    st.dataframe(
-                        df_excluded[['DOMAIN', 'PAGE', 'VISIT', 'ITEM ID', 'LAYOUT']],
-                        use_container_width=True, hide_index=True
-                    )
-
-            # ── Entry Screen: EDC Export 로드 ─────────────────
-            df_final_edc = process_data_final(edc_excel, edc_sheet, edc_header)
-
-            if df_final_edc.empty:
-                status.update(label="❌ EDC Export 로드 실패", state="error")
-                st.error("EDC Export 데이터를 불러올 수 없습니다.")
-                st.stop()
-
-            # ── EDC Export에도 동일한 SYS_ 필터 적용 ──────────
-            df_final_edc, df_edc_excluded = apply_sys_layout_filter(
-                df_final_edc, SYS_LAYOUT_WHITELIST
-            )
-            st.write("📖 EDC Export 로드 및 SYS_ 필터 적용 - 완료")
-
-            if not df_edc_excluded.empty:
-                st.info(
-                    f"ℹ️ EDC Export에서도 SYS_ 레이아웃으로 제외된 항목: "
-                    f"**{len(df_edc_excluded)}건**"
-                )
-
-            # ── Data Structure: Dataset Long format 변환 ──────
-            df_dataset_long = None
-            if dataset_ready:
-                df_dataset_long = build_dataset_long(dataset_excel)
-                st.write(
-                    f"🔄 CDMS Dataset 변환 - 완료 "
-                    f"(총 **{len(df_dataset_long)}개** Domain-Item ID 조합 추출)"
-                )
-
-            # ── 템플릿에 저장 ─────────────────────────────────
-            st.write("📝 템플릿 결과 기입 - 완료")
-            ver_info    = {'blank': bv, 'db': dv, 'annotated': av}
-            result_file = save_to_template(
-                TEMPLATE_PATH,
-                df_doc_entry,       # Entry Screen용 (SYS_ 필터 적용)
-                df_final_edc,
-                ver_info,
-                df_doc_full=df_doc_full,            # Data Structure용 (필터 없음)
-                df_dataset_long=df_dataset_long,    # None이면 해당 시트 건너뜀
-            )
+    # 현재 입력 조합 식별값 — 저장된 결과가 현재 입력과 같은 경우에만 결과 영역을 표시
+    run_inputs = (str(doc_source), str(doc_sheet_sel), doc_header, edc_path, edc_sheet, edc_header,
+                  dataset_path if dataset_ready else None, study, bv, dv, av)
 
-            if result_file:
-                status.update(label="🎉 완료!", state="complete")
-
-                summary_parts = ["✅ **Entry Screen Validation** 완료"]
-                if df_dataset_long is not None:
-                    no_data_cnt = (df_dataset_long['DS_TYPE'] == '').sum() if not df_dataset_long.empty else 0
-                    summary_parts.append(
-                        f"✅ **Data Structure Validation** 완료 "
-                        f"(데이터 없는 항목: {no_data_cnt}건 → 연분홍 표시 + FALSE)"
-                    )
-                else:
-                    summary_parts.append("⚠️ CDMS Dataset 미업로드 → Data Structure Validation 건너뜀")
-
-                st.success("\n\n".join(summary_parts))
-
-                today_str = pd.Timestamp.now().strftime('%Y%m%d')
-                file_name = f"EDC Validation List_{today_str}.xlsx"
-                st.download_button(
-                    label="📥 결과 리포트 다운로드",
-                    data=result_file,
-                    file_name=file_name,
-                    mime="application/vnd.openxmlformats-officedocument.spreadsheetml.sheet"
-                )
-            else:
-                status.update(label="❌ 템플릿 저장 실패", state="error")
-                st.error("결과 파일 생성 중 오류가 발생했습니다.")
+    # ── 사전 점검: 키 열만 읽어 일치 건수 확인 (전체 검증 전에 시트/헤더 행 확인) ──
+    if st.button("⚡ 사전 점검 (키 일치 건수)", disabled=not (doc_ready and edc_ready)):
+        import preflight
+        try:
+            pf = preflight.preflight(doc_source, doc_sheet_sel, doc_header, edc_path, edc_sheet, edc_header)
+        except Exception as e:
+            st.error(f"사전 점검 실패: {e}")
+        else:
+            m1, m2, m3, m4 = st.columns(4)
+            m1.metric("일치", f"{pf['matched']:,}")
+            m2.metric("DB Spec에만", f"{pf['spec_only']:,}")
+            m3.metric("Export에만", f"{pf['export_only']:,}")
+            m4.metric("일치율", f"{pf['match_rate']:.1%}")
+            if pf['matched'] == 0:
+                st.warning("⚠️ 일치하는 키가 없습니다 — 시트와 헤더 행 설정을 확인하세요.")
+            if not pf['top_domains'].empty:
+                st.caption("불일치가 많은 DOMAIN")
+                st.dataframe(pf['top_domains'], use_container_width=True, hide_index=True)
+            st.caption(f"⏱ {pf['elapsed_s']}초 · SYS_ 제외: DB Spec {pf['spec_excluded']:,}건 / "
+                       f"Export {pf['export_excluded']:,}건")
+
+    # 백그라운드 검증이 진행 중이면 끝날 때까지 새 실행을 막음 (세션당 하나)
+    active_run = st.session_state.get('validation_run')
+    running    = active_run is not None and active_run.running
+
+    use_cache = st.checkbox("같은 입력으로 저장된 결과가 있으면 바로 사용 (리포트 캐시)", value=True,
+                            key="use_cache")
+    start = st.button("🚀 검증 시작 (Start Validation)", type="primary", disabled=btn_disabled or running)
+
+    # ── 리포트 캐시: 입력 파일 해시 + 설정이 같으면 저장된 리포트를 바로 사용 ──
+    cache     = None
+    cache_key = None
+    cached    = None
+    if start:
+        import report_cache
+        cache       = report_cache.ReportCache()
+        ver_info    = {'blank': bv, 'db': dv, 'annotated': av}
+        run_sources = {'spec': doc_source if doc_more_up else doc_file_up, 'export': edc_file_up,
+                       'dataset': dataset_file_up if dataset_ready else None}
+        file_names  = {'spec_file'   : ", ".join(f.name for f in [doc_file_up] + (doc_more_up or [])),
+                       'export_file' : edc_file_up.name,
+                       'dataset_file': dataset_file_up.name if dataset_ready else None}
+        if cache.enabled:
+            try:
+                cache_key = report_cache.cache_key(doc_source, doc_sheet_sel, doc_header, edc_path, edc_sheet,
+                                                   edc_header, dataset_path if dataset_ready else None,
+                                                   ver_info)
+            except OSError:
+                cache_key = None
+        if cache_key and use_cache:
+            cached = cache.get(cache_key)
+
+    if cached is not None:
+        report, meta, frames = cached
+        with run_metrics.RunMetrics('ui', inputs=run_sources) as metrics:
+            metrics.count(cache_hit=1, report_bytes=len(report))
+            history_error = save_history(metrics, study, ver_info, frames, file_names)
+        if history_error:
+            st.warning(history_error)
+        entry = (meta.get('summary') or {}).get('entry_screen') or {}
+        st.success(
+            "♻️ 같은 입력으로 저장된 결과 리포트를 불러왔습니다."
+            + (f" (일치 {entry['match']:,} / 불일치 {entry['mismatch']:,} / DB Spec에만 "
+               f"{entry['spec_only']:,} / Export에만 {entry['export_only']:,})" if entry else "")
+        )
+        st.session_state['last_run'] = {
+            'inputs'   : run_inputs,
+            'report'   : report,
+            'file_name': f"EDC Validation List_{time.strftime('%Y%m%d')}.xlsx",
+            'explorer' : engine.build_explorer_frame(frames['merged']),
+        }
+
+    elif start:
+        # ── 단계별 청크 처리 (DB Spec/Export 로드 → Dataset 변환 → 비교 → 결과 기입) ──
+        # 검증은 백그라운드 스레드에서 실행하고 화면은 진행률만 주기적으로 읽음 (중지 버튼이 실행 중인 검증에 닿도록)
+        # 입력은 경로로 넘겨 엔진이 자기 핸들로 읽고 닫게 함 — 화면 프리뷰가 쓰는 스풀 ExcelFile은 스레드 간에 공유하지 않음
+        import background_run
+        cancel  = engine.CancelToken()
+        sources = (doc_source, doc_sheet_sel, doc_header, edc_path, edc_sheet, edc_header,
+                   dataset_path if dataset_ready else None)
+        steps   = validation_steps(run_metrics.RunMetrics('ui', inputs=run_sources), sources, study, ver_info,
+                                   file_names, cache, cache_key, cancel)
+        active_run = background_run.BackgroundRun(steps, cancel, inputs=run_inputs)
+        st.session_state['validation_run'] = active_run
+
+    if active_run is not None:
+        if active_run.running:
+            render_validation_progress()
+        else:
+            del st.session_state['validation_run']
+            show_run_outcome(active_run)
+
+    # ── 결과 다운로드 + 탐색기 (재실행 후에도 유지) ───────────
+    last_run = st.session_state.get('last_run')
+    if last_run and last_run['inputs'] == run_inputs:
+        st.download_button(
+            label="📥 결과 리포트 다운로드",
+            data=last_run['report'],
+            file_name=last_run['file_name'],
+            mime="application/vnd.openxmlformats-officedocument.spreadsheetml.sheet"
+        )
+        render_report_diff(last_run['report'])
+        st.markdown("---")
+        render_result_explorer(last_run['explorer'])
 
 else:
     st.info("👆 먼저 상단에서 기준 문서(DB Spec)와 CDMS Export 파일을 업로드해주세요.")
\ No newline at end of file
@@ -0,0 +1,269 @@
+"""
+CDMS Dataset 프로파일링
+
+Dataset 엑셀의 도메인 시트별로 모든 대상자 값을 전수 집계하여
+(DOMAIN, ITEM ID) 단위 프로파일을 계산하고, DB Spec의 TYPE / MAX_LEN / MIN_VAL / MAX_VAL
+기준으로 위반 값 건수를 자동 점검합니다.
+
+- 시트 내부 계산은 셀 값을 하나의 긴 배열로 펼쳐 numpy/pandas 벡터 연산으로 처리
+- 파일 경로가 주어지면 시트 단위로 프로세스 풀에서 병렬 처리
+"""
+import os
+
+import numpy as np
+import pandas as pd
+
+import xlsx_meta
+from worker_pool import iter_completed, process_pool
+
+SKIP_SHEETS = {'SUBJECT_INFO'}
+
+# 시트 병렬 처리 기준 (이보다 작은 파일은 프로세스 기동 비용이 더 커서 순차 처리)
+PARALLEL_MIN_BYTES = 5 * 1024 * 1024
+# 한 번에 펼쳐서 계산할 열 수 (메모리 상한)
+COLUMN_BLOCK_SIZE = 256
+
+# 값 타입 코드
+TYPE_INTEGER, TYPE_FLOAT, TYPE_DATETIME, TYPE_TEXT = 0, 1, 2, 3
+TYPE_NAMES = {TYPE_INTEGER: 'integer', TYPE_FLOAT: 'float', TYPE_DATETIME: 'datetime', TYPE_TEXT: 'text'}
+
+INT_PATTERN  = r'[+-]?\d+'
+DATE_PATTERN = r'\d{4}-\d{2}-\d{2}(?:[ T]\d{2}:\d{2}(?::\d{2})?)?'
+
+PROFILE_COLS = ['DOMAIN', 'ITEM ID', 'DS_TYPE', 'DS_SUBJID',
+                'PROFILE_TYPE', 'PROFILE_MAX_LEN', 'PROFILE_MIN', 'PROFILE_MAX',
+                'PROFILE_NULL_RATE', 'PROFILE_NON_CONFORMING', 'PROFILE_CHECK']
+
+
+def parse_item_id(col_name: str) -> str:
+    """
+    'ITEMID:LABEL' 형태의 컬럼명에서 ITEM ID 부분만 추출합니다.
+    ':' 가 없으면 컬럼명 그대로 반환합니다.
+    """
+    return col_name.split(':')[0].strip().upper()
+
+
+def expected_type(spec_type: str):
+    """DB Spec TYPE 문자열 → 값 타입 코드 (판단 불가 시 None)"""
+    t = str(spec_type).strip().upper()
+    if not t or t == 'NAN':
+        return None
+    if 'INT' in t:
+        return TYPE_INTEGER
+    if 'DATE' in t or 'TIME' in t:
+        return TYPE_DATETIME
+    if any(k in t for k in ('FLOAT', 'NUM', 'DEC', 'REAL', 'DOUBLE')):
+        return TYPE_FLOAT
+    if any(k in t for k in ('TEXT', 'CHAR', 'STR')):
+        return TYPE_TEXT
+    return None
+
+
+def build_spec_constraints(df_spec: pd.DataFrame) -> dict:
+    """
+    DB Spec → {DOMAIN: {ITEM ID: (타입 코드, MAX_LEN, MIN_VAL, MAX_VAL)}}
+    (같은 항목이 여러 PAGE/VISIT에 있으면 첫 행 기준)
+    """
+    if df_spec is None or df_spec.empty:
+        return {}
+
+    spec = df_spec.reindex(columns=['DOMAIN', 'ITEM ID', 'TYPE', 'MAX_LEN', 'MIN_VAL', 'MAX_VAL']).fillna('')
+    if {'KEY_DOMAIN', 'KEY_ITEM_ID'} <= set(df_spec.columns):
+        # DB Spec을 읽을 때 만든 정규화 키 열 재사용 (edc_engine.SPEC_KEY_COLS)
+        spec = spec.assign(DOMAIN=df_spec['KEY_DOMAIN'], **{'ITEM ID': df_spec['KEY_ITEM_ID']})
+    else:
+        spec = spec.assign(DOMAIN=spec['DOMAIN'].astype(str).str.strip().str.upper(),
+                           **{'ITEM ID': spec['ITEM ID'].astype(str).str.strip().str.upper()})
+    spec = spec.drop_duplicates(subset=['DOMAIN', 'ITEM ID'])
+
+    numeric = {c: pd.to_numeric(spec[c].astype(str).str.strip(), errors='coerce')
+               for c in ['MAX_LEN', 'MIN_VAL', 'MAX_VAL']}
+    # Series.map은 None을 NaN으로 바꾸므로(판단 불가 TYPE이 섞인 경우) 목록으로 변환
+    types   = [expected_type(t) for t in spec['TYPE']]
+
+    constraints = {}
+    for domain, item_id, exp, max_len, min_val, max_val in zip(
+            spec['DOMAIN'], spec['ITEM ID'], types,
+            numeric['MAX_LEN'], numeric['MIN_VAL'], numeric['MAX_VAL']):
+        constraints.setdefault(domain, {})[item_id] = (exp, max_len, min_val, max_val)
+    return constraints
+
+
+def _check_text(exp, dominant, n_type, n_len, n_range) -> str:
+    parts = []
+    if exp is not None and dominant is not None:
+        compatible = (exp == TYPE_TEXT or exp == dominant or
+                      (exp == TYPE_FLOAT and dominant == TYPE_INTEGER))
+        if not compatible:
+            parts.append(f"TYPE 불일치 (Spec={TYPE_NAMES[exp]}, Data={TYPE_NAMES[dominant]})")
+    if n_type:
+        parts.append(f"타입 위반 {n_type}건")
+    if n_len:
+        parts.append(f"MAX_LEN 초과 {n_len}건")
+    if n_range:
+        parts.append(f"MIN/MAX 범위 밖 {n_range}건")
+    return ' / '.join(parts)
+
+
+def profile_sheet(df: pd.DataFrame, domain: str, constraints: dict = None) -> pd.DataFrame:
+    """
+    한 도메인 시트(모든 값 문자열로 읽은 DataFrame)의 컬럼별 프로파일을 계산합니다.
+
+    Returns:
+        PROFILE_COLS 컬럼의 DataFrame (시트 컬럼 1개 = 1행)
+          - DS_TYPE / DS_SUBJID : 값이 있는 첫 대상자의 실제 값과 SUBJID
+          - PROFILE_TYPE        : 값들의 우세 타입 (integer / float / datetime / text)
+          - PROFILE_MAX_LEN     : 최대 문자열 길이
+          - PROFILE_MIN / MAX   : 숫자 값 최소/최대
+          - PROFILE_NULL_RATE   : 결측 비율 (0~1)
+          - PROFILE_NON_CONFORMING / PROFILE_CHECK : Spec 기준 위반 값 건수 / 점검 요약
+    """
+    constraints = constraints or {}
+    n_rows      = len(df)
+    item_ids    = [parse_item_id(str(c)) for c in df.columns]
+
+    subj_values = None
+    if 'SUBJID' in item_ids:
+        subj_values = df.iloc[:, item_ids.index('SUBJID')].fillna('').astype(str).str.strip().to_numpy()
+
+    records = []
+    for start in range(0, len(item_ids), COLUMN_BLOCK_SIZE):
+        block_ids = item_ids[start:start + COLUMN_BLOCK_SIZE]
+        m         = len(block_ids)
+        values    = df.iloc[:, start:start + m].to_numpy(dtype=object).ravel(order='F')
+
+        # 열 우선으로 펼친 값: 위치 p → 열 p // n_rows, 행 p % n_rows
+        col_idx = np.repeat(np.arange(m), n_rows)
+        text    = pd.Series(values, dtype=object).fillna('').astype(str).str.strip()
+        present = ((text != '') & (text.str.lower() != 'nan')).to_numpy()
+
+        lengths = text.str.len().to_numpy()
+        numbers = pd.to_numeric(text.where(present), errors='coerce').to_numpy(dtype=float)
+        is_num  = ~np.isnan(numbers)
+        is_int  = text.str.fullmatch(INT_PATTERN).to_numpy(dtype=bool)
+        is_date = text.str.fullmatch(DATE_PATTERN).to_numpy(dtype=bool)
+        kinds   = np.select([is_int, is_num, is_date], [TYPE_INTEGER, TYPE_FLOAT, TYPE_DATETIME], TYPE_TEXT)
+
+        # 열별 Spec 제약 배열
+        limits  = [constraints.get(item_id, (None, np.nan, np.nan, np.nan)) for item_id in block_ids]
+        exp_arr = np.array([-1 if lim[0] is None else lim[0] for lim in limits])[col_idx]
+        max_len = np.array([lim[1] for lim in limits], dtype=float)[col_idx]
+        min_val = np.array([lim[2] for lim in limits], dtype=float)[col_idx]
+        max_val = np.array([lim[3] for lim in limits], dtype=float)[col_idx]
+
+        with np.errstate(invalid='ignore'):
+            type_bad  = present & (((exp_arr == TYPE_INTEGER) & ~is_int) |
+                                   ((exp_arr == TYPE_FLOAT) & ~is_num) |
+                                   ((exp_arr == TYPE_DATETIME) & ~is_date))
+            len_bad   = present & (exp_arr != TYPE_DATETIME) & (lengths > max_len)
+            range_bad = present & is_num & ((numbers < min_val) | (numbers > max_val))
+
+        # 열별 집계
+        n_present  = np.bincount(col_idx[present], minlength=m)
+        kind_count = np.bincount(col_idx[present] * 4 + kinds[present], minlength=m * 4).reshape(m, 4)
+        n_type     = np.bincount(col_idx[type_bad], minlength=m)
+        n_len      = np.bincount(col_idx[len_bad], minlength=m)
+        n_range    = np.bincount(col_idx[range_bad], minlength=m)
+        n_bad      = np.bincount(col_idx[type_bad | len_bad | range_bad], minlength=m)
+
+        max_lens = pd.Series(lengths[present]).groupby(col_idx[present]).max()
+        num_mask = present & is_num
+        num_min  = pd.Series(numbers[num_mask]).groupby(col_idx[num_mask]).min()
+        num_max  = pd.Series(numbers[num_mask]).groupby(col_idx[num_mask]).max()
+
+        first_cols, first_pos = np.unique(col_idx[present], return_index=True)
+        first_pos = np.flatnonzero(present)[first_pos]
+        first_at  = dict(zip(first_cols, first_pos))
+
+        for j, item_id in enumerate(block_ids):
+            pos      = first_at.get(j)
+            dominant = int(kind_count[j].argmax()) if n_present[j] else None
+            records.append({
+                'DOMAIN'                : domain,
+                'ITEM ID'               : item_id,
+                'DS_TYPE'               : text.iat[pos] if pos is not None else '',
+                'DS_SUBJID'             : (subj_values[pos % n_rows]
+                                           if pos is not None and subj_values is not None else ''),
+                'PROFILE_TYPE'          : TYPE_NAMES[dominant] if dominant is not None else '',
+                'PROFILE_MAX_LEN'       : int(max_lens.get(j, 0)),
+                'PROFILE_MIN'           : num_min.get(j, np.nan),
+                'PROFILE_MAX'           : num_max.get(j, np.nan),
+                'PROFILE_NULL_RATE'     : 1 - n_present[j] / n_rows if n_rows else 1.0,
+                'PROFILE_NON_CONFORMING': int(n_bad[j]),
+                'PROFILE_CHECK'         : _check_text(limits[j][0], dominant,
+                                                      n_type[j], n_len[j], n_range[j]),
+            })
+
+    return pd.DataFrame(records, columns=PROFILE_COLS)
+
+
+def _profile_sheet_source(source, sheet: str, constraints: dict) -> pd.DataFrame:
+    """시트 하나를 읽어 프로파일 계산 (프로세스 풀 작업 단위)"""
+    try:
+        df = pd.read_excel(source, sheet_name=sheet, dtype=str)
+    except Exception:
+        return pd.DataFrame(columns=PROFILE_COLS)
+    if df.empty:
+        return pd.DataFrame(columns=PROFILE_COLS)
+    domain = sheet.strip().upper()
+    return profile_sheet(df, domain, constraints.get(domain, {}))
+
+
+def profile_dataset(source, df_spec: pd.DataFrame = None, max_workers: int = None) -> pd.DataFrame:
+    """
+    CDMS Dataset 전체 도메인 시트를 프로파일링합니다.
+
+    Args:
+        source     : 파일 경로 또는 pd.ExcelFile
+                     (경로이고 파일이 PARALLEL_MIN_BYTES 이상이면 시트 단위 병렬 처리)
+        df_spec    : 표준화된 DB Spec (위반 값 점검 기준, 없으면 점검 생략)
+        max_workers: 병렬 프로세스 수 (기본: CPU 수와 시트 수 중 작은 값, 1이면 순차)
+
+    Returns:
+        PROFILE_COLS 컬럼의 DataFrame (시트 순서 유지)
+    """
+    steps = iter_profile_dataset(source, df_spec, max_workers)
+    while True:
+        try:
+            next(steps)
+        except StopIteration as stop:
+            return stop.value
+
+
+def iter_profile_dataset(source, df_spec: pd.DataFrame = None, max_workers: int = None, cancel=None):
+    """
+    profile_dataset의 제너레이터 버전 — 시트 하나가 끝날 때마다 (완료 시트 수, 전체 시트 수)를 yield 하고
+    결과 DataFrame을 return 합니다. 중간에 close()하면 대기 중인 병렬 작업은 취소합니다.
+    cancel(engine.CancelToken)이 있으면 병렬 작업을 기다리는 동안에도 중지 요청을 확인합니다.
+    """
+    if isinstance(source, (str, os.PathLike)):
+        # 시트 이름은 워크북 색인 파트에서만 읽음 (시트 데이터를 여는 pd.ExcelFile 생략)
+        sheets      = xlsx_meta.sheet_names(source)
+        parallel_ok = os.path.getsize(source) >= PARALLEL_MIN_BYTES
+    else:
+        sheets, parallel_ok = source.sheet_names, False
+
+    sheets      = [s for s in sheets if s.upper() not in SKIP_SHEETS]
+    constraints = build_spec_constraints(df_spec)
+    if max_workers is None:
+        max_workers = min(os.cpu_count() or 1, len(sheets))
+
+    frames = []
+    yield 0, len(sheets)
+    if parallel_ok and max_workers > 1 and len(sheets) > 1:
+        frames = [None] * len(sheets)
+        with process_pool(max_workers) as pool:
+            futures = {pool.submit(_profile_sheet_source, source, sheet, constraints): i
+                       for i, sheet in enumerate(sheets)}
+            for finished, future in enumerate(iter_completed(futures, cancel), start=1):
+                frames[futures[future]] = future.result()
+                yield finished, len(sheets)
+    else:
+        for sheet in sheets:
+            frames.append(_profile_sheet_source(source, sheet, constraints))
+            yield len(frames), len(sheets)
+
+    frames = [f for f in frames if not f.empty]
+    if not frames:
+        return pd.DataFrame(columns=PROFILE_COLS)
+    return pd.concat(frames, ignore_index=True)
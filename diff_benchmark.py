@@ -0,0 +1,123 @@
+"""
+결과 리포트 비교(report_diff) 벤치마크
+
+Entry Screen 시트 레이아웃(헤더 5~6행, 데이터 7행부터, 31열 '확인 결과')을 따르는 이전/현재 리포트를
+행 수별로 생성해 diff_reports의 소요 시간과 최대 RSS 증가량을 측정합니다.
+현재 리포트는 일정 간격으로 값 변경 / 확인 결과 변경 / 삭제 / 추가 행을 포함합니다.
+
+스트리밍 읽기라 메모리에는 행 키 인덱스와 변경 행 값만 남으므로 최대 RSS 증가량은 고정 한도로 점검하며,
+행 수별 예산(DIFF_BUDGET_S / DIFF_RSS_BUDGET_MB)을 넘으면 종료 코드 1로 끝납니다.
+
+사용법:
+    python diff_benchmark.py                      # 10,000 / 50,000행 측정 + 예산 점검
+    python diff_benchmark.py --sizes 100000
+"""
+import argparse
+import os
+import sys
+import tempfile
+import time
+
+# ============================================================
+# [유지보수 포인트] 벤치마크 설정
+#   DIFF_BUDGET_S     : (기본 초, 10,000행당 추가 초) — 예산 = 기본 + 행 수 / 10000 × 추가
+#   DIFF_RSS_BUDGET_MB: 비교 중 최대 RSS 증가 한도(MB, 행 수와 무관한 고정값)
+# ============================================================
+BENCH_SIZES        = (10000, 50000)
+DIFF_BUDGET_S      = (1.0, 2.0)
+DIFF_RSS_BUDGET_MB = 200
+
+CHANGE_EVERY  = 50     # n행마다 값 변경
+RESULT_EVERY  = 200    # n행마다 확인 결과 변경
+REMOVED_EVERY = 500    # n행마다 삭제 (현재 리포트 끝에 같은 수만큼 추가)
+
+SPEC_COLS = ['DOMAIN', 'DOMAIN LABEL', 'PAGE', 'PAGE LABEL', 'VISIT', 'ITEM ID', 'ITEM LABEL',
+             'ITEM SEQ', 'TYPE', 'MAX_LEN', 'CODE']
+
+
+def _entry_row(i: int, label: str, result: str) -> list:
+    domain = f"D{i % 40:02d}"
+    spec = [domain, f"{domain} label", f"{domain}_P{i % 7}", f"Page {i % 7}", f"V{i % 5}", f"ITEM{i}",
+            label, str(i), 'text', '200', '1=Yes;2=No' if i % 3 == 0 else '']
+    # 1~15열 DB Spec, 16~30열 Export, 31열 확인 결과
+    return spec + [None] * (15 - len(spec)) + spec + [None] * (15 - len(spec)) + [result]
+
+
+def generate_reports(rows: int, folder: str) -> tuple:
+    """(이전 리포트 경로, 현재 리포트 경로, 예상 변경 행 수 dict)"""
+    from openpyxl import Workbook
+    from report_diff import ENTRY_SHEET
+
+    paths, expected = [], {'added': 0, 'removed': 0, 'changed': 0}
+    for version in ('old', 'new'):
+        wb = Workbook(write_only=True)
+        ws = wb.create_sheet(ENTRY_SHEET)
+        for _ in range(4):
+            ws.append([])
+        ws.append([None] * 30 + ['확인 결과'])
+        ws.append(SPEC_COLS + [None] * (15 - len(SPEC_COLS)) + SPEC_COLS + [None] * (15 - len(SPEC_COLS))
+                  + ['확인 결과'])
+        for i in range(rows):
+            label, result = f"Label {i}", 'TRUE'
+            if version == 'new':
+                if i % REMOVED_EVERY == 0:
+                    expected['removed'] += 1
+                    continue
+                if i % CHANGE_EVERY == 0:
+                    label = f"Label {i} (changed)"
+                if i % RESULT_EVERY == 0:
+                    result = 'FALSE'
+                expected['changed'] += (i % CHANGE_EVERY == 0 or i % RESULT_EVERY == 0)
+            ws.append(_entry_row(i, label, result))
+        if version == 'new':
+            for i in range(rows, rows + expected['removed']):
+                ws.append(_entry_row(i, f"Label {i}", 'TRUE'))
+            expected['added'] = expected['removed']
+        path = os.path.join(folder, f"{version}_{rows}.xlsx")
+        wb.save(path)
+        paths.append(path)
+    return paths[0], paths[1], expected
+
+
+def measure(old_path: str, new_path: str, expected: dict) -> dict:
+    """diff_reports 1회 실행 — 소요 시간 / 최대 RSS 증가량(MB), 변경 건수 검증"""
+    import report_diff
+    from run_metrics import RSSSampler, current_rss_bytes
+
+    base = current_rss_bytes() or 0
+    sampler = RSSSampler(interval=0.05).start()
+    t0 = time.perf_counter()
+    df_diff = report_diff.diff_reports(old_path, new_path)
+    elapsed = time.perf_counter() - t0
+    peak = sampler.stop().get('self', base)
+
+    items = df_diff.drop_duplicates(subset=['CHANGE'] + report_diff.DIFF_KEY_COLS)['CHANGE'].value_counts()
+    found = {'added'  : int(items.get(report_diff.CHANGE_ADDED, 0)),
+             'removed': int(items.get(report_diff.CHANGE_REMOVED, 0)),
+             'changed': len(df_diff[df_diff['CHANGE'].isin([report_diff.CHANGE_RESULT, report_diff.CHANGE_VALUE])]
+                            .drop_duplicates(subset=report_diff.DIFF_KEY_COLS))}
+    if found != expected:
+        raise RuntimeError(f"변경 건수 불일치 — 예상 {expected}, 결과 {found}")
+    return {'seconds': elapsed, 'rss_mb': (peak - base) / 1024 / 1024}
+
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(description="EDC Validation 결과 리포트 비교 벤치마크")
+    parser.add_argument("--sizes", type=int, nargs="+", default=list(BENCH_SIZES), help="리포트 데이터 행 수")
+    args = parser.parse_args(argv)
+
+    failures = 0
+    with tempfile.TemporaryDirectory(prefix="edc_diff_bench_") as folder:
+        for rows in args.sizes:
+            old_path, new_path, expected = generate_reports(rows, folder)
+            result = measure(old_path, new_path, expected)
+            limit = DIFF_BUDGET_S[0] + DIFF_BUDGET_S[1] * rows / 10000
+            ok = result['seconds'] <= limit and result['rss_mb'] <= DIFF_RSS_BUDGET_MB
+            failures += not ok
+            print(f"{'✅' if ok else '❌'} [{rows:,}행] {result['seconds']:.2f}s (한도 {limit:.1f}s), "
+                  f"최대 RSS 증가 {result['rss_mb']:.0f}MB (한도 {DIFF_RSS_BUDGET_MB}MB)", flush=True)
+    return 1 if failures else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
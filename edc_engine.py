@@ -0,0 +1,2097 @@
+"""
+EDC Validation 엔진 (UI 비의존)
+
+DB Spec / CDMS Export / CDMS Dataset 로드, 비교, 결과 템플릿 기입 로직을 모읍니다.
+pandas / openpyxl 등 무거운 의존성은 이 모듈에서만 import 하므로,
+Streamlit 화면(bm_app.py)은 실제 파일이 업로드된 뒤에야 이 모듈을 불러옵니다.
+"""
+import io
+import os
+import mmap
+import re
+import sys
+import threading
+import hashlib
+from copy import copy
+from collections import namedtuple
+from datetime import datetime, timezone
+from zipfile import ZIP_DEFLATED, ZipFile
+from contextlib import nullcontext
+from functools import lru_cache
+
+import pandas as pd
+from pandas.io.parsers import TextParser
+from openpyxl import load_workbook
+from openpyxl.styles import PatternFill, Border, Side, Alignment, Font, NamedStyle
+from openpyxl.cell.cell import MergedCell
+from openpyxl.formatting.rule import FormulaRule
+from openpyxl.utils import get_column_letter
+from openpyxl.drawing.spreadsheet_drawing import SpreadsheetDrawing
+from openpyxl.worksheet._writer import WorksheetWriter
+from openpyxl.writer.excel import ExcelWriter
+
+import xlsx_stitch
+from dataset_profile import iter_profile_dataset, profile_dataset
+from worker_pool import iter_completed, process_pool, wait_result
+
+
+# ============================================================
+# 1. 설정
+# ============================================================
+TEMPLATE_PATH = 'EDC Validation_template.xlsx'
+
+# ============================================================
+# [유지보수 포인트] SYS_ 레이아웃 제외 시 포함 예외 목록 (ITEM ID 기준)
+# 추후 비교에 포함시켜야 할 ITEM ID가 생기면 이 리스트에 추가하세요.
+# ============================================================
+SYS_LAYOUT_WHITELIST = [
+    "SUBJID",
+    # "SITEID",  # 예시: 추후 추가할 경우 이런 식으로 등록
+]
+
+# ============================================================
+# [유지보수 포인트] 수집 단계 행 제외 규칙 (DB Spec / EDC Export의 Entry Screen 비교용)
+# (규칙 이름, 표준 컬럼명, 방식, 값) — 방식: "prefix" | "equals" | "contains" | "regex"
+# 대소문자/앞뒤 공백은 무시하며, ITEM ID가 SYS_LAYOUT_WHITELIST에 있으면 제외하지 않습니다.
+# 제외된 행은 정규화 전에 버려지고 '제외된 항목' 집계(규칙/DOMAIN/PAGE/LAYOUT별 건수)로만 남습니다.
+# ============================================================
+INGEST_EXCLUDE_RULES = [
+    ("SYS_ 레이아웃", "LAYOUT", "prefix", "SYS_"),
+]
+
+# ============================================================
+# [유지보수 포인트] Entry Screen 컬럼별 비교 규칙
+# 규칙이 없는 컬럼은 "exact"(앞뒤 공백 제거 후 완전 일치)로 비교합니다.
+#   "exact"   : 앞뒤 공백 제거 후 완전 일치
+#   "text_ci" : 대소문자/연속 공백 무시
+#   "numeric" : 숫자로 해석해 허용오차(tol) 이내면 일치 (10 == 10.00), 숫자가 아니면 exact
+#   "set"     : 구분자(sep)로 나눈 항목의 집합이 같으면 일치 (순서/공백 무시)
+#   "codelist": 'code=decode' 목록을 정규화한 집합의 해시가 같으면 일치 (순서/구분자/공백 무시)
+#   "ignore"  : 비교하지 않음
+# 파라미터가 필요한 규칙은 ("numeric", {"tol": 0.001}) 처럼 튜플로 지정합니다.
+# ============================================================
+COMPARE_RULES = {
+    'DOMAIN LABEL': "text_ci",
+    'PAGE LABEL'  : "text_ci",
+    'ITEM LABEL'  : "text_ci",
+    'CODE'        : "codelist",
+    'MAX_LEN'     : ("numeric", {"tol": 0}),
+    'MIN_VAL'     : ("numeric", {"tol": 1e-9}),
+    'MAX_VAL'     : ("numeric", {"tol": 1e-9}),
+}
+
+# ============================================================
+# [유지보수 포인트] 결과 리포트 하이라이트 방식
+#   "rules": 불일치 플래그만 값으로 기록하고, 색상/테두리는 범위 단위 조건부 서식으로 표시
+#            (셀 단위 스타일 기입이 없어 저장/열기가 빠르고 파일이 작음)
+#   "cell" : 기존 방식 — 셀마다 배경/테두리/정렬을 직접 지정
+# ============================================================
+REPORT_HIGHLIGHT_MODE = "rules"
+
+# 결과 리포트의 두 시트를 병렬로 생성하는 최소 행 수 (DB Spec 기준, 작으면 프로세스 기동 비용이 더 큼)
+REPORT_PARALLEL_MIN_ROWS = 5000
+
+# Entry Screen 비교를 DOMAIN 단위로 나눠 여러 프로세스에서 수행하는 최소 행 수 (DB Spec 기준)
+COMPARE_PARALLEL_MIN_ROWS = 50000
+
+# 여러 시트/파일로 나뉜 DB Spec을 작업 프로세스에서 나눠 읽는 최소 전체 파일 크기
+SPEC_PARALLEL_MIN_BYTES = 5 * 1024 * 1024
+
+# ============================================================
+# [유지보수 포인트] 진행 상황 보고 / 중지 확인 단위 (행)
+#   값 정규화, Entry Screen 비교, 결과 시트 기입을 이 행 수 단위로 나눠 처리하며
+#   단위마다 진행률(Progress)을 알리고 중지 요청(CancelToken)을 확인합니다.
+# ============================================================
+PROGRESS_CHUNK_ROWS = 2000
+
+
+# ============================================================
+# 2. 공통 유틸 함수
+# ============================================================
+
+# ── 진행 상황 / 중지 ───────────────────────────────────────────
+# iter_* 함수는 Progress를 yield 하는 제너레이터이고 최종 결과는 return 값(StopIteration.value)입니다.
+# 진행 상황이 필요 없으면 drain()으로 끝까지 실행해 결과만 받습니다.
+
+# 단계 → 화면 표시 이름 (실행 순서)
+PIPELINE_STAGES = {
+    'read_spec'      : '📖 DB Spec 로드',
+    'read_export'    : '📖 EDC Export 로드',
+    'dataset_profile': '🔄 CDMS Dataset 변환',
+    'compare'        : '⚖️ Entry Screen 비교',
+    'entry_sheet'    : '📝 Entry Screen 결과 기입',
+    'ds_sheet'       : '📝 Data Structure 결과 기입',
+    'save'           : '💾 결과 파일 저장',
+}
+
+Progress = namedtuple('Progress', ['stage', 'done', 'total'])
+
+
+class ValidationCancelled(Exception):
+    """CancelToken으로 중지 요청된 검증"""
+
+
+class CancelToken:
+    """검증 중지 요청 — 다른 스레드에서 cancel()하면 다음 청크 경계에서 ValidationCancelled 발생"""
+
+    def __init__(self):
+        self._event = threading.Event()
+
+    def cancel(self):
+        self._event.set()
+
+    @property
+    def cancelled(self) -> bool:
+        return self._event.is_set()
+
+    def check(self):
+        if self._event.is_set():
+            raise ValidationCancelled("중지 요청으로 검증을 중단했습니다.")
+
+
+def progress(stage, done, total, cancel=None) -> Progress:
+    """진행 이벤트 생성 (중지 요청이 있으면 ValidationCancelled)"""
+    if cancel is not None:
+        cancel.check()
+    return Progress(stage, done, total)
+
+
+def chunk_ranges(total, size=PROGRESS_CHUNK_ROWS):
+    """0..total 을 size 행 단위 (start, stop) 구간으로 분할"""
+    return [(start, min(start + size, total)) for start in range(0, total, size)]
+
+
+def drain(steps):
+    """진행 이벤트 제너레이터를 끝까지 실행하고 return 값만 반환"""
+    while True:
+        try:
+            next(steps)
+        except StopIteration as stop:
+            return stop.value
+
+
+class MappedFile(io.RawIOBase):
+    """디스크 파일을 mmap으로 열어 읽기 전용 file-like 객체로 제공합니다."""
+
+    def __init__(self, path):
+        super().__init__()
+        self._fh  = open(path, 'rb')
+        self._map = mmap.mmap(self._fh.fileno(), 0, access=mmap.ACCESS_READ)
+        self._pos = 0
+
+    def readable(self):
+        return True
+
+    def seekable(self):
+        return True
+
+    def tell(self):
+        return self._pos
+
+    def seek(self, offset, whence=io.SEEK_SET):
+        if whence == io.SEEK_CUR:
+            offset += self._pos
+        elif whence == io.SEEK_END:
+            offset += len(self._map)
+        self._pos = max(0, offset)
+        return self._pos
+
+    def readinto(self, buffer):
+        n = min(len(buffer), max(0, len(self._map) - self._pos))
+        buffer[:n] = self._map[self._pos:self._pos + n]
+        self._pos += n
+        return n
+
+    def close(self):
+        if not self.closed:
+            self._map.close()
+            self._fh.close()
+        super().close()
+
+
+class MappedExcelFile(pd.ExcelFile):
+    """MappedFile 위의 ExcelFile — close() 시 워크북과 함께 메모리 매핑/파일 핸들도 닫습니다."""
+
+    def __init__(self, path):
+        self.mapped = MappedFile(path)
+        super().__init__(self.mapped)
+
+    def close(self):
+        try:
+            super().close()
+        finally:
+            self.mapped.close()
+
+
+def open_excel(path):
+    """디스크 파일을 메모리 매핑으로 열어 ExcelFile로 로드 (다 쓰면 close()로 매핑 해제)"""
+    return MappedExcelFile(path)
+
+
+# ── 결과 템플릿 캐시 ──────────────────────────────────────────
+# 템플릿 파일 내용과 Entry Screen 헤더 배치(컬럼 → 열 번호)는 프로세스당 한 번만 읽고,
+# 리포트마다 메모리의 바이트에서 워크북을 새로 엽니다.
+# 템플릿 파일이 교체되면(수정 시각/크기 변경) 자동으로 다시 읽습니다.
+ENTRY_TEMPLATE_HEADER_ROW = 6
+
+
+def _entry_screen_layout(ws):
+    """Entry Screen 시트 헤더에서 (DB Spec 열 맵, EDC 열 맵, 확인 결과 열 번호)를 추출"""
+    doc_col_map = {}
+    edc_col_map = {}
+
+    for col_idx in range(1, 31):
+        col_name = ws.cell(row=ENTRY_TEMPLATE_HEADER_ROW, column=col_idx).value
+        if col_name:
+            col_name = str(col_name).strip().upper()
+            if col_idx <= 15:
+                doc_col_map[col_name] = col_idx
+            else:
+                edc_col_map[col_name] = col_idx
+
+    res_col_idx = 31
+    for col_idx in range(31, ws.max_column + 1):
+        if ("확인 결과" in str(ws.cell(row=5, column=col_idx).value or "") or
+                "확인 결과" in str(ws.cell(row=6, column=col_idx).value or "")):
+            res_col_idx = col_idx
+            break
+
+    return doc_col_map, edc_col_map, res_col_idx
+
+
+@lru_cache(maxsize=4)
+def _read_template(path, mtime, size):
+    with open(path, 'rb') as f:
+        content = f.read()
+    wb = load_workbook(io.BytesIO(content))
+    entry_layout = None
+    if 'Entry Screen Validation' in wb.sheetnames:
+        entry_layout = _entry_screen_layout(wb['Entry Screen Validation'])
+    return {'content': content, 'entry_layout': entry_layout}
+
+
+def load_template(template_path) -> dict:
+    """
+    템플릿 바이트와 Entry Screen 헤더 배치를 캐시에서 반환합니다.
+    반환값은 공유 객체이므로 수정하지 말고, 워크북은 new_template_workbook()으로 여세요.
+    """
+    path = os.path.abspath(template_path)
+    stat = os.stat(path)
+    return _read_template(path, stat.st_mtime_ns, stat.st_size)
+
+
+def new_template_workbook(template):
+    """캐시된 템플릿 바이트로 수정 가능한 새 워크북을 생성"""
+    return load_workbook(io.BytesIO(template['content']))
+
+
+def warm_up(template_path=TEMPLATE_PATH) -> bool:
+    """
+    서버 기동 시 한 번 호출해 첫 사용자의 대기 시간을 줄입니다.
+      - 템플릿 바이트/헤더 배치 캐시 적재
+      - openpyxl 저장 경로, pandas 엑셀 리더 등 지연 import 되는 모듈을 미리 로드
+    템플릿이 없으면 False를 반환합니다.
+    """
+    compile_compare_rules()
+    if not os.path.exists(template_path):
+        return False
+    template = load_template(template_path)
+    new_template_workbook(template).save(io.BytesIO())
+    pd.ExcelFile(io.BytesIO(template['content'])).close()
+    return True
+
+
+# ── rules 모드 열 서식 (이름 있는 스타일) ─────────────────────
+# 값을 쓰는 열마다 템플릿 첫 데이터 행 셀의 글꼴/배경/테두리/표시 형식에 정렬을 더한
+# 이름 있는 스타일(NamedStyle)을 워크북에 한 번 등록하고, 셀에는 스타일 이름만 지정합니다.
+# 템플릿 데이터 행은 이미 서식이 있는 셀로 저장되어 있어 열 기본 서식(column_dimensions)은
+# 적용되지 않으므로 값을 쓰는 셀마다 이름을 지정합니다. 같은 서식 조합은 스타일 하나를 공유합니다.
+RULES_STYLE_PREFIX = "EDC Validation"
+
+ENTRY_DATA_ROW = 7   # Entry Screen 데이터 시작 행
+DS_DATA_ROW    = 5   # Data Structure 데이터 시작 행
+
+# rules 모드 Entry Screen 불일치 플래그를 기록하는 숨김 시트 (A열, Entry Screen과 같은 행)
+MISMATCH_FLAG_SHEET = 'Entry Mismatch Flags'
+
+
+def ds_rules_columns() -> list:
+    """rules 모드에서 값을 쓰는 Data Structure 시트 열 [(열 번호, 정렬)] — iter_save_data_structure 열 위치와 같음"""
+    columns = [(col, 'center') for col in (1, 2)] + [(3, 'left')]          # DB Spec Domain / Item ID / Item Label
+    columns += [(col, 'center') for col in (4, 5, 6, 7, 8, 10)]          # Type, Dataset, 확인 결과, SUBJID
+    columns += [(11 + offset, 'center') for offset in range(len(DS_PROFILE_COLUMNS))]
+    return columns
+
+
+def register_rules_styles(wb, entry_layout=None) -> dict:
+    """
+    rules 모드 열 서식 등록 → {(시트명, 열 번호): 스타일 이름}
+    entry_layout: 템플릿 Entry Screen 헤더 배치(load_template()['entry_layout']) — None이면 Entry Screen 생략
+
+    두 시트를 별도 프로세스에서 채운 뒤 합치는 경우(xlsx_stitch)에도 명명 스타일 목록이 같아야 하므로
+    채울 시트와 관계없이 워크북에 있는 두 시트의 열 서식을 항상 같은 순서로 등록합니다.
+    """
+    layout = []
+    if entry_layout is not None:
+        doc_col_map, edc_col_map, res_col_idx = entry_layout
+        layout.append(('Entry Screen Validation', ENTRY_DATA_ROW,
+                       [(col, 'center') for col
+                        in sorted({*doc_col_map.values(), *edc_col_map.values(), res_col_idx})]))
+    layout.append(('Data Structure Validation', DS_DATA_ROW, ds_rules_columns()))
+
+    names, registered = {}, {}
+    for sheet_name, data_row, columns in layout:
+        if sheet_name not in wb.sheetnames:
+            continue
+        ws = wb[sheet_name]
+        for col, horizontal in columns:
+            base  = ws.cell(row=data_row, column=col)
+            attrs = (copy(base.font), copy(base.fill), copy(base.border), base.number_format,
+                     copy(base.protection),
+                     Alignment(horizontal=horizontal, vertical='center', wrap_text=True))
+            if attrs not in registered:
+                number = len(registered) + 1
+                while f"{RULES_STYLE_PREFIX} {number}" in wb.named_styles:   # 템플릿에 이미 있는 이름은 건너뜀
+                    number += 1
+                name = f"{RULES_STYLE_PREFIX} {number}"
+                font, fill, border, number_format, protection, alignment = attrs
+                wb.add_named_style(NamedStyle(name=name, font=font, fill=fill, border=border,
+                                              number_format=number_format, protection=protection,
+                                              alignment=alignment))
+                registered[attrs] = name
+            names[(sheet_name, col)] = registered[attrs]
+    return names
+
+
+def write_styled(ws, row, col, value, style_name):
+    """값이 있는 셀에만 값과 이름 있는 스타일을 기입"""
+    if value is None or value == '':
+        return
+    cell       = ws.cell(row=row, column=col)
+    cell.value = value
+    cell.style = style_name
+
+
+def add_range_rules(ws, cell_range, formula, fill, border):
+    """
+    범위 단위 조건부 서식 등록.
+    formula가 참이면 배경+테두리, 그 외 셀은 테두리만 표시합니다.
+    (첫 규칙이 참이면 중단 — 규칙을 하나만 적용하는 뷰어에서도 동일하게 보이도록)
+    """
+    if formula:
+        ws.conditional_formatting.add(
+            cell_range, FormulaRule(formula=[formula], fill=fill, border=border, stopIfTrue=True))
+    ws.conditional_formatting.add(cell_range, FormulaRule(formula=['TRUE'], border=border))
+
+
+def get_dynamic_preview(excel_file, sheet_name, header_row):
+    """사용자가 선택한 행을 헤더로 적용하여 미리보기 생성"""
+    try:
+        return pd.read_excel(excel_file, sheet_name=sheet_name, header=header_row, nrows=5, dtype=str)
+    except Exception:
+        return pd.DataFrame()
+
+
+def check_columns_status(df):
+    """필수 컬럼이 식별되는지 진단"""
+    if df.empty:
+        return False, "데이터 없음", []
+
+    current_cols = [str(c).upper().strip() for c in df.columns]
+
+    rename_map = {
+        'VAR NAME': 'ITEM ID', 'VARIABLE NAME': 'ITEM ID', 'VARIABLE': 'ITEM ID',
+        'OID': 'ITEM ID', 'ITEMOID': 'ITEM ID', 'QUESTION OID': 'ITEM ID',
+        'FORM': 'PAGE', 'FORM OID': 'PAGE', 'FORM NAME': 'PAGE', 'CRF PAGE': 'PAGE',
+        'FOLDER': 'VISIT', 'FOLDER OID': 'VISIT', 'EVENT': 'VISIT', 'VISIT NAME': 'VISIT',
+        'DATASET': 'DOMAIN', 'LB DOMAIN': 'DOMAIN', 'DOMAIN NAME': 'DOMAIN',
+        'VER.': 'VERSION', 'VER': 'VERSION', 'CRF_VERSION': 'VERSION', 'CRF VERSION': 'VERSION',
+    }
+
+    mapped_cols = set()
+    for col in current_cols:
+        if col in rename_map:
+            mapped_cols.add(rename_map[col])
+        elif col in {'DOMAIN', 'PAGE', 'VISIT', 'ITEM ID'}:
+            mapped_cols.add(col)
+
+    required = {'DOMAIN', 'PAGE', 'VISIT', 'ITEM ID'}
+    missing = required - mapped_cols
+
+    if not missing:
+        return True, "✅ 필수 컬럼 자동 인식 성공!", []
+    else:
+        return False, f"⚠️ 필수 컬럼 미식별: {', '.join(missing)}", list(missing)
+
+
+EXCLUSION_SUMMARY_COLS = ['RULE', 'DOMAIN', 'PAGE', 'LAYOUT', 'COUNT']
+
+ROW_FILTER_MATCHERS = {
+    'prefix'  : lambda values, v: values.str.startswith(v),
+    'equals'  : lambda values, v: values == v,
+    'contains': lambda values, v: values.str.contains(v, regex=False),
+    'regex'   : lambda values, v: values.str.contains(v, regex=True, case=False),
+}
+
+
+def empty_exclusion_summary() -> pd.DataFrame:
+    return pd.DataFrame({c: pd.Series(dtype='int64' if c == 'COUNT' else 'object')
+                         for c in EXCLUSION_SUMMARY_COLS})
+
+
+def excluded_count(summary: pd.DataFrame) -> int:
+    """제외 집계의 총 행 수"""
+    return int(summary['COUNT'].sum()) if not summary.empty else 0
+
+
+class RowFilter:
+    """
+    수집 단계 행 제외 규칙 묶음 (compile_row_filter()로 한 번만 생성해 재사용).
+    split()은 제외 행을 버리고 (규칙, DOMAIN, PAGE, LAYOUT)별 건수만 돌려줍니다.
+    """
+
+    def __init__(self, rules, whitelist):
+        self.rules = []
+        for name, col, kind, value in rules:
+            if kind not in ROW_FILTER_MATCHERS:
+                raise ValueError(f"알 수 없는 제외 규칙 방식: {kind} ({name})")
+            self.rules.append((name, col, ROW_FILTER_MATCHERS[kind],
+                               value if kind == 'regex' else str(value).strip().upper()))
+        self.whitelist = {str(item).strip().upper() for item in whitelist}
+
+    @staticmethod
+    def _values(df, col):
+        if col not in df.columns:
+            return pd.Series('', index=df.index)
+        return df[col].fillna('').astype(str).str.strip()
+
+    def split(self, df: pd.DataFrame):
+        """Returns: (제외 규칙을 통과한 행, 제외 집계 DataFrame[EXCLUSION_SUMMARY_COLS])"""
+        if df.empty or not self.rules:
+            return df.reset_index(drop=True), empty_exclusion_summary()
+
+        reason = pd.Series(None, index=df.index, dtype='object')
+        for name, col, matcher, value in self.rules:
+            hit = matcher(self._values(df, col).str.upper(), value).fillna(False)
+            reason = reason.mask(reason.isna() & hit, name)
+        item_ids = df['KEY_ITEM_ID'] if 'KEY_ITEM_ID' in df.columns else self._values(df, 'ITEM ID').str.upper()
+        reason = reason.mask(item_ids.isin(self.whitelist))
+
+        excluded = reason.notna()
+        if not excluded.any():
+            return df.reset_index(drop=True), empty_exclusion_summary()
+
+        summary = (pd.DataFrame({'RULE'  : reason[excluded],
+                                 'DOMAIN': self._values(df, 'DOMAIN')[excluded],
+                                 'PAGE'  : self._values(df, 'PAGE')[excluded],
+                                 'LAYOUT': self._values(df, 'LAYOUT')[excluded]})
+                   .groupby(['RULE', 'DOMAIN', 'PAGE', 'LAYOUT'], sort=False).size()
+                   .rename('COUNT').reset_index())
+        return df[~excluded].reset_index(drop=True), summary
+
+
+def compile_row_filter(rules=None, whitelist=None) -> RowFilter:
+    return RowFilter(INGEST_EXCLUDE_RULES if rules is None else rules,
+                     SYS_LAYOUT_WHITELIST if whitelist is None else whitelist)
+
+
+INGEST_ROW_FILTER = compile_row_filter()
+
+
+def process_data_final(excel_file, sheet_name, header_row):
+    """DB Spec 파일을 읽어 표준화된 DataFrame으로 반환 ((DOMAIN, ITEM ID) 키 열 포함)"""
+    return add_spec_keys(read_standardized(excel_file, sheet_name, header_row)[0])
+
+
+def read_standardized(excel_file, sheet_name, header_row, row_filter=None):
+    """
+    DB Spec / EDC Export 시트를 읽어 (표준화된 DataFrame, 제외 집계)를 반환합니다.
+
+    row_filter(RowFilter)가 있으면 값 정규화, JOIN_KEY 생성, 중복 제거 뒤에 제외 규칙을 적용합니다
+    (process_data_final 후 제외 규칙을 적용하던 기존 순서와 같은 결과). 시트는 행 묶음 단위로 읽어
+    묶음마다 제외 규칙까지 적용하므로 제외 행은 보관하지 않고 건수만 집계합니다.
+    읽기에 실패하면 (빈 DataFrame, 빈 집계)를 반환합니다.
+    """
+    return drain(iter_read_standardized(excel_file, sheet_name, header_row, row_filter))
+
+
+STD_COLS = ['DOMAIN', 'DOMAIN LABEL', 'PAGE', 'PAGE LABEL', 'VISIT',
+            'ITEM ID', 'ITEM LABEL', 'ITEM SEQ', 'VERSION', 'CODE',
+            'LAYOUT', 'TYPE', 'MAX_LEN', 'MIN_VAL', 'MAX_VAL']
+
+# 시트 헤더(대문자, 앞뒤 공백 제거) → 표준 열 이름
+COLUMN_ALIASES = {
+    'VAR NAME': 'ITEM ID', 'VARIABLE NAME': 'ITEM ID', 'VARIABLE': 'ITEM ID',
+    'OID': 'ITEM ID', 'ITEMOID': 'ITEM ID',
+    'FORM': 'PAGE', 'FORM OID': 'PAGE', 'FORM NAME': 'PAGE', 'CRF PAGE': 'PAGE',
+    'FOLDER': 'VISIT', 'FOLDER OID': 'VISIT', 'EVENT': 'VISIT',
+    'DATASET': 'DOMAIN', 'LB DOMAIN': 'DOMAIN',
+    'VER.': 'VERSION', 'VER': 'VERSION', 'CRF_VERSION': 'VERSION', 'CRF VERSION': 'VERSION',
+}
+
+JOIN_KEY_COLS = ['DOMAIN', 'PAGE', 'VISIT', 'ITEM ID']
+
+
+def standard_column_name(header) -> str:
+    """시트 헤더 → 표준 열 이름 (COLUMN_ALIASES에 없으면 대문자/공백 제거한 이름 그대로)"""
+    name = str(header).upper().strip()
+    return COLUMN_ALIASES.get(name, name)
+
+
+def normalize_std_cols(df, cols=STD_COLS):
+    """표준 열 값 정규화 (없는 열은 빈 값으로 추가, '1.0' → '1', 앞뒤 공백 제거)"""
+    for col in cols:
+        if col not in df.columns:
+            df[col] = ""
+        df[col] = (df[col].fillna("").astype(str)
+                   .apply(lambda x: x.replace('.0', '').strip() if x.endswith('.0') else x.strip()))
+    return df
+
+
+def make_join_key(df) -> pd.Series:
+    """DOMAIN + PAGE + VISIT + ITEM ID (공백 제거, 대문자) — Entry Screen 비교 키"""
+    return (df['DOMAIN'] + df['PAGE'] + df['VISIT'] + df['ITEM ID']
+            ).str.replace(r'\s+', '', regex=True).str.upper()
+
+
+def _excel_cell_value(cell):
+    """openpyxl 셀 → pd.read_excel과 같은 값 (빈 셀 '', 오류 NaN, 정수로 떨어지는 숫자는 int)"""
+    if cell.value is None:
+        return ""
+    if cell.data_type == 'e':
+        return float('nan')
+    if cell.data_type == 'n':
+        value = int(cell.value)
+        return value if value == cell.value else float(cell.value)
+    return cell.value
+
+
+def _parse_rows(header, rows, offset) -> pd.DataFrame:
+    """헤더 + 데이터 행 묶음을 pd.read_excel(dtype=str)과 같은 방식으로 DataFrame 변환 (index = 데이터 행 번호)"""
+    width = max([len(header)] + [len(row) for row in rows])
+    data  = [row + [""] * (width - len(row)) for row in [header] + rows]
+    df = TextParser(data, header=0, dtype=str, skip_blank_lines=False).read()
+    df.index = pd.RangeIndex(offset, offset + len(df))
+    return df
+
+
+def iter_sheet_chunks(excel_file, sheet_name, header_row, chunk_rows=PROGRESS_CHUNK_ROWS):
+    """
+    시트를 chunk_rows 행 단위 DataFrame으로 스트리밍합니다 → (추정 전체 행 수, DataFrame) 반복.
+
+    openpyxl로 연 ExcelFile은 워크시트 행을 순서대로 읽어 묶음마다 변환하므로 시트 전체를 한 번에
+    DataFrame으로 만들지 않습니다. 값/열 이름/행 번호는 pd.read_excel(header=header_row, dtype=str)과 같고,
+    헤더보다 넓은 행이 나오면 그 묶음부터 'Unnamed: n' 열이 붙습니다 (이어 붙이면 앞 묶음은 빈 값).
+    그 외 엔진(.xls 등)이나 파일 경로는 pd.read_excel로 한 번에 읽은 뒤 같은 크기로 나눠 돌려줍니다.
+    """
+    if not (isinstance(excel_file, pd.ExcelFile) and excel_file.engine == 'openpyxl'):
+        df = pd.read_excel(excel_file, sheet_name=sheet_name, header=header_row, dtype=str)
+        for start, stop in chunk_ranges(len(df), chunk_rows) or [(0, 0)]:
+            yield len(df), df.iloc[start:stop]
+        return
+
+    if isinstance(sheet_name, int):
+        sheet_name = excel_file.sheet_names[sheet_name]
+    ws = excel_file.book[sheet_name]
+    estimate = max(0, (ws.max_row or 0) - header_row - 1)     # 선언된 시트 범위 (진행률 표시용)
+    if excel_file.book.read_only:
+        ws.reset_dimensions()
+
+    header, rows, pending, offset = None, [], [], 0
+    for row_no, row in enumerate(ws.rows):
+        values = [_excel_cell_value(cell) for cell in row]
+        while values and values[-1] == "":
+            values.pop()
+        if row_no < header_row:
+            continue
+        if header is None:
+            header = values
+            continue
+        if not values:
+            # 빈 행은 뒤에 데이터가 더 있을 때만 포함 (시트 끝의 빈 행은 pd.read_excel도 버림)
+            pending.append(values)
+            continue
+        rows.extend(pending)
+        pending = []
+        rows.append(values)
+        if len(rows) >= chunk_rows:
+            yield max(estimate, offset + len(rows)), _parse_rows(header, rows, offset)
+            offset += len(rows)
+            rows = []
+    if header is None:
+        raise ValueError(f"'{sheet_name}' 시트에 헤더 행({header_row})이 없습니다.")
+    if rows or offset == 0:
+        yield offset + len(rows), _parse_rows(header, rows, offset)
+
+
+def merge_exclusion_summaries(summaries) -> pd.DataFrame:
+    """묶음별 제외 집계 합치기 (같은 (규칙, DOMAIN, PAGE, LAYOUT)은 건수 합산, 처음 나온 순서 유지)"""
+    summaries = [s for s in summaries if not s.empty]
+    if not summaries:
+        return empty_exclusion_summary()
+    return (pd.concat(summaries, ignore_index=True)
+            .groupby(EXCLUSION_SUMMARY_COLS[:-1], sort=False)['COUNT'].sum().reset_index())
+
+
+def iter_read_standardized(excel_file, sheet_name, header_row, row_filter=None,
+                           stage='read_spec', cancel=None):
+    """
+    read_standardized의 제너레이터 버전.
+    시트를 iter_sheet_chunks로 PROGRESS_CHUNK_ROWS 행씩 읽으면서 묶음마다
+    정규화 → JOIN_KEY → 빈 키 제거 → 중복 제거(앞 묶음까지 나온 키 포함) → 제외 규칙 순으로 처리하고
+    Progress(stage, 읽은 행, 전체 행)를 yield 합니다. 제외 행은 묶음 단위로 버리므로 모아 두지 않습니다.
+    중지 요청(ValidationCancelled)은 읽기 실패로 취급하지 않고 그대로 전달합니다.
+    """
+    try:
+        yield progress(stage, 0, 0, cancel)
+        parts, summaries, seen, done = [], [], set(), 0
+        columns = []        # 시트 열 순서 (뒤 묶음에서 새로 생긴 열 포함)
+        for total, chunk in iter_sheet_chunks(excel_file, sheet_name, header_row):
+            done += len(chunk)
+            chunk = chunk.copy()
+            chunk.columns = [standard_column_name(c) for c in chunk.columns]
+            columns += [c for c in chunk.columns if c not in columns]
+            chunk = normalize_std_cols(chunk)
+            chunk['JOIN_KEY'] = make_join_key(chunk)
+            chunk = chunk[chunk['JOIN_KEY'].str.len() > 1].drop_duplicates(subset=['JOIN_KEY'])
+            chunk = chunk[~chunk['JOIN_KEY'].isin(seen)]
+            seen.update(chunk['JOIN_KEY'])
+            if row_filter is not None:
+                chunk, excluded = row_filter.split(chunk)
+                summaries.append(excluded)
+            parts.append(chunk)
+            yield progress(stage, done, max(total, done), cancel)
+
+        df = pd.concat(parts, ignore_index=row_filter is not None)
+        df = df[columns + [c for c in df.columns if c not in columns]]
+        return df, merge_exclusion_summaries(summaries)
+    except ValidationCancelled:
+        raise
+    except Exception:
+        return pd.DataFrame(), empty_exclusion_summary()
+
+
+# ── 여러 시트/파일로 나뉜 DB Spec ─────────────────────────────
+# CRF 모듈별로 시트/파일이 나뉜 DB Spec을 조각(SpecPart)마다 정규화한 뒤 문서 순서(조각 순서 → 행 순서)로 합치고
+# JOIN_KEY 전체 기준으로 중복을 제거합니다 (처음 나온 행 사용).
+# 서로 다른 조각에 같은 JOIN_KEY가 있으면 버리지 않고 중복 키 목록(SPEC_DUPLICATE_COLS)으로 남깁니다.
+SpecPart = namedtuple('SpecPart', ['source', 'sheet', 'header'])
+
+SPEC_DUPLICATE_COLS = ['DOMAIN', 'PAGE', 'VISIT', 'ITEM ID', 'JOIN_KEY', 'SOURCE', 'ROW', 'KEPT']
+
+
+def as_spec_parts(doc_source, doc_sheet, doc_header):
+    """
+    DB Spec 입력 → SpecPart 목록 (시트 하나짜리 기존 입력이면 None).
+      doc_source가 목록: 항목마다 SpecPart / (source, sheet, header) / source
+                         (sheet, header가 없으면 doc_sheet(문자열일 때), doc_header 사용)
+      doc_sheet가 목록 : 같은 파일의 여러 시트 (헤더 행은 doc_header 공통)
+    """
+    default_sheet = doc_sheet if isinstance(doc_sheet, str) else None
+    if isinstance(doc_source, list):
+        parts = []
+        for item in doc_source:
+            source, sheet, header = (list(item) + [None, None])[:3] if isinstance(item, tuple) else (item, None, None)
+            parts.append(SpecPart(source, default_sheet if sheet is None else sheet,
+                                  doc_header if header is None else header))
+        return parts
+    if isinstance(doc_sheet, (list, tuple)):
+        return [SpecPart(doc_source, sheet, doc_header) for sheet in doc_sheet]
+    return None
+
+
+def spec_part_labels(parts) -> list:
+    """조각 표시 이름 — 파일이 여러 개면 '파일명 / 시트', 하나면 시트 이름"""
+    def file_name(source):
+        return os.path.basename(source) if isinstance(source, (str, os.PathLike)) else str(id(source))
+    multi_file = len({file_name(p.source) for p in parts}) > 1
+    return [f"{os.path.basename(p.source)} / {p.sheet}" if multi_file and isinstance(p.source, (str, os.PathLike))
+            else str(p.sheet) for p in parts]
+
+
+def read_spec_part(source, sheet_name, header_row, label=None) -> pd.DataFrame:
+    """
+    [작업 프로세스에서도 실행] DB Spec 조각 하나 → 정규화 + JOIN_KEY (빈 키 제외, 중복은 그대로).
+    '_SPEC_ROW' 열에 원본 엑셀 행 번호를 남깁니다. 읽기 실패 시 ValidationInputError.
+    """
+    try:
+        df = pd.read_excel(source, sheet_name=sheet_name, header=header_row, dtype=str)
+        df.columns = [standard_column_name(c) for c in df.columns]
+        df = normalize_std_cols(df)
+        df['JOIN_KEY'] = make_join_key(df)
+    except Exception as e:
+        raise ValidationInputError(f"DB Spec ({label or sheet_name}) 읽기 실패: {e}")
+    df['_SPEC_ROW'] = df.index + header_row + 2
+    return df[df['JOIN_KEY'].str.len() > 1]
+
+
+def combine_spec_parts(frames, labels):
+    """
+    조각별 DB Spec → (JOIN_KEY 기준 중복 제거한 DataFrame, 조각 간 중복 키 DataFrame[SPEC_DUPLICATE_COLS]).
+    중복 키 목록에는 두 개 이상의 조각에 나온 키의 모든 행을 키가 처음 나온 순서대로 담고,
+    KEPT는 비교에 사용한 행(처음 나온 행)이면 True입니다.
+    """
+    df    = pd.concat([f.assign(_SPEC_PART=i) for i, f in enumerate(frames)], ignore_index=True)
+    first = ~df.duplicated(subset=['JOIN_KEY'])
+    cross = df.groupby('JOIN_KEY', sort=False)['_SPEC_PART'].transform('nunique') > 1
+
+    dup = df[cross]
+    key_order = dup['JOIN_KEY'].map({k: i for i, k in enumerate(pd.unique(dup['JOIN_KEY']))})
+    duplicates = (pd.DataFrame({'DOMAIN'  : dup['DOMAIN'], 'PAGE': dup['PAGE'], 'VISIT': dup['VISIT'],
+                                'ITEM ID' : dup['ITEM ID'], 'JOIN_KEY': dup['JOIN_KEY'],
+                                'SOURCE'  : [labels[i] for i in dup['_SPEC_PART']],
+                                'ROW'     : dup['_SPEC_ROW'].astype('int64'),
+                                'KEPT'    : first[cross],
+                                '_ORDER'  : key_order})
+                  .sort_values('_ORDER', kind='stable').drop(columns=['_ORDER'])
+                  .reset_index(drop=True))
+    df = df[first].drop(columns=['_SPEC_PART', '_SPEC_ROW']).reset_index(drop=True)
+    return df, duplicates[SPEC_DUPLICATE_COLS]
+
+
+def _spec_parallel_ok(parts) -> bool:
+    paths = {p.source for p in parts}
+    if len(parts) < 2 or (os.cpu_count() or 1) < 2 or not all(isinstance(p, str) for p in paths):
+        return False
+    return sum(os.path.getsize(p) for p in paths) >= SPEC_PARALLEL_MIN_BYTES
+
+
+def iter_read_spec_parts(parts, excel_files=None, cancel=None, parallel=None):
+    """
+    여러 DB Spec 조각을 정규화해 합칩니다 — 조각 하나가 끝날 때마다 Progress('read_spec', 완료 조각, 전체 조각).
+
+    excel_files: 순차 처리 시 조각별로 이미 열어 둔 ExcelFile (없으면 part.source 사용)
+    parallel   : True이면 조각마다 작업 프로세스에서 읽기/정규화 (source가 모두 파일 경로여야 함).
+                 None이면 CPU가 2개 이상이고 파일 크기 합이 SPEC_PARALLEL_MIN_BYTES 이상일 때만 병렬 처리.
+
+    Returns:
+        combine_spec_parts() 결과 (DataFrame, 조각 간 중복 키 DataFrame)
+    """
+    labels = spec_part_labels(parts)
+    total  = len(parts)
+    frames = [None] * total
+    if parallel is None:
+        parallel = _spec_parallel_ok(parts)
+
+    yield progress('read_spec', 0, total, cancel)
+    if parallel:
+        with process_pool(min(os.cpu_count() or 1, total)) as pool:
+            futures = {pool.submit(read_spec_part, os.path.abspath(p.source), p.sheet, p.header, label): i
+                       for i, (p, label) in enumerate(zip(parts, labels))}
+            for finished, future in enumerate(iter_completed(futures, cancel), start=1):
+                frames[futures[future]] = future.result()
+                yield progress('read_spec', finished, total, cancel)
+    else:
+        for i, (part, label) in enumerate(zip(parts, labels)):
+            source    = excel_files[i] if excel_files else part.source
+            frames[i] = read_spec_part(source, part.sheet, part.header, label)
+            yield progress('read_spec', i + 1, total, cancel)
+    return combine_spec_parts(frames, labels)
+
+
+# ── DB Spec (DOMAIN, ITEM ID) 키 인덱스 ───────────────────────
+# 실행마다 DB Spec을 읽을 때(process_data_final) 한 번만 만들고,
+# 수집 단계 제외 규칙(whitelist), Dataset 프로파일 점검 기준, Data Structure 시트가 함께 사용
+SPEC_KEY_COLS = ['KEY_DOMAIN', 'KEY_ITEM_ID']
+
+
+def normalize_keys(values: pd.Series) -> pd.Series:
+    """
+    키 값 정규화 (앞뒤 공백 제거 + 대문자) — 고유값마다 한 번만 계산하고 sys.intern으로 문자열 공유
+    (pandas 3의 str dtype은 Arrow 배열에 값을 저장하므로 문자열 공유는 object dtype일 때만 해당)
+    """
+    values = values.fillna('').astype(str)
+    return values.map({v: sys.intern(v.strip().upper()) for v in values.unique()})
+
+
+def add_spec_keys(df: pd.DataFrame) -> pd.DataFrame:
+    """DOMAIN / ITEM ID 정규화 키 열(SPEC_KEY_COLS) 추가 (이미 있으면 그대로 반환)"""
+    if all(c in df.columns for c in SPEC_KEY_COLS) or not {'DOMAIN', 'ITEM ID'} <= set(df.columns):
+        return df
+    return df.assign(KEY_DOMAIN=normalize_keys(df['DOMAIN']),
+                     KEY_ITEM_ID=normalize_keys(df['ITEM ID']))
+
+
+def join_on_spec_keys(df_spec: pd.DataFrame, df_other: pd.DataFrame, columns) -> pd.DataFrame:
+    """
+    DB Spec 행 순서 그대로 df_other의 columns를 (DOMAIN, ITEM ID) 키로 붙입니다.
+    df_other에 같은 키가 여러 번 있으면 마지막 행을 사용합니다.
+
+    Returns:
+        DataFrame[columns + ['MATCHED']] (index = df_spec 행 순서 0..n-1)
+    """
+    spec  = add_spec_keys(df_spec)
+    other = (add_spec_keys(df_other)[SPEC_KEY_COLS + list(columns)]
+             .drop_duplicates(subset=SPEC_KEY_COLS, keep='last')
+             .assign(MATCHED=True))
+    joined = spec[SPEC_KEY_COLS].reset_index(drop=True).merge(other, on=SPEC_KEY_COLS, how='left', sort=False)
+    joined['MATCHED'] = joined['MATCHED'].notna()
+    return joined.drop(columns=SPEC_KEY_COLS)
+
+
+# ============================================================
+# 3. [신규] Data Structure Validation 관련 함수
+# ============================================================
+
+def dtype_to_type_str(dtype) -> str:
+    """
+    pandas dtype을 사람이 읽기 쉬운 Type 문자열로 변환합니다.
+    DB Spec의 TYPE 컬럼과 비교하기 위한 참고값입니다.
+    """
+    dtype_str = str(dtype)
+    if 'datetime' in dtype_str:
+        return 'datetime'
+    elif 'int' in dtype_str:
+        return 'integer'
+    elif 'float' in dtype_str:
+        return 'float'
+    else:
+        return 'text'
+
+
+def build_dataset_long(dataset_source, df_spec: pd.DataFrame = None) -> pd.DataFrame:
+    """
+    CDMS Dataset 엑셀의 모든 도메인 시트를 읽어 Long format DataFrame으로 변환합니다.
+
+    변환 규칙:
+    - 시트명 = DOMAIN
+    - 컬럼명 'ITEMID:LABEL' → ITEM ID는 ':' 앞 부분만 추출
+    - 모든 컬럼을 Item ID로 처리 (제외 없음)
+    - 각 Item ID에 대해 값이 실제로 존재하는(non-null) 첫 번째 행의
+      실제 셀 값을 Type으로, 해당 행의 SUBJID를 참조 대상자로 기록
+    - 모든 대상자에게 값이 없는 경우 DS_TYPE = '', DS_SUBJID = '' 으로 기록
+    - 전체 대상자 값에 대한 프로파일(우세 타입, 최대 길이, 최소/최대, 결측 비율)과
+      df_spec 기준 위반 값 건수를 함께 계산 (dataset_profile.profile_dataset)
+
+    dataset_source: 파일 경로(대용량이면 시트 단위 병렬 처리) 또는 pd.ExcelFile
+
+    Returns:
+        DataFrame with columns: [DOMAIN, ITEM ID, DS_TYPE, DS_SUBJID, PROFILE_*]
+    """
+    return profile_dataset(dataset_source, df_spec)
+
+
+def iter_build_dataset_long(dataset_source, df_spec: pd.DataFrame = None, cancel=None):
+    """build_dataset_long의 제너레이터 버전 — 도메인 시트 단위로 Progress('dataset_profile', ...)를 yield"""
+    steps = iter_profile_dataset(dataset_source, df_spec, cancel=cancel)
+    try:
+        while True:
+            done, total = next(steps)
+            yield progress('dataset_profile', done, total, cancel)
+    except StopIteration as stop:
+        return stop.value
+    finally:
+        steps.close()
+
+
+# Data Structure 시트 K열부터 추가하는 프로파일 열: (3행 레이블, 4행 레이블, 프로파일 컬럼)
+DS_PROFILE_COLUMNS = [
+    ('Inferred Type',  '추정 타입',      'PROFILE_TYPE'),
+    ('Max Len',        '최대 길이',      'PROFILE_MAX_LEN'),
+    ('Min',            '최소값',         'PROFILE_MIN'),
+    ('Max',            '최대값',         'PROFILE_MAX'),
+    ('Null Rate',      '결측 비율',      'PROFILE_NULL_RATE'),
+    ('Non-conforming', 'Spec 위반 건수', 'PROFILE_NON_CONFORMING'),
+    ('Auto Check',     '자동 점검',      'PROFILE_CHECK'),
+]
+
+
+def _format_profile_value(v, col):
+    if v is None or (isinstance(v, float) and pd.isna(v)):
+        return ''
+    if col == 'PROFILE_NULL_RATE':
+        return f"{float(v):.1%}"
+    if isinstance(v, float) and v.is_integer():
+        return int(v)
+    return v
+
+
+def format_profile_rows(df: pd.DataFrame) -> list:
+    """Dataset 프로파일 열 → 행별 K~Q열 기입 값 (숫자는 정수면 정수로, 결측 비율은 % 문자열)"""
+    columns = []
+    for _, _, col in DS_PROFILE_COLUMNS:
+        values = df[col] if col in df.columns else pd.Series('', index=df.index)
+        columns.append([_format_profile_value(v, col) for v in values])
+    return list(zip(*columns))
+
+
+def save_data_structure_to_template(wb, df_doc_full: pd.DataFrame, df_dataset_long: pd.DataFrame,
+                                    highlight_mode: str = "cell"):
+    """
+    템플릿 워크북의 'Data Structure Validation' 시트에 결과를 기입합니다.
+    (진행 상황이 필요 없을 때의 iter_save_data_structure 실행)
+    """
+    return drain(iter_save_data_structure(wb, df_doc_full, df_dataset_long, highlight_mode))
+
+
+def iter_save_data_structure(wb, df_doc_full: pd.DataFrame, df_dataset_long: pd.DataFrame,
+                             highlight_mode: str = "cell", cancel=None, styles=None):
+    """
+    템플릿 워크북의 'Data Structure Validation' 시트에
+    DB Spec(전체, 필터 없음)과 CDMS Dataset Long format을 비교하여 기입합니다.
+
+    템플릿 구조 (확인된 실제 구조):
+        행3: 'Database Specifications'(A~D 병합) | 'Dataset'(E~G 병합) | '확인 결과'(H) | 'Comment'(I)
+        행4: Domain | Item ID | Item Label | Type | Domain | Item ID | Type | (병합) | (병합)
+        행5~: 데이터 입력 시작
+
+    추가 열 (코드에서 동적 삽입):
+        J열: SUBJID (참조 대상자) — 템플릿에는 없지만 J열에 동적으로 추가
+        K~Q열: Dataset 전수 프로파일 (DS_PROFILE_COLUMNS) — 추정 타입, 최대 길이, 최소/최대,
+               결측 비율, Spec 위반 건수, 자동 점검 결과
+
+    색상 규칙:
+        - Dataset에서 해당 값이 아예 없는 경우(DS_TYPE이 빈값) → 연분홍(FFD7E9) 하이라이트
+        - 확인 결과: 값이 없는 경우 'FALSE', 있는 경우 빈칸(human validation)
+        - 자동 점검(Q열)에 Spec 위반 내용이 있으면 → 빨강(FFC7CE) 하이라이트
+
+    highlight_mode:
+        - "cell" : 셀마다 배경/테두리/정렬 지정 (기존 방식)
+        - "rules": 값만 기입하고 연분홍/테두리는 조건부 서식($H="FALSE")으로 표시
+                   (열 서식은 register_rules_styles의 이름 있는 스타일 — styles로 전달, 없으면 여기서 등록)
+
+    PROGRESS_CHUNK_ROWS 행마다 Progress('ds_sheet', 기입 행, 전체 행)를 yield 하고 워크북을 return 합니다.
+    """
+    sheet_name = 'Data Structure Validation'
+    if sheet_name not in wb.sheetnames:
+        return wb
+
+    ws = wb[sheet_name]
+
+    # ── 스타일 정의 ──────────────────────────────────────────
+    thin_border    = Border(
+        left=Side(style='thin'), right=Side(style='thin'),
+        top=Side(style='thin'),  bottom=Side(style='thin')
+    )
+    align_center   = Alignment(horizontal='center', vertical='center', wrap_text=True)
+    align_left     = Alignment(horizontal='left',   vertical='center', wrap_text=True)
+
+    # 연분홍: 아무 대상자도 값이 없는 경우
+    light_pink_fill = PatternFill(start_color="FFD7E9", end_color="FFD7E9", fill_type="solid")
+    # 흰색: 기본 배경
+    white_fill      = PatternFill(start_color="FFFFFF", end_color="FFFFFF", fill_type="solid")
+    # 빨강: 자동 점검에서 Spec 위반이 발견된 경우
+    red_fill        = PatternFill(start_color="FFC7CE", end_color="FFC7CE", fill_type="solid")
+
+    # ── 열 위치 상수 (템플릿 고정 구조 기반) ─────────────────
+    # A=1, B=2, C=3, D=4 → DB Spec 영역 (Domain, Item ID, Item Label, Type)
+    # E=5, F=6, G=7      → Dataset 영역  (Domain, Item ID, Type)
+    # H=8                → 확인 결과
+    # I=9                → Comment
+    # J=10               → SUBJID (동적 추가)
+    COL_DOC_DOMAIN    = 1   # A: DB Spec - Domain
+    COL_DOC_ITEM_ID   = 2   # B: DB Spec - Item ID
+    COL_DOC_ITEM_LABEL= 3   # C: DB Spec - Item Label
+    COL_DOC_TYPE      = 4   # D: DB Spec - Type
+    COL_DS_DOMAIN     = 5   # E: Dataset - Domain
+    COL_DS_ITEM_ID    = 6   # F: Dataset - Item ID
+    COL_DS_TYPE       = 7   # G: Dataset - Type
+    COL_RESULT        = 8   # H: 확인 결과
+    COL_COMMENT       = 9   # I: Comment
+    COL_SUBJID        = 10  # J: 참조 대상자 (동적 추가)
+    COL_PROFILE       = 11  # K~: 프로파일 (동적 추가)
+
+    # ── J열 헤더 추가 ─────────────────────────────────────────
+    # 3행: 병합 없이 단순 레이블
+    hdr3 = ws.cell(row=3, column=COL_SUBJID)
+    hdr3.value     = 'SUBJID'
+    hdr3.border    = thin_border
+    hdr3.alignment = align_center
+
+    # 4행: 세부 레이블
+    hdr4 = ws.cell(row=4, column=COL_SUBJID)
+    hdr4.value     = '참조 대상자'
+    hdr4.border    = thin_border
+    hdr4.alignment = align_center
+
+    # ── K~Q열 프로파일 헤더 추가 ──────────────────────────────
+    for offset, (label, sub_label, _) in enumerate(DS_PROFILE_COLUMNS):
+        for hdr_row, text in ((3, label), (4, sub_label)):
+            hdr           = ws.cell(row=hdr_row, column=COL_PROFILE + offset)
+            hdr.value     = text
+            hdr.border    = thin_border
+            hdr.alignment = align_center
+    COL_CHECK = COL_PROFILE + len(DS_PROFILE_COLUMNS) - 1
+
+    # ── DB Spec 행 순서대로 Dataset Long format을 (DOMAIN, ITEM ID) 키로 결합 ──
+    # (키 열은 DB Spec을 읽을 때 만든 SPEC_KEY_COLS를 그대로 사용, Dataset 쪽 같은 키는 마지막 행)
+    spec = add_spec_keys(df_doc_full.reset_index(drop=True))
+    ds   = join_on_spec_keys(spec, df_dataset_long.assign(
+               DS_TYPE=df_dataset_long['DS_TYPE'].astype(str).str.strip(),
+               DS_SUBJID=df_dataset_long['DS_SUBJID'].astype(str).str.strip()),
+           ['DS_TYPE', 'DS_SUBJID'] + [col for _, _, col in DS_PROFILE_COLUMNS
+                                       if col in df_dataset_long.columns])
+    matched    = ds['MATCHED'].tolist()
+    ds_types   = ds['DS_TYPE'].where(ds['MATCHED'], '').tolist()
+    ds_subjids = ds['DS_SUBJID'].where(ds['MATCHED'], '').tolist()
+    empty_profile = ('',) * len(DS_PROFILE_COLUMNS)
+    profiles   = [p if m else empty_profile for p, m in zip(format_profile_rows(ds), matched)]
+
+    doc_rows = zip(*(_strip(spec[c]) if c in spec.columns else [''] * len(spec)
+                     for c in ('DOMAIN', 'ITEM ID', 'ITEM LABEL', 'TYPE')))
+    rows = enumerate(zip(doc_rows, matched, ds_types, ds_subjids, profiles))
+
+    # ── DB Spec 기준으로 행 기입 (행 수 = DB Spec 행 수와 동일) ──
+    START_ROW = DS_DATA_ROW  # 데이터 시작 행
+    total     = len(spec)
+    yield progress('ds_sheet', 0, total, cancel)
+
+    if highlight_mode == "rules":
+        if styles is None:
+            styles = register_rules_styles(wb)
+        col_style = {col: styles[(sheet_name, col)] for col, _ in ds_rules_columns()}
+
+        for i, ((doc_domain, doc_item_id, doc_item_label, doc_type),
+                found, ds_type, ds_subjid, profile) in rows:
+            if i and i % PROGRESS_CHUNK_ROWS == 0:
+                yield progress('ds_sheet', i, total, cancel)
+            r = START_ROW + i
+
+            write_styled(ws, r, COL_DOC_DOMAIN,     doc_domain,     col_style[COL_DOC_DOMAIN])
+            write_styled(ws, r, COL_DOC_ITEM_ID,    doc_item_id,    col_style[COL_DOC_ITEM_ID])
+            write_styled(ws, r, COL_DOC_ITEM_LABEL, doc_item_label, col_style[COL_DOC_ITEM_LABEL])
+            write_styled(ws, r, COL_DOC_TYPE,       doc_type,       col_style[COL_DOC_TYPE])
+            if found:
+                write_styled(ws, r, COL_DS_DOMAIN,  doc_domain,  col_style[COL_DS_DOMAIN])
+                write_styled(ws, r, COL_DS_ITEM_ID, doc_item_id, col_style[COL_DS_ITEM_ID])
+                write_styled(ws, r, COL_DS_TYPE,    ds_type,     col_style[COL_DS_TYPE])
+                write_styled(ws, r, COL_SUBJID,     ds_subjid,   col_style[COL_SUBJID])
+                for offset, value in enumerate(profile):
+                    write_styled(ws, r, COL_PROFILE + offset, value, col_style[COL_PROFILE + offset])
+            write_styled(ws, r, COL_RESULT, 'FALSE' if ds_type == '' else None, col_style[COL_RESULT])
+
+        if len(df_doc_full) > 0:
+            last_row = START_ROW + len(df_doc_full) - 1
+            add_range_rules(
+                ws,
+                f"E{START_ROW}:H{last_row} J{START_ROW}:J{last_row}",
+                f'$H{START_ROW}="FALSE"', light_pink_fill, thin_border,
+            )
+            add_range_rules(
+                ws, f"A{START_ROW}:D{last_row} I{START_ROW}:I{last_row}", None, None, thin_border)
+            check_letter = get_column_letter(COL_CHECK)
+            add_range_rules(
+                ws,
+                f"{get_column_letter(COL_PROFILE)}{START_ROW}:{check_letter}{last_row}",
+                f'LEN(${check_letter}{START_ROW})>0', red_fill, thin_border,
+            )
+        yield progress('ds_sheet', total, total, cancel)
+        return wb
+
+    for i, ((doc_domain, doc_item_id, doc_item_label, doc_type),
+            found, ds_type, ds_subjid, profile) in rows:
+        if i and i % PROGRESS_CHUNK_ROWS == 0:
+            yield progress('ds_sheet', i, total, cancel)
+        r = START_ROW + i
+
+        ds_domain  = doc_domain  if found else ''
+        ds_item_id = doc_item_id if found else ''
+
+        # 값이 없는 경우(아무 대상자도 해당 item에 데이터 없음) 판별
+        no_data = (ds_type == '')
+
+        # 적용할 배경색 결정
+        fill = light_pink_fill if no_data else white_fill
+
+        # ── 셀 기입 헬퍼 ──────────────────────────────────────
+        def write_cell(col, value, align=align_center, apply_fill=False):
+            cell           = ws.cell(row=r, column=col)
+            cell.value     = value if value != '' else None
+            cell.border    = thin_border
+            cell.alignment = align
+            if apply_fill:
+                cell.fill = fill
+
+        # A~D: DB Spec 영역 (배경색 없음 — 기준 문서이므로)
+        write_cell(COL_DOC_DOMAIN,     doc_domain)
+        write_cell(COL_DOC_ITEM_ID,    doc_item_id)
+        write_cell(COL_DOC_ITEM_LABEL, doc_item_label, align=align_left)
+        write_cell(COL_DOC_TYPE,       doc_type)
+
+        # E~G: Dataset 영역 (no_data이면 연분홍)
+        write_cell(COL_DS_DOMAIN,  ds_domain,  apply_fill=True)
+        write_cell(COL_DS_ITEM_ID, ds_item_id, apply_fill=True)
+        write_cell(COL_DS_TYPE,    ds_type,    apply_fill=True)
+
+        # H: 확인 결과 — 값 없으면 FALSE, 있으면 빈칸
+        result_cell           = ws.cell(row=r, column=COL_RESULT)
+        result_cell.value     = 'FALSE' if no_data else None
+        result_cell.border    = thin_border
+        result_cell.alignment = align_center
+        if no_data:
+            result_cell.fill = light_pink_fill
+
+        # I: Comment — 빈칸 (human validation)
+        comment_cell           = ws.cell(row=r, column=COL_COMMENT)
+        comment_cell.value     = None
+        comment_cell.border    = thin_border
+        comment_cell.alignment = align_center
+
+        # J: 참조 대상자 SUBJID (no_data이면 연분홍)
+        write_cell(COL_SUBJID, ds_subjid, apply_fill=True)
+
+        # K~Q: 프로파일 / 자동 점검 (Spec 위반이 있으면 빨강)
+        fill    = red_fill if profile[-1] else white_fill
+        for offset, value in enumerate(profile):
+            write_cell(COL_PROFILE + offset, value, apply_fill=True)
+
+    yield progress('ds_sheet', total, total, cancel)
+    return wb
+
+
+# ============================================================
+# 4. Entry Screen Validation 저장 함수 (기존 유지)
+# ============================================================
+
+# Entry Screen 비교 대상 컬럼 (템플릿 6행 헤더와 동일한 순서)
+ENTRY_COMPARE_COLS = ['DOMAIN', 'DOMAIN LABEL', 'PAGE', 'PAGE LABEL', 'VISIT',
+                      'ITEM ID', 'ITEM LABEL', 'ITEM SEQ', 'VERSION', 'CODE',
+                      'LAYOUT', 'TYPE', 'MAX_LEN', 'MIN_VAL', 'MAX_VAL']
+
+
+def _strip(values: pd.Series) -> pd.Series:
+    """비교용 문자열 (결측값은 빈 값 — 'nan' 문자열과 구분)"""
+    return values.fillna('').astype(str).str.strip()
+
+
+def _rule_exact(d: pd.Series, e: pd.Series) -> pd.Series:
+    return _strip(d) == _strip(e)
+
+
+def _rule_text_ci(d: pd.Series, e: pd.Series) -> pd.Series:
+    def norm(values):
+        return _strip(values).str.replace(r'\s+', ' ', regex=True).str.casefold()
+    return norm(d) == norm(e)
+
+
+def _make_numeric_rule(tol=0.0):
+    def rule(d: pd.Series, e: pd.Series) -> pd.Series:
+        d_txt, e_txt = _strip(d), _strip(e)
+        d_num = pd.to_numeric(d_txt, errors='coerce')
+        e_num = pd.to_numeric(e_txt, errors='coerce')
+        both_num = d_num.notna() & e_num.notna()
+        return (both_num & ((d_num - e_num).abs() <= tol)) | (~both_num & (d_txt == e_txt))
+    return rule
+
+
+def _make_set_rule(sep=";"):
+    def canonical(value):
+        return sep.join(sorted({part.strip() for part in str(value).split(sep) if part.strip()}))
+
+    def rule(d: pd.Series, e: pd.Series) -> pd.Series:
+        # 고유값 단위로만 정규화하여 행 단위 Python 처리를 피함
+        d_txt, e_txt = _strip(d), _strip(e)
+        uniques = pd.unique(pd.concat([d_txt, e_txt], ignore_index=True))
+        canon   = {v: canonical(v) for v in uniques}
+        return d_txt.map(canon) == e_txt.map(canon)
+    return rule
+
+
+# ── Codelist (CODE 컬럼) 파싱 ───────────────────────────────
+# 'code=decode' 항목 구분: ';' 또는 줄바꿈 / code-decode 구분: 첫 번째 '=' (없으면 ':')
+CODELIST_ITEM_SEP = re.compile(r'[;\n\r]+')
+
+
+def parse_codelist(value) -> dict:
+    """'1=Yes; 2=No' → {'1': 'Yes', '2': 'No'} (공백 정규화, 순서 무관)"""
+    pairs = {}
+    for item in CODELIST_ITEM_SEP.split(str(value)):
+        item = item.strip()
+        if not item or item.lower() == 'nan':
+            continue
+        sep = '=' if '=' in item else (':' if ':' in item else None)
+        code, decode = item.split(sep, 1) if sep else (item, '')
+        pairs[code.strip()] = ' '.join(decode.split())
+    return pairs
+
+
+def codelist_hash(pairs: dict) -> int:
+    """정규화된 codelist의 순서 무관 64bit 해시"""
+    canonical = '\x1f'.join(f"{k}\x1e{v}" for k, v in sorted(pairs.items()))
+    return int.from_bytes(hashlib.blake2b(canonical.encode('utf-8'), digest_size=8).digest(),
+                          'little', signed=True)
+
+
+def hash_codelists(values: pd.Series):
+    """
+    CODE 값 Series → (해시 int64 Series, {원본값: 파싱 결과}).
+    고유값 단위로만 파싱하므로 같은 codelist가 반복되는 대량 데이터에서도 비용이 작습니다.
+    """
+    text    = _strip(values)
+    parsed  = {v: parse_codelist(v) for v in pd.unique(text)}
+    hashes  = {v: codelist_hash(p) for v, p in parsed.items()}
+    return text.map(hashes).astype('int64'), parsed
+
+
+def _format_code(code, decode):
+    return f"{code}={decode}" if decode else code
+
+
+def codelist_diff(d_pairs: dict, e_pairs: dict):
+    """두 codelist의 차이 → (추가된 항목, 삭제된 항목, 변경된 항목) 문자열 리스트"""
+    added   = [_format_code(k, e_pairs[k]) for k in e_pairs if k not in d_pairs]
+    removed = [_format_code(k, d_pairs[k]) for k in d_pairs if k not in e_pairs]
+    changed = [f"{k}: {d_pairs[k]} → {e_pairs[k]}" for k in d_pairs
+               if k in e_pairs and d_pairs[k] != e_pairs[k]]
+    return added, removed, changed
+
+
+def _rule_codelist(d: pd.Series, e: pd.Series) -> pd.Series:
+    d_hash, _ = hash_codelists(d)
+    e_hash, _ = hash_codelists(e)
+    return d_hash == e_hash
+
+
+def describe_codelist_diffs(d: pd.Series, e: pd.Series) -> pd.DataFrame:
+    """
+    행별 CODE 차이 (ADDED / REMOVED / CHANGED / SUMMARY, 항목은 '; ' 구분).
+    (DB Spec 값, Export 값) 고유 조합 단위로 계산합니다.
+    """
+    pairs = pd.DataFrame({'d': _strip(d), 'e': _strip(e)}, index=d.index)
+    _, d_parsed = hash_codelists(pairs['d'])
+    _, e_parsed = hash_codelists(pairs['e'])
+
+    rows = []
+    for d_val, e_val in pairs.drop_duplicates().itertuples(index=False, name=None):
+        added, removed, changed = codelist_diff(d_parsed[d_val], e_parsed[e_val])
+        summary = ' / '.join(f"{label}: {'; '.join(items)}" for label, items in
+                             (('추가', added), ('삭제', removed), ('변경', changed)) if items)
+        rows.append((d_val, e_val, '; '.join(added), '; '.join(removed), '; '.join(changed), summary))
+
+    table  = pd.DataFrame(rows, columns=['d', 'e', 'ADDED', 'REMOVED', 'CHANGED', 'SUMMARY'])
+    result = table.set_index(['d', 'e']).reindex(pd.MultiIndex.from_frame(pairs))
+    result.index = pairs.index
+    return result
+
+
+def _rule_ignore(d: pd.Series, e: pd.Series) -> pd.Series:
+    return pd.Series(True, index=d.index)
+
+
+COMPARE_RULE_FACTORIES = {
+    "exact"  : lambda: _rule_exact,
+    "text_ci": lambda: _rule_text_ci,
+    "numeric": _make_numeric_rule,
+    "set"    : _make_set_rule,
+    "codelist": lambda: _rule_codelist,
+    "ignore" : lambda: _rule_ignore,
+}
+
+
+def compile_compare_rules(rules=None, compare_cols=None) -> dict:
+    """
+    선언적 비교 규칙(COMPARE_RULES 형식)을 컬럼별 벡터 비교 함수로 변환합니다.
+    각 함수는 (DB Spec 값 Series, Export 값 Series) → 일치 여부 bool Series 를 반환합니다.
+    """
+    rules        = COMPARE_RULES if rules is None else rules
+    compare_cols = compare_cols or ENTRY_COMPARE_COLS
+
+    compiled = {}
+    for cname in compare_cols:
+        spec = rules.get(cname, "exact")
+        kind, params = (spec, {}) if isinstance(spec, str) else spec
+        if kind not in COMPARE_RULE_FACTORIES:
+            raise ValueError(f"알 수 없는 비교 규칙: {cname} → {kind}")
+        compiled[cname] = COMPARE_RULE_FACTORIES[kind](**params)
+    return compiled
+
+
+def build_comparison(df_doc: pd.DataFrame, df_edc: pd.DataFrame, compare_cols=None,
+                     rules=None) -> pd.DataFrame:
+    """
+    DB Spec / EDC Export를 JOIN_KEY 기준으로 outer merge 하고 행별 불일치 컬럼을 계산합니다.
+
+    Returns:
+        merged DataFrame (DB Spec 원래 순서, Export에만 있는 행은 마지막)
+          - '<컬럼>_Doc' / '<컬럼>_EDC' : 양쪽 값
+          - _merge   : both / left_only / right_only
+          - MISMATCH : both 행에서 값이 다른 컬럼 목록 ('|CODE|TYPE|' 형식, 없으면 '')
+          - CODE_DIFF: CODE 불일치 행의 codelist 추가/삭제/변경 요약
+
+    rules: 컬럼별 비교 규칙 (기본 COMPARE_RULES, compile_compare_rules 참고)
+    """
+    return drain(iter_build_comparison(df_doc, df_edc, compare_cols, rules))
+
+
+def _mismatch_flags(merged: pd.DataFrame, compare_cols, predicates) -> pd.Series:
+    """merged 행(일부 구간이어도 됨)별 불일치 컬럼 플래그 ('|CODE|TYPE|' 형식, 없으면 '')"""
+    is_both = merged['_merge'] == 'both'
+    flags   = pd.Series('', index=merged.index, dtype=object)
+    for cname in compare_cols:
+        d_col, e_col = f"{cname}_Doc", f"{cname}_EDC"
+        if d_col not in merged.columns and e_col not in merged.columns:
+            continue
+        d_val = merged[d_col] if d_col in merged.columns else pd.Series('', index=merged.index)
+        e_val = merged[e_col] if e_col in merged.columns else pd.Series('', index=merged.index)
+        diff  = is_both & ~predicates[cname](d_val, e_val)
+        flags = flags.where(~diff, flags + cname + '|')
+    return flags.where(flags == '', '|' + flags)
+
+
+def iter_build_comparison(df_doc: pd.DataFrame, df_edc: pd.DataFrame, compare_cols=None,
+                          rules=None, cancel=None, parallel=None):
+    """
+    build_comparison의 제너레이터 버전 — 불일치 판정을 PROGRESS_CHUNK_ROWS 행 단위로 진행
+
+    parallel: True이면 DOMAIN 단위 shard로 나눠 작업 프로세스에서 merge/비교 후 원래 순서로 합칩니다.
+              None이면 CPU가 2개 이상이고 DB Spec이 COMPARE_PARALLEL_MIN_ROWS 행 이상일 때만 병렬 처리.
+              (JOIN_KEY가 중복된 입력은 순서가 정해지지 않으므로 항상 순차 처리)
+    """
+    compare_cols = compare_cols or ENTRY_COMPARE_COLS
+    predicates   = compile_compare_rules(rules, compare_cols)
+
+    if parallel is None:
+        parallel = (os.cpu_count() or 1) > 1 and len(df_doc) >= COMPARE_PARALLEL_MIN_ROWS
+    if (parallel and 'DOMAIN' in df_doc.columns and 'DOMAIN' in df_edc.columns
+            and df_doc['JOIN_KEY'].is_unique and df_edc['JOIN_KEY'].is_unique):
+        return (yield from _iter_compare_sharded(df_doc, df_edc, compare_cols, rules, cancel))
+
+    merged = pd.merge(df_doc.assign(ORIGINAL_ORDER=range(len(df_doc))), df_edc,
+                      on='JOIN_KEY', how='outer', suffixes=('_Doc', '_EDC'), indicator=True)
+    merged = (merged.sort_values(by=['ORIGINAL_ORDER'], na_position='last')
+                    .drop(columns=['ORIGINAL_ORDER'])
+                    .reset_index(drop=True))
+
+    total = len(merged)
+    yield progress('compare', 0, total, cancel)
+    parts = []
+    for start, stop in chunk_ranges(total):
+        parts.append(_mismatch_flags(merged.iloc[start:stop], compare_cols, predicates))
+        yield progress('compare', stop, total, cancel)
+    merged['MISMATCH'] = (pd.concat(parts) if parts
+                          else _mismatch_flags(merged, compare_cols, predicates))
+
+    # ── CODE 불일치 행: codelist 추가/삭제/변경 내역 ───────────
+    merged['CODE_DIFF'] = ''
+    code_mis = merged['MISMATCH'].str.contains('|CODE|', regex=False)
+    if code_mis.any() and 'CODE_Doc' in merged.columns and 'CODE_EDC' in merged.columns:
+        diffs = describe_codelist_diffs(merged.loc[code_mis, 'CODE_Doc'], merged.loc[code_mis, 'CODE_EDC'])
+        merged.loc[code_mis, 'CODE_DIFF'] = diffs['SUMMARY']
+    return merged
+
+
+def _compare_shard(df_doc, df_edc, compare_cols, rules) -> pd.DataFrame:
+    """[작업 프로세스] DOMAIN shard 하나의 merge + 불일치 판정"""
+    return drain(iter_build_comparison(df_doc, df_edc, compare_cols, rules, parallel=False))
+
+
+def _iter_compare_sharded(df_doc, df_edc, compare_cols, rules, cancel=None):
+    """
+    DOMAIN shard 단위 병렬 비교.
+    같은 JOIN_KEY는 항상 같은 shard에 들어가도록, 양쪽을 합쳐 JOIN_KEY가 처음 나온 행의 DOMAIN을 shard로 정합니다.
+    최종 행 순서는 키 열만으로 한 번 더 outer merge 해 순차 처리와 똑같이 맞춥니다
+    (DB Spec 원래 순서, Export에만 있는 행은 마지막 — merge가 정한 순서 그대로).
+    """
+    keys  = pd.concat([df_doc[['JOIN_KEY', 'DOMAIN']], df_edc[['JOIN_KEY', 'DOMAIN']]])
+    owner = keys.drop_duplicates(subset=['JOIN_KEY']).set_index('JOIN_KEY')['DOMAIN']
+    doc_shard = df_doc['JOIN_KEY'].map(owner)
+    edc_shard = df_edc['JOIN_KEY'].map(owner)
+
+    order = pd.merge(pd.DataFrame({'JOIN_KEY': df_doc['JOIN_KEY'].to_numpy(),
+                                   'ORIGINAL_ORDER': range(len(df_doc))}),
+                     df_edc[['JOIN_KEY']], on='JOIN_KEY', how='outer')
+    order = order.sort_values(by=['ORIGINAL_ORDER'], na_position='last')['JOIN_KEY']
+    position = pd.Series(range(len(order)), index=order.to_numpy())
+
+    shards  = pd.unique(owner)
+    total   = len(order)
+    yield progress('compare', 0, total, cancel)
+
+    with process_pool(min(os.cpu_count() or 1, len(shards))) as pool:
+        futures = [pool.submit(_compare_shard, df_doc[doc_shard == shard], df_edc[edc_shard == shard],
+                               compare_cols, rules) for shard in shards]
+        parts, finished = [], 0
+        for future in iter_completed(futures, cancel):
+            parts.append(future.result())
+            finished += len(parts[-1])
+            yield progress('compare', finished, total, cancel)
+
+    merged = pd.concat(parts, ignore_index=True)
+    merged = merged.iloc[merged['JOIN_KEY'].map(position).to_numpy().argsort(kind='stable')]
+    return merged.reset_index(drop=True)
+
+
+CODELIST_DIFF_SHEET = 'Codelist Diff'
+
+
+def save_codelist_diff_sheet(wb, merged: pd.DataFrame):
+    """
+    CODE 불일치 행의 codelist 추가/삭제/변경 내역을 별도 시트에 기록합니다.
+    CODE 불일치가 없으면 시트를 만들지 않습니다.
+    """
+    code_mis = merged['MISMATCH'].str.contains('|CODE|', regex=False)
+    if not code_mis.any():
+        return wb
+
+    rows  = merged[code_mis]
+    diffs = describe_codelist_diffs(rows['CODE_Doc'], rows['CODE_EDC'])
+
+    ws = wb.create_sheet(CODELIST_DIFF_SHEET)
+    ws.append([CODELIST_DIFF_SHEET])
+    ws['A1'].font = Font(bold=True, size=14)
+    ws.append([])
+
+    headers = ['DOMAIN', 'PAGE', 'VISIT', 'ITEM ID', 'DB Spec CODE', 'Export CODE', '추가', '삭제', '변경']
+    ws.append(headers)
+    thin_border = Border(
+        left=Side(style='thin'), right=Side(style='thin'),
+        top=Side(style='thin'),  bottom=Side(style='thin')
+    )
+    for col_idx in range(1, len(headers) + 1):
+        cell        = ws.cell(row=3, column=col_idx)
+        cell.font   = Font(bold=True)
+        cell.border = thin_border
+        cell.fill   = PatternFill(start_color="D9E1F2", end_color="D9E1F2", fill_type="solid")
+
+    for values in pd.concat(
+            [rows[['DOMAIN_Doc', 'PAGE_Doc', 'VISIT_Doc', 'ITEM ID_Doc', 'CODE_Doc', 'CODE_EDC']],
+             diffs[['ADDED', 'REMOVED', 'CHANGED']]], axis=1).itertuples(index=False, name=None):
+        ws.append(list(values))
+
+    for letter, width in zip('ABCDEFGHI', [10, 14, 10, 16, 40, 40, 30, 30, 40]):
+        ws.column_dimensions[letter].width = width
+    ws.freeze_panes = 'A4'
+    return wb
+
+
+SPEC_DUPLICATES_SHEET = 'Spec Duplicates'
+
+
+def save_spec_duplicates_sheet(wb, spec_duplicates: pd.DataFrame):
+    """
+    여러 시트/파일로 나뉜 DB Spec에서 서로 다른 조각에 함께 나온 JOIN_KEY를 별도 시트에 기록합니다.
+    중복이 없으면(또는 단일 시트 입력이면) 시트를 만들지 않습니다.
+    """
+    if spec_duplicates is None or spec_duplicates.empty:
+        return wb
+
+    ws = wb.create_sheet(SPEC_DUPLICATES_SHEET)
+    ws.append([SPEC_DUPLICATES_SHEET])
+    ws['A1'].font = Font(bold=True, size=14)
+    ws.append([f"DB Spec 시트/파일 간 중복 키 {spec_duplicates['JOIN_KEY'].nunique()}건 — "
+               f"처음 나온 행만 Entry Screen 비교에 사용"])
+
+    headers = ['DOMAIN', 'PAGE', 'VISIT', 'ITEM ID', '시트/파일', '행', '비교 사용']
+    ws.append(headers)
+    thin_border = Border(
+        left=Side(style='thin'), right=Side(style='thin'),
+        top=Side(style='thin'),  bottom=Side(style='thin')
+    )
+    for col_idx in range(1, len(headers) + 1):
+        cell        = ws.cell(row=3, column=col_idx)
+        cell.font   = Font(bold=True)
+        cell.border = thin_border
+        cell.fill   = PatternFill(start_color="D9E1F2", end_color="D9E1F2", fill_type="solid")
+
+    for domain, page, visit, item_id, source, row_no, kept in spec_duplicates[
+            ['DOMAIN', 'PAGE', 'VISIT', 'ITEM ID', 'SOURCE', 'ROW', 'KEPT']].itertuples(index=False, name=None):
+        ws.append([domain, page, visit, item_id, source, int(row_no), "사용" if kept else "제외"])
+
+    for letter, width in zip('ABCDEFG', [10, 14, 10, 16, 36, 8, 10]):
+        ws.column_dimensions[letter].width = width
+    ws.freeze_panes = 'A4'
+    return wb
+
+
+def save_to_template(template_path, df_doc, df_edc, ver_info,
+                     df_doc_full=None, df_dataset_long=None,
+                     highlight_mode=REPORT_HIGHLIGHT_MODE, merged=None, parallel=None,
+                     spec_duplicates=None):
+    """
+    템플릿에 두 가지 시트 결과를 모두 저장합니다.
+      - Entry Screen Validation  : 기존 로직 (df_doc / df_edc 사용)
+      - Data Structure Validation: 신규 로직 (df_doc_full / df_dataset_long 사용)
+
+    df_doc_full / df_dataset_long 이 None이면 Data Structure 시트는 건너뜁니다.
+
+    highlight_mode="rules"이면 숨김 시트(MISMATCH_FLAG_SHEET) A열의 같은 행에
+    불일치 플래그('L' / 'R' / '|컬럼명|...|')를 기록하고, 빨간 배경은
+    해당 플래그를 참조하는 열별 조건부 서식(FIND — 대소문자 구분, 정확한 토큰)으로 표시합니다.
+    (다른 시트를 참조하는 조건부 서식은 Excel 2010 이상에서 표시됩니다.)
+
+    merged: build_comparison() 결과를 이미 계산했다면 전달 (없으면 내부에서 계산)
+
+    spec_duplicates: iter_read_spec_parts()의 조각 간 중복 키 — 있으면 'Spec Duplicates' 시트 추가
+
+    parallel: True이면 Data Structure 시트는 별도 프로세스에서, Entry Screen 시트는 현재
+              프로세스에서 동시에 생성한 뒤 워크시트 XML을 하나의 패키지로 합칩니다.
+              None이면 CPU가 2개 이상이고 두 시트 모두 REPORT_PARALLEL_MIN_ROWS 행 이상일 때만
+              병렬 처리합니다.
+    """
+    return drain(iter_save_to_template(template_path, df_doc, df_edc, ver_info,
+                                       df_doc_full, df_dataset_long, highlight_mode, merged, parallel,
+                                       spec_duplicates=spec_duplicates))
+
+
+def iter_save_to_template(template_path, df_doc, df_edc, ver_info,
+                          df_doc_full=None, df_dataset_long=None,
+                          highlight_mode=REPORT_HIGHLIGHT_MODE, merged=None, parallel=None,
+                          cancel=None, spec_duplicates=None):
+    """save_to_template의 제너레이터 버전 — 시트 기입/저장 Progress를 yield 하고 BytesIO를 return"""
+    if not os.path.exists(template_path):
+        return None
+
+    template = load_template(template_path)
+    with_ds  = df_doc_full is not None and df_dataset_long is not None
+    if parallel is None:
+        parallel = (with_ds and (os.cpu_count() or 1) > 1
+                    and min(len(df_doc_full), len(df_doc)) >= REPORT_PARALLEL_MIN_ROWS)
+    if parallel and with_ds:
+        try:
+            content = yield from _iter_save_to_template_parallel(
+                template_path, template, ver_info, (df_doc, df_edc, merged),
+                (df_doc_full, df_dataset_long), highlight_mode, cancel, spec_duplicates)
+            return io.BytesIO(content)
+        except xlsx_stitch.StitchError:
+            pass  # 패키지 구조가 예상과 다르면 순차 저장으로 대체
+
+    wb = new_template_workbook(template)
+    yield from iter_fill_report(wb, template, ver_info, highlight_mode,
+                                entry=(df_doc, df_edc, merged),
+                                data_structure=(df_doc_full, df_dataset_long) if with_ds else None,
+                                cancel=cancel)
+    wb = save_spec_duplicates_sheet(wb, spec_duplicates)
+
+    yield progress('save', 0, 1, cancel)
+    output = io.BytesIO()
+    save_workbook(wb, output, cancel)
+    output.seek(0)
+    yield progress('save', 1, 1)
+    return output
+
+
+class _CancellableWorksheetWriter(WorksheetWriter):
+    """시트 XML을 쓰는 동안 PROGRESS_CHUNK_ROWS 행마다 중지 요청 확인"""
+
+    def __init__(self, ws, cancel):
+        self.cancel = cancel
+        super().__init__(ws)
+
+    def write_row(self, xf, row, row_idx):
+        if row_idx % PROGRESS_CHUNK_ROWS == 0:
+            self.cancel.check()
+        super().write_row(xf, row, row_idx)
+
+
+class _CancellableExcelWriter(ExcelWriter):
+    """
+    openpyxl ExcelWriter — 시트마다 _CancellableWorksheetWriter 사용.
+    중지되면 시트 임시 파일을 지우고 ValidationCancelled를 그대로 전달합니다.
+    """
+
+    def __init__(self, workbook, archive, cancel):
+        super().__init__(workbook, archive)
+        self.cancel = cancel
+
+    def write_worksheet(self, ws):
+        self.cancel.check()
+        ws._drawing = SpreadsheetDrawing()
+        ws._drawing.charts = ws._charts
+        ws._drawing.images = ws._images
+        writer = _CancellableWorksheetWriter(ws, self.cancel)
+        try:
+            writer.write()
+            ws._rels = writer._rels
+            self._archive.write(writer.out, ws.path[1:])
+            self.manifest.append(ws)
+        finally:
+            writer.xf.close()
+            writer.cleanup()
+
+
+def save_workbook(wb, output, cancel=None):
+    """
+    wb.save(output) — cancel이 있으면 시트 XML을 쓰는 동안에도 중지 요청을 확인합니다
+    (큰 Entry Screen 시트는 저장에만 수 초가 걸려 진행 이벤트 사이 간격이 깁니다).
+    """
+    if cancel is None or wb.write_only:
+        wb.save(output)
+        return
+    wb.properties.modified = datetime.now(timezone.utc).replace(tzinfo=None)
+    with ZipFile(output, 'w', ZIP_DEFLATED, allowZip64=True) as archive:
+        _CancellableExcelWriter(wb, archive, cancel).save()
+
+
+def _render_data_structure_part(template_path, ver_info, data_structure, highlight_mode) -> bytes:
+    """[작업 프로세스] 템플릿에 Data Structure 시트만 채워 저장한 패키지 bytes"""
+    template = load_template(template_path)
+    wb       = new_template_workbook(template)
+    fill_report(wb, template, ver_info, highlight_mode, data_structure=data_structure)
+    output = io.BytesIO()
+    wb.save(output)
+    return output.getvalue()
+
+
+def _iter_save_to_template_parallel(template_path, template, ver_info, entry, data_structure,
+                                    highlight_mode, cancel=None, spec_duplicates=None):
+    """
+    Data Structure 시트(작업 프로세스)와 Entry Screen 시트(현재 프로세스)를 동시에 생성 후 조립.
+    작업 프로세스 쪽은 진행률을 알 수 없으므로 Entry Screen 기입 진행만 yield 합니다.
+    중간에 중지되면 결과를 기다리지 않고 풀을 정리합니다 (실행 중인 작업은 끝난 뒤 프로세스 종료).
+    """
+    with process_pool(1) as pool:
+        ds_future = pool.submit(_render_data_structure_part, os.path.abspath(template_path),
+                                ver_info, data_structure, highlight_mode)
+
+        wb = new_template_workbook(template)
+        yield from iter_fill_report(wb, template, ver_info, highlight_mode, entry=entry, cancel=cancel)
+        wb = save_spec_duplicates_sheet(wb, spec_duplicates)
+        yield progress('save', 0, 1, cancel)
+        output = io.BytesIO()
+        save_workbook(wb, output, cancel)
+        del wb
+
+        total = len(data_structure[0])
+        yield progress('ds_sheet', 0, total, cancel)
+        part = wait_result(ds_future, cancel)
+        yield progress('ds_sheet', total, total, cancel)
+        content = xlsx_stitch.replace_sheet(output.getvalue(), part, 'Data Structure Validation')
+        yield progress('save', 1, 1)
+    return content
+
+
+def fill_report(wb, template, ver_info, highlight_mode=REPORT_HIGHLIGHT_MODE,
+                entry=None, data_structure=None):
+    """
+    템플릿 워크북에 버전 정보와 지정한 시트 결과를 기입합니다.
+      entry         : (df_doc, df_edc, merged) — None이면 Entry Screen 시트 생략
+      data_structure: (df_doc_full, df_dataset_long) — None이면 Data Structure 시트 생략
+    """
+    return drain(iter_fill_report(wb, template, ver_info, highlight_mode, entry, data_structure))
+
+
+def iter_fill_report(wb, template, ver_info, highlight_mode=REPORT_HIGHLIGHT_MODE,
+                     entry=None, data_structure=None, cancel=None):
+    """fill_report의 제너레이터 버전 — 시트별 기입 Progress('entry_sheet' / 'ds_sheet')를 yield"""
+    # ── 버전 정보 기입 ────────────────────────────────────────
+    # Entry Screen Validation 시트: A2(Blank), A3(DB Spec), A4(Annotated)
+    # Data Structure Validation 시트: A2(DB Spec)
+    # 형식 예시: "Blank eCRF Version: V1.1" → "V" + 입력값으로 치환
+    def write_version(ws, row, col, label_prefix, ver_value):
+        """기존 셀 텍스트에서 버전 부분만 교체하여 기입"""
+        cell = ws.cell(row=row, column=col)
+        ver_str = f"V{ver_value}" if not str(ver_value).upper().startswith('V') else str(ver_value)
+        cell.value = f"{label_prefix}{ver_str}"
+
+    entry_ws = wb['Entry Screen Validation'] if 'Entry Screen Validation' in wb.sheetnames else None
+    ds_ws    = wb['Data Structure Validation'] if 'Data Structure Validation' in wb.sheetnames else None
+
+    if entry_ws:
+        write_version(entry_ws, row=2, col=1,
+                      label_prefix="Blank eCRF Version: ",
+                      ver_value=ver_info.get('blank', ''))
+        write_version(entry_ws, row=3, col=1,
+                      label_prefix="Database Specifications Version: ",
+                      ver_value=ver_info.get('db', ''))
+        write_version(entry_ws, row=4, col=1,
+                      label_prefix="Annotated CRF Version: ",
+                      ver_value=ver_info.get('annotated', ''))
+
+    if ds_ws:
+        write_version(ds_ws, row=2, col=1,
+                      label_prefix="Database Specifications Version: ",
+                      ver_value=ver_info.get('db', ''))
+    # ─────────────────────────────────────────────────────────
+
+    styles = register_rules_styles(wb, template['entry_layout']) if highlight_mode == "rules" else None
+
+    # ── Entry Screen Validation ───────────────────────────────
+    target_sheet = 'Entry Screen Validation'
+    if entry is not None and target_sheet in wb.sheetnames:
+        ws = wb[target_sheet]
+        df_doc, df_edc, merged = entry
+
+        template_header_row = ENTRY_TEMPLATE_HEADER_ROW
+        doc_col_map, edc_col_map, res_col_idx = template['entry_layout']
+
+        red_fill   = PatternFill(start_color="FFC7CE", end_color="FFC7CE", fill_type="solid")
+        thin_border = Border(
+            left=Side(style='thin'), right=Side(style='thin'),
+            top=Side(style='thin'),  bottom=Side(style='thin')
+        )
+        align_center = Alignment(horizontal='center', vertical='center', wrap_text=True)
+
+        if merged is None:
+            merged = yield from iter_build_comparison(df_doc, df_edc, list(doc_col_map.keys()),
+                                                      cancel=cancel)
+
+        start_row = ENTRY_DATA_ROW
+        rules_mode = (highlight_mode == "rules")
+        if rules_mode:
+            col_style = {col: name for (sheet, col), name in styles.items() if sheet == target_sheet}
+            flag_ws   = wb.create_sheet(MISMATCH_FLAG_SHEET)
+            flag_ws.sheet_state = 'hidden'
+            flag_ws.cell(row=template_header_row, column=1).value = 'MISMATCH'
+
+        total = len(merged)
+        yield progress('entry_sheet', 0, total, cancel)
+        for i, row in merged.reset_index(drop=True).iterrows():
+            if i and i % PROGRESS_CHUNK_ROWS == 0:
+                yield progress('entry_sheet', i, total, cancel)
+            curr_r     = start_row + i
+            status     = row['_merge']
+            mismatches = row['MISMATCH'].strip('|').split('|') if row['MISMATCH'] else []
+
+            if rules_mode:
+                if status != 'right_only':
+                    for cname, col_idx in doc_col_map.items():
+                        write_styled(ws, curr_r, col_idx, row.get(f"{cname}_Doc", ""), col_style[col_idx])
+                if status != 'left_only':
+                    for cname, col_idx in edc_col_map.items():
+                        write_styled(ws, curr_r, col_idx, row.get(f"{cname}_EDC", ""), col_style[col_idx])
+
+                if status == 'left_only':
+                    flag = 'L'
+                elif status == 'right_only':
+                    flag = 'R'
+                else:
+                    flag = row['MISMATCH']
+                write_styled(ws, curr_r, res_col_idx,
+                             "True" if (status == 'both' and not mismatches) else "False",
+                             col_style[res_col_idx])
+                if flag:
+                    flag_ws.cell(row=curr_r, column=1).value = flag
+                continue
+
+            for cname, col_idx in doc_col_map.items():
+                cell           = ws.cell(row=curr_r, column=col_idx)
+                cell.value     = row.get(f"{cname}_Doc", "") if status != 'right_only' else ""
+                cell.border    = thin_border
+                cell.alignment = align_center
+                if status == 'left_only' or (status == 'both' and cname in mismatches):
+                    cell.fill = red_fill
+
+            for cname, col_idx in edc_col_map.items():
+                cell           = ws.cell(row=curr_r, column=col_idx)
+                cell.value     = row.get(f"{cname}_EDC", "") if status != 'left_only' else ""
+                cell.border    = thin_border
+                cell.alignment = align_center
+                if status == 'right_only' or (status == 'both' and cname in mismatches):
+                    cell.fill = red_fill
+
+            res_text               = "True" if (status == 'both' and not mismatches) else "False"
+            cell_res               = ws.cell(row=curr_r, column=res_col_idx)
+            cell_res.value         = res_text
+            cell_res.border        = thin_border
+            cell_res.alignment     = align_center
+
+        # ── rules 모드: 플래그 시트를 참조하는 조건부 서식 ──
+        # 비교 열마다 규칙 하나 — 플래그 토큰('|ITEM ID|')을 수식에 그대로 넣고 FIND(대소문자 구분,
+        # 와일드카드 없음)로 찾으므로 헤더 셀 표기나 다른 컬럼명에 포함된 이름과 섞이지 않습니다.
+        if rules_mode and len(merged) > 0:
+            last_row = start_row + len(merged) - 1
+            flag_ref = f"'{MISMATCH_FLAG_SHEET}'!$A{start_row}"
+            for side, col_map in (('L', doc_col_map), ('R', edc_col_map)):
+                for cname, col_idx in col_map.items():
+                    letter = get_column_letter(col_idx)
+                    token  = f"|{cname}|".replace('"', '""')
+                    ws.conditional_formatting.add(
+                        f"{letter}{start_row}:{letter}{last_row}",
+                        FormulaRule(formula=[f'OR({flag_ref}="{side}",ISNUMBER(FIND("{token}",{flag_ref})))'],
+                                    fill=red_fill, border=thin_border, stopIfTrue=True))
+                cols = sorted(col_map.values())
+                add_range_rules(ws, f"{get_column_letter(cols[0])}{start_row}:"
+                                    f"{get_column_letter(cols[-1])}{last_row}", None, None, thin_border)
+            res_letter = get_column_letter(res_col_idx)
+            add_range_rules(ws, f"{res_letter}{start_row}:{res_letter}{last_row}", None, None, thin_border)
+
+        # ── CODE 불일치 상세 내역 (별도 시트) ─────────────────
+        wb = save_codelist_diff_sheet(wb, merged)
+        yield progress('entry_sheet', total, total, cancel)
+
+    # ── Data Structure Validation ─────────────────────────────
+    if data_structure is not None:
+        df_doc_full, df_dataset_long = data_structure
+        wb = yield from iter_save_data_structure(wb, df_doc_full, df_dataset_long,
+                                                 highlight_mode=highlight_mode, cancel=cancel, styles=styles)
+    return wb
+
+
+# ============================================================
+# 5. 결과 탐색기 (서버 측 필터/정렬/페이지 처리)
+# ============================================================
+
+EXPLORER_KEY_COLS  = ['DOMAIN', 'PAGE', 'VISIT', 'ITEM ID']
+EXPLORER_STATUS    = {
+    'both'      : '일치',
+    'mismatch'  : '불일치',
+    'left_only' : 'DB Spec에만 존재',
+    'right_only': 'Export에만 존재',
+}
+EXPLORER_PAGE_SIZES = [50, 100, 200, 500]
+
+
+def build_explorer_frame(merged: pd.DataFrame) -> pd.DataFrame:
+    """
+    build_comparison() 결과를 탐색기용 프레임으로 정리합니다.
+    키 컬럼은 DB Spec 값 우선(없으면 Export 값), 필터 대상 컬럼은 category로 변환합니다.
+    """
+    out = pd.DataFrame(index=merged.index)
+    for c in EXPLORER_KEY_COLS:
+        out[c] = merged[f"{c}_Doc"].fillna(merged[f"{c}_EDC"]).fillna('')
+
+    status = merged['_merge'].astype(str)
+    status = status.where(~((status == 'both') & (merged['MISMATCH'] != '')), 'mismatch')
+    out['STATUS']   = status.map(EXPLORER_STATUS)
+    out['MISMATCH'] = merged['MISMATCH'].str.strip('|').str.replace('|', ', ', regex=False)
+    out['CODE 변경 내역'] = merged['CODE_DIFF']
+    out['_FLAG']    = merged['MISMATCH']
+
+    for c in ENTRY_COMPARE_COLS:
+        for side, label in (('_Doc', 'Spec'), ('_EDC', 'Export')):
+            if f"{c}{side}" in merged.columns:
+                out[f"{c} ({label})"] = merged[f"{c}{side}"].fillna('')
+
+    for c in ['DOMAIN', 'PAGE', 'STATUS']:
+        out[c] = out[c].astype('category')
+    return out
+
+
+def query_explorer(df: pd.DataFrame, domains=None, pages=None, statuses=None,
+                   mismatch_cols=None, sort_by=None, ascending=True,
+                   page=1, page_size=EXPLORER_PAGE_SIZES[0]):
+    """
+    탐색기 프레임에 필터 → 정렬 → 페이지 슬라이스를 적용합니다.
+    화면에는 반환된 한 페이지 분량만 전송됩니다.
+
+    Returns:
+        (page_df, 필터 후 전체 행 수, 전체 페이지 수)
+    """
+    mask = pd.Series(True, index=df.index)
+    if domains:
+        mask &= df['DOMAIN'].isin(domains)
+    if pages:
+        mask &= df['PAGE'].isin(pages)
+    if statuses:
+        mask &= df['STATUS'].isin(statuses)
+    if mismatch_cols:
+        col_mask = pd.Series(False, index=df.index)
+        for c in mismatch_cols:
+            col_mask |= df['_FLAG'].str.contains(f"|{c}|", regex=False)
+        mask &= col_mask
+
+    result = df[mask]
+    if sort_by:
+        result = result.sort_values(by=sort_by, ascending=ascending, kind='stable')
+
+    total       = len(result)
+    total_pages = max(1, -(-total // page_size))
+    page        = min(max(1, page), total_pages)
+    start       = (page - 1) * page_size
+    return result.iloc[start:start + page_size].drop(columns=['_FLAG']), total, total_pages
+
+
+# ============================================================
+# 6. 일괄 실행 (화면 없이 — HTTP API / 배치용)
+# ============================================================
+
+class ValidationInputError(ValueError):
+    """입력 파일/시트/헤더 설정 문제로 검증을 진행할 수 없는 경우"""
+
+
+def _resolve_sheet(excel_file, sheet_name, label):
+    """시트명이 없으면 첫 번째 시트, 있으면 존재 여부 확인"""
+    if sheet_name in (None, ''):
+        return excel_file.sheet_names[0]
+    if sheet_name not in excel_file.sheet_names:
+        raise ValidationInputError(
+            f"{label}: '{sheet_name}' 시트가 없습니다. (시트 목록: {', '.join(excel_file.sheet_names)})")
+    return sheet_name
+
+
+def validation_counts(df_doc_full, df_doc_entry, doc_excluded, df_edc, edc_excluded,
+                      df_dataset_long, merged) -> dict:
+    """실행 지표용 단계별 행 수 / Entry Screen 비교 결과 건수 / Data Structure 데이터 없음 건수"""
+    status   = merged['_merge'].astype(str)
+    mismatch = (status == 'both') & (merged['MISMATCH'] != '')
+    counts = {
+        'spec_rows'       : len(df_doc_full),
+        'spec_entry_rows' : len(df_doc_entry),
+        'spec_excluded'   : excluded_count(doc_excluded),
+        'export_rows'     : len(df_edc),
+        'export_excluded' : excluded_count(edc_excluded),
+        'entry_rows'      : len(merged),
+        'entry_match'     : int(((status == 'both') & ~mismatch).sum()),
+        'entry_mismatch'  : int(mismatch.sum()),
+        'entry_left_only' : int((status == 'left_only').sum()),
+        'entry_right_only': int((status == 'right_only').sum()),
+    }
+    if df_dataset_long is not None:
+        # ds_no_data: 값이 하나도 없는 Dataset 항목 / ds_false: Data Structure 시트에서 FALSE인 DB Spec 행
+        ds = join_on_spec_keys(df_doc_full, df_dataset_long, ['DS_TYPE'])
+        counts['dataset_items'] = len(df_dataset_long)
+        counts['ds_no_data']    = int((df_dataset_long['DS_TYPE'] == '').sum())
+        counts['ds_false']      = int((~ds['MATCHED'] | (ds['DS_TYPE'].astype(str).str.strip() == '')).sum())
+    return counts
+
+
+def summarize_result(result: dict) -> dict:
+    """run_validation 결과 → Entry Screen / Data Structure 건수 요약 (JSON 직렬화 가능)"""
+    merged = result['merged']
+    status = merged['_merge'].astype(str)
+    status = status.where(~((status == 'both') & (merged['MISMATCH'] != '')), 'mismatch')
+    counts = status.value_counts()
+    summary = {
+        'entry_screen': {
+            'rows'            : int(len(merged)),
+            'match'           : int(counts.get('both', 0)),
+            'mismatch'        : int(counts.get('mismatch', 0)),
+            'spec_only'       : int(counts.get('left_only', 0)),
+            'export_only'     : int(counts.get('right_only', 0)),
+            'spec_excluded'   : excluded_count(result['doc_excluded']),
+            'export_excluded' : excluded_count(result['edc_excluded']),
+        },
+        'data_structure': None,
+        'spec_duplicate_keys': (int(result['spec_duplicates']['JOIN_KEY'].nunique())
+                                if result.get('spec_duplicates') is not None else None),
+    }
+    ds = result['df_dataset_long']
+    if ds is not None:
+        summary['data_structure'] = {
+            'items'  : int(len(ds)),
+            'no_data': int((ds['DS_TYPE'] == '').sum()) if not ds.empty else 0,
+        }
+    return summary
+
+
+def run_validation(doc_source, doc_sheet, doc_header, edc_source, edc_sheet, edc_header,
+                   dataset_source=None, ver_info=None, template_path=TEMPLATE_PATH,
+                   highlight_mode=REPORT_HIGHLIGHT_MODE, metrics=None, cancel=None) -> dict:
+    """
+    화면의 '검증 시작'과 같은 순서로 전체 검증을 수행하고 결과 리포트까지 생성합니다.
+
+    doc_source / edc_source : 파일 경로 또는 pd.ExcelFile
+                              (doc_source는 여러 파일 목록도 가능 — as_spec_parts 참고)
+    dataset_source          : 파일 경로 / pd.ExcelFile / None (None이면 Data Structure 생략)
+    doc_sheet / edc_sheet   : 시트명 (None이면 첫 번째 시트, doc_sheet는 여러 시트 목록도 가능)
+    metrics                 : run_metrics.RunMetrics — 단계별 소요 시간/행 수를 기록
+                              (finish()는 호출 측에서 — 이력 저장 등 후속 단계까지 포함하기 위해)
+    cancel                  : CancelToken — 중지 요청 시 ValidationCancelled
+
+    Returns:
+        {'df_doc_full', 'df_doc_entry', 'doc_excluded', 'df_edc', 'edc_excluded',
+         'df_dataset_long', 'merged', 'report'(BytesIO), 'spec_duplicates'}
+        (doc_excluded / edc_excluded: 제외 규칙별 집계, EXCLUSION_SUMMARY_COLS)
+        (spec_duplicates: DB Spec이 여러 조각이면 조각 간 중복 키 SPEC_DUPLICATE_COLS, 아니면 None)
+
+    Raises:
+        ValidationInputError: 시트/필수 컬럼/템플릿 문제
+        ValidationCancelled : cancel로 중지 요청된 경우
+    """
+    return drain(iter_validation(doc_source, doc_sheet, doc_header, edc_source, edc_sheet, edc_header,
+                                 dataset_source, ver_info, template_path, highlight_mode, metrics, cancel))
+
+
+def pipeline_fraction(event: Progress) -> float:
+    """진행 이벤트 → 전체 진행률(0~1) — PIPELINE_STAGES 단계마다 같은 비중"""
+    stages = list(PIPELINE_STAGES)
+    within = event.done / event.total if event.total else 1.0
+    return min(1.0, (stages.index(event.stage) + within) / len(stages))
+
+
+def iter_validation(doc_source, doc_sheet, doc_header, edc_source, edc_sheet, edc_header,
+                    dataset_source=None, ver_info=None, template_path=TEMPLATE_PATH,
+                    highlight_mode=REPORT_HIGHLIGHT_MODE, metrics=None, cancel=None):
+    """
+    run_validation의 제너레이터 버전.
+
+    단계(PIPELINE_STAGES)마다 PROGRESS_CHUNK_ROWS 행 단위로 Progress(stage, done, total)를
+    yield 하고, 끝나면 run_validation과 같은 결과 dict를 return 합니다.
+    청크 경계마다 cancel을 확인하며, 호출 측이 중간에 close()해도 진행 중인 단계가 정리됩니다.
+    """
+    stage = metrics.stage if metrics is not None else (lambda name: nullcontext())
+
+    if not os.path.exists(template_path):
+        raise ValidationInputError(f"템플릿 파일이 없습니다: {template_path}")
+
+    # 경로로 넘어온 입력은 여기서 열고 끝나면(중지/오류 포함) 닫음 — 호출 측이 넘긴 ExcelFile은 닫지 않음
+    owned = []
+
+    def open_source(source):
+        if not isinstance(source, str):
+            return source
+        owned.append(open_excel(source))
+        return owned[-1]
+
+    try:
+        spec_parts = as_spec_parts(doc_source, doc_sheet, doc_header)
+        if spec_parts is None:
+            doc_excel = open_source(doc_source)
+            doc_sheet = _resolve_sheet(doc_excel, doc_sheet, "DB Spec")
+            checks    = [("DB Spec", doc_excel, doc_sheet, doc_header)]
+        else:
+            # 조각마다 시트 확인 (같은 파일은 한 번만 열기)
+            opened, spec_excels = {}, []
+            for i, part in enumerate(spec_parts):
+                key = part.source if isinstance(part.source, str) else id(part.source)
+                if key not in opened:
+                    opened[key] = open_source(part.source)
+                spec_excels.append(opened[key])
+                spec_parts[i] = part._replace(sheet=_resolve_sheet(opened[key], part.sheet, "DB Spec"))
+            checks = [(f"DB Spec [{label}]", excel_file, part.sheet, part.header) for label, excel_file, part
+                      in zip(spec_part_labels(spec_parts), spec_excels, spec_parts)]
+        edc_excel = open_source(edc_source)
+        edc_sheet = _resolve_sheet(edc_excel, edc_sheet, "EDC Export")
+        checks.append(("EDC Export", edc_excel, edc_sheet, edc_header))
+
+        for label, excel_file, sheet, header in checks:
+            is_ok, msg, _ = check_columns_status(get_dynamic_preview(excel_file, sheet, header))
+            if not is_ok:
+                raise ValidationInputError(f"{label} ('{sheet}', 헤더 {header}행): {msg}")
+
+        # DB Spec 전체는 Data Structure 비교에도 쓰이므로 읽은 뒤 제외 규칙으로 나누고,
+        # EDC Export는 수집 단계에서 바로 제외 규칙을 적용
+        # DB Spec이 여러 시트/파일이면 조각별로 정규화 후 JOIN_KEY 전체 기준 중복 제거 (조각 간 중복은 별도 보고)
+        spec_duplicates = None
+        with stage('read_spec'):
+            if spec_parts is None:
+                df_doc_full, _ = yield from iter_read_standardized(doc_excel, doc_sheet, doc_header,
+                                                                   stage='read_spec', cancel=cancel)
+            else:
+                df_doc_full, spec_duplicates = yield from iter_read_spec_parts(spec_parts, spec_excels, cancel)
+            df_doc_full = add_spec_keys(df_doc_full)
+            if df_doc_full.empty:
+                raise ValidationInputError("DB Spec 데이터를 불러올 수 없습니다.")
+            df_doc_entry, doc_excluded = INGEST_ROW_FILTER.split(df_doc_full)
+
+        with stage('read_export'):
+            df_edc, edc_excluded = yield from iter_read_standardized(
+                edc_excel, edc_sheet, edc_header, row_filter=INGEST_ROW_FILTER,
+                stage='read_export', cancel=cancel)
+            if df_edc.empty:
+                raise ValidationInputError("EDC Export 데이터를 불러올 수 없습니다.")
+
+        df_dataset_long = None
+        if dataset_source is not None:
+            with stage('dataset_profile'):
+                df_dataset_long = yield from iter_build_dataset_long(dataset_source, df_spec=df_doc_full,
+                                                                     cancel=cancel)
+
+        with stage('compare'):
+            merged = yield from iter_build_comparison(df_doc_entry, df_edc, cancel=cancel)
+        with stage('report'):
+            report = yield from iter_save_to_template(
+                template_path, df_doc_entry, df_edc, ver_info or {},
+                df_doc_full=df_doc_full, df_dataset_long=df_dataset_long,
+                highlight_mode=highlight_mode, merged=merged, cancel=cancel, spec_duplicates=spec_duplicates)
+        if metrics is not None:
+            metrics.count(**validation_counts(df_doc_full, df_doc_entry, doc_excluded, df_edc, edc_excluded,
+                                              df_dataset_long, merged), report_bytes=report.getbuffer().nbytes,
+                          spec_parts=len(spec_parts) if spec_parts else None,
+                          spec_duplicate_keys=(spec_duplicates['JOIN_KEY'].nunique()
+                                               if spec_duplicates is not None else None))
+
+        return {
+            'df_doc_full'    : df_doc_full,
+            'df_doc_entry'   : df_doc_entry,
+            'doc_excluded'   : doc_excluded,
+            'df_edc'         : df_edc,
+            'edc_excluded'   : edc_excluded,
+            'df_dataset_long': df_dataset_long,
+            'merged'         : merged,
+            'report'         : report,
+            'spec_duplicates': spec_duplicates,
+        }
+    finally:
+        for excel_file in owned:
+            excel_file.close()
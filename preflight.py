@@ -0,0 +1,199 @@
+"""
+사전 점검 (Preflight) — 키 수준 일치 건수
+
+전체 리포트를 만들기 전에 DB Spec / EDC Export의 키 열(DOMAIN, PAGE, VISIT, ITEM ID)과
+제외 규칙에 필요한 열(LAYOUT 등)만 읽어 SYS_ 제외 규칙을 적용하고,
+JOIN_KEY 집합 연산으로 일치 / DB Spec에만 있음 / Export에만 있음 건수와
+불일치가 많은 DOMAIN을 계산합니다. 시트나 헤더 행을 잘못 고른 경우 일치 건수가 0에 가깝게 나오므로
+save_to_template 전체 실행 전에 바로 확인할 수 있습니다.
+
+읽기:
+  .xlsx/.xlsm — 워크시트 XML을 행 단위 정규식으로 스트리밍 (report_diff.iter_sheet_rows), 필요한 열만 보관
+  그 외(.xls) — pd.read_excel(usecols=필요한 열)
+
+키 생성/정규화/중복 제거/제외 규칙 적용 순서는 검증 실행(read_standardized)과 같습니다.
+  - DB Spec   : 정규화 → JOIN_KEY 중복 제거 → 제외 규칙 (process_data_final 후 INGEST_ROW_FILTER.split)
+                여러 시트/파일(engine.as_spec_parts)이면 조각 순서대로 이어 붙인 뒤 전체 기준으로 중복 제거
+  - EDC Export: 정규화 → JOIN_KEY 중복 제거 → 제외 규칙 (read_standardized(row_filter=...), 묶음 단위 처리와 같은 결과)
+
+CLI:
+    python preflight.py spec.xlsx export.xlsx --spec-sheet Spec --spec-header 1 --export-header 0
+"""
+import argparse
+import io
+import time
+import zipfile
+
+import pandas as pd
+
+import edc_engine as engine
+from report_diff import iter_sheet_rows, shared_strings
+from xlsx_stitch import sheet_parts
+
+# [유지보수 포인트] 결과에 표시할 불일치 상위 DOMAIN 수
+PREFLIGHT_TOP_DOMAINS = 10
+
+DOMAIN_COLS = ['DOMAIN', 'MATCHED', 'SPEC_ONLY', 'EXPORT_ONLY']
+
+
+def preflight_columns() -> list:
+    """사전 점검에 읽는 표준 열 (키 열 + 제외 규칙이 참조하는 열)"""
+    cols = list(engine.JOIN_KEY_COLS)
+    for _, col, _, _ in engine.INGEST_ROW_FILTER.rules:
+        if col not in cols:
+            cols.append(col)
+    return cols
+
+
+# ============================================================
+# 1. 키 열만 읽기
+# ============================================================
+
+def _open_zip(source):
+    try:
+        return zipfile.ZipFile(source)
+    except zipfile.BadZipFile:
+        return None
+
+
+def _read_columns_xlsx(zf, sheet_name, header_row, columns) -> pd.DataFrame:
+    """워크시트 XML 스트리밍 — header_row(0부터, pd.read_excel과 같은 기준) 다음 행부터 필요한 열만"""
+    parts = sheet_parts(zf)
+    if sheet_name in (None, ''):
+        sheet_name = next(iter(parts))
+    if sheet_name not in parts:
+        raise engine.ValidationInputError(
+            f"'{sheet_name}' 시트가 없습니다. (시트 목록: {', '.join(parts)})")
+
+    shared    = shared_strings(zf)
+    header_no = header_row + 1
+    picked    = {}      # 열 번호 → 표준 열 이름 (같은 이름은 처음 나온 열)
+    records   = []
+    for row_no, values in iter_sheet_rows(zf, parts[sheet_name], shared):
+        if row_no < header_no:
+            continue
+        if row_no == header_no:
+            for col_idx in sorted(values):
+                name = engine.standard_column_name(values[col_idx])
+                if name in columns and name not in picked.values():
+                    picked[col_idx] = name
+            continue
+        if not picked:
+            break
+        records.append([values.get(col_idx) for col_idx in picked])
+    return pd.DataFrame(records, columns=list(picked.values()), dtype=object)
+
+
+def _read_columns_excel(source, sheet_name, header_row, columns) -> pd.DataFrame:
+    """xlsx가 아닌 파일 — pd.read_excel로 필요한 열만"""
+    df = pd.read_excel(source, sheet_name=sheet_name or 0, header=header_row, dtype=str,
+                       usecols=lambda c: engine.standard_column_name(c) in columns)
+    df.columns = [engine.standard_column_name(c) for c in df.columns]
+    return df.loc[:, ~df.columns.duplicated()]
+
+
+def read_key_columns(source, sheet_name, header_row, columns=None) -> pd.DataFrame:
+    """
+    시트에서 columns(기본 preflight_columns())에 해당하는 표준 열만 읽습니다.
+    source: 파일 경로 / bytes / file-like, sheet_name이 None이면 첫 번째 시트
+    """
+    columns = columns or preflight_columns()
+    if isinstance(source, (bytes, bytearray)):
+        source = io.BytesIO(source)
+    zf = _open_zip(source)
+    if zf is None:
+        if hasattr(source, 'seek'):
+            source.seek(0)
+        return _read_columns_excel(source, sheet_name, header_row, columns)
+    with zf:
+        return _read_columns_xlsx(zf, sheet_name, header_row, columns)
+
+
+def _join_keys(df: pd.DataFrame) -> pd.DataFrame:
+    """키 열 정규화 + JOIN_KEY 생성 + 빈 키 제거 + 중복 제거 (read_standardized와 동일)"""
+    df = engine.normalize_std_cols(df, engine.JOIN_KEY_COLS)
+    df['JOIN_KEY'] = engine.make_join_key(df)
+    df = df[df['JOIN_KEY'].str.len() > 1]
+    return df.drop_duplicates(subset=['JOIN_KEY'])
+
+
+# ============================================================
+# 2. 키 집합 비교
+# ============================================================
+
+def preflight(doc_source, doc_sheet, doc_header, edc_source, edc_sheet, edc_header,
+              top=PREFLIGHT_TOP_DOMAINS) -> dict:
+    """
+    DB Spec / EDC Export 키 수준 일치 건수.
+
+    Returns:
+        {'spec_rows', 'export_rows'        : 제외 규칙 적용 후 키 수
+         'spec_excluded', 'export_excluded': 제외 규칙으로 빠진 행 수
+         'matched', 'spec_only', 'export_only', 'match_rate'(일치 / 전체 키),
+         'top_domains': DataFrame[DOMAIN_COLS] — SPEC_ONLY + EXPORT_ONLY 많은 순 상위 top개,
+         'elapsed_s'}
+    """
+    t0 = time.perf_counter()
+    row_filter = engine.INGEST_ROW_FILTER
+
+    parts = (engine.as_spec_parts(doc_source, doc_sheet, doc_header)
+             or [engine.SpecPart(doc_source, doc_sheet, doc_header)])
+    spec  = _join_keys(pd.concat([read_key_columns(p.source, p.sheet, p.header) for p in parts],
+                                 ignore_index=True))
+    spec, spec_excluded = row_filter.split(spec)
+
+    export, export_excluded = row_filter.split(_join_keys(read_key_columns(edc_source, edc_sheet, edc_header)))
+
+    in_export = spec['JOIN_KEY'].isin(export['JOIN_KEY'])
+    in_spec   = export['JOIN_KEY'].isin(spec['JOIN_KEY'])
+    matched   = int(in_export.sum())
+
+    by_domain = pd.concat([
+        pd.DataFrame({'DOMAIN': spec['DOMAIN'], 'MATCHED': in_export, 'SPEC_ONLY': ~in_export,
+                      'EXPORT_ONLY': False}),
+        pd.DataFrame({'DOMAIN': export['DOMAIN'][~in_spec], 'MATCHED': False, 'SPEC_ONLY': False,
+                      'EXPORT_ONLY': True}),
+    ]).groupby('DOMAIN', sort=False)[DOMAIN_COLS[1:]].sum().astype('int64').reset_index()
+    by_domain = by_domain[(by_domain['SPEC_ONLY'] + by_domain['EXPORT_ONLY']) > 0]
+    by_domain = (by_domain.assign(_TOTAL=by_domain['SPEC_ONLY'] + by_domain['EXPORT_ONLY'])
+                 .sort_values('_TOTAL', ascending=False, kind='stable')
+                 .drop(columns=['_TOTAL']).head(top).reset_index(drop=True))
+
+    total_keys = len(spec) + int((~in_spec).sum())
+    return {
+        'spec_rows'      : len(spec),
+        'export_rows'    : len(export),
+        'spec_excluded'  : engine.excluded_count(spec_excluded),
+        'export_excluded': engine.excluded_count(export_excluded),
+        'matched'        : matched,
+        'spec_only'      : len(spec) - matched,
+        'export_only'    : int((~in_spec).sum()),
+        'match_rate'     : matched / total_keys if total_keys else 0.0,
+        'top_domains'    : by_domain,
+        'elapsed_s'      : round(time.perf_counter() - t0, 3),
+    }
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="EDC Validation 사전 점검 (키 수준 일치 건수)")
+    parser.add_argument("spec", help="DB Spec (.xlsx)")
+    parser.add_argument("export", help="EDC Export (.xlsx)")
+    parser.add_argument("--spec-sheet")
+    parser.add_argument("--spec-header", type=int, default=1)
+    parser.add_argument("--export-sheet")
+    parser.add_argument("--export-header", type=int, default=0)
+    parser.add_argument("--top", type=int, default=PREFLIGHT_TOP_DOMAINS)
+    args = parser.parse_args(argv)
+
+    result = preflight(args.spec, args.spec_sheet, args.spec_header,
+                       args.export, args.export_sheet, args.export_header, top=args.top)
+    print(f"일치 {result['matched']:,} / DB Spec에만 {result['spec_only']:,} / "
+          f"Export에만 {result['export_only']:,} (일치율 {result['match_rate']:.1%}, "
+          f"{result['elapsed_s']}s)")
+    print(f"제외 규칙: DB Spec {result['spec_excluded']:,}건, Export {result['export_excluded']:,}건")
+    if not result['top_domains'].empty:
+        print(result['top_domains'].to_string(index=False))
+
+
+if __name__ == "__main__":
+    main()
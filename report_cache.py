@@ -0,0 +1,242 @@
+"""
+검증 결과 리포트 디스크 캐시 (내용 주소 기반)
+
+같은 입력으로 다시 실행하면(동료의 재검증, 새로고침 후 재다운로드 등) 전체 파이프라인과
+wb.save를 다시 수행하지 않고 저장된 리포트 bytes와 결과 DataFrame(RESULT_FRAMES)을 바로 돌려줍니다.
+결과 DataFrame이 함께 있으므로 캐시 적중 시에도 결과 탐색기, 검증 이력 저장, JSON 결과를 그대로 쓸 수 있습니다.
+
+캐시 키 = SHA-256(
+    DB Spec / EDC Export / CDMS Dataset 파일 내용 해시,
+    시트 / 헤더 행 선택, 버전 문자열(ver_info),
+    SYS_LAYOUT_WHITELIST / INGEST_EXCLUDE_RULES / 하이라이트 방식,
+    템플릿 파일 해시, 엔진 소스 해시(비교 규칙 등 코드 상수 변경 시 자동 무효화))
+
+저장 형식: REPORT_CACHE_DIR/<키>.xlsx (리포트) + <키>.frames (결과 DataFrame — 프레임별 parquet를 묶은 zip)
+          + <키>.json (요약 등 부가 정보)
+  - parquet 저장에는 pyarrow가 필요합니다 (Streamlit 의존성으로 함께 설치됨). 없거나 저장할 수 없는 값이면
+    해당 결과는 캐시하지 않습니다.
+  - 쓰기는 임시 파일 → os.replace 로 원자적으로 교체하므로 여러 세션/프로세스가 같은 폴더를 공유해도 됩니다.
+  - 조회 시 mtime을 갱신하고, 전체 크기가 REPORT_CACHE_MAX_MB를 넘으면 오래 조회되지 않은 항목부터 삭제합니다.
+"""
+import hashlib
+import io
+import json
+import os
+import time
+import uuid
+import zipfile
+
+# ============================================================
+# [유지보수 포인트] 리포트 캐시 설정 (환경변수로 덮어쓰기 가능)
+#   REPORT_CACHE_MAX_MB를 0으로 두면 캐시를 사용하지 않습니다.
+#   리포트 형식을 바꾸는 코드 변경이 엔진 소스 밖(템플릿 외 자원 등)에 있으면 CACHE_FORMAT을 올리세요.
+# ============================================================
+REPORT_CACHE_DIR    = os.environ.get("EDC_REPORT_CACHE_DIR", "report_cache")
+REPORT_CACHE_MAX_MB = int(os.environ.get("EDC_REPORT_CACHE_MAX_MB", "1024"))
+CACHE_FORMAT        = 2
+
+HASH_CHUNK_SIZE = 1024 * 1024
+
+CACHE_EXTENSIONS = ('.xlsx', '.frames', '.json')
+
+# 리포트 내용에 영향을 주는 엔진 소스 (내용이 바뀌면 캐시 키도 바뀜)
+ENGINE_SOURCES = ('edc_engine.py', 'dataset_profile.py', 'xlsx_stitch.py')
+
+# 캐시에 함께 저장하는 run_validation 결과 DataFrame (None인 항목은 None으로 복원)
+RESULT_FRAMES = ('df_doc_full', 'df_doc_entry', 'doc_excluded', 'df_edc', 'edc_excluded',
+                 'df_dataset_long', 'merged', 'spec_duplicates')
+
+_digest_memo = {}   # (경로, 크기, mtime) → 해시 — 같은 파일을 실행마다 다시 읽지 않도록
+
+
+def file_digest(path) -> str:
+    """파일 내용 SHA-256 (경로/크기/mtime이 같으면 프로세스 내에서 재사용)"""
+    stat = os.stat(path)
+    memo = (os.path.abspath(path), stat.st_size, stat.st_mtime_ns)
+    if memo not in _digest_memo:
+        digest = hashlib.sha256()
+        with open(path, 'rb') as f:
+            for block in iter(lambda: f.read(HASH_CHUNK_SIZE), b''):
+                digest.update(block)
+        _digest_memo[memo] = digest.hexdigest()
+    return _digest_memo[memo]
+
+
+def engine_digest() -> str:
+    """ENGINE_SOURCES 내용 해시"""
+    folder = os.path.dirname(os.path.abspath(__file__))
+    digest = hashlib.sha256()
+    for name in ENGINE_SOURCES:
+        path = os.path.join(folder, name)
+        digest.update(name.encode('utf-8'))
+        digest.update(file_digest(path).encode('ascii') if os.path.exists(path) else b'-')
+    return digest.hexdigest()
+
+
+def cache_key(doc_path, doc_sheet, doc_header, edc_path, edc_sheet, edc_header,
+              dataset_path=None, ver_info=None, template_path=None, highlight_mode=None) -> str:
+    """
+    검증 입력 조합의 캐시 키 (run_validation과 같은 인자 — 소스는 파일 경로만 지원,
+    여러 시트/파일로 나뉜 DB Spec은 조각마다 해시).
+    template_path / highlight_mode가 None이면 엔진 기본값을 사용합니다.
+    """
+    import edc_engine as engine
+
+    template_path  = engine.TEMPLATE_PATH if template_path is None else template_path
+    highlight_mode = engine.REPORT_HIGHLIGHT_MODE if highlight_mode is None else highlight_mode
+    parts = {
+        'format'   : CACHE_FORMAT,
+        'spec'     : [[file_digest(source), sheet, int(header)] for source, sheet, header
+                      in engine.as_spec_parts(doc_path, doc_sheet, doc_header) or [(doc_path, doc_sheet, doc_header)]],
+        'export'   : [file_digest(edc_path), edc_sheet, int(edc_header)],
+        'dataset'  : file_digest(dataset_path) if dataset_path else None,
+        'ver_info' : ver_info or {},
+        'whitelist': list(engine.SYS_LAYOUT_WHITELIST),
+        'exclude'  : [list(rule) for rule in engine.INGEST_EXCLUDE_RULES],
+        'highlight': highlight_mode,
+        'template' : file_digest(template_path),
+        'engine'   : engine_digest(),
+    }
+    canonical = json.dumps(parts, ensure_ascii=False, sort_keys=True, default=str)
+    return hashlib.sha256(canonical.encode('utf-8')).hexdigest()
+
+
+def pack_frames(result: dict) -> bytes:
+    """result의 RESULT_FRAMES → zip bytes (프레임별 parquet + object 열 목록 — parquet는 object 열을 str로 읽음)"""
+    buffer = io.BytesIO()
+    object_cols = {}
+    with zipfile.ZipFile(buffer, 'w', zipfile.ZIP_STORED) as zf:
+        for name in RESULT_FRAMES:
+            df = result.get(name)
+            if df is None:
+                continue
+            part = io.BytesIO()
+            df.to_parquet(part)
+            zf.writestr(f"{name}.parquet", part.getvalue())
+            object_cols[name] = [str(c) for c, dtype in df.dtypes.items() if dtype == object]
+        zf.writestr('object_columns.json', json.dumps(object_cols))
+    return buffer.getvalue()
+
+
+def unpack_frames(data: bytes) -> dict:
+    """pack_frames 결과 → {프레임 이름: DataFrame 또는 None}"""
+    import pandas as pd
+
+    with zipfile.ZipFile(io.BytesIO(data)) as zf:
+        object_cols = json.loads(zf.read('object_columns.json'))
+        frames = {name: None for name in RESULT_FRAMES}
+        for name, cols in object_cols.items():
+            df = pd.read_parquet(io.BytesIO(zf.read(f"{name}.parquet")))
+            frames[name] = df.astype({c: object for c in cols}) if cols else df
+    return frames
+
+
+class ReportCache:
+    """
+    크기 제한이 있는 리포트 캐시 폴더.
+    get()/put()은 실패해도 예외를 내지 않으므로(캐시 미사용으로 처리) 검증 흐름에 영향을 주지 않습니다.
+    """
+
+    def __init__(self, root=REPORT_CACHE_DIR, max_bytes=REPORT_CACHE_MAX_MB * 1024 * 1024):
+        self.root      = root
+        self.max_bytes = max_bytes
+
+    @property
+    def enabled(self) -> bool:
+        return self.max_bytes > 0
+
+    def _paths(self, key):
+        """(리포트, 결과 DataFrame, 부가 정보) 경로 — 부가 정보를 마지막에 기록하므로 마지막 순서 유지"""
+        return tuple(os.path.join(self.root, f"{key}{ext}") for ext in CACHE_EXTENSIONS)
+
+    def get(self, key):
+        """
+        (리포트 bytes, 부가 정보 dict, 결과 DataFrame dict) 또는 캐시에 없으면 None.
+        결과 DataFrame dict는 RESULT_FRAMES 이름 → DataFrame(없던 항목은 None)입니다.
+        조회된 항목은 mtime을 갱신해 삭제 순서에서 뒤로 보냅니다.
+        """
+        if not self.enabled:
+            return None
+        report_path, frames_path, meta_path = self._paths(key)
+        try:
+            with open(meta_path, encoding='utf-8') as f:
+                meta = json.load(f)
+            with open(report_path, 'rb') as f:
+                report = f.read()
+            with open(frames_path, 'rb') as f:
+                frames = unpack_frames(f.read())
+            now = time.time()
+            for path in (report_path, frames_path, meta_path):
+                os.utime(path, (now, now))
+        except Exception:       # 없는 항목, 손상된 파일, parquet 엔진 없음 — 캐시 미사용으로 처리
+            return None
+        return report, meta, frames
+
+    def put(self, key, report: bytes, meta: dict = None, result: dict = None) -> bool:
+        """
+        리포트 + result(run_validation 결과)의 RESULT_FRAMES 저장 후 크기 한도까지 오래된 항목 삭제
+        (한도보다 큰 항목이나 DataFrame을 parquet로 저장할 수 없는 결과는 저장하지 않음)
+        """
+        if not self.enabled:
+            return False
+        try:
+            frames = pack_frames(result or {})
+        except Exception:
+            return False
+        if len(report) + len(frames) > self.max_bytes:
+            return False
+        report_path, frames_path, meta_path = self._paths(key)
+        try:
+            os.makedirs(self.root, exist_ok=True)
+            # 리포트/결과를 먼저 교체하고 부가 정보를 나중에 기록 — get()은 부가 정보가 있어야 적중으로 봄
+            for path, data in ((report_path, report), (frames_path, frames),
+                               (meta_path, json.dumps(dict(meta or {}, created_at=time.time()),
+                                                      ensure_ascii=False).encode('utf-8'))):
+                tmp_path = f"{path}.{uuid.uuid4().hex}.part"
+                with open(tmp_path, 'wb') as f:
+                    f.write(data)
+                os.replace(tmp_path, path)
+        except OSError:
+            return False
+        self.evict()
+        return True
+
+    def entries(self) -> list:
+        """[(마지막 조회 시각, 키, 크기 bytes)] — 오래된 순"""
+        sizes, used = {}, {}
+        try:
+            names = os.listdir(self.root)
+        except OSError:
+            return []
+        for name in names:
+            key, ext = os.path.splitext(name)
+            if ext not in CACHE_EXTENSIONS:
+                continue
+            try:
+                stat = os.stat(os.path.join(self.root, name))
+            except OSError:
+                continue
+            sizes[key] = sizes.get(key, 0) + stat.st_size
+            used[key]  = max(used.get(key, 0), stat.st_mtime)
+        return sorted((used[key], key, sizes[key]) for key in sizes)
+
+    def evict(self, max_bytes=None) -> int:
+        """전체 크기가 max_bytes(기본 self.max_bytes) 이하가 될 때까지 오래된 항목 삭제 → 삭제 건수"""
+        max_bytes = self.max_bytes if max_bytes is None else max_bytes
+        entries   = self.entries()
+        total     = sum(size for _, _, size in entries)
+        removed   = 0
+        for _, key, size in entries:
+            if total <= max_bytes:
+                break
+            for path in self._paths(key):
+                try:
+                    os.remove(path)
+                except OSError:
+                    pass
+            total   -= size
+            removed += 1
+        return removed
+
+    def clear(self) -> int:
+        return self.evict(0)
@@ -0,0 +1,360 @@
+"""
+검증 결과 리포트 비교 (이전 리포트 vs 현재 리포트)
+
+두 개의 'EDC Validation List_YYYYMMDD.xlsx' 파일에서 Entry Screen / Data Structure 시트를
+워크시트 XML 스트리밍으로 읽어, 행 키(Domain/Page/Visit/Item ID) 해시 인덱스로 정렬한 뒤
+확인 결과 변경, 추가/삭제된 항목, 값이 바뀐 셀을 Long format으로 반환합니다.
+
+메모리 사용:
+  1차) 이전 리포트 → 키별 (행 해시, 행 번호, 확인 결과)만 보관
+  2차) 현재 리포트 → 행 해시가 다른 행만 값 보관
+  3차) 이전 리포트 → 변경된 행 번호의 값만 다시 읽어 셀 단위 비교
+
+CLI:
+    python report_diff.py "EDC Validation List_20250101.xlsx" "EDC Validation List_20250201.xlsx" -o diff.xlsx
+"""
+import argparse
+import hashlib
+import io
+import re
+import zipfile
+import xml.etree.ElementTree as ET
+
+import pandas as pd
+
+from xlsx_stitch import MAIN_NS, sheet_parts
+
+ENTRY_SHEET = 'Entry Screen Validation'
+DS_SHEET    = 'Data Structure Validation'
+
+DIFF_KEY_COLS = ['DOMAIN', 'PAGE', 'VISIT', 'ITEM ID']
+DIFF_COLS     = ['SHEET', 'CHANGE'] + DIFF_KEY_COLS + ['RESULT_OLD', 'RESULT_NEW', 'COLUMN', 'OLD', 'NEW']
+
+CHANGE_ADDED   = '추가'
+CHANGE_REMOVED = '삭제'
+CHANGE_RESULT  = '결과 변경'
+CHANGE_VALUE   = '값 변경'
+
+# Data Structure 시트 고정 열 레이블 (save_data_structure_to_template 열 구성과 동일)
+DS_FIXED_LABELS = {
+    1: 'Domain (Spec)', 2: 'Item ID (Spec)', 3: 'Item Label (Spec)', 4: 'Type (Spec)',
+    5: 'Domain (Dataset)', 6: 'Item ID (Dataset)', 7: 'Type (Dataset)',
+    8: '확인 결과', 9: 'Comment', 10: 'SUBJID',
+}
+
+_T        = f"{{{MAIN_NS}}}t"
+_SI       = f"{{{MAIN_NS}}}si"
+
+
+# ============================================================
+# 1. 워크시트 XML 스트리밍 읽기
+# ============================================================
+
+_ROW_END   = re.compile(rb'</row>|<row\b[^>]*/>')
+_ROW_NO    = re.compile(r'<row\b[^>]*?\br="(\d+)"')
+# 일반적인 값 셀(<v> 또는 단일 <t> inlineStr)을 한 번에 꺼내는 빠른 경로
+_CELL_FAST = re.compile(r'<c r="([A-Z]+)\d+"([^>]*)>'
+                        r'(?:<v>([^<]*)</v>|<is><t(?:\s[^>]*)?>([^<]*)</t></is>)</c>')
+_CELL      = re.compile(r'<c\b([^>]*?)(?:/>|>(.*?)</c>)', re.S)
+_CELL_ATTR = re.compile(r'\b(r|t)="([^"]*)"')
+_TEXT      = re.compile(r'<t\b[^>]*?(?:/>|>(.*?)</t>)', re.S)
+_VALUE     = re.compile(r'<v>(.*?)</v>', re.S)
+_ENTITY    = re.compile(r'&(#x[0-9A-Fa-f]+|#\d+|amp|lt|gt|quot|apos);')
+_ENTITIES  = {'amp': '&', 'lt': '<', 'gt': '>', 'quot': '"', 'apos': "'"}
+
+# [유지보수 포인트] 한 번에 읽을 압축 해제 바이트 수
+READ_CHUNK = 1 << 20
+
+
+def _unescape(text: str) -> str:
+    if '&' not in text:
+        return text
+    def _sub(m):
+        name = m.group(1)
+        if name[0] == '#':
+            return chr(int(name[2:], 16) if name[1] == 'x' else int(name[1:]))
+        return _ENTITIES[name]
+    return _ENTITY.sub(_sub, text)
+
+
+_COLUMN_CACHE = {}
+
+
+def _column_index(ref: str) -> int:
+    letters = ref.rstrip('0123456789')
+    idx = _COLUMN_CACHE.get(letters)
+    if idx is None:
+        idx = 0
+        for ch in letters:
+            idx = idx * 26 + (ord(ch) - 64)
+        _COLUMN_CACHE[letters] = idx
+    return idx
+
+
+def shared_strings(zf: zipfile.ZipFile) -> list:
+    """공유 문자열 표 (openpyxl 저장본은 inlineStr만 쓰지만 Excel에서 다시 저장한 파일 대비)"""
+    if 'xl/sharedStrings.xml' not in zf.namelist():
+        return []
+    strings = []
+    for _, elem in ET.iterparse(zf.open('xl/sharedStrings.xml'), events=('end',)):
+        if elem.tag == _SI:
+            strings.append(''.join(t.text or '' for t in elem.iter(_T)))
+            elem.clear()
+    return strings
+
+
+def _iter_row_xml(stream):
+    """압축 해제 스트림을 READ_CHUNK 단위로 읽어 <row> ... </row> 조각을 하나씩 생성"""
+    buffer = b''
+    while True:
+        chunk = stream.read(READ_CHUNK)
+        if not chunk:
+            break
+        buffer += chunk
+        last = 0
+        for m in _ROW_END.finditer(buffer):
+            yield buffer[last:m.end()].decode('utf-8')
+            last = m.end()
+        buffer = buffer[last:]
+
+
+def _parse_row_fast(row_xml: str, shared: list):
+    """값 셀이 모두 빠른 경로 형식이면 {열: 값}, 아니면 None"""
+    cells = _CELL_FAST.findall(row_xml)
+    if len(cells) != row_xml.count('</c>'):
+        return None
+    # 엔티티 해제는 XML 원문(<v> / inlineStr <t>)에만 — 공유 문자열은 ElementTree가 이미 해제한 값
+    if '&' in row_xml:
+        cells = [(letters, attrs, _unescape(v), _unescape(text)) for letters, attrs, v, text in cells]
+    if shared and 't="s"' in row_xml:
+        cells = [(letters, attrs, shared[int(v)] if 't="s"' in attrs else v, text)
+                 for letters, attrs, v, text in cells]
+    cache = _COLUMN_CACHE
+    return {cache.get(letters) or _column_index(letters): text or v
+            for letters, _, v, text in cells if text or v}
+
+
+def _parse_row_general(row_xml: str, shared: list) -> dict:
+    """서식 있는 텍스트(여러 <t>), r 속성 생략 등 일반 형식"""
+    values = {}
+    position = 0
+    for cell in _CELL.finditer(row_xml):
+        attrs = dict(_CELL_ATTR.findall(cell.group(1)))
+        ref = attrs.get('r')
+        position = _column_index(ref) if ref else position + 1
+        body = cell.group(2)
+        if not body:
+            continue
+        kind = attrs.get('t')
+        if kind == 'inlineStr':
+            value = _unescape(''.join(t or '' for t in _TEXT.findall(body)))
+        else:
+            v = _VALUE.search(body)
+            if v is None:
+                continue
+            value = shared[int(v.group(1))] if kind == 's' else _unescape(v.group(1))
+        if value != '':
+            values[position] = value
+    return values
+
+
+def iter_sheet_rows(zf: zipfile.ZipFile, part: str, shared: list):
+    """
+    워크시트 XML을 행 단위로 읽어 (행 번호, {열 번호: 값 문자열}) 를 생성합니다.
+    값이 없는 셀(서식만 있는 셀)은 포함하지 않습니다.
+
+    ElementTree는 셀마다 요소 객체를 만들어 5만 행 리포트에서 느리므로,
+    행 조각 단위 정규식으로 필요한 값(r / t 속성, <v>, <t>)만 꺼냅니다.
+    """
+    row_no = 0
+    with zf.open(part) as stream:
+        for row_xml in _iter_row_xml(stream):
+            start = row_xml.find('<row')
+            if start < 0:
+                continue
+            m = _ROW_NO.match(row_xml, start)
+            row_no = int(m.group(1)) if m else row_no + 1
+            row_xml = row_xml[start:]
+            values = _parse_row_fast(row_xml, shared)
+            yield row_no, (values if values is not None else _parse_row_general(row_xml, shared))
+
+
+# ============================================================
+# 2. 시트 레이아웃 (헤더 행 → 키 열 / 결과 열 / 열 레이블)
+# ============================================================
+
+def _entry_layout(headers: dict) -> dict:
+    row5, row6 = headers.get(5, {}), headers.get(6, {})
+    labels, doc_keys, edc_keys = {}, {}, {}
+    result_col = None
+    for col in sorted(set(row5) | set(row6)):
+        name = str(row6.get(col, '')).strip().upper()
+        if col >= 31 and ('확인 결과' in row5.get(col, '') or '확인 결과' in row6.get(col, '')):
+            result_col = result_col or col
+            labels[col] = '확인 결과'
+        elif col <= 15 and name:
+            labels[col] = f"{name} (Spec)"
+            doc_keys[name] = col
+        elif col <= 30 and name:
+            labels[col] = f"{name} (Export)"
+            edc_keys[name] = col
+        elif name:
+            labels[col] = row6[col].strip()
+    keys = [(doc_keys.get(k), edc_keys.get(k)) for k in DIFF_KEY_COLS]
+    return {'labels': labels, 'keys': keys, 'result_col': result_col or 31}
+
+
+def _ds_layout(headers: dict) -> dict:
+    row3 = headers.get(3, {})
+    labels = dict(DS_FIXED_LABELS)
+    for col, text in row3.items():
+        if col > max(DS_FIXED_LABELS):
+            labels[col] = text.strip()
+    # (DOMAIN, PAGE, VISIT, ITEM ID) 중 Data Structure 시트에 있는 키는 DOMAIN / ITEM ID
+    return {'labels': labels, 'keys': [(1, 5), (None, None), (None, None), (2, 6)], 'result_col': 8}
+
+
+SHEET_LAYOUTS = {
+    ENTRY_SHEET: {'header_rows': (5, 6), 'data_start': 7, 'layout': _entry_layout},
+    DS_SHEET   : {'header_rows': (3, 4), 'data_start': 5, 'layout': _ds_layout},
+}
+
+
+def _row_key(values: dict, keys: list) -> tuple:
+    """키 열 값 (좌측 Spec 값 우선, 없으면 우측 값) — 공백 제거, 대문자"""
+    out = []
+    for left, right in keys:
+        value = values.get(left, '') if left else ''
+        if not value and right:
+            value = values.get(right, '')
+        out.append(''.join(value.split()).upper())
+    return tuple(out)
+
+
+def _row_digest(values: dict) -> bytes:
+    return hashlib.blake2b(repr(sorted(values.items())).encode('utf-8'), digest_size=16).digest()
+
+
+def _iter_data_rows(zf, part, shared, spec):
+    """(행 번호, 레이아웃, 키, 값) 생성 — 헤더 행으로 레이아웃을 먼저 만들고, 키가 빈 행은 건너뜀"""
+    headers, layout, seen = {}, None, {}
+    for row_no, values in iter_sheet_rows(zf, part, shared):
+        if row_no in spec['header_rows']:
+            headers[row_no] = values
+            continue
+        if row_no < spec['data_start']:
+            continue
+        if layout is None:
+            layout = spec['layout'](headers)
+        key = _row_key(values, layout['keys'])
+        if not any(key):
+            continue
+        # 같은 키가 반복되면(Data Structure 시트의 Domain+Item ID 등) 순번으로 구분
+        seen[key] = seen.get(key, 0) + 1
+        yield row_no, layout, key + (seen[key],), values
+
+
+# ============================================================
+# 3. 비교
+# ============================================================
+
+def diff_sheet(old_zf, new_zf, sheet_name, old_shared, new_shared) -> list:
+    """한 시트의 변경 내역 (DIFF_COLS 순서의 tuple 목록)"""
+    spec = SHEET_LAYOUTS[sheet_name]
+    old_part, new_part = sheet_parts(old_zf).get(sheet_name), sheet_parts(new_zf).get(sheet_name)
+    if old_part is None or new_part is None:
+        return []
+
+    # 1차: 이전 리포트 인덱스
+    index = {}
+    for row_no, layout, key, values in _iter_data_rows(old_zf, old_part, old_shared, spec):
+        index[key] = (_row_digest(values), row_no, values.get(layout['result_col'], ''))
+
+    # 2차: 현재 리포트를 읽으며 해시 비교
+    records, changed, labels = [], {}, {}
+    for row_no, layout, key, values in _iter_data_rows(new_zf, new_part, new_shared, spec):
+        labels = layout['labels']
+        result_new = values.get(layout['result_col'], '')
+        hit = index.pop(key, None)
+        if hit is None:
+            records.append((sheet_name, CHANGE_ADDED) + key[:4] + ('', result_new, '', '', ''))
+        elif hit[0] != _row_digest(values):
+            changed[hit[1]] = (key, values, result_new)
+
+    for key, (_, _, result_old) in index.items():
+        records.append((sheet_name, CHANGE_REMOVED) + key[:4] + (result_old, '', '', '', ''))
+
+    # 3차: 변경된 행만 이전 값을 다시 읽어 셀 단위 비교
+    if changed:
+        for row_no, layout, _, old_values in _iter_data_rows(old_zf, old_part, old_shared, spec):
+            if row_no not in changed:
+                continue
+            key, new_values, result_new = changed.pop(row_no)
+            result_col = layout['result_col']
+            result_old = old_values.get(result_col, '')
+            if result_old != result_new:
+                records.append((sheet_name, CHANGE_RESULT) + key[:4]
+                               + (result_old, result_new, labels.get(result_col, '확인 결과'),
+                                  result_old, result_new))
+            for col in sorted((set(old_values) | set(new_values)) - {result_col}):
+                old, new = old_values.get(col, ''), new_values.get(col, '')
+                if old != new:
+                    records.append((sheet_name, CHANGE_VALUE) + key[:4]
+                                   + (result_old, result_new, labels.get(col, f"열 {col}"), old, new))
+            if not changed:
+                break
+    return records
+
+
+def diff_reports(old_source, new_source, sheets=(ENTRY_SHEET, DS_SHEET)) -> pd.DataFrame:
+    """
+    두 결과 리포트를 비교합니다.
+    old_source / new_source: 파일 경로 또는 bytes / file-like
+
+    Returns:
+        DataFrame[DIFF_COLS] — CHANGE: 추가 / 삭제 / 결과 변경 / 값 변경
+    """
+    def _open(source):
+        return zipfile.ZipFile(io.BytesIO(source) if isinstance(source, bytes) else source)
+
+    with _open(old_source) as old_zf, _open(new_source) as new_zf:
+        old_shared, new_shared = shared_strings(old_zf), shared_strings(new_zf)
+        records = []
+        for sheet_name in sheets:
+            records.extend(diff_sheet(old_zf, new_zf, sheet_name, old_shared, new_shared))
+    return pd.DataFrame.from_records(records, columns=DIFF_COLS)
+
+
+def summarize_diff(df_diff: pd.DataFrame) -> pd.DataFrame:
+    """시트 × 변경 유형별 건수 (결과/값 변경은 항목(행) 기준)"""
+    if df_diff.empty:
+        return pd.DataFrame(columns=['SHEET', 'CHANGE', 'ITEMS'])
+    return (df_diff.drop_duplicates(subset=['SHEET', 'CHANGE'] + DIFF_KEY_COLS)
+            .groupby(['SHEET', 'CHANGE'], sort=False).size().rename('ITEMS').reset_index())
+
+
+def save_diff(df_diff: pd.DataFrame, path_or_buffer):
+    """비교 결과를 요약 / 상세 두 시트의 엑셀로 저장"""
+    with pd.ExcelWriter(path_or_buffer, engine='openpyxl') as writer:
+        summarize_diff(df_diff).to_excel(writer, sheet_name='Summary', index=False)
+        df_diff.to_excel(writer, sheet_name='Changes', index=False)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="EDC Validation 결과 리포트 비교")
+    parser.add_argument("old", help="이전 리포트 (.xlsx)")
+    parser.add_argument("new", help="현재 리포트 (.xlsx)")
+    parser.add_argument("-o", "--output", help="비교 결과 저장 경로 (.xlsx 또는 .csv)")
+    args = parser.parse_args(argv)
+
+    df_diff = diff_reports(args.old, args.new)
+    print(summarize_diff(df_diff).to_string(index=False) if not df_diff.empty else "변경 사항 없음")
+    if args.output:
+        if args.output.lower().endswith('.csv'):
+            df_diff.to_csv(args.output, index=False, encoding='utf-8-sig')
+        else:
+            save_diff(df_diff, args.output)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,378 @@
+"""
+검증 실행 지표 (구조화 실행 로그 + Prometheus 텍스트 지표)
+
+매 검증 실행마다 입력 크기, 단계별 행 수, Entry Screen 비교 결과 건수(일치/불일치/한쪽에만 존재),
+Data Structure 데이터 없음 건수, 단계별 소요 시간, 실행 중 최대 메모리(run_peak_rss)를 한 건의 레코드로 모아
+JSON Lines 로그(METRICS_LOG_PATH)에 한 줄씩 남기고, 같은 값을 프로세스 내 누적 지표로 집계해
+Prometheus 텍스트 형식(render_prometheus)으로 제공합니다.
+
+사용 예:
+    metrics = RunMetrics('api', inputs={'spec': spec_path, 'export': export_path})
+    with metrics.stage('read_spec'):
+        ...
+    metrics.count(spec_rows=len(df))
+    metrics.finish('ok')            # 또는 with RunMetrics(...) as metrics: — 블록 종료 시 자동 마무리
+
+지표 노출:
+    - validation_api.py   : GET /metrics
+    - serve.py (Streamlit): EDC_METRICS_PORT 지정 시 별도 포트의 /metrics (start_metrics_server)
+
+메모리 지표:
+    - run_peak_rss     : 실행 시작~finish() 사이 RSS_SAMPLE_INTERVAL_S 간격으로 표본 추출한 최대 RSS
+                         ('self' = 현재 프로세스, 'total' = 현재 프로세스 + 실행 중인 병렬 처리 worker).
+                         /proc 이 없는 환경(Windows, macOS)에서는 빈 dict. 같은 프로세스에서 다른 실행이
+                         동시에 돌고 있으면(API 작업 스레드 등) 그 메모리도 함께 잡힙니다.
+    - process_peak_rss : resource.getrusage 의 ru_maxrss — 프로세스 시작 이후 최대값이라 실행 단위로
+                         비교할 수 없습니다 (상주 서버가 한 번 큰 파일을 처리하면 이후 모든 실행에 같은 값).
+
+표준 라이브러리만 사용하므로 화면 첫 로드 시 import 해도 부담이 없습니다.
+"""
+import json
+import os
+import sys
+import threading
+import time
+import uuid
+from contextlib import contextmanager
+from datetime import datetime, timezone
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+try:
+    import resource
+except ImportError:     # Windows
+    resource = None
+
+# ============================================================
+# [유지보수 포인트] 지표 설정 (환경변수로 덮어쓰기 가능)
+# ============================================================
+METRICS_LOG_PATH = os.environ.get("EDC_METRICS_LOG", "validation_runs.jsonl")   # 빈 값이면 로그 기록 안 함
+
+# 전체 실행 시간 히스토그램 구간(초)
+DURATION_BUCKETS = (1, 2, 5, 10, 30, 60, 120, 300, 600)
+
+METRICS_CONTENT_TYPE = "text/plain; version=0.0.4; charset=utf-8"
+
+STATUS_OK      = 'ok'
+STATUS_INVALID = 'invalid'    # 입력 오류 (ValidationInputError 등)
+STATUS_FAILED  = 'failed'
+STATUS_CANCELLED = 'cancelled'  # 사용자 중지 (ValidationCancelled, 화면 재실행으로 인한 중단 등)
+
+# 실행 중 RSS 표본 추출 간격(초) — 0이면 표본 추출 안 함
+RSS_SAMPLE_INTERVAL_S = float(os.environ.get("EDC_RSS_SAMPLE_INTERVAL", "0.2"))
+
+try:
+    _PAGE_SIZE = os.sysconf('SC_PAGE_SIZE')
+except (AttributeError, ValueError, OSError):
+    _PAGE_SIZE = 4096
+
+
+def current_rss_bytes(pid='self'):
+    """프로세스의 현재 RSS (bytes) — /proc/<pid>/statm 기준, 읽을 수 없으면 None"""
+    try:
+        with open(f'/proc/{pid}/statm', 'rb') as f:
+            return int(f.read().split()[1]) * _PAGE_SIZE
+    except (OSError, ValueError, IndexError):
+        return None
+
+
+def _worker_pids():
+    """현재 실행 중인 자식 프로세스(병렬 처리 worker) pid"""
+    import multiprocessing
+    try:
+        return [p.pid for p in multiprocessing.active_children()]
+    except RuntimeError:    # 다른 스레드가 worker를 만드는 중 — 다음 표본에서 다시 읽음
+        return []
+
+
+class RSSSampler:
+    """
+    백그라운드 스레드에서 interval 초마다 현재 RSS를 읽어 최대값을 보관합니다.
+    stop()이 {'self', 'total'} 최대 RSS(bytes)를 반환 — /proc 이 없으면 시작하지 않고 빈 dict.
+    """
+
+    def __init__(self, interval=RSS_SAMPLE_INTERVAL_S):
+        self.interval = interval
+        self.peak     = {}
+        self._stop    = threading.Event()
+        self._thread  = None
+
+    def start(self):
+        if self.interval > 0 and current_rss_bytes() is not None:
+            self.sample()
+            self._thread = threading.Thread(target=self._run, name="edc-rss-sampler", daemon=True)
+            self._thread.start()
+        return self
+
+    def sample(self):
+        own = current_rss_bytes()
+        if own is None:
+            return
+        children = sum(current_rss_bytes(pid) or 0 for pid in _worker_pids())
+        self.peak = {'self' : max(self.peak.get('self', 0), own),
+                     'total': max(self.peak.get('total', 0), own + children)}
+
+    def _run(self):
+        while not self._stop.wait(self.interval):
+            self.sample()
+
+    def stop(self) -> dict:
+        if self._thread is not None:
+            self._stop.set()
+            self._thread.join()
+            self._thread = None
+            self.sample()
+        return dict(self.peak)
+
+
+def process_peak_rss_bytes() -> dict:
+    """
+    현재 프로세스 / 종료된 자식 프로세스(병렬 처리 worker)의 최대 RSS (bytes)
+    (프로세스 시작 이후 최대값 — 실행 단위 값이 아님, resource 모듈이 없는 환경에서는 빈 dict)
+    """
+    if resource is None:
+        return {}
+    scale = 1 if sys.platform == 'darwin' else 1024     # macOS는 bytes, Linux는 KB
+    return {'self'    : resource.getrusage(resource.RUSAGE_SELF).ru_maxrss * scale,
+            'children': resource.getrusage(resource.RUSAGE_CHILDREN).ru_maxrss * scale}
+
+
+def input_size(source):
+    """입력 크기(bytes): 파일 경로(목록), bytes, .size 속성이 있는 업로드 객체 — 알 수 없으면 None"""
+    if source is None:
+        return None
+    if isinstance(source, (str, os.PathLike)):
+        try:
+            return os.path.getsize(source)
+        except OSError:
+            return None
+    if isinstance(source, (bytes, bytearray, memoryview)):
+        return len(source)
+    if isinstance(source, list):     # 여러 파일/시트로 나뉜 DB Spec (engine.SpecPart 목록) — 파일별 한 번씩 합산
+        sizes = [input_size(s) for s in {getattr(item, 'source', item) for item in source}
+                 if isinstance(s, (str, os.PathLike))]
+        return sum(sizes) if sizes and None not in sizes else None
+    size = getattr(source, 'size', None)
+    return size if isinstance(size, int) else None
+
+
+# ============================================================
+# 1. 실행 단위 레코드
+# ============================================================
+
+class RunMetrics:
+    """
+    검증 1회 실행의 지표 레코드.
+    stage()로 단계별 소요 시간을, count()로 행 수 등 건수를 모은 뒤 finish()에서
+    JSON 로그 기록 + 누적 지표 반영을 한 번만 수행합니다.
+    """
+
+    def __init__(self, source: str, inputs: dict = None):
+        self.run_id  = uuid.uuid4().hex
+        self.source  = source
+        self.started = time.time()
+        self._t0     = time.perf_counter()
+        self.inputs  = {name: input_size(src) for name, src in (inputs or {}).items()}
+        self.stages  = {}
+        self.counts  = {}
+        self.record  = None
+        self._rss    = RSSSampler().start()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        """
+        with 블록을 벗어날 때까지 finish()가 없었으면 예외 여부로 상태를 정해 마무리
+        (Exception이 아닌 BaseException — Streamlit 재실행 중단, KeyboardInterrupt 등 — 은 중지로 기록)
+        """
+        if self.record is None:
+            if exc_type is None:
+                self.finish(STATUS_OK)
+            elif issubclass(exc_type, Exception):
+                self.finish(STATUS_FAILED, f"{exc_type.__name__}: {exc}")
+            else:
+                self.finish(STATUS_CANCELLED, exc_type.__name__)
+        return False
+
+    @contextmanager
+    def stage(self, name: str):
+        """단계 소요 시간 측정 (같은 이름이 여러 번이면 합산)"""
+        t0 = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.stages[name] = self.stages.get(name, 0.0) + (time.perf_counter() - t0)
+
+    def count(self, **counts):
+        for name, value in counts.items():
+            if value is not None:
+                self.counts[name] = int(value)
+
+    def finish(self, status: str = STATUS_OK, error: str = None, log_path: str = None) -> dict:
+        """레코드를 확정해 JSON 로그에 남기고 누적 지표에 반영 (두 번째 호출부터는 무시)"""
+        if self.record is not None:
+            return self.record
+        self.record = {
+            'run_id'          : self.run_id,
+            'ts'              : datetime.fromtimestamp(self.started, timezone.utc).strftime('%Y-%m-%dT%H:%M:%S.%fZ'),
+            'source'          : self.source,
+            'status'          : status,
+            'error'           : error,
+            'duration_s'      : round(time.perf_counter() - self._t0, 4),
+            'inputs'          : self.inputs,
+            'counts'          : self.counts,
+            'stages_s'        : {k: round(v, 4) for k, v in self.stages.items()},
+            'run_peak_rss'    : self._rss.stop(),
+            'process_peak_rss': process_peak_rss_bytes(),
+        }
+        REGISTRY.observe(self.record)
+        write_log(self.record, METRICS_LOG_PATH if log_path is None else log_path)
+        return self.record
+
+
+_log_lock = threading.Lock()
+
+
+def write_log(record: dict, path: str):
+    """JSON Lines 로그에 한 줄 추가 (기록 실패는 검증 결과에 영향을 주지 않도록 경고만 출력)"""
+    if not path:
+        return
+    line = json.dumps(record, ensure_ascii=False) + "\n"
+    try:
+        with _log_lock, open(path, 'a', encoding='utf-8') as f:
+            f.write(line)
+    except OSError as e:
+        print(f"[metrics] 실행 로그 기록 실패: {e}", file=sys.stderr, flush=True)
+
+
+# ============================================================
+# 2. 누적 지표 (프로세스 단위) + Prometheus 텍스트 형식
+# ============================================================
+
+def _labels(**labels) -> str:
+    if not labels:
+        return ''
+    body = ",".join('{}="{}"'.format(k, str(v).replace('\\', '\\\\').replace('"', '\\"'))
+                    for k, v in labels.items())
+    return "{" + body + "}"
+
+
+class MetricsRegistry:
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.runs          = {}     # (source, status) → 실행 수
+        self.duration_hist = {}     # source → [구간별 누적 수..., +Inf, 합계]
+        self.stage_sum     = {}     # stage → 소요 시간 합계
+        self.stage_count   = {}
+        self.count_sum     = {}     # count 이름 → 누적 합계
+        self.input_sum     = {}     # 입력 이름 → 누적 bytes
+        self.last          = None   # 마지막 실행 레코드
+
+    def observe(self, record: dict):
+        with self._lock:
+            key = (record['source'], record['status'])
+            self.runs[key] = self.runs.get(key, 0) + 1
+
+            hist = self.duration_hist.setdefault(record['source'], [0] * (len(DURATION_BUCKETS) + 1) + [0.0])
+            for i, bound in enumerate(DURATION_BUCKETS):
+                if record['duration_s'] <= bound:
+                    hist[i] += 1
+            hist[len(DURATION_BUCKETS)] += 1
+            hist[-1] += record['duration_s']
+
+            for name, seconds in record['stages_s'].items():
+                self.stage_sum[name]   = self.stage_sum.get(name, 0.0) + seconds
+                self.stage_count[name] = self.stage_count.get(name, 0) + 1
+            for name, value in record['counts'].items():
+                self.count_sum[name] = self.count_sum.get(name, 0) + value
+            for name, size in record['inputs'].items():
+                if size is not None:
+                    self.input_sum[name] = self.input_sum.get(name, 0) + size
+            self.last = record
+
+    def render(self) -> str:
+        """Prometheus 텍스트 노출 형식 (version 0.0.4)"""
+        out = []
+
+        def metric(name, kind, help_text, samples):
+            out.append(f"# HELP {name} {help_text}")
+            out.append(f"# TYPE {name} {kind}")
+            for suffix, labels, value in samples:
+                out.append(f"{name}{suffix}{_labels(**labels)} {value:g}" if isinstance(value, float)
+                           else f"{name}{suffix}{_labels(**labels)} {value}")
+
+        with self._lock:
+            metric("edc_validation_runs_total", "counter", "검증 실행 수",
+                   [('', {'source': s, 'status': st}, n) for (s, st), n in sorted(self.runs.items())])
+
+            samples = []
+            for source, hist in sorted(self.duration_hist.items()):
+                for bound, n in zip(DURATION_BUCKETS, hist):
+                    samples.append(('_bucket', {'source': source, 'le': bound}, n))
+                samples.append(('_bucket', {'source': source, 'le': '+Inf'}, hist[len(DURATION_BUCKETS)]))
+                samples.append(('_sum',   {'source': source}, float(hist[-1])))
+                samples.append(('_count', {'source': source}, hist[len(DURATION_BUCKETS)]))
+            metric("edc_validation_duration_seconds", "histogram", "검증 1회 전체 소요 시간(초)", samples)
+
+            metric("edc_validation_stage_seconds", "summary", "단계별 소요 시간(초)",
+                   [s for name in sorted(self.stage_sum)
+                    for s in (('_sum',   {'stage': name}, float(self.stage_sum[name])),
+                              ('_count', {'stage': name}, self.stage_count[name]))])
+            metric("edc_validation_rows_total", "counter", "단계별 누적 행/건수",
+                   [('', {'kind': name}, n) for name, n in sorted(self.count_sum.items())])
+            metric("edc_validation_input_bytes_total", "counter", "누적 입력 파일 크기(bytes)",
+                   [('', {'input': name}, n) for name, n in sorted(self.input_sum.items())])
+
+            last = self.last
+            if last is not None:
+                metric("edc_validation_last_duration_seconds", "gauge", "마지막 검증 소요 시간(초)",
+                       [('', {'source': last['source'], 'status': last['status']}, float(last['duration_s']))])
+                metric("edc_validation_last_rows", "gauge", "마지막 검증의 단계별 행/건수",
+                       [('', {'kind': name}, n) for name, n in sorted(last['counts'].items())])
+                metric("edc_validation_last_stage_seconds", "gauge", "마지막 검증의 단계별 소요 시간(초)",
+                       [('', {'stage': name}, float(v)) for name, v in sorted(last['stages_s'].items())])
+                if last['run_peak_rss']:
+                    metric("edc_validation_last_peak_rss_bytes", "gauge",
+                           "마지막 검증 실행 중 최대 RSS(bytes, 표본 추출)",
+                           [('', {'process': name}, n) for name, n in sorted(last['run_peak_rss'].items())])
+
+        rss = process_peak_rss_bytes()
+        if rss:
+            metric("edc_process_peak_rss_bytes", "gauge", "프로세스 시작 이후 최대 RSS(bytes, ru_maxrss)",
+                   [('', {'process': name}, n) for name, n in sorted(rss.items())])
+        return "\n".join(out) + "\n"
+
+
+REGISTRY = MetricsRegistry()
+
+
+def render_prometheus() -> str:
+    return REGISTRY.render()
+
+
+# ============================================================
+# 3. 지표 전용 HTTP 서버 (Streamlit 프로세스용)
+# ============================================================
+
+class _MetricsHandler(BaseHTTPRequestHandler):
+    def do_GET(self):
+        if self.path.split('?')[0] != '/metrics':
+            self.send_error(404)
+            return
+        body = render_prometheus().encode('utf-8')
+        self.send_response(200)
+        self.send_header('Content-Type', METRICS_CONTENT_TYPE)
+        self.send_header('Content-Length', str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, fmt, *args):
+        pass
+
+
+def start_metrics_server(host: str = "127.0.0.1", port: int = 9600) -> ThreadingHTTPServer:
+    """백그라운드 스레드에서 GET /metrics 서버 실행 (같은 프로세스의 REGISTRY 노출)"""
+    server = ThreadingHTTPServer((host, port), _MetricsHandler)
+    server.daemon_threads = True
+    threading.Thread(target=server.serve_forever, name="edc-metrics", daemon=True).start()
+    return server
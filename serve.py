@@ -0,0 +1,51 @@
+"""
+EDC Validation 서버 실행기
+
+사용법:
+    python serve.py [--warmup] [--metrics-port 9600] [streamlit run 옵션 ...]
+
+--warmup(또는 환경변수 EDC_WARMUP=1)을 주면 Streamlit 서버를 띄우기 전에
+같은 프로세스에서 정적 자원/검증 엔진/템플릿 캐시를 미리 채웁니다.
+배포 직후 첫 사용자가 pandas·openpyxl import 및 템플릿 파싱 비용을 치르지 않게 됩니다.
+
+--metrics-port(또는 환경변수 EDC_METRICS_PORT)를 주면 같은 프로세스에서
+화면 검증 실행 지표를 http://127.0.0.1:<port>/metrics 로 노출합니다. (run_metrics)
+"""
+import os
+import sys
+
+APP_SCRIPT = "bm_app.py"
+
+
+def main(argv=None):
+    argv   = list(sys.argv[1:] if argv is None else argv)
+    warmup = os.environ.get("EDC_WARMUP", "").lower() in ("1", "true", "yes")
+    if "--warmup" in argv:
+        argv.remove("--warmup")
+        warmup = True
+    metrics_port = os.environ.get("EDC_METRICS_PORT", "")
+    if "--metrics-port" in argv:
+        i = argv.index("--metrics-port")
+        metrics_port = argv[i + 1]
+        del argv[i:i + 2]
+
+    # 상대 경로 자원(템플릿, 이미지)을 찾을 수 있도록 앱 폴더에서 실행
+    os.chdir(os.path.dirname(os.path.abspath(__file__)))
+
+    if warmup:
+        import app_assets
+        timings = app_assets.warm_up()
+        print("[warmup] " + ", ".join(f"{k} {v:.2f}s" for k, v in timings.items()), flush=True)
+
+    if metrics_port:
+        import run_metrics
+        run_metrics.start_metrics_server(port=int(metrics_port))
+        print(f"[metrics] http://127.0.0.1:{metrics_port}/metrics", flush=True)
+
+    from streamlit.web import cli as stcli
+    sys.argv = ["streamlit", "run", APP_SCRIPT] + argv
+    return stcli.main()
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,77 @@
+"""
+pytest 공통 설정 — 저장소 루트의 평면 모듈(edc_engine 등)을 import 할 수 있도록 경로를 추가하고,
+템플릿 등 상대 경로 자원을 쓰는 테스트를 위해 작업 폴더를 저장소 루트로 고정합니다.
+"""
+import os
+import sys
+
+import pytest
+
+REPO_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+if REPO_ROOT not in sys.path:
+    sys.path.insert(0, REPO_ROOT)
+
+
+@pytest.fixture(autouse=True)
+def _repo_cwd(monkeypatch):
+    monkeypatch.chdir(REPO_ROOT)
+
+
+DOMAINS = ['DM', 'AE', 'LB', 'VS', 'CM', 'MH']
+
+
+def spec_rows(n):
+    """표준 DB Spec 행 n개 (+ SYS_ 레이아웃 행 일부 — 제외 규칙 대상)"""
+    rows = []
+    for i in range(n):
+        d = DOMAINS[i % len(DOMAINS)]
+        rows.append({'DOMAIN': d, 'DOMAIN LABEL': f'{d} label', 'PAGE': f'{d}_P', 'PAGE LABEL': f'Page {d}',
+                     'VISIT': f'V{i % 5}', 'ITEM ID': f'{d}ITEM{i}', 'ITEM LABEL': f'Label {i}',
+                     'ITEM SEQ': str(i), 'VERSION': '1', 'CODE': '1=Yes;2=No' if i % 7 == 0 else '',
+                     'LAYOUT': 'SYS_HDR' if i % 11 == 0 else 'STD',
+                     'TYPE': 'integer' if i % 3 == 0 else 'text',
+                     'MAX_LEN': '10', 'MIN_VAL': '0', 'MAX_VAL': '100'})
+    return rows
+
+
+def write_study(folder, n=120):
+    """
+    DB Spec('Spec' 시트, 제목 행 다음 헤더 — header=1) / EDC Export(header=0) / CDMS Dataset 파일 생성.
+    Export는 값 변경·누락·추가 행과 다른 컬럼명(VARIABLE, FORM)을 포함합니다.
+    """
+    import pandas as pd
+
+    rows = spec_rows(n)
+    spec = pd.DataFrame(rows)
+    export = spec.copy()
+    export.loc[3, 'ITEM LABEL'] = 'changed'
+    export.loc[7, 'CODE'] = '2=No; 1=Yes'
+    export.loc[14, 'CODE'] = '1=Yes;2=Nope;3=Maybe'
+    export.loc[9, 'MAX_VAL'] = '100.00'
+    export = export.drop(index=[5, 6])
+    export = pd.concat([export, pd.DataFrame([dict(rows[1], **{'ITEM ID': 'EXTRA1'}),
+                                              dict(rows[2], **{'ITEM ID': 'EXTRA2', 'LAYOUT': 'SYS_X'})])],
+                       ignore_index=True)
+    export = export.rename(columns={'ITEM ID': 'VARIABLE', 'PAGE': 'FORM'})
+
+    paths = {name: os.path.join(folder, f'{name}.xlsx') for name in ('spec', 'export', 'dataset')}
+    with pd.ExcelWriter(paths['spec']) as w:
+        pd.DataFrame([['title']]).to_excel(w, sheet_name='Spec', index=False, header=False)
+        spec.to_excel(w, sheet_name='Spec', index=False, startrow=1)
+    export.to_excel(paths['export'], index=False, sheet_name='Export')
+    with pd.ExcelWriter(paths['dataset']) as w:
+        pd.DataFrame({'SUBJID:Subject': ['S1']}).to_excel(w, sheet_name='SUBJECT_INFO', index=False)
+        for d in DOMAINS:
+            items = [r['ITEM ID'] for r in rows if r['DOMAIN'] == d][:-2]
+            data  = {'SUBJID:Subject': [f'S{k}' for k in range(20)]}
+            for j, item in enumerate(items):
+                data[f'{item}:lab'] = ([None] * 20 if j % 4 == 0 else
+                                       [str(k * 3) if k % 2 else None for k in range(20)] if j % 4 == 1 else
+                                       [k * 1.5 for k in range(20)])
+            pd.DataFrame(data).to_excel(w, sheet_name=d, index=False)
+    return paths
+
+
+@pytest.fixture(scope='session')
+def study_files(tmp_path_factory):
+    return write_study(str(tmp_path_factory.mktemp('study')))
@@ -0,0 +1,82 @@
+import io
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+import pytest
+from openpyxl import Workbook
+
+import edc_engine as engine
+from worker_pool import iter_completed, wait_result
+
+
+def test_wait_result_stops_on_cancel():
+    cancel  = engine.CancelToken()
+    release = threading.Event()
+    with ThreadPoolExecutor(1) as pool:
+        future = pool.submit(release.wait, 10)
+        threading.Timer(0.1, cancel.cancel).start()
+        t0 = time.perf_counter()
+        with pytest.raises(engine.ValidationCancelled):
+            wait_result(future, cancel, poll_s=0.05)
+        assert time.perf_counter() - t0 < 2
+        release.set()
+
+
+def test_iter_completed_returns_all_futures():
+    with ThreadPoolExecutor(2) as pool:
+        futures = [pool.submit(lambda v: v, i) for i in range(5)]
+        assert sorted(f.result() for f in iter_completed(futures, engine.CancelToken())) == list(range(5))
+
+
+def test_save_workbook_cancel(monkeypatch):
+    wb = Workbook()
+    for i in range(1, 30):
+        wb.active.append([i, f'row {i}'])
+
+    plain, cancellable = io.BytesIO(), io.BytesIO()
+    wb.save(plain)
+    engine.save_workbook(wb, cancellable, engine.CancelToken())
+    assert len(cancellable.getvalue()) == pytest.approx(len(plain.getvalue()), abs=16)
+
+    # 시트 XML을 쓰는 중간(PROGRESS_CHUNK_ROWS 행 경계)에 중지
+    monkeypatch.setattr(engine, 'PROGRESS_CHUNK_ROWS', 10)
+    cancel = engine.CancelToken()
+    write_row = engine._CancellableWorksheetWriter.write_row
+
+    def cancel_at_row_15(self, xf, row, row_idx):
+        if row_idx == 15:
+            cancel.cancel()
+        write_row(self, xf, row, row_idx)
+
+    monkeypatch.setattr(engine._CancellableWorksheetWriter, 'write_row', cancel_at_row_15)
+    with pytest.raises(engine.ValidationCancelled):
+        engine.save_workbook(wb, io.BytesIO(), cancel)
+
+
+def test_iter_validation_closes_only_excel_files_it_opened(study_files, monkeypatch):
+    opened = []
+    open_excel = engine.open_excel
+
+    def recording_open_excel(path):
+        opened.append(open_excel(path))
+        return opened[-1]
+
+    monkeypatch.setattr(engine, 'open_excel', recording_open_excel)
+
+    # 경로 입력 — 끝까지 실행하면 직접 연 파일을 모두 닫음
+    engine.run_validation(study_files['spec'], 'Spec', 1, study_files['export'], 'Export', 0)
+    assert len(opened) == 2 and all(f.mapped.closed for f in opened)
+
+    # 중간 중지 + 호출 측이 넘긴 ExcelFile — 직접 연 DB Spec만 닫고 넘겨받은 Export는 그대로 둠
+    opened.clear()
+    cancel = engine.CancelToken()
+    with open_excel(study_files['export']) as edc_excel:
+        steps = engine.iter_validation(study_files['spec'], 'Spec', 1, edc_excel, 'Export', 0, cancel=cancel)
+        next(steps)
+        cancel.cancel()
+        with pytest.raises(engine.ValidationCancelled):
+            for _ in steps:
+                pass
+        assert len(opened) == 1 and opened[0].mapped.closed
+        assert not edc_excel.mapped.closed
@@ -0,0 +1,116 @@
+import pandas as pd
+import pytest
+
+import edc_engine as engine
+
+
+def _inputs(study_files):
+    df_doc = engine.process_data_final(study_files['spec'], 'Spec', 1)
+    df_doc, _ = engine.INGEST_ROW_FILTER.split(df_doc)
+    df_edc, _ = engine.read_standardized(study_files['export'], 'Export', 0, row_filter=engine.INGEST_ROW_FILTER)
+    return df_doc, df_edc
+
+
+def test_sharded_compare_matches_serial(study_files):
+    df_doc, df_edc = _inputs(study_files)
+    # Export에만 있는 DOMAIN (어느 DB Spec shard에도 속하지 않는 행)
+    df_edc = pd.concat([df_edc, df_edc.iloc[[0]].assign(DOMAIN='QS', JOIN_KEY='QSONLY')], ignore_index=True)
+
+    serial  = engine.drain(engine.iter_build_comparison(df_doc, df_edc, parallel=False))
+    sharded = engine.drain(engine.iter_build_comparison(df_doc, df_edc, parallel=True))
+
+    pd.testing.assert_frame_equal(sharded, serial)
+    assert (serial['MISMATCH'] != '').any() and (serial['CODE_DIFF'] != '').any()
+    assert set(serial['_merge']) == {'both', 'left_only', 'right_only'}
+
+
+def test_duplicate_keys_fall_back_to_serial(study_files, monkeypatch):
+    df_doc, df_edc = _inputs(study_files)
+    df_edc = pd.concat([df_edc, df_edc.iloc[[0]]], ignore_index=True)
+    monkeypatch.setattr(engine, '_iter_compare_sharded', None)   # 호출되면 TypeError
+
+    merged = engine.drain(engine.iter_build_comparison(df_doc, df_edc, parallel=True))
+    assert merged['JOIN_KEY'].duplicated().any()
+
+
+def _matches(rule, pairs):
+    """[(DB Spec 값, Export 값)] → 규칙별 일치 여부 리스트"""
+    d, e = (pd.Series(list(side), dtype=object) for side in zip(*pairs))
+    return rule(d, e).tolist()
+
+
+def test_numeric_rule_tolerance_and_text_fallback():
+    rules = engine.compile_compare_rules({'MAX_LEN': ("numeric", {"tol": 0}),
+                                          'MAX_VAL': ("numeric", {"tol": 0.01})}, ['MAX_LEN', 'MAX_VAL'])
+    assert _matches(rules['MAX_LEN'], [('10', '10.00'), (' 10', '1e1'), ('10', '10.001'),
+                                       ('N/A', 'N/A'), ('N/A', 'n/a'), ('10', 'ten')]) == \
+        [True, True, False, True, False, False]
+    assert _matches(rules['MAX_VAL'], [('1.5', '1.509'), ('1.5', '1.52'), ('-0', '0')]) == [True, False, True]
+
+
+def test_text_rules_case_and_whitespace():
+    rules = engine.compile_compare_rules({'ITEM LABEL': "text_ci"}, ['ITEM LABEL', 'TYPE'])
+    pairs = [('Adverse  Event', 'adverse event'), (' Term ', 'TERM'), ('Term', 'Terms')]
+    assert _matches(rules['ITEM LABEL'], pairs) == [True, True, False]
+    # 규칙이 없는 컬럼은 exact — 앞뒤 공백만 무시
+    assert _matches(rules['TYPE'], pairs + [(' text ', 'text')]) == [False, False, False, True]
+
+
+def test_set_rule_ignores_member_order():
+    rules = engine.compile_compare_rules({'VISIT': ("set", {"sep": ","})}, ['VISIT'])
+    assert _matches(rules['VISIT'], [('V1,V2,V3', 'V3, V1,V2'), ('V1,V2', 'V1,V2,V2'), ('V1,V2', 'V1,V3'),
+                                     ('V1,,V2', 'V2,V1,')]) == [True, True, False, True]
+
+
+def test_ignore_rule_and_unknown_rule():
+    rules = engine.compile_compare_rules({'VERSION': "ignore"}, ['VERSION'])
+    assert _matches(rules['VERSION'], [('1', '2'), ('', 'x')]) == [True, True]
+    with pytest.raises(ValueError):
+        engine.compile_compare_rules({'VERSION': "fuzzy"}, ['VERSION'])
+
+    # 무시한 컬럼은 MISMATCH에 나오지 않음
+    df_doc = pd.DataFrame({'JOIN_KEY': ['K'], 'VERSION': ['1'], 'TYPE': ['text']})
+    df_edc = pd.DataFrame({'JOIN_KEY': ['K'], 'VERSION': ['2'], 'TYPE': ['integer']})
+    merged = engine.build_comparison(df_doc, df_edc, ['VERSION', 'TYPE'], rules={'VERSION': "ignore"})
+    assert merged.loc[0, 'MISMATCH'] == '|TYPE|'
+
+
+def test_rules_treat_missing_value_as_blank():
+    rules = engine.compile_compare_rules({'ITEM LABEL': "text_ci", 'MAX_LEN': ("numeric", {"tol": 0}),
+                                          'VISIT': ("set", {"sep": ","}), 'CODE': "codelist"},
+                                         ['ITEM LABEL', 'MAX_LEN', 'VISIT', 'CODE', 'TYPE'])
+    # 결측값은 빈 값 — 'nan' 문자열과는 다름 (codelist는 'nan' 문자열도 빈 목록으로 파싱)
+    pairs = [(float('nan'), ''), (None, ''), (float('nan'), 'nan'), (float('nan'), '1')]
+    for cname, rule in rules.items():
+        assert _matches(rule, pairs) == [True, True, cname == 'CODE', False], cname
+
+
+def test_codelist_hash_ignores_order_whitespace_and_separator():
+    base = engine.parse_codelist('1=Yes;2=No;3=Not  applicable')
+    assert base == {'1': 'Yes', '2': 'No', '3': 'Not applicable'}
+    for variant in ('3=Not applicable; 1=Yes ;2=No', '2 = No\n1=Yes\r\n3=Not applicable;',
+                    '1=Yes;;2=No;3= Not applicable '):
+        assert engine.codelist_hash(engine.parse_codelist(variant)) == engine.codelist_hash(base), variant
+    assert engine.codelist_hash(engine.parse_codelist('1=Yes;2=Nope;3=Not applicable')) != \
+        engine.codelist_hash(base)
+
+
+def test_parse_codelist_malformed_entries():
+    # '='가 없으면 ':'로, 둘 다 없으면 decode 없는 code — 첫 구분자만 사용
+    assert engine.parse_codelist('1:Yes;2;3=a=b') == {'1': 'Yes', '2': '', '3': 'a=b'}
+    for empty in ('', ' ; ;', 'nan', float('nan')):
+        assert engine.parse_codelist(empty) == {}
+    assert engine.codelist_hash({}) == engine.codelist_hash(engine.parse_codelist(''))
+
+
+def test_describe_codelist_diffs_added_removed_changed():
+    d = pd.Series(['1=Yes;2=No', '1=Yes;2=No;3=Maybe', '1=Yes', '', '1=Yes;2=No'], index=[10, 11, 12, 13, 14])
+    e = pd.Series(['2=No;1=Yes;3=Maybe', '1=Yes;2=No', '1=Ja', '1=Yes', '1=Yes;2=No'], index=d.index)
+    diffs = engine.describe_codelist_diffs(d, e)
+
+    assert list(diffs.index) == [10, 11, 12, 13, 14]
+    assert diffs['ADDED'].tolist()   == ['3=Maybe', '', '', '1=Yes', '']
+    assert diffs['REMOVED'].tolist() == ['', '3=Maybe', '', '', '']
+    assert diffs['CHANGED'].tolist() == ['', '', '1: Yes → Ja', '', '']
+    assert diffs.loc[10, 'SUMMARY'] == '추가: 3=Maybe' and diffs.loc[14, 'SUMMARY'] == ''
+    assert engine.codelist_diff({'1': 'Yes', '2': 'No'}, {'1': 'Si', '3': ''}) == (['3'], ['2=No'], ['1: Yes → Si'])
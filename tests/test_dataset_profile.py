@@ -0,0 +1,109 @@
+import math
+
+import pandas as pd
+import pytest
+
+import dataset_profile as dp
+import edc_engine as engine
+
+
+def _spec(rows):
+    cols = ['DOMAIN', 'ITEM ID', 'TYPE', 'MAX_LEN', 'MIN_VAL', 'MAX_VAL']
+    return pd.DataFrame([dict(zip(cols, r)) for r in rows])
+
+
+def test_build_spec_constraints_normalizes_keys_and_keeps_first_row():
+    constraints = dp.build_spec_constraints(_spec([
+        (' ae ', 'aeterm ', 'Text', '200', '', ''),
+        ('AE', 'AETERM', 'integer', '3', '0', '9'),          # 같은 항목의 다른 PAGE/VISIT 행 → 무시
+        ('VS', 'VSORRES', 'Numeric', ' 5 ', '-1.5', 'abc'),
+        ('VS', 'VSDAT', 'unknown', 'N/A', '', ''),
+    ]))
+    assert set(constraints) == {'AE', 'VS'}
+    assert constraints['AE']['AETERM'][:2] == (dp.TYPE_TEXT, 200)
+    assert all(math.isnan(v) for v in constraints['AE']['AETERM'][2:])
+
+    exp, max_len, min_val, max_val = constraints['VS']['VSORRES']
+    assert (exp, max_len, min_val) == (dp.TYPE_FLOAT, 5, -1.5) and math.isnan(max_val)
+    assert constraints['VS']['VSDAT'][0] is None and math.isnan(constraints['VS']['VSDAT'][1])
+
+    # 판단 불가 TYPE이 섞여도 타입 코드는 None (NaN이면 자동 점검 문구에서 KeyError)
+    profile = dp.profile_sheet(pd.DataFrame({'VSDAT': ['a', 'b']}, dtype=object), 'VS', constraints['VS'])
+    assert profile.loc[0, 'PROFILE_CHECK'] == ''
+
+    assert dp.build_spec_constraints(None) == {} and dp.build_spec_constraints(pd.DataFrame()) == {}
+
+
+def test_build_spec_constraints_reuses_normalized_key_columns():
+    spec = _spec([('ae', 'aeterm', 'text', '10', '', '')]).assign(KEY_DOMAIN=['AE'], KEY_ITEM_ID=['AETERM'])
+    assert dp.build_spec_constraints(spec)['AE']['AETERM'][:2] == (dp.TYPE_TEXT, 10)
+
+
+def test_profile_sheet_counts_violations_per_column():
+    df = pd.DataFrame({
+        'SUBJID:Subject': ['S1', 'S2', 'S3', 'S4'],
+        'AGE:Age'       : [None, '35', 'x', '150'],
+        'NOTE:Note'     : ['abc', 'abcdef', None, ' '],
+        'VSDAT:Date'    : ['2024-01-02', '2024-01-03 10:00', 'soon', None],
+    }, dtype=object)
+    constraints = {'AGE': (dp.TYPE_INTEGER, 3, 0, 120), 'NOTE': (dp.TYPE_TEXT, 5, math.nan, math.nan),
+                   'VSDAT': (dp.TYPE_DATETIME, 5, math.nan, math.nan)}
+    profile = dp.profile_sheet(df, 'DM', constraints).set_index('ITEM ID')
+
+    assert profile.columns.tolist() == [c for c in dp.PROFILE_COLS if c != 'ITEM ID']
+    age = profile.loc['AGE']
+    assert (age['DS_TYPE'], age['DS_SUBJID'], age['PROFILE_TYPE']) == ('35', 'S2', 'integer')
+    assert (age['PROFILE_MIN'], age['PROFILE_MAX'], age['PROFILE_NULL_RATE']) == (35, 150, 0.25)
+    assert age['PROFILE_NON_CONFORMING'] == 2                        # 'x' 타입 위반, 150 범위 밖
+    assert age['PROFILE_CHECK'] == "타입 위반 1건 / MIN/MAX 범위 밖 1건"
+
+    note = profile.loc['NOTE']
+    assert (note['PROFILE_MAX_LEN'], note['PROFILE_NULL_RATE'], note['PROFILE_NON_CONFORMING']) == (6, 0.5, 1)
+    assert math.isnan(note['PROFILE_MIN'])
+
+    # 날짜 항목은 MAX_LEN 점검 제외, 우세 타입이 Spec과 같으면 TYPE 불일치 없음
+    date = profile.loc['VSDAT']
+    assert (date['PROFILE_TYPE'], date['PROFILE_NON_CONFORMING'], date['PROFILE_CHECK']) == \
+        ('datetime', 1, "타입 위반 1건")
+
+
+def test_profile_sheet_reports_dominant_type_mismatch_and_empty_column(monkeypatch):
+    monkeypatch.setattr(dp, 'COLUMN_BLOCK_SIZE', 1)            # 열 묶음 경계에서도 같은 결과
+    df = pd.DataFrame({'SUBJID': ['S1', 'S2'], 'CODE': ['1', '2'], 'EMPTY': [None, 'nan']}, dtype=object)
+    profile = dp.profile_sheet(df, 'LB', {'CODE': (dp.TYPE_DATETIME, math.nan, math.nan, math.nan)})
+    profile = profile.set_index('ITEM ID')
+
+    assert profile.loc['CODE', 'PROFILE_CHECK'].startswith("TYPE 불일치 (Spec=datetime, Data=integer)")
+    empty = profile.loc['EMPTY']
+    assert (empty['DS_TYPE'], empty['DS_SUBJID'], empty['PROFILE_TYPE'], empty['PROFILE_MAX_LEN'],
+            empty['PROFILE_NULL_RATE'], empty['PROFILE_CHECK']) == ('', '', '', 0, 1.0, '')
+
+
+@pytest.mark.parametrize('max_workers', [1, 2])
+def test_numeric_cells_keep_excel_text_under_dtype_str(tmp_path, monkeypatch, max_workers):
+    # 회귀 방지: dtype=str로 읽으므로 정수 셀은 '3'(not '3.0'), 소수 셀은 '1.5' 그대로 — 정수 TYPE 위반이 생기면 안 됨
+    monkeypatch.setattr(dp, 'PARALLEL_MIN_BYTES', 0)
+    path = str(tmp_path / 'dataset.xlsx')
+    with pd.ExcelWriter(path) as w:
+        pd.DataFrame({'SUBJID:Subject': ['S1']}).to_excel(w, sheet_name='SUBJECT_INFO', index=False)
+        pd.DataFrame({'SUBJID:Subject': ['S1', 'S2', 'S3'], 'AGE:Age': [None, 3, 12],
+                      'DOSE:Dose': [1.5, 2.0, 0.25]}).to_excel(w, sheet_name='DM', index=False)
+        pd.DataFrame({'SUBJID:Subject': ['S1'], 'LBORRES:Result': [7]}).to_excel(w, sheet_name='LB', index=False)
+
+    spec = _spec([('DM', 'AGE', 'integer', '3', '0', '120'), ('DM', 'DOSE', 'float', '4', '0', '10')])
+    profile = dp.profile_dataset(path, spec, max_workers=max_workers).set_index('ITEM ID')
+
+    assert profile['DOMAIN'].tolist() == ['DM'] * 3 + ['LB'] * 2   # SUBJID 열 포함
+    assert profile.loc['AGE', ['DS_TYPE', 'DS_SUBJID', 'PROFILE_TYPE']].tolist() == ['3', 'S2', 'integer']
+    assert profile.loc['DOSE', ['DS_TYPE', 'PROFILE_TYPE', 'PROFILE_MAX_LEN']].tolist() == ['1.5', 'float', 4]
+    assert profile.loc['LBORRES', 'DS_TYPE'] == '7'
+    assert (profile.loc[['AGE', 'DOSE'], 'PROFILE_NON_CONFORMING'] == 0).all()
+    assert (profile.loc[['AGE', 'DOSE'], 'PROFILE_CHECK'] == '').all()
+
+    # 리포트에 기입되는 최소/최대는 정수면 정수 (3.0 → 3)
+    rows = dict(zip(profile.index, engine.format_profile_rows(profile)))
+    labels = [col for _, _, col in engine.DS_PROFILE_COLUMNS]
+    age = dict(zip(labels, rows['AGE']))
+    assert (age['PROFILE_MIN'], age['PROFILE_MAX']) == (3, 12) and isinstance(age['PROFILE_MIN'], int)
+    dose = dict(zip(labels, rows['DOSE']))
+    assert (dose['PROFILE_MIN'], dose['PROFILE_MAX']) == (0.25, 2)   # 2.0 셀은 '2'로 읽힘
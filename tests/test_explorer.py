@@ -0,0 +1,61 @@
+import pytest
+
+import edc_engine as engine
+
+
+@pytest.fixture(scope='module')
+def explorer(study_files):
+    df_doc = engine.process_data_final(study_files['spec'], 'Spec', 1)
+    df_doc, _ = engine.INGEST_ROW_FILTER.split(df_doc)
+    df_edc, _ = engine.read_standardized(study_files['export'], 'Export', 0, row_filter=engine.INGEST_ROW_FILTER)
+    merged = engine.drain(engine.iter_build_comparison(df_doc, df_edc, parallel=False))
+    return engine.build_explorer_frame(merged)
+
+
+def test_pages_cover_filtered_rows_once(explorer):
+    seen, total_rows = [], len(explorer)
+    page_df, total, total_pages = engine.query_explorer(explorer, page_size=7)
+    assert total == total_rows and total_pages == -(-total_rows // 7)
+    assert '_FLAG' not in page_df.columns
+
+    for page in range(1, total_pages + 1):
+        page_df, _, _ = engine.query_explorer(explorer, page=page, page_size=7)
+        assert len(page_df) == (7 if page < total_pages else total_rows - 7 * (total_pages - 1))
+        seen.extend(page_df.index)
+    assert seen == list(explorer.index)
+
+    # 범위 밖 페이지 번호는 첫 / 마지막 페이지로
+    last, _, _ = engine.query_explorer(explorer, page=total_pages + 5, page_size=7)
+    first, _, _ = engine.query_explorer(explorer, page=0, page_size=7)
+    assert list(last.index) == seen[7 * (total_pages - 1):] and list(first.index) == seen[:7]
+
+
+def test_filters_combine_and_empty_result_keeps_one_page(explorer):
+    mismatch = engine.EXPLORER_STATUS['mismatch']
+    page_df, total, _ = engine.query_explorer(explorer, statuses=[mismatch], page_size=500)
+    assert total == (explorer['STATUS'] == mismatch).sum() > 0
+    assert set(page_df['STATUS']) == {mismatch}
+
+    page_df, total, _ = engine.query_explorer(explorer, mismatch_cols=['ITEM LABEL'], page_size=500)
+    assert total == 1 and page_df.iloc[0]['ITEM LABEL (Export)'] == 'changed'
+    assert 'ITEM LABEL' in page_df.iloc[0]['MISMATCH']
+
+    domain, page = explorer.iloc[0][['DOMAIN', 'PAGE']]
+    page_df, total, _ = engine.query_explorer(explorer, domains=[domain], pages=[page], page_size=500)
+    assert total == ((explorer['DOMAIN'] == domain) & (explorer['PAGE'] == page)).sum()
+    assert set(page_df['DOMAIN']) == {domain}
+
+    page_df, total, total_pages = engine.query_explorer(explorer, domains=['NONE'])
+    assert (len(page_df), total, total_pages) == (0, 0, 1)
+
+
+def test_sort_is_stable_and_applied_before_paging(explorer):
+    full, _, _ = engine.query_explorer(explorer, sort_by='ITEM ID', ascending=False, page_size=500)
+    assert full['ITEM ID'].tolist() == sorted(explorer['ITEM ID'], reverse=True)
+
+    second, _, _ = engine.query_explorer(explorer, sort_by='ITEM ID', ascending=False, page=2, page_size=5)
+    assert list(second.index) == list(full.index[5:10])
+
+    by_domain, _, _ = engine.query_explorer(explorer, sort_by='DOMAIN', page_size=500)
+    for _, group in by_domain.groupby('DOMAIN', observed=True):
+        assert list(group.index) == sorted(group.index)    # 같은 DOMAIN 안에서는 원래 순서 유지
@@ -0,0 +1,38 @@
+import pandas as pd
+
+import edc_engine as engine
+import preflight
+
+
+def _counts(study_files, export_path):
+    result  = engine.run_validation(study_files['spec'], 'Spec', 1, export_path, 'Export', 0)
+    summary = engine.summarize_result(result)['entry_screen']
+    pf      = preflight.preflight(study_files['spec'], 'Spec', 1, export_path, 'Export', 0)
+    return summary, pf
+
+
+def _assert_same(summary, pf):
+    assert pf['matched']         == summary['match'] + summary['mismatch']
+    assert pf['spec_only']       == summary['spec_only']
+    assert pf['export_only']     == summary['export_only']
+    assert pf['spec_excluded']   == summary['spec_excluded']
+    assert pf['export_excluded'] == summary['export_excluded']
+
+
+def test_preflight_counts_match_full_run(study_files):
+    summary, pf = _counts(study_files, study_files['export'])
+    _assert_same(summary, pf)
+    assert pf['matched'] > 0 and pf['spec_only'] > 0 and pf['export_only'] > 0
+    assert pf['top_domains'][['SPEC_ONLY', 'EXPORT_ONLY']].to_numpy().sum() == pf['spec_only'] + pf['export_only']
+
+
+def test_preflight_dedups_before_exclusion_like_full_run(study_files, tmp_path):
+    # 첫 행(SYS_HDR)과 같은 키의 STD 행을 끝에 추가 — 중복 제거로 SYS_ 행이 남고 제외되어야 함
+    export = pd.read_excel(study_files['export'], sheet_name='Export', dtype=str)
+    assert export.loc[0, 'LAYOUT'].startswith('SYS_')
+    export = pd.concat([export, export.iloc[[0]].assign(LAYOUT='STD')], ignore_index=True)
+    path = str(tmp_path / 'export_dup.xlsx')
+    export.to_excel(path, index=False, sheet_name='Export')
+
+    summary, pf = _counts(study_files, path)
+    _assert_same(summary, pf)
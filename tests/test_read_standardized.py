@@ -0,0 +1,61 @@
+import pandas as pd
+from openpyxl import Workbook
+
+import edc_engine as engine
+
+
+def _export(path):
+    """
+    중복 키의 첫 행이 SYS_ 레이아웃이고 두 번째 행이 다른 묶음에 있는 Export
+    + 중간 빈 행 / 헤더보다 넓은 행 / 오류 값 / 끝의 빈 행
+    """
+    wb = Workbook()
+    ws = wb.active
+    ws.title = 'Export'
+    ws.append(['DOMAIN', 'FORM', 'VISIT', 'VARIABLE', 'LAYOUT', 'MAX_LEN'])
+    ws.append(['AE', 'AE_P', 'V1', 'DUP', 'SYS_HDR', 1.0])
+    ws.append(['AE', 'AE_P', 'V1', 'ITEM2', 'STD', 2.5])
+    ws.append([])
+    ws.append(['LB', 'LB_P', 'V1', 'ITEM3', 'STD', '#N/A', None, 'wide'])
+    ws.append(['AE', 'AE_P', 'V1', 'DUP', 'STD', 3])
+    ws.append(['LB', 'LB_P', 'V2', 'ITEM4', 'SYS_X', 4])
+    ws.append([])
+    wb.save(path)
+
+
+def _reference(path, row_filter):
+    """기존 순서 — 시트 전체 읽기 → 정규화 → JOIN_KEY 중복 제거 → 제외 규칙"""
+    df = pd.read_excel(path, sheet_name='Export', header=0, dtype=str)
+    df.columns = [engine.standard_column_name(c) for c in df.columns]
+    df = engine.normalize_std_cols(df)
+    df['JOIN_KEY'] = engine.make_join_key(df)
+    df = df[df['JOIN_KEY'].str.len() > 1].drop_duplicates(subset=['JOIN_KEY'])
+    return row_filter.split(df)
+
+
+def test_sheet_chunks_match_read_excel(tmp_path):
+    path = str(tmp_path / 'export.xlsx')
+    _export(path)
+    expected = pd.read_excel(path, sheet_name='Export', header=0, dtype=str)
+    with engine.open_excel(path) as excel_file:
+        chunks = [df for _, df in engine.iter_sheet_chunks(excel_file, 'Export', 0, chunk_rows=2)]
+    assert len(chunks) == 3
+    pd.testing.assert_frame_equal(pd.concat(chunks), expected)
+
+
+def test_streamed_filter_keeps_dedup_before_exclusion(tmp_path, monkeypatch):
+    path = str(tmp_path / 'export.xlsx')
+    _export(path)
+    iter_sheet_chunks = engine.iter_sheet_chunks
+    monkeypatch.setattr(engine, 'iter_sheet_chunks',
+                        lambda *args: iter_sheet_chunks(*args, chunk_rows=2))
+
+    expected, expected_excluded = _reference(path, engine.INGEST_ROW_FILTER)
+    with engine.open_excel(path) as excel_file:
+        df, excluded = engine.read_standardized(excel_file, 'Export', 0, row_filter=engine.INGEST_ROW_FILTER)
+
+    pd.testing.assert_frame_equal(df, expected)
+    pd.testing.assert_frame_equal(excluded, expected_excluded)
+    # 첫 DUP 행(SYS_)이 중복 제거에서 남고 제외 규칙으로 빠지므로 뒤 묶음의 DUP 행도 쓰지 않음
+    assert 'DUP' not in set(df['ITEM ID'])
+    assert engine.excluded_count(excluded) == 2
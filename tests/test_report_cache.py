@@ -0,0 +1,85 @@
+import json
+import os
+import shutil
+import time
+
+import pandas as pd
+
+import edc_engine as engine
+import report_cache
+import run_metrics
+import validation_api as api
+import validation_history
+
+
+def _put(cache, key, size, mtime):
+    assert cache.put(key, b'x' * size, {'summary': key}, {'merged': pd.DataFrame({'A': [key]})})
+    for ext in report_cache.CACHE_EXTENSIONS:
+        os.utime(os.path.join(cache.root, key + ext), (mtime, mtime))
+
+
+def test_eviction_removes_least_recently_used(tmp_path):
+    cache = report_cache.ReportCache(str(tmp_path), max_bytes=10 ** 9)
+    now = time.time()
+    for i, key in enumerate(['a', 'b', 'c']):
+        _put(cache, key, 1000, now - 100 + i)
+
+    assert cache.get('a') is not None           # 조회하면 가장 최근 항목이 됨
+    entries = cache.entries()
+    assert [key for _, key, _ in entries] == ['b', 'c', 'a']
+
+    assert cache.evict(sum(size for _, _, size in entries[1:])) == 1
+    assert cache.get('b') is None
+    assert not any(name.startswith('b.') for name in os.listdir(tmp_path))
+    assert cache.clear() == 2 and cache.entries() == []
+
+
+def test_put_skips_entries_larger_than_limit(tmp_path):
+    cache = report_cache.ReportCache(str(tmp_path), max_bytes=500)
+    assert not cache.put('big', b'x' * 400, {}, {'merged': pd.DataFrame({'A': range(100)})})
+    assert cache.entries() == []
+    assert not report_cache.ReportCache(str(tmp_path), max_bytes=0).put('k', b'x', {}, {})
+
+
+def test_frames_round_trip(study_files, tmp_path):
+    result = engine.run_validation(study_files['spec'], 'Spec', 1, study_files['export'], 'Export', 0,
+                                   dataset_source=study_files['dataset'])
+    cache = report_cache.ReportCache(str(tmp_path))
+    assert cache.put('k', result['report'].getvalue(), {'summary': 1}, result)
+
+    report, meta, frames = cache.get('k')
+    assert report == result['report'].getvalue() and meta['summary'] == 1
+    for name in report_cache.RESULT_FRAMES:
+        if result[name] is None:
+            assert frames[name] is None
+        else:
+            pd.testing.assert_frame_equal(frames[name], result[name])
+
+
+def _run_job(jobs, study_files, fields):
+    workdir = jobs.new_workdir()
+    files = {}
+    for name in ('spec', 'export'):
+        path = os.path.join(workdir, f'{name}.xlsx')
+        shutil.copy(study_files[name], path)
+        files[name] = (f'{name}.xlsx', path)
+    job = jobs.submit(api.build_job_params(dict(fields, spec_sheet='Spec', study='S1'), files), workdir)
+    assert job.done.wait(120)
+    assert job.status == api.JOB_DONE, job.error
+    return job
+
+
+def test_api_cache_hit_serves_json_and_records_history(study_files, tmp_path, monkeypatch):
+    monkeypatch.setattr(run_metrics, 'METRICS_LOG_PATH', '')
+    monkeypatch.setattr(validation_history, 'HISTORY_DB_PATH', str(tmp_path / 'history.db'))
+    jobs = api.JobManager(workers=1, work_root=str(tmp_path / 'work'))
+    jobs.cache = report_cache.ReportCache(str(tmp_path / 'cache'))
+
+    first  = _run_job(jobs, study_files, {'record': '1'})
+    second = _run_job(jobs, study_files, {'record': '1'})
+
+    assert not first.describe()['cached'] and second.describe()['cached']
+    docs = [json.loads(''.join(api.iter_result_json(job))) for job in (first, second)]
+    assert docs[1]['entry_screen'] == docs[0]['entry_screen']
+    assert docs[1]['summary'] == docs[0]['summary']
+    assert len(validation_history.list_runs(str(tmp_path / 'history.db'))) == 2
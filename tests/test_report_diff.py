@@ -0,0 +1,106 @@
+import io
+import re
+import zipfile
+
+from openpyxl import Workbook
+
+import report_diff
+from report_diff import (CHANGE_ADDED, CHANGE_REMOVED, CHANGE_RESULT, CHANGE_VALUE, ENTRY_SHEET,
+                         diff_reports)
+
+KEY_COLS = ['DOMAIN', 'PAGE', 'VISIT', 'ITEM ID', 'ITEM LABEL']
+
+
+def _report(rows) -> bytes:
+    """Entry Screen 시트만 있는 리포트 — rows: [(ITEM ID, ITEM LABEL, 확인 결과)]"""
+    wb = Workbook()
+    ws = wb.active
+    ws.title = ENTRY_SHEET
+    ws.cell(5, 31, '확인 결과')
+    for col, name in enumerate(KEY_COLS, 1):
+        ws.cell(6, col, name)
+        ws.cell(6, col + 15, name)
+    for row, (item, label, result) in enumerate(rows, 7):
+        for col, value in enumerate(['AE', 'AE_P', 'V1', item, label], 1):
+            ws.cell(row, col, value)
+            ws.cell(row, col + 15, value)
+        ws.cell(row, 31, result)
+    buffer = io.BytesIO()
+    wb.save(buffer)
+    return buffer.getvalue()
+
+
+def _spec_side_shared(data: bytes) -> bytes:
+    """
+    Excel에서 다시 저장한 파일처럼 DB Spec 쪽(A~O열) 문자열 셀을 공유 문자열(sharedStrings.xml)로 바꾼 리포트
+    (Export 쪽은 inlineStr 그대로 — 한 행에 두 형식이 섞임)
+    """
+    strings = []
+
+    def to_shared(m):
+        strings.append(m.group(2))
+        return f'<c r="{m.group(1)}" t="s"><v>{len(strings) - 1}</v></c>'
+
+    out = io.BytesIO()
+    with zipfile.ZipFile(io.BytesIO(data)) as src, zipfile.ZipFile(out, 'w') as dst:
+        for name in src.namelist():
+            body = src.read(name)
+            if name.startswith('xl/worksheets/'):
+                body = re.sub(r'<c r="([A-O]\d+)" t="inlineStr"><is><t>(.*?)</t></is></c>', to_shared,
+                              body.decode('utf-8')).encode('utf-8')
+            dst.writestr(name, body)
+        dst.writestr('xl/sharedStrings.xml',
+                     f'<sst xmlns="{report_diff.MAIN_NS}">' + ''.join(f'<si><t>{s}</t></si>' for s in strings)
+                     + '</sst>')
+    return out.getvalue()
+
+
+OLD_ROWS = [('AETERM', 'Term', 'TRUE'), ('AESEV', 'Severity', 'TRUE'), ('AEOUT', 'Outcome', 'TRUE'),
+            ('AEREL', 'a &lt; b & c', 'TRUE')]
+
+
+def test_diff_reports_added_removed_result_and_value():
+    new_rows = [('AETERM', 'Term', 'FALSE'),          # 확인 결과 변경
+                ('AESEV', 'Severity (mild)', 'TRUE'),  # 값 변경
+                ('AEREL', 'a &lt; b & c', 'TRUE'),     # 변경 없음 (순서만 이동)
+                ('AENEW', 'New item', 'TRUE')]         # 추가 — AEOUT 삭제
+    df = diff_reports(_report(OLD_ROWS), _report(new_rows))
+
+    changes = {(c, item) for c, item in zip(df['CHANGE'], df['ITEM ID'])}
+    assert changes == {(CHANGE_RESULT, 'AETERM'), (CHANGE_VALUE, 'AESEV'),
+                       (CHANGE_ADDED, 'AENEW'), (CHANGE_REMOVED, 'AEOUT')}
+
+    result = df[df['CHANGE'] == CHANGE_RESULT].iloc[0]
+    assert (result['RESULT_OLD'], result['RESULT_NEW'], result['OLD'], result['NEW']) == ('TRUE', 'FALSE',
+                                                                                          'TRUE', 'FALSE')
+    # ITEM LABEL은 Spec / Export 양쪽 열에서 바뀜
+    value = df[df['CHANGE'] == CHANGE_VALUE]
+    assert set(value['COLUMN']) == {'ITEM LABEL (Spec)', 'ITEM LABEL (Export)'}
+    assert set(value['OLD']) == {'Severity'} and set(value['NEW']) == {'Severity (mild)'}
+
+    assert df[df['CHANGE'] == CHANGE_REMOVED].iloc[0]['RESULT_OLD'] == 'TRUE'
+    assert diff_reports(_report(OLD_ROWS), _report(OLD_ROWS)).empty
+
+
+def test_diff_reports_keeps_literal_entities_in_shared_strings():
+    # 셀에 입력된 '&lt;' 문자열은 '<'와 다른 값 — 공유 문자열을 한 번 더 해제하면 DB Spec 쪽 변경이 사라짐
+    new_rows = [row if row[0] != 'AEREL' else ('AEREL', 'a < b & c', 'TRUE') for row in OLD_ROWS]
+    old, new = _spec_side_shared(_report(OLD_ROWS)), _spec_side_shared(_report(new_rows))
+    assert report_diff.shared_strings(zipfile.ZipFile(io.BytesIO(old)))
+
+    df = diff_reports(old, new)
+    assert set(df['CHANGE']) == {CHANGE_VALUE}
+    assert set(df['COLUMN']) == {'ITEM LABEL (Spec)', 'ITEM LABEL (Export)'}
+    assert set(df['OLD']) == {'a &lt; b & c'} and set(df['NEW']) == {'a < b & c'}
+    assert diff_reports(old, _spec_side_shared(_report(OLD_ROWS))).empty
+
+
+def test_sheet_rows_unescape_raw_xml_text_once():
+    shared = ['x &amp; y']   # ElementTree가 이미 해제한 공유 문자열 값
+    fast = ('<row r="7"><c r="A7" t="s"><v>0</v></c>'
+            '<c r="B7" t="inlineStr"><is><t>p &amp;lt; q</t></is></c></row>')
+    general = ('<row r="7"><c r="A7" t="s"><v>0</v></c>'
+               '<c r="B7" t="inlineStr"><is><r><t>p &amp;lt;</t></r><r><t> q</t></r></is></c></row>')
+    assert report_diff._parse_row_fast(fast, shared) == {1: 'x &amp; y', 2: 'p &lt; q'}
+    assert report_diff._parse_row_fast(general, shared) is None
+    assert report_diff._parse_row_general(general, shared) == {1: 'x &amp; y', 2: 'p &lt; q'}
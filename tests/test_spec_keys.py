@@ -0,0 +1,53 @@
+import pandas as pd
+
+import edc_engine as engine
+
+
+def test_normalize_keys_strips_uppercases_and_interns():
+    values = pd.Series([' ae ', 'AE', None, 'ae', 'Vs\t'], index=[10, 11, 12, 13, 14])
+    keys = engine.normalize_keys(values)
+
+    assert keys.tolist() == ['AE', 'AE', '', 'AE', 'VS'] and keys.index.tolist() == values.index.tolist()
+    # object dtype(pandas 2)이면 서로 다른 원본 / 다른 Series에서 만든 같은 키는 같은 문자열 객체
+    other = engine.normalize_keys(pd.Series(['aE ']))
+    if keys.dtype == object:
+        assert keys.iat[0] is keys.iat[3] is other.iat[0]
+    assert keys.iat[0] == other.iat[0]
+
+
+def test_add_spec_keys_keeps_existing_key_columns():
+    df = pd.DataFrame({'DOMAIN': [' dm'], 'ITEM ID': ['age ']})
+    keyed = engine.add_spec_keys(df)
+    assert keyed[engine.SPEC_KEY_COLS].values.tolist() == [['DM', 'AGE']]
+    assert 'KEY_DOMAIN' not in df.columns                  # 원본은 그대로
+    assert engine.add_spec_keys(keyed) is keyed
+    assert engine.add_spec_keys(pd.DataFrame({'DOMAIN': ['DM']})).columns.tolist() == ['DOMAIN']
+
+
+def test_join_on_spec_keys_follows_spec_order():
+    spec = pd.DataFrame({'DOMAIN' : ['vs', 'DM', 'DM', 'AE', 'DM'],
+                         'ITEM ID': ['VSORRES', ' age', 'SEX', 'AETERM', 'AGE']},   # AGE는 두 PAGE에 있음
+                        index=[7, 3, 5, 1, 9])
+    other = pd.DataFrame({'DOMAIN' : ['DM', 'VS ', 'dm', 'LB'],
+                          'ITEM ID': ['AGE', 'vsorres', 'age', 'LBTEST'],
+                          'DS_TYPE': ['old', '120', '35', 'x'],
+                          'EXTRA'  : [1, 2, 3, 4]})
+
+    joined = engine.join_on_spec_keys(spec, other, ['DS_TYPE'])
+
+    assert joined.columns.tolist() == ['DS_TYPE', 'MATCHED']
+    assert joined.index.tolist() == [0, 1, 2, 3, 4]
+    # 같은 키가 df_other에 여러 번 있으면 마지막 행, DB Spec에 없는 키(LBTEST)는 버림
+    assert joined['DS_TYPE'].tolist()[:2] == ['120', '35'] and joined['DS_TYPE'].iat[4] == '35'
+    assert joined['MATCHED'].tolist() == [True, True, False, False, True]
+    assert joined['DS_TYPE'].iloc[[2, 3]].isna().all()
+
+
+def test_join_on_spec_keys_reuses_precomputed_keys():
+    # 미리 만든 키 열이 있으면 DOMAIN / ITEM ID 원본 값이 아니라 키 열로 조인
+    spec  = pd.DataFrame({'DOMAIN': ['x'], 'ITEM ID': ['y'], 'KEY_DOMAIN': ['DM'], 'KEY_ITEM_ID': ['AGE']})
+    other = pd.DataFrame({'DOMAIN': ['DM'], 'ITEM ID': ['AGE'], 'DS_TYPE': ['35']})
+    assert engine.join_on_spec_keys(spec, other, ['DS_TYPE']).values.tolist() == [['35', True]]
+
+    empty = engine.join_on_spec_keys(spec, other.iloc[:0], ['DS_TYPE'])
+    assert empty['MATCHED'].tolist() == [False] and len(empty) == 1
@@ -0,0 +1,45 @@
+import pandas as pd
+import pytest
+
+import edc_engine as engine
+from conftest import spec_rows
+
+
+def _spec_file(path, rows, label_suffix):
+    """header=0 DB Spec 파일 — ITEM LABEL 끝에 파일 구분 문자열을 붙여 어느 조각의 행이 남았는지 확인"""
+    df = pd.DataFrame(rows)
+    df['ITEM LABEL'] = df['ITEM LABEL'] + label_suffix
+    df.to_excel(path, sheet_name='Spec', index=False)
+    return str(path)
+
+
+@pytest.fixture
+def split_spec(tmp_path):
+    """두 파일로 나뉜 DB Spec — 두 번째 파일의 두 번째 행이 첫 파일의 세 번째 행과 같은 JOIN_KEY"""
+    rows = spec_rows(8)
+    first  = _spec_file(tmp_path / 'spec_a.xlsx', rows[:4], ' (A)')
+    second = _spec_file(tmp_path / 'spec_b.xlsx', [rows[4], rows[2], rows[5]], ' (B)')
+    return [engine.SpecPart(first, 'Spec', 0), engine.SpecPart(second, 'Spec', 0)], rows
+
+
+@pytest.mark.parametrize('parallel', [False, True])
+def test_cross_file_duplicate_keeps_first_in_document_order(split_spec, parallel):
+    parts, rows = split_spec
+    df, duplicates = engine.drain(engine.iter_read_spec_parts(parts, parallel=parallel))
+
+    # 문서 순서(첫 파일 행 → 두 번째 파일 행), 중복 키는 처음 나온 첫 파일 행만
+    assert df['ITEM ID'].tolist() == [rows[i]['ITEM ID'] for i in (0, 1, 2, 3, 4, 5)]
+    assert df.loc[2, 'ITEM LABEL'].endswith(' (A)') and df['JOIN_KEY'].is_unique
+
+    assert duplicates.columns.tolist() == engine.SPEC_DUPLICATE_COLS
+    assert duplicates['ITEM ID'].tolist() == [rows[2]['ITEM ID']] * 2
+    assert duplicates['SOURCE'].tolist() == ['spec_a.xlsx / Spec', 'spec_b.xlsx / Spec']
+    assert duplicates['ROW'].tolist() == [4, 3]          # 엑셀 행 번호 (헤더 1행)
+    assert duplicates['KEPT'].tolist() == [True, False]
+
+
+def test_run_validation_reports_spec_duplicates(split_spec, study_files):
+    parts, _ = split_spec
+    result = engine.run_validation(parts, None, 0, study_files['export'], 'Export', 0)
+    assert result['spec_duplicates']['KEPT'].tolist() == [True, False]
+    assert result['df_doc_full']['JOIN_KEY'].is_unique and len(result['df_doc_full']) == 6
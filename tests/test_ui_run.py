@@ -0,0 +1,97 @@
+import os
+import threading
+
+import pytest
+from streamlit.testing.v1 import AppTest
+
+from conftest import REPO_ROOT
+
+import edc_engine as engine
+import report_cache
+import run_metrics
+import validation_history
+
+XLSX_MIME = 'application/vnd.openxmlformats-officedocument.spreadsheetml.sheet'
+
+
+@pytest.fixture
+def app(study_files, tmp_path, monkeypatch):
+    """bm_app에 DB Spec / Export를 올린 상태 (지표 로그 / 이력 DB / 리포트 캐시는 임시 폴더로)"""
+    monkeypatch.setattr(run_metrics, 'METRICS_LOG_PATH', '')
+    monkeypatch.setattr(validation_history, 'HISTORY_DB_PATH', str(tmp_path / 'history.db'))
+    cache_class = report_cache.ReportCache
+    monkeypatch.setattr(report_cache, 'ReportCache', lambda: cache_class(root=str(tmp_path / 'cache')))
+
+    at = AppTest.from_file(os.path.join(REPO_ROOT, 'bm_app.py'), default_timeout=60).run()
+    for key, name in (('doc', 'spec'), ('edc', 'export')):
+        with open(study_files[name], 'rb') as f:
+            at.file_uploader(key=key).set_value((f'{name}.xlsx', f.read(), XLSX_MIME))
+    at.run()
+    at.checkbox(key='use_cache').uncheck().run()
+    return at
+
+
+def _start(at):
+    at.button[[b.label for b in at.button].index("🚀 검증 시작 (Start Validation)")].click().run()
+    return at.session_state['validation_run']
+
+
+def test_stop_button_reaches_running_validation(app, monkeypatch):
+    # 진행 이벤트 없이 중지 요청만 기다리는 검증 — 화면 스크립트가 아니라 백그라운드 스레드에서 돌아야 멈출 수 있음
+    waiting, stopped = threading.Event(), threading.Event()
+
+    def blocking_validation(*args, cancel=None, **kwargs):
+        yield engine.progress('read_spec', 0, 1, cancel)
+        waiting.set()
+        try:
+            while True:
+                cancel.check()
+                waiting.wait(0.05)
+        except engine.ValidationCancelled:
+            stopped.set()
+            raise
+
+    monkeypatch.setattr(engine, 'iter_validation', blocking_validation)
+
+    run = _start(app)
+    assert waiting.wait(10) and run.running
+    assert app.button(key='stop_validation').label == "⏹ 검증 중지"
+
+    # 클릭 → 다음 재실행 시작 시 request_cancel이 세션의 실행 토큰을 중지 상태로 바꿈
+    app.button(key='stop_validation').click().run()
+    assert stopped.wait(10) and run.done.wait(10)
+    assert isinstance(run.error, engine.ValidationCancelled)
+
+    # 중지 안내는 실행이 끝난 뒤 첫 재실행에서 한 번 표시 (클릭 재실행 중에 이미 끝났을 수도 있음)
+    warnings = [w.value for w in app.warning]
+    app.run()
+    warnings += [w.value for w in app.warning]
+    assert 'validation_run' not in app.session_state
+    assert any("검증을 중지했습니다" in w for w in warnings)
+    assert 'last_run' not in app.session_state
+
+
+def test_background_run_result_is_shown_after_completion(app):
+    run = _start(app)
+    assert run.done.wait(60) and run.error is None
+
+    app.run()
+    assert any("Entry Screen Validation" in s.value for s in app.success)
+    last_run = app.session_state['last_run']
+    assert last_run['report'][:2] == b'PK' and len(last_run['explorer']) > 0
+
+
+def test_extra_spec_file_is_combined_with_duplicates_reported(app, study_files):
+    with open(study_files['spec'], 'rb') as f:
+        app.file_uploader(key='doc_more').set_value([('spec_more.xlsx', f.read(), XLSX_MIME)])
+    app.run()
+    assert app.selectbox(key='s1_more_spec_more.xlsx').value == 'Spec'
+
+    run = _start(app)
+    assert run.done.wait(60) and run.error is None
+    duplicates = run.result['spec_duplicates']
+    assert set(duplicates['SOURCE']) == {'spec.xlsx / Spec', 'spec_more.xlsx / Spec'}
+    assert duplicates['KEPT'].sum() == duplicates['JOIN_KEY'].nunique() == len(run.result['df_doc_full'])
+
+    app.run()
+    assert any("시트/파일 간 중복 키" in w.value for w in app.warning)
@@ -0,0 +1,153 @@
+import http.client
+import io
+import json
+import threading
+import time
+import zipfile
+
+import pytest
+
+import edc_engine as engine
+import report_cache
+import run_metrics
+import validation_api as api
+
+
+def _multipart(boundary, fields, files):
+    out = io.BytesIO()
+    for name, value in fields.items():
+        value = value if isinstance(value, bytes) else value.encode()
+        out.write(f'--{boundary}\r\nContent-Disposition: form-data; name="{name}"\r\n\r\n'.encode()
+                  + value + b'\r\n')
+    for name, (filename, content) in files.items():
+        out.write(f'--{boundary}\r\nContent-Disposition: form-data; name="{name}"; '
+                  f'filename="{filename}"\r\n\r\n'.encode() + content + b'\r\n')
+    out.write(f'--{boundary}--\r\n'.encode())
+    return out.getvalue()
+
+
+@pytest.mark.parametrize("chunk_size", [5, 64, 1024 * 1024])
+def test_read_multipart_streams_files_to_workdir(tmp_path, monkeypatch, chunk_size):
+    monkeypatch.setattr(api, 'UPLOAD_CHUNK_SIZE', chunk_size)
+    boundary = "b0undary"
+    spec     = b"PK\x03\x04" + bytes(range(256)) * 40 + b"\r\n--b0undar"   # 구분자와 비슷한 내용 포함
+    body     = _multipart(boundary, {'spec_sheet': 'Spec', 'study': ' ABC '},
+                          {'spec': ('spec.xlsx', spec), 'export': ('export.XLSX', b'export'),
+                           'other': ('x.bin', b'ignored')})
+    rfile = io.BytesIO(body + b'NEXT REQUEST')
+
+    fields, files = api.read_multipart(rfile, f'multipart/form-data; boundary="{boundary}"',
+                                       len(body), str(tmp_path))
+
+    assert fields == {'spec_sheet': 'Spec', 'study': 'ABC'}
+    assert set(files) == {'spec', 'export'}
+    assert open(files['spec'][1], 'rb').read() == spec
+    assert files['export'][1].endswith('export.xlsx')
+    assert rfile.read() == b'NEXT REQUEST'      # Content-Length 이후는 읽지 않음
+
+    params = api.build_job_params(fields, files)
+    assert params['paths'] == {'spec': files['spec'][1], 'export': files['export'][1]}
+    assert params['study'] == 'ABC'
+
+
+def test_read_multipart_rejects_truncated_body(tmp_path):
+    body = b'--b\r\nContent-Disposition: form-data; name="spec"; filename="s.xlsx"\r\n\r\npartial'
+    with pytest.raises(api.ApiError) as err:
+        api.read_multipart(io.BytesIO(body), 'multipart/form-data; boundary=b', len(body), str(tmp_path))
+    assert err.value.status == 400
+
+
+# ── 실제 HTTP 서버 (임의 포트) ─────────────────────────────────
+
+@pytest.fixture
+def server(tmp_path, monkeypatch):
+    monkeypatch.setattr(run_metrics, 'METRICS_LOG_PATH', '')
+    httpd = api.create_server(port=0, workers=1)
+    jobs  = httpd.RequestHandlerClass.jobs
+    jobs.work_root = str(tmp_path / 'work')
+    jobs.cache     = report_cache.ReportCache(str(tmp_path / 'cache'))
+    thread = threading.Thread(target=httpd.serve_forever, daemon=True)
+    thread.start()
+    yield httpd
+    httpd.shutdown()
+    httpd.server_close()
+
+
+def _request(httpd, method, path, fields=None, files=None):
+    """(상태 코드, 응답 본문 bytes) — fields/files가 있으면 multipart 업로드"""
+    conn = http.client.HTTPConnection(*httpd.server_address, timeout=120)
+    try:
+        headers, body = {}, None
+        if fields is not None or files is not None:
+            body = _multipart('b0undary', fields or {}, files or {})
+            headers['Content-Type'] = 'multipart/form-data; boundary=b0undary'
+        conn.request(method, path, body=body, headers=headers)
+        response = conn.getresponse()
+        return response.status, response.read()
+    finally:
+        conn.close()
+
+
+def _upload(study_files, **fields):
+    files = {name: (f'{name}.xlsx', open(study_files[name], 'rb').read()) for name in ('spec', 'export')}
+    return dict({'spec_sheet': 'Spec', 'spec_header': '1', 'cache': '0'}, **fields), files
+
+
+def _wait_status(httpd, job_id, statuses, timeout=120):
+    deadline = time.time() + timeout
+    while time.time() < deadline:
+        status, body = _request(httpd, 'GET', f'/jobs/{job_id}')
+        info = json.loads(body)
+        if info['status'] in statuses:
+            return info
+        time.sleep(0.1)
+    raise AssertionError(f"작업 상태 대기 시간 초과: {info}")
+
+
+def test_http_job_poll_and_download(server, study_files):
+    status, body = _request(server, 'POST', '/jobs', *_upload(study_files))
+    assert status == 202
+    job_id = json.loads(body)['job_id']
+
+    info = _wait_status(server, job_id, {api.JOB_DONE, api.JOB_FAILED})
+    assert info['status'] == api.JOB_DONE and info['summary']['entry_screen']['match'] > 0
+
+    status, report = _request(server, 'GET', f'/jobs/{job_id}/result')
+    assert status == 200
+    assert 'xl/workbook.xml' in zipfile.ZipFile(io.BytesIO(report)).namelist()
+    status, body = _request(server, 'GET', f'/jobs/{job_id}/result?format=json')
+    assert status == 200 and json.loads(body)['summary'] == info['summary']
+
+    # 동기 실행 / 사전 점검
+    status, report = _request(server, 'POST', '/validate', *_upload(study_files))
+    assert status == 200 and report[:2] == b'PK'
+    status, body = _request(server, 'POST', '/preflight', *_upload(study_files))
+    assert status == 200 and json.loads(body)['matched'] > 0
+
+    assert _request(server, 'DELETE', f'/jobs/{job_id}')[0] == 200
+    assert _request(server, 'GET', f'/jobs/{job_id}')[0] == 404
+
+
+def test_http_cancel_running_job(server, study_files, monkeypatch):
+    def blocking_validation(*args, cancel=None, **kwargs):
+        yield engine.progress('read_spec', 0, 1, cancel)
+        while True:
+            cancel.check()
+            time.sleep(0.05)
+
+    monkeypatch.setattr(engine, 'iter_validation', blocking_validation)
+    status, body = _request(server, 'POST', '/jobs', *_upload(study_files))
+    job_id = json.loads(body)['job_id']
+    _wait_status(server, job_id, {api.JOB_RUNNING})
+
+    status, body = _request(server, 'POST', f'/jobs/{job_id}/cancel')
+    assert status == 202 and json.loads(body)['cancel_requested']
+    assert _wait_status(server, job_id, {api.JOB_CANCELLED, api.JOB_DONE, api.JOB_FAILED})['status'] == \
+        api.JOB_CANCELLED
+    assert _request(server, 'GET', f'/jobs/{job_id}/result')[0] == 409
+    assert _request(server, 'POST', f'/jobs/{job_id}/cancel')[0] == 409
+
+
+def test_http_rejects_non_utf8_field(server, study_files):
+    status, body = _request(server, 'POST', '/preflight', *_upload(study_files, study=b'\xff\xfe'))
+    assert status == 400 and 'study' in json.loads(body)['error']
@@ -0,0 +1,79 @@
+import sqlite3
+
+import pandas as pd
+
+import validation_history as history
+
+
+def _merged(rows):
+    """build_comparison() 결과 형태의 최소 프레임 — rows: (DOMAIN, VISIT, ITEM ID, _merge, MISMATCH)"""
+    records = []
+    for domain, visit, item_id, merge, mismatch in rows:
+        doc = merge != 'right_only'
+        edc = merge != 'left_only'
+        records.append({
+            'JOIN_KEY'   : f"{domain}P{visit}{item_id}".replace(' ', '').upper(),
+            'DOMAIN_Doc' : domain if doc else None, 'DOMAIN_EDC' : domain if edc else None,
+            'PAGE_Doc'   : 'P' if doc else None,    'PAGE_EDC'   : 'P' if edc else None,
+            'VISIT_Doc'  : visit if doc else None,  'VISIT_EDC'  : visit if edc else None,
+            'ITEM ID_Doc': item_id if doc else None, 'ITEM ID_EDC': item_id if edc else None,
+            '_merge'     : merge,
+            'MISMATCH'   : mismatch,
+        })
+    return pd.DataFrame(records)
+
+
+def _record(db, study, merged):
+    return history.record_run(str(db), study, {'db': '1.0'}, pd.DataFrame(), merged=merged)
+
+
+def test_lookup_is_case_insensitive_for_item_and_visit(tmp_path):
+    db = tmp_path / "h.db"
+    _record(db, "ABC", _merged([('LB', 'v3 ', 'lborres', 'both', '|TYPE|')]))
+
+    for item_id, visit in (("LBORRES", "V3"), ("lborres", " v3"), ("LbOrRes", None)):
+        assert len(history.item_history(str(db), item_id, visit=visit)) == 1
+    stored = history.item_history(str(db), "lborres")
+    assert stored.loc[0, 'item_id'] == 'LBORRES'
+    assert stored.loc[0, 'visit'] == 'V3'
+
+
+def test_first_failure_returns_earliest_failing_run(tmp_path):
+    db = tmp_path / "h.db"
+    _record(db, "ABC", _merged([('LB', 'V3', 'LBORRES', 'both', '')]))
+    failed = _record(db, "ABC", _merged([('LB', 'V3', 'LBORRES', 'both', '|CODE|')]))
+    _record(db, "ABC", _merged([('LB', 'V3', 'LBORRES', 'left_only', '')]))
+
+    result = history.first_failure(str(db), "lborres", visit="v3")
+    assert len(result) == 1
+    assert int(result.loc[0, 'run_id']) == failed
+    assert result.loc[0, 'status'] == history.STATUS_MISMATCH
+
+
+def test_studies_with_mismatch_filters_by_column_and_item(tmp_path):
+    db = tmp_path / "h.db"
+    _record(db, "ABC", _merged([('AE', 'V1', 'aeterm', 'both', '|TYPE|CODE|')]))
+    _record(db, "XYZ", _merged([('AE', 'V1', 'AETERM', 'both', '|CODE|')]))
+    _record(db, "XYZ", _merged([('LB', 'V1', 'LBORRES', 'both', '|TYPE|')]))
+
+    assert history.studies_with_mismatch(str(db), "type", item_id="AETERM")['study'].tolist() == ["ABC"]
+    assert history.studies_with_mismatch(str(db), "CODE", item_id="aeterm")['study'].tolist() == ["ABC", "XYZ"]
+    assert history.studies_with_mismatch(str(db), "TYPE")['study'].tolist() == ["ABC", "XYZ"]
+
+
+def test_connect_migrates_unnormalized_rows(tmp_path):
+    db = tmp_path / "h.db"
+    with sqlite3.connect(db) as conn:
+        conn.executescript(history.SCHEMA)
+        conn.execute("INSERT INTO runs (study, created_at) VALUES ('ABC', '2024-01-01')")
+        conn.execute("INSERT INTO results (run_id, study, created_at, join_key, visit, item_id, status) "
+                     "VALUES (1, 'ABC', '2024-01-01', 'K', ' v3', 'lborres ', 'left_only')")
+        conn.execute("INSERT INTO result_mismatches (run_id, study, created_at, join_key, item_id, visit, "
+                     "col_name) VALUES (1, 'ABC', '2024-01-01', 'K', 'lborres', 'v3', 'TYPE')")
+    conn.close()
+
+    assert len(history.first_failure(str(db), "LBORRES", visit="V3")) == 1
+    assert history.studies_with_mismatch(str(db), "TYPE", item_id="LBORRES")['study'].tolist() == ["ABC"]
+    with sqlite3.connect(db) as conn:
+        assert conn.execute("PRAGMA user_version").fetchone()[0] == history.SCHEMA_VERSION
+    conn.close()
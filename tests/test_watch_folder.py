@@ -0,0 +1,78 @@
+import os
+import shutil
+import time
+
+import run_metrics
+import watch_folder
+
+
+def _study(folder, study_files, record=False):
+    for name in ('spec', 'export'):
+        shutil.copy(study_files[name], os.path.join(folder, f'{name}.xlsx'))
+    return dict(watch_folder.STUDY_DEFAULTS, study='S1', folder=str(folder), spec='spec.xlsx',
+                spec_sheet='Spec', export_glob='export*.xlsx', export_sheet='Export', record=record)
+
+
+def _watcher(study):
+    logs = []
+    return watch_folder.FolderWatcher([study], settle_s=5, log=logs.append), logs
+
+
+def test_latest_input_waits_for_settled_unchanged_file(tmp_path):
+    watcher, _ = _watcher({})
+    path = tmp_path / 'export_1.xlsx'
+    path.write_bytes(b'not a zip yet')
+    now = time.time()
+
+    assert watcher.latest_input(str(tmp_path), 'export*.xlsx', now) == (None, True)        # 방금 수정됨
+    assert watcher.latest_input(str(tmp_path), 'export*.xlsx', now + 10) == (None, True)   # zip 미완성
+
+    shutil.copy(os.path.join(os.path.dirname(__file__), '..', 'EDC Validation_template.xlsx'), path)
+    assert watcher.latest_input(str(tmp_path), 'export*.xlsx', now + 10) == (None, True)   # 크기 변경
+    assert watcher.latest_input(str(tmp_path), 'export*.xlsx', now + 10) == (str(path), False)
+
+    (tmp_path / '~$export_2.xlsx').write_bytes(b'lock')        # 잠금 파일은 무시
+    assert watcher.latest_input(str(tmp_path), 'export*.xlsx', now + 10) == (str(path), False)
+    assert watcher.latest_input(str(tmp_path), 'dataset*.xlsx', now + 10) == (None, False)
+
+
+def test_poll_runs_once_per_input_state(tmp_path, study_files):
+    study = _study(tmp_path, study_files)
+    watcher, _ = _watcher(study)
+    now = time.time() + 60
+
+    records = watcher.poll(now)
+    assert [r['status'] for r in records] == [run_metrics.STATUS_OK]
+    state = watch_folder.read_state(str(tmp_path))
+    assert state['status'] == run_metrics.STATUS_OK and state['history_error'] is None
+    assert os.path.isfile(tmp_path / state['report'])
+
+    assert watcher.poll(now) == []                             # 입력이 같으면 다시 실행하지 않음
+
+    export = tmp_path / 'export.xlsx'
+    shutil.copy(study_files['spec'], tmp_path / 'export_new.xlsx')   # 잘못된 시트 구성의 새 Export
+    os.utime(tmp_path / 'export_new.xlsx', (now - 30, now - 30))
+    os.utime(export, (now - 40, now - 40))
+    records = watcher.poll(now)                                # 처음 보는 파일 — 경과 시간 충분하면 바로 실행
+    assert [r['status'] for r in records] == [run_metrics.STATUS_INVALID]
+    assert watch_folder.read_state(str(tmp_path))['report'] is None
+    assert watcher.poll(now) == []                             # 실패한 실행도 입력이 바뀔 때까지 재시도 안 함
+
+
+def test_history_failure_keeps_validation_ok(tmp_path, study_files, monkeypatch):
+    study = _study(tmp_path, study_files, record=True)
+    watcher, logs = _watcher(study)
+
+    def fail(*args):
+        raise OSError("database is locked")
+
+    monkeypatch.setattr(watch_folder, 'record_history', fail)
+    [record] = watcher.poll(time.time() + 60)
+
+    assert record['status'] == run_metrics.STATUS_OK and record['error'] is None
+    assert record['counts']['history_failed'] == 1
+    state = watch_folder.read_state(str(tmp_path))
+    assert state['status'] == run_metrics.STATUS_OK
+    assert state['history_error'] == "OSError: database is locked"
+    assert os.path.isfile(tmp_path / state['report'])
+    assert any('이력 저장 실패' in line for line in logs)
@@ -0,0 +1,65 @@
+import io
+
+import pandas as pd
+from openpyxl import Workbook
+
+import xlsx_meta
+
+SHEETS = {'SUBJECT_INFO': (3, 2), 'AE': (40, 12), 'R&D <측정>': (7, 30), 'VS': (1200, 5)}
+
+
+def _workbook(path, write_only):
+    """시트마다 (데이터 행 수, 열 수)가 다른 워크북 — 헤더 1행 포함, 워크북 순서와 시트 파트 번호가 다름"""
+    wb = Workbook(write_only=write_only)
+    if not write_only:
+        wb.remove(wb.active)
+    for name, (rows, cols) in SHEETS.items():
+        ws = wb.create_sheet(name)
+        ws.append([f'C{c}' for c in range(cols)])
+        for r in range(rows):
+            ws.append([r * cols + c for c in range(cols)])
+    if not write_only:
+        wb.move_sheet('VS', offset=-2)          # 파트 번호(sheet4)는 그대로, 워크북 순서만 앞으로
+    wb.save(path)
+    return str(path)
+
+
+def test_meta_matches_pandas_excel_file(tmp_path):
+    path = _workbook(tmp_path / 'dataset.xlsx', False)
+    sheets = xlsx_meta.read_workbook_meta(path)
+
+    with pd.ExcelFile(path) as excel:
+        assert [s.name for s in sheets] == excel.sheet_names
+        for sheet in sheets:
+            df = excel.parse(sheet.name, header=None)
+            assert sheet.max_row == len(df) and sheet.max_col == df.shape[1]
+            assert sheet.part.startswith('xl/worksheets/') and sheet.xml_bytes > 0
+
+    assert xlsx_meta.total_rows(sheets) == sum(rows + 1 for rows, _ in SHEETS.values())
+
+
+def test_missing_dimension_leaves_row_count_unknown(tmp_path):
+    # openpyxl write_only 모드는 <dimension>을 쓰지 않음 — 시트 데이터를 읽어 세지 않고 None으로 둠
+    path = _workbook(tmp_path / 'dataset.xlsx', True)
+    sheets = xlsx_meta.read_workbook_meta(path)
+    with pd.ExcelFile(path) as excel:
+        assert [s.name for s in sheets] == excel.sheet_names
+    assert all(s.dimension is None and s.max_row is None for s in sheets)
+    assert xlsx_meta.total_rows(sheets) == 0
+
+
+def test_sources_bytes_and_file_like(tmp_path):
+    path = _workbook(tmp_path / 'dataset.xlsx', False)
+    with open(path, 'rb') as f:
+        data = f.read()
+    expected = xlsx_meta.read_workbook_meta(path)
+    assert xlsx_meta.read_workbook_meta(data) == expected
+    assert xlsx_meta.read_workbook_meta(io.BytesIO(data)) == expected
+    assert xlsx_meta.sheet_names(path) == ['SUBJECT_INFO', 'VS', 'AE', 'R&D <측정>']
+
+
+def test_parse_dimension():
+    assert xlsx_meta._parse_dimension('A1:Q20003') == (20003, 17)
+    assert xlsx_meta._parse_dimension('$A$1:$AB$9') == (9, 28)
+    assert xlsx_meta._parse_dimension('B2') == (2, 2)
+    assert xlsx_meta._parse_dimension('') == (None, None)
@@ -0,0 +1,74 @@
+import io
+
+from openpyxl import Workbook, load_workbook
+from openpyxl.formatting.rule import FormulaRule
+from openpyxl.styles import Alignment, Border, Font, PatternFill, Side
+
+import edc_engine as engine
+import xlsx_stitch
+
+RED = PatternFill(start_color="FFC7CE", end_color="FFC7CE", fill_type="solid")
+
+
+def _package(fill_donor):
+    wb = Workbook()
+    wb.active.title = 'Keep'
+    wb['Keep']['A1'] = 'base'
+    wb['Keep']['A1'].font = Font(italic=True)
+    ws = wb.create_sheet('Swap')
+    ws['A1'] = 'template'
+    if fill_donor:
+        ws['A2'] = 'donor'
+        ws['A2'].font = Font(bold=True, color="FF0000")
+        ws['A2'].fill = PatternFill(start_color="FFD7E9", end_color="FFD7E9", fill_type="solid")
+        ws['A2'].border = Border(left=Side(style='thick'))
+        ws['A2'].number_format = '0.000%'
+        ws['B2'] = 'plain'
+        ws['B2'].alignment = Alignment(horizontal='center')
+        ws.conditional_formatting.add('A2:B9', FormulaRule(formula=['LEN($A2)>0'], fill=RED))
+    out = io.BytesIO()
+    wb.save(out)
+    return out.getvalue()
+
+
+def test_replace_sheet_remaps_donor_styles():
+    merged = load_workbook(io.BytesIO(
+        xlsx_stitch.replace_sheet(_package(False), _package(True), 'Swap')))
+
+    assert merged['Keep']['A1'].value == 'base' and merged['Keep']['A1'].font.i
+    cell = merged['Swap']['A2']
+    assert cell.value == 'donor'
+    assert cell.font.b and cell.font.color.rgb == "00FF0000"
+    assert cell.fill.start_color.rgb == "00FFD7E9"
+    assert cell.border.left.style == 'thick'
+    assert cell.number_format == '0.000%'
+    assert merged['Swap']['B2'].alignment.horizontal == 'center'
+    (rules,) = [r for _, r in merged['Swap'].conditional_formatting._cf_rules.items()]
+    assert rules[0].formula == ['LEN($A2)>0']
+    assert rules[0].dxf.fill.bgColor.rgb == "00FFC7CE"
+
+
+def _sheet_snapshot(content):
+    wb = load_workbook(io.BytesIO(content))
+    cells = {name: [[(c.value, repr(c.font), repr(c.fill), repr(c.border), repr(c.alignment))
+                     for c in row] for row in wb[name].iter_rows()]
+             for name in ('Entry Screen Validation', 'Data Structure Validation')}
+    return wb.sheetnames, wb.named_styles, cells
+
+
+def test_parallel_report_matches_sequential(study_files, monkeypatch):
+    doc  = engine.open_excel(study_files['spec'])
+    edc  = engine.open_excel(study_files['export'])
+    full = engine.process_data_final(doc, 'Spec', 1)
+    entry, _ = engine.INGEST_ROW_FILTER.split(full)
+    df_edc, _ = engine.read_standardized(edc, 'Export', 0, row_filter=engine.INGEST_ROW_FILTER)
+    long = engine.build_dataset_long(study_files['dataset'], full)
+
+    stitched = []
+    monkeypatch.setattr(xlsx_stitch, 'replace_sheet',
+                        lambda *args, _orig=xlsx_stitch.replace_sheet: stitched.append(1) or _orig(*args))
+    reports = [engine.save_to_template(engine.TEMPLATE_PATH, entry, df_edc, {'db': '1'}, df_doc_full=full,
+                                       df_dataset_long=long, highlight_mode='rules', parallel=parallel)
+               for parallel in (False, True)]
+    assert stitched, "병렬 저장이 순차 저장으로 대체됨 (StitchError)"
+    assert _sheet_snapshot(reports[0].getvalue()) == _sheet_snapshot(reports[1].getvalue())
@@ -0,0 +1,225 @@
+"""
+화면 상호작용 지연 벤치마크 (Streamlit AppTest — 브라우저 없이 같은 프로세스에서 실행)
+
+생성한 DB Spec / EDC Export / CDMS Dataset 워크북(여러 크기)을 bm_app.py에 업로드한 뒤
+사용자가 체감하는 상호작용마다 재실행(rerun) 시간을 측정합니다.
+
+    first_load        : 파일 없이 첫 화면
+    upload            : 세 파일 업로드 → 미리보기 표시
+    header_row        : DB Spec 헤더 행 변경 → 미리보기 갱신
+    sheet_select      : DB Spec 시트 변경 → 미리보기 갱신
+    start_to_download : '검증 시작' 클릭 → 결과 다운로드 버튼 표시
+
+상호작용별 중앙값이 예산(UI_LATENCY_BUDGET_S) 또는 기준 결과(--baseline) 대비 허용 배수를 넘으면
+종료 코드 1로 끝나므로, 엔진 벤치마크처럼 CI에서 화면 경로의 성능 저하를 잡을 수 있습니다.
+
+사용법:
+    python ui_benchmark.py                                   # 기본 크기 측정 + 예산 점검
+    python ui_benchmark.py --sizes 200 5000 --repeat 5 --save-baseline ui_baseline.json
+    python ui_benchmark.py --baseline ui_baseline.json --tolerance 1.3
+"""
+import argparse
+import json
+import os
+import statistics
+import sys
+import tempfile
+import time
+
+APP_DIR    = os.path.dirname(os.path.abspath(__file__))
+APP_SCRIPT = os.path.join(APP_DIR, "bm_app.py")
+XLSX_MIME  = "application/vnd.openxmlformats-officedocument.spreadsheetml.sheet"
+
+# ============================================================
+# [유지보수 포인트] 벤치마크 설정
+#   UI_LATENCY_BUDGET_S: 상호작용 → (기본 초, DB Spec 1,000행당 추가 초)
+#   예산 = 기본 + 행 수 / 1000 × 추가 — 측정 환경이 바뀌면 --baseline 비교를 권장합니다.
+# ============================================================
+BENCH_SIZES  = (200, 2000, 10000)
+BENCH_REPEAT = 3
+
+UI_LATENCY_BUDGET_S = {
+    'first_load'       : (3.0, 0.0),
+    'upload'           : (5.0, 0.5),
+    'header_row'       : (2.0, 0.2),
+    'sheet_select'     : (2.0, 0.2),
+    'start_to_download': (10.0, 4.0),
+}
+
+BASELINE_TOLERANCE = 1.3    # 기준 결과 대비 허용 배수
+BASELINE_SLACK_S   = 0.2    # 짧은 상호작용의 측정 잡음 허용치(초)
+
+APP_TIMEOUT_S = 1800
+
+
+# ============================================================
+# 1. 벤치마크용 워크북 생성
+# ============================================================
+
+def generate_workbooks(rows: int, folder: str) -> dict:
+    """
+    rows 행 규모의 DB Spec(제목 1행 + 헤더 1행, 'Spec'/'Other' 시트), EDC Export, CDMS Dataset 생성.
+    Export는 일부 값 변경 / 누락 / 추가 행을 넣어 비교 결과가 비어 있지 않게 만듭니다.
+    """
+    import pandas as pd
+
+    domains = ['DM', 'AE', 'LB', 'VS', 'CM', 'MH']
+    spec = pd.DataFrame([{
+        'DOMAIN': d, 'DOMAIN LABEL': f'{d} label', 'PAGE': f'{d}_P', 'PAGE LABEL': f'Page {d}',
+        'VISIT': f'V{i % 5}', 'ITEM ID': f'{d}ITEM{i}', 'ITEM LABEL': f'Label {i}', 'ITEM SEQ': str(i),
+        'VERSION': '1', 'CODE': '1=Yes;2=No' if i % 7 == 0 else '',
+        'LAYOUT': 'SYS_HDR' if i % 11 == 0 else 'STD', 'TYPE': 'integer' if i % 3 == 0 else 'text',
+        'MAX_LEN': '10', 'MIN_VAL': '0', 'MAX_VAL': '100',
+    } for i, d in ((i, domains[i % len(domains)]) for i in range(rows))])
+
+    export = spec.copy()
+    export.loc[export.index % 97 == 3, 'ITEM LABEL'] = 'changed'
+    export.loc[export.index % 89 == 7, 'CODE'] = '2=No; 1=Yes'
+    export = export[export.index % 101 != 5]
+    export = pd.concat([export, spec.head(1).assign(**{'ITEM ID': 'EXTRA1'})], ignore_index=True)
+    export = export.rename(columns={'ITEM ID': 'VARIABLE', 'PAGE': 'FORM'})
+
+    paths = {name: os.path.join(folder, f"{name}_{rows}.xlsx") for name in ('spec', 'export', 'dataset')}
+    with pd.ExcelWriter(paths['spec']) as writer:
+        pd.DataFrame([['DB Specification']]).to_excel(writer, sheet_name='Spec', index=False, header=False)
+        spec.to_excel(writer, sheet_name='Spec', index=False, startrow=1)
+        spec.head(3).to_excel(writer, sheet_name='Other', index=False)
+    export.to_excel(paths['export'], sheet_name='Export', index=False)
+
+    subjects = [f'S{k}' for k in range(20)]
+    with pd.ExcelWriter(paths['dataset']) as writer:
+        pd.DataFrame({'SUBJID:Subject': subjects}).to_excel(writer, sheet_name='SUBJECT_INFO', index=False)
+        for d in domains:
+            data = {'SUBJID:Subject': subjects}
+            for j, item in enumerate(spec.loc[spec['DOMAIN'] == d, 'ITEM ID']):
+                data[f'{item}:label'] = ([None] * 20 if j % 4 == 0 else
+                                         [str(k * 3) if k % 2 else None for k in range(20)] if j % 4 == 1 else
+                                         [k * 1.5 for k in range(20)])
+            pd.DataFrame(data).to_excel(writer, sheet_name=d, index=False)
+    return paths
+
+
+# ============================================================
+# 2. 상호작용 측정
+# ============================================================
+
+def _timed_run(at, samples: dict, name: str):
+    t0 = time.perf_counter()
+    at.run()
+    samples.setdefault(name, []).append(time.perf_counter() - t0)
+    if at.exception:
+        raise RuntimeError(f"{name}: 앱 실행 중 예외 — {at.exception[0].value}")
+
+
+def _timed_validation(at, samples: dict, name: str):
+    """'검증 시작' 클릭 재실행 + 백그라운드 검증(BackgroundRun) 완료 후 결과를 표시하는 재실행까지의 시간"""
+    t0 = time.perf_counter()
+    at.run()
+    if 'validation_run' in at.session_state:
+        at.session_state['validation_run'].done.wait(APP_TIMEOUT_S)
+        at.run()
+    samples.setdefault(name, []).append(time.perf_counter() - t0)
+    if at.exception:
+        raise RuntimeError(f"{name}: 앱 실행 중 예외 — {at.exception[0].value}")
+
+
+def measure_session(paths: dict, repeat: int = BENCH_REPEAT) -> dict:
+    """한 세션에서 상호작용 순서대로 실행하며 {상호작용: [초, ...]} 반환"""
+    from streamlit.testing.v1 import AppTest
+
+    samples = {}
+    at = AppTest.from_file(APP_SCRIPT, default_timeout=APP_TIMEOUT_S)
+    _timed_run(at, samples, 'first_load')
+
+    for key, field in (('doc', 'spec'), ('edc', 'export'), ('dataset', 'dataset')):
+        with open(paths[field], 'rb') as f:
+            at.file_uploader(key=key).upload(os.path.basename(paths[field]), f.read(), XLSX_MIME)
+    _timed_run(at, samples, 'upload')
+
+    for _ in range(repeat):
+        at.number_input(key="h1").set_value(2)
+        _timed_run(at, samples, 'header_row')
+        at.number_input(key="h1").set_value(1)
+        _timed_run(at, samples, 'header_row')
+
+        at.selectbox(key="s1").set_value('Other')
+        _timed_run(at, samples, 'sheet_select')
+        at.selectbox(key="s1").set_value('Spec')
+        _timed_run(at, samples, 'sheet_select')
+
+        start = next(b for b in at.button if b.label.startswith("🚀"))
+        start.click()
+        _timed_validation(at, samples, 'start_to_download')
+        if not at.get('download_button'):
+            raise RuntimeError("start_to_download: 결과 다운로드 버튼이 표시되지 않았습니다.")
+    return samples
+
+
+# ============================================================
+# 3. 예산 / 기준 결과 비교
+# ============================================================
+
+def summarize(results: dict) -> list:
+    """{행 수: {상호작용: [초]}} → [{'rows', 'interaction', 'median_s', 'max_s', 'n'}]"""
+    return [{'rows': rows, 'interaction': name, 'median_s': round(statistics.median(values), 4),
+             'max_s': round(max(values), 4), 'n': len(values)}
+            for rows, samples in results.items() for name, values in samples.items()]
+
+
+def check_regressions(records: list, baseline: list = None, tolerance: float = BASELINE_TOLERANCE) -> list:
+    """예산 초과 / 기준 결과 대비 저하 항목 → [(record, 한도 초, 사유)]"""
+    base = {(r['rows'], r['interaction']): r['median_s'] for r in baseline or []}
+    failures = []
+    for record in records:
+        key = (record['rows'], record['interaction'])
+        if key in base:
+            limit, reason = base[key] * tolerance + BASELINE_SLACK_S, f"기준 {base[key]:.2f}s × {tolerance}"
+        elif record['interaction'] in UI_LATENCY_BUDGET_S:
+            fixed, per_1k = UI_LATENCY_BUDGET_S[record['interaction']]
+            limit, reason = fixed + per_1k * record['rows'] / 1000, "예산"
+        else:
+            continue
+        if record['median_s'] > limit:
+            failures.append((record, round(limit, 3), reason))
+    return failures
+
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(description="EDC Validation 화면 상호작용 지연 벤치마크")
+    parser.add_argument("--sizes", type=int, nargs="+", default=list(BENCH_SIZES), help="DB Spec 행 수")
+    parser.add_argument("--repeat", type=int, default=BENCH_REPEAT)
+    parser.add_argument("--baseline", help="기준 결과 JSON (--save-baseline으로 저장한 파일)")
+    parser.add_argument("--tolerance", type=float, default=BASELINE_TOLERANCE)
+    parser.add_argument("--save-baseline", help="이번 측정 결과를 기준 결과 JSON으로 저장")
+    args = parser.parse_args(argv)
+
+    # 상대 경로 자원(템플릿, 이미지)을 찾을 수 있도록 앱 폴더에서 실행
+    os.chdir(APP_DIR)
+    results = {}
+    with tempfile.TemporaryDirectory(prefix="edc_ui_bench_") as folder:
+        for rows in args.sizes:
+            paths = generate_workbooks(rows, folder)
+            results[rows] = measure_session(paths, args.repeat)
+            print(f"[{rows:,}행] " + ", ".join(f"{name} {statistics.median(v):.2f}s"
+                                              for name, v in results[rows].items()), flush=True)
+
+    records = summarize(results)
+    if args.save_baseline:
+        with open(args.save_baseline, 'w', encoding='utf-8') as f:
+            json.dump(records, f, ensure_ascii=False, indent=2)
+
+    baseline = None
+    if args.baseline:
+        with open(args.baseline, encoding='utf-8') as f:
+            baseline = json.load(f)
+    failures = check_regressions(records, baseline, args.tolerance)
+    for record, limit, reason in failures:
+        print(f"❌ {record['rows']:,}행 {record['interaction']}: {record['median_s']:.2f}s > "
+              f"{limit:.2f}s ({reason})", flush=True)
+    if not failures:
+        print("✅ 모든 상호작용이 한도 이내입니다.", flush=True)
+    return 1 if failures else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
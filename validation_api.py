@@ -0,0 +1,690 @@
+"""
+EDC Validation HTTP API
+
+Streamlit 화면 없이 검증을 호출하기 위한 표준 라이브러리 기반 HTTP 서비스입니다.
+(CDMS 배포 후 빌드 파이프라인에서 자동 호출하는 용도)
+
+엔드포인트:
+    GET    /health                 상태 / 작업 수
+    GET    /metrics                실행 지표 (Prometheus 텍스트 형식, run_metrics)
+    POST   /validate[?format=json] 동기 실행 — 완료 후 결과 XLSX(기본) 또는 JSON을 스트리밍
+    POST   /preflight              사전 점검 — 키 수준 일치 건수만 JSON으로 (preflight, 검증 작업과 같은 워커 풀 / 대기열 한도)
+    POST   /jobs                   비동기 작업 등록 → 202 + job_id
+    GET    /jobs                   작업 목록
+    GET    /jobs/<id>              작업 상태
+    GET    /jobs/<id>/result[?format=json]  완료된 작업 결과 스트리밍
+    POST   /jobs/<id>/cancel       실행 중/대기 작업 중지 요청 → 202 (다음 청크 경계에서 중단)
+    DELETE /jobs/<id>              작업/결과 삭제
+
+업로드 (multipart/form-data):
+    파일  : spec (필수), export (필수), dataset (선택)
+    필드  : spec_sheet, spec_header(기본 1), export_sheet, export_header(기본 0),
+            study, blank_ver, db_ver, annotated_ver (기본 1.0), record(1이면 검증 이력 저장),
+            cache(기본 1, 0이면 저장된 결과를 쓰지 않고 다시 실행)
+    시트명을 생략하면 첫 번째 시트를 사용합니다.
+    업로드 본문은 UPLOAD_CHUNK_SIZE 단위로 읽어 파일 파트를 작업 폴더에 바로 기록하므로
+    (메모리에 본문 전체를 올리지 않음) 엔진에는 파일 경로가 전달됩니다.
+    DB Spec이 여러 시트로 나뉘어 있으면 spec_sheets에 시트명을 줄바꿈으로 구분해 넣습니다
+    (spec_sheet 대신 사용, 헤더 행은 spec_header 공통 — 조각 간 중복 키는 'Spec Duplicates' 시트로 보고).
+
+리포트 캐시 (report_cache):
+    같은 입력 조합의 결과가 캐시에 있으면 파이프라인을 건너뛰고 저장된 리포트와 결과 DataFrame을 사용합니다.
+    캐시에서 온 작업도 XLSX / format=json 결과를 모두 제공하고, record=1이면 검증 이력도 저장합니다
+    (작업 상태의 cached 값으로 구분).
+
+실행 / 로컬 파일로 확인:
+    python validation_api.py --port 8600 --workers 2
+    curl -F spec=@spec.xlsx -F export=@export.xlsx -F dataset=@dataset.xlsx \\
+         -F spec_sheet=Spec -o report.xlsx http://127.0.0.1:8600/validate
+    curl -F spec=@spec.xlsx -F export=@export.xlsx http://127.0.0.1:8600/jobs
+    curl http://127.0.0.1:8600/jobs/<id>/result?format=json
+"""
+import argparse
+import email.policy
+import io
+import json
+import os
+import shutil
+import tempfile
+import threading
+import time
+import uuid
+from concurrent.futures import ThreadPoolExecutor
+from email.message import Message
+from email.parser import BytesParser
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qs, urlsplit
+
+import edc_engine as engine
+import preflight
+import report_cache
+import run_metrics
+
+# ============================================================
+# [유지보수 포인트] API 서버 설정 (환경변수로 덮어쓰기 가능)
+# ============================================================
+API_WORKERS        = int(os.environ.get("EDC_API_WORKERS", "2"))      # 동시 실행 검증 수
+API_MAX_PENDING    = int(os.environ.get("EDC_API_MAX_PENDING", "8"))  # 대기열 상한 (초과 시 503)
+API_MAX_UPLOAD_MB  = int(os.environ.get("EDC_API_MAX_UPLOAD_MB", "2048"))
+API_JOB_TTL        = int(os.environ.get("EDC_API_JOB_TTL", "3600"))   # 완료 작업 결과 보관 시간(초)
+API_SYNC_TIMEOUT   = int(os.environ.get("EDC_API_SYNC_TIMEOUT", "1800"))
+API_WORK_ROOT      = os.path.join(tempfile.gettempdir(), "edc_validation_api")
+
+STREAM_CHUNK_SIZE  = 64 * 1024
+UPLOAD_CHUNK_SIZE  = 1024 * 1024       # 업로드 본문을 읽는 단위 (파일 파트는 이 단위로 디스크에 기록)
+MULTIPART_FIELD_LIMIT = 1024 * 1024    # 파일이 아닌 필드 / 파트 헤더 최대 크기
+JSON_RECORD_CHUNK  = 2000   # JSON 스트리밍 시 한 번에 변환하는 행 수
+
+XLSX_MIME = "application/vnd.openxmlformats-officedocument.spreadsheetml.sheet"
+UPLOAD_FIELDS = ('spec', 'export', 'dataset')
+
+JOB_QUEUED  = 'queued'
+JOB_RUNNING = 'running'
+JOB_DONE    = 'done'
+JOB_FAILED  = 'failed'
+JOB_CANCELLED = 'cancelled'
+
+
+class ApiError(Exception):
+    """HTTP 상태 코드와 함께 클라이언트에 전달할 오류"""
+
+    def __init__(self, status, message):
+        super().__init__(message)
+        self.status = status
+
+
+# ============================================================
+# 1. 요청 파싱
+# ============================================================
+
+class _MultipartStream:
+    """
+    multipart 본문을 UPLOAD_CHUNK_SIZE 단위로 읽으며 구분자(boundary)를 찾는 리더.
+    파일 파트는 구분자 길이만큼만 버퍼에 남기고 바로 디스크로 흘려보내므로
+    업로드 크기와 관계없이 메모리에는 청크 하나 정도만 유지합니다.
+    """
+
+    def __init__(self, rfile, length):
+        self.rfile     = rfile
+        self.remaining = length
+        self.buf       = bytearray()
+
+    def _fill(self) -> bool:
+        if self.remaining <= 0:
+            return False
+        data = self.rfile.read(min(UPLOAD_CHUNK_SIZE, self.remaining))
+        if not data:
+            raise ApiError(400, "업로드 본문이 Content-Length보다 짧습니다.")
+        self.remaining -= len(data)
+        self.buf += data
+        return True
+
+    def read_until(self, marker: bytes, sink=None, limit=MULTIPART_FIELD_LIMIT) -> bytes:
+        """
+        marker 앞까지 읽고 marker는 버립니다.
+        sink가 있으면 내용을 sink.write()로 흘려보내고 b''를, 없으면 내용을 반환합니다(limit bytes 이하).
+        """
+        keep, start = len(marker) - 1, 0
+        while True:
+            idx = self.buf.find(marker, start)
+            if idx >= 0:
+                data = bytes(self.buf[:idx])
+                del self.buf[:idx + len(marker)]
+                if sink is None:
+                    return data
+                sink.write(data)
+                return b''
+            if sink is not None and len(self.buf) > keep:
+                sink.write(self.buf[:len(self.buf) - keep])
+                del self.buf[:len(self.buf) - keep]
+            elif sink is None and len(self.buf) > limit:
+                raise ApiError(413, f"multipart 필드/헤더가 너무 깁니다 ({limit:,} bytes 초과).")
+            start = max(0, len(self.buf) - keep)
+            if not self._fill():
+                raise ApiError(400, "multipart 본문이 끝 구분자 없이 끝났습니다.")
+
+    def drain(self):
+        """남은 본문(에필로그)을 읽어 버림 — keep-alive 연결의 다음 요청과 섞이지 않도록"""
+        self.buf.clear()
+        while self._fill():
+            self.buf.clear()
+
+    def read_exact(self, size: int) -> bytes:
+        while len(self.buf) < size:
+            if not self._fill():
+                raise ApiError(400, "multipart 본문이 끝 구분자 없이 끝났습니다.")
+        data = bytes(self.buf[:size])
+        del self.buf[:size]
+        return data
+
+
+class _Discard:
+    def write(self, data):
+        pass
+
+
+def read_multipart(rfile, content_type: str, length: int, workdir: str):
+    """
+    multipart/form-data 본문을 rfile에서 스트리밍으로 읽어 (필드 dict, 파일 dict{name: (filename, path)})로 분리.
+    UPLOAD_FIELDS 파일은 workdir/<필드명><확장자>로 청크 단위 기록하고, 그 외 파일 파트는 버립니다.
+    """
+    if not content_type.lower().startswith('multipart/form-data'):
+        raise ApiError(415, "multipart/form-data 형식으로 업로드해 주세요.")
+    header = Message()
+    header['Content-Type'] = content_type
+    boundary = header.get_param('boundary')
+    if not boundary:
+        raise ApiError(400, "multipart 본문을 해석할 수 없습니다. (boundary 없음)")
+
+    stream    = _MultipartStream(rfile, length)
+    delimiter = b"--" + boundary.encode('latin-1')
+    stream.read_until(delimiter, sink=_Discard())              # 프리앰블
+    fields, files = {}, {}
+    while stream.read_exact(2) == b"\r\n":
+        part = BytesParser(policy=email.policy.HTTP).parsebytes(stream.read_until(b"\r\n\r\n") + b"\r\n\r\n")
+        name     = part.get_param('name', header='content-disposition')
+        filename = part.get_filename()
+        if filename is None:
+            value = stream.read_until(b"\r\n" + delimiter)
+            if name:
+                try:
+                    fields[name] = value.decode('utf-8').strip()
+                except UnicodeDecodeError:
+                    raise ApiError(400, f"'{name}' 필드는 UTF-8 텍스트여야 합니다.")
+        elif name in UPLOAD_FIELDS:
+            ext  = os.path.splitext(filename)[1].lower() or '.xlsx'
+            path = os.path.join(workdir, f"{name}{ext}")
+            with open(path, 'wb') as f:
+                stream.read_until(b"\r\n" + delimiter, sink=f)
+            files[name] = (filename, path)
+        else:
+            stream.read_until(b"\r\n" + delimiter, sink=_Discard())
+    stream.drain()
+    return fields, files
+
+
+def _int_field(fields, name, default):
+    value = fields.get(name, '')
+    if value == '':
+        return default
+    try:
+        return int(value)
+    except ValueError:
+        raise ApiError(400, f"'{name}' 값은 정수여야 합니다: {value}")
+
+
+def build_job_params(fields: dict, files: dict) -> dict:
+    """업로드 필드/파일(read_multipart 결과)을 검증 실행 파라미터로 변환 (필수값 누락 시 400)"""
+    missing = [f for f in ('spec', 'export') if f not in files or not os.path.getsize(files[f][1])]
+    if missing:
+        raise ApiError(400, f"필수 파일 누락: {', '.join(missing)}")
+    return {
+        'spec_sheet'   : ([s.strip() for s in fields['spec_sheets'].splitlines() if s.strip()]
+                          if fields.get('spec_sheets') else fields.get('spec_sheet') or None),
+        'spec_header'  : _int_field(fields, 'spec_header', 1),
+        'export_sheet' : fields.get('export_sheet') or None,
+        'export_header': _int_field(fields, 'export_header', 0),
+        'study'        : fields.get('study') or os.path.splitext(files['spec'][0])[0],
+        'ver_info'     : {'blank'    : fields.get('blank_ver') or '1.0',
+                          'db'       : fields.get('db_ver') or '1.0',
+                          'annotated': fields.get('annotated_ver') or '1.0'},
+        'record'       : fields.get('record', '').lower() in ('1', 'true', 'yes'),
+        'cache'        : fields.get('cache', '1').lower() not in ('0', 'false', 'no'),
+        'file_names'   : {k: v[0] for k, v in files.items() if k in UPLOAD_FIELDS},
+        'paths'        : {k: v[1] for k, v in files.items() if os.path.getsize(v[1])},
+    }
+
+
+# ============================================================
+# 2. 작업 관리 (제한된 워커 풀 + 대기열)
+# ============================================================
+
+class Job:
+    def __init__(self, params, workdir):
+        self.job_id      = uuid.uuid4().hex
+        self.params      = params
+        self.workdir     = workdir
+        self.status      = JOB_QUEUED
+        self.error       = None
+        self.error_code  = None
+        self.result      = None
+        self.created_at  = time.time()
+        self.started_at  = None
+        self.finished_at = None
+        self.done        = threading.Event()
+        self.cancel      = engine.CancelToken()
+        self.progress    = None     # 마지막 engine.Progress
+
+    def describe(self) -> dict:
+        info = {
+            'job_id'     : self.job_id,
+            'status'     : self.status,
+            'study'      : self.params['study'],
+            'files'      : self.params['file_names'],
+            'created_at' : self.created_at,
+            'started_at' : self.started_at,
+            'finished_at': self.finished_at,
+        }
+        if self.status == JOB_RUNNING and self.progress is not None:
+            stage = self.progress.stage
+            info['progress'] = {'stage'   : stage,
+                                'label'   : engine.PIPELINE_STAGES[stage],
+                                'done'    : self.progress.done,
+                                'total'   : self.progress.total,
+                                'fraction': round(engine.pipeline_fraction(self.progress), 4)}
+        if self.status in (JOB_FAILED, JOB_CANCELLED):
+            info['error'] = self.error
+        if self.status == JOB_DONE:
+            info['summary'] = self.result['summary']
+            info['cached']  = bool(self.result.get('cached'))
+        return info
+
+
+class JobManager:
+    """
+    검증 작업 실행기.
+    워커 수(API_WORKERS)만큼만 동시에 실행하고, 실행+대기 작업이 한도를 넘으면 503으로 거절합니다.
+    완료된 작업 결과는 API_JOB_TTL 동안 메모리에 보관 후 정리합니다.
+    """
+
+    def __init__(self, workers=API_WORKERS, max_pending=API_MAX_PENDING,
+                 ttl=API_JOB_TTL, work_root=API_WORK_ROOT):
+        self.workers   = workers
+        self.ttl       = ttl
+        self.work_root = work_root
+        self._pool     = ThreadPoolExecutor(max_workers=workers, thread_name_prefix="edc-job")
+        self._slots    = threading.BoundedSemaphore(workers + max_pending)
+        self._jobs     = {}
+        self._lock     = threading.Lock()
+        self.cache     = report_cache.ReportCache()
+
+    def new_workdir(self) -> str:
+        """업로드를 기록할 작업 폴더 (submit()에 넘기면 작업 종료 시 삭제)"""
+        workdir = os.path.join(self.work_root, uuid.uuid4().hex)
+        os.makedirs(workdir, exist_ok=True)
+        return workdir
+
+    def submit(self, params: dict, workdir: str) -> Job:
+        """params['paths']의 업로드 파일(workdir 안)로 작업 등록 — 거절되면 workdir을 삭제"""
+        self._expire()
+        if not self._slots.acquire(blocking=False):
+            shutil.rmtree(workdir, ignore_errors=True)
+            raise ApiError(503, "검증 대기열이 가득 찼습니다. 잠시 후 다시 시도해 주세요.")
+        try:
+            job = Job(params, workdir)
+            with self._lock:
+                self._jobs[job.job_id] = job
+            self._pool.submit(self._execute, job)
+            return job
+        except Exception:
+            self._slots.release()
+            shutil.rmtree(workdir, ignore_errors=True)
+            raise
+
+    def preflight(self, params: dict, workdir: str) -> dict:
+        """
+        사전 점검 — 검증 작업과 같은 대기열 한도(503) / 워커 풀에서 실행하고 결과를 기다림.
+        작업이 끝나거나 거절되면 workdir을 삭제합니다.
+        """
+        if not self._slots.acquire(blocking=False):
+            shutil.rmtree(workdir, ignore_errors=True)
+            raise ApiError(503, "검증 대기열이 가득 찼습니다. 잠시 후 다시 시도해 주세요.")
+        try:
+            future = self._pool.submit(self._execute_preflight, params, workdir)
+        except Exception:
+            self._slots.release()
+            shutil.rmtree(workdir, ignore_errors=True)
+            raise
+        try:
+            return future.result(timeout=API_SYNC_TIMEOUT)
+        except TimeoutError:
+            raise ApiError(504, "사전 점검 시간 초과")
+
+    def _execute_preflight(self, params: dict, workdir: str) -> dict:
+        p = params
+        try:
+            return preflight.preflight(p['paths']['spec'], p['spec_sheet'], p['spec_header'],
+                                       p['paths']['export'], p['export_sheet'], p['export_header'])
+        except engine.ValidationInputError as e:
+            raise ApiError(422, str(e))
+        except Exception as e:
+            raise ApiError(500, f"{type(e).__name__}: {e}")
+        finally:
+            shutil.rmtree(workdir, ignore_errors=True)
+            self._slots.release()
+
+    def _execute(self, job: Job):
+        job.status, job.started_at = JOB_RUNNING, time.time()
+        p = job.params
+        metrics = run_metrics.RunMetrics('api', inputs=p['paths'])
+        try:
+            job.cancel.check()      # 대기 중에 중지된 작업
+            key = self._cache_key(p)
+            cached = self.cache.get(key) if key and p['cache'] else None
+            if cached is not None:
+                report, meta, frames = cached
+                result = dict(frames, report=io.BytesIO(report), summary=meta.get('summary'), cached=True)
+                metrics.count(cache_hit=1, report_bytes=len(report))
+                if p['record']:
+                    self._record_history(p, result, metrics)
+                job.result, job.status = result, JOB_DONE
+                metrics.finish(run_metrics.STATUS_OK)
+                return
+            steps = engine.iter_validation(
+                p['paths']['spec'], p['spec_sheet'], p['spec_header'],
+                p['paths']['export'], p['export_sheet'], p['export_header'],
+                dataset_source=p['paths'].get('dataset'), ver_info=p['ver_info'], metrics=metrics,
+                cancel=job.cancel,
+            )
+            while True:
+                try:
+                    job.progress = next(steps)
+                except StopIteration as stop:
+                    result = stop.value
+                    break
+            result['summary'] = engine.summarize_result(result)
+            if p['record']:
+                self._record_history(p, result, metrics)
+            if key:
+                self.cache.put(key, result['report'].getvalue(), {'summary': result['summary'], 'source': 'api'},
+                               result)
+            job.result, job.status = result, JOB_DONE
+            metrics.finish(run_metrics.STATUS_OK)
+        except engine.ValidationInputError as e:
+            job.error, job.error_code, job.status = str(e), 422, JOB_FAILED
+            metrics.finish(run_metrics.STATUS_INVALID, job.error)
+        except engine.ValidationCancelled as e:
+            job.error, job.error_code, job.status = str(e), 409, JOB_CANCELLED
+            metrics.finish(run_metrics.STATUS_CANCELLED, job.error)
+        except Exception as e:
+            job.error, job.error_code, job.status = f"{type(e).__name__}: {e}", 500, JOB_FAILED
+            metrics.finish(run_metrics.STATUS_FAILED, job.error)
+        finally:
+            job.finished_at = time.time()
+            shutil.rmtree(job.workdir, ignore_errors=True)
+            self._slots.release()
+            job.done.set()
+
+    @staticmethod
+    def _record_history(p, result, metrics):
+        import validation_history
+        with metrics.stage('history'):
+            validation_history.record_run(
+                validation_history.HISTORY_DB_PATH, p['study'], p['ver_info'],
+                df_spec=result['df_doc_full'], df_export=result['df_edc'],
+                df_dataset_long=result['df_dataset_long'], merged=result['merged'],
+                meta={'spec_file'   : p['file_names'].get('spec'),
+                      'export_file' : p['file_names'].get('export'),
+                      'dataset_file': p['file_names'].get('dataset'),
+                      'source'      : 'api'},
+            )
+
+    def _cache_key(self, p):
+        if not self.cache.enabled:
+            return None
+        try:
+            return report_cache.cache_key(p['paths']['spec'], p['spec_sheet'], p['spec_header'],
+                                          p['paths']['export'], p['export_sheet'], p['export_header'],
+                                          dataset_path=p['paths'].get('dataset'), ver_info=p['ver_info'])
+        except OSError:
+            return None
+
+    def get(self, job_id) -> Job:
+        self._expire()
+        with self._lock:
+            job = self._jobs.get(job_id)
+        if job is None:
+            raise ApiError(404, f"작업을 찾을 수 없습니다: {job_id}")
+        return job
+
+    def cancel(self, job_id) -> Job:
+        """중지 요청 — 실행 중인 작업은 다음 청크 경계에서, 대기 중인 작업은 시작 시점에 중단"""
+        job = self.get(job_id)
+        if job.done.is_set():
+            raise ApiError(409, f"이미 종료된 작업입니다 (status={job.status}).")
+        job.cancel.cancel()
+        return job
+
+    def delete(self, job_id):
+        job = self.get(job_id)
+        if not job.done.is_set():
+            raise ApiError(409, "실행 중인 작업은 삭제할 수 없습니다.")
+        with self._lock:
+            self._jobs.pop(job_id, None)
+
+    def list(self) -> list:
+        self._expire()
+        with self._lock:
+            return [job.describe() for job in self._jobs.values()]
+
+    def counts(self) -> dict:
+        with self._lock:
+            statuses = [job.status for job in self._jobs.values()]
+        return {s: statuses.count(s)
+                for s in (JOB_QUEUED, JOB_RUNNING, JOB_DONE, JOB_FAILED, JOB_CANCELLED)}
+
+    def _expire(self):
+        now = time.time()
+        with self._lock:
+            for job_id in [j.job_id for j in self._jobs.values()
+                           if j.finished_at and now - j.finished_at > self.ttl]:
+                del self._jobs[job_id]
+
+
+# ============================================================
+# 3. 결과 직렬화 (XLSX / JSON 스트리밍)
+# ============================================================
+
+def iter_report_chunks(report: bytes):
+    view = memoryview(report)
+    for start in range(0, len(view), STREAM_CHUNK_SIZE):
+        yield view[start:start + STREAM_CHUNK_SIZE]
+
+
+def _entry_screen_frame(merged):
+    """build_comparison 결과를 행 단위 JSON용 프레임으로 변환 (키 컬럼은 DB Spec 값 우선)"""
+    out = merged[[]].copy()
+    for c in engine.EXPLORER_KEY_COLS:
+        out[c] = merged[f"{c}_Doc"].fillna(merged[f"{c}_EDC"]).fillna('')
+    status = merged['_merge'].astype(str)
+    out['STATUS']    = status.where(~((status == 'both') & (merged['MISMATCH'] != '')), 'mismatch')
+    out['MISMATCH']  = merged['MISMATCH'].str.strip('|').str.split('|').map(lambda v: [c for c in v if c])
+    out['CODE_DIFF'] = merged['CODE_DIFF']
+    for side, label in (('_Doc', 'SPEC'), ('_EDC', 'EXPORT')):
+        cols = [c for c in engine.ENTRY_COMPARE_COLS if f"{c}{side}" in merged.columns]
+        vals = merged[[f"{c}{side}" for c in cols]]
+        out[label] = [dict(zip(cols, row)) for row in vals.astype(object).where(vals.notna(), None).values]
+    return out
+
+
+def _iter_json_records(df):
+    """DataFrame을 JSON_RECORD_CHUNK 행씩 잘라 레코드 JSON 문자열로 변환"""
+    for start in range(0, len(df), JSON_RECORD_CHUNK):
+        part = df.iloc[start:start + JSON_RECORD_CHUNK]
+        part = part.astype(object).where(part.notna(), None)
+        yield ",".join(json.dumps(rec, ensure_ascii=False) for rec in part.to_dict('records'))
+
+
+def iter_result_json(job: Job):
+    """결과 JSON을 조각 단위로 생성 (전체 문서를 메모리에 한 번에 만들지 않음)"""
+    result = job.result
+    head   = {'job_id': job.job_id, 'study': job.params['study'], 'summary': result['summary']}
+    yield json.dumps(head, ensure_ascii=False)[:-1] + ', "entry_screen": ['
+
+    first = True
+    for piece in _iter_json_records(_entry_screen_frame(result['merged'])):
+        yield piece if first else "," + piece
+        first = False
+    yield '], "data_structure": '
+
+    ds = result['df_dataset_long']
+    if ds is None:
+        yield 'null}'
+        return
+    yield '['
+    first = True
+    for piece in _iter_json_records(ds):
+        yield piece if first else "," + piece
+        first = False
+    yield ']}'
+
+
+# ============================================================
+# 4. HTTP 처리
+# ============================================================
+
+class ValidationRequestHandler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"
+    server_version   = "EDCValidationAPI/1.0"
+    jobs: JobManager = None
+
+    # ── 응답 헬퍼 ─────────────────────────────────────────────
+    def _send_json(self, status, payload):
+        body = json.dumps(payload, ensure_ascii=False).encode('utf-8')
+        self.send_response(status)
+        self.send_header('Content-Type', 'application/json; charset=utf-8')
+        self.send_header('Content-Length', str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def _send_stream(self, content_type, chunks, headers=None):
+        """Transfer-Encoding: chunked 로 결과를 조각 단위 전송"""
+        self.send_response(200)
+        self.send_header('Content-Type', content_type)
+        self.send_header('Transfer-Encoding', 'chunked')
+        for key, value in (headers or {}).items():
+            self.send_header(key, value)
+        self.end_headers()
+
+        buffer = bytearray()
+        for chunk in chunks:
+            buffer += chunk.encode('utf-8') if isinstance(chunk, str) else chunk
+            if len(buffer) >= STREAM_CHUNK_SIZE:
+                self.wfile.write(b"%X\r\n%s\r\n" % (len(buffer), bytes(buffer)))
+                buffer.clear()
+        if buffer:
+            self.wfile.write(b"%X\r\n%s\r\n" % (len(buffer), bytes(buffer)))
+        self.wfile.write(b"0\r\n\r\n")
+
+    def _send_result(self, job: Job, fmt: str):
+        if not job.done.is_set():
+            raise ApiError(409, f"작업이 아직 완료되지 않았습니다 (status={job.status}).")
+        if job.status in (JOB_FAILED, JOB_CANCELLED):
+            raise ApiError(job.error_code, job.error)
+        if fmt == 'json':
+            self._send_stream('application/json; charset=utf-8', iter_result_json(job))
+        else:
+            file_name = f"EDC Validation List_{time.strftime('%Y%m%d')}.xlsx"
+            self._send_stream(XLSX_MIME, iter_report_chunks(job.result['report'].getbuffer()),
+                              {'Content-Disposition': f'attachment; filename="{file_name}"',
+                               'X-Job-Id': job.job_id})
+
+    def _read_upload(self):
+        """업로드를 작업 폴더로 스트리밍 → (실행 파라미터, 작업 폴더). 실패하면 폴더를 지우고 오류 전달"""
+        length = int(self.headers.get('Content-Length') or 0)
+        if length <= 0:
+            raise ApiError(411, "Content-Length 헤더가 필요합니다.")
+        if length > API_MAX_UPLOAD_MB * 1024 * 1024:
+            raise ApiError(413, f"업로드 용량 한도({API_MAX_UPLOAD_MB}MB)를 초과했습니다.")
+        workdir = self.jobs.new_workdir()
+        try:
+            fields, files = read_multipart(self.rfile, self.headers.get('Content-Type', ''), length, workdir)
+            return build_job_params(fields, files), workdir
+        except BaseException:
+            self.close_connection = True    # 본문을 끝까지 읽지 못했을 수 있으므로 연결 재사용 안 함
+            shutil.rmtree(workdir, ignore_errors=True)
+            raise
+
+    # ── 라우팅 ───────────────────────────────────────────────
+    def _route(self, method):
+        url   = urlsplit(self.path)
+        parts = [p for p in url.path.split('/') if p]
+        query = parse_qs(url.query)
+        fmt   = (query.get('format') or ['xlsx'])[0].lower()
+        try:
+            if method == 'GET' and parts == ['health']:
+                self._send_json(200, {'status': 'ok', 'workers': self.jobs.workers,
+                                      'jobs': self.jobs.counts()})
+            elif method == 'GET' and parts == ['metrics']:
+                self._send_stream(run_metrics.METRICS_CONTENT_TYPE, [run_metrics.render_prometheus()])
+            elif method == 'POST' and parts == ['validate']:
+                params, workdir = self._read_upload()
+                job = self.jobs.submit(params, workdir)
+                if not job.done.wait(API_SYNC_TIMEOUT):
+                    raise ApiError(504, f"시간 초과 — /jobs/{job.job_id} 로 결과를 조회하세요.")
+                try:
+                    self._send_result(job, fmt)
+                finally:
+                    self.jobs.delete(job.job_id)
+            elif method == 'POST' and parts == ['preflight']:
+                params, workdir = self._read_upload()
+                result = self.jobs.preflight(params, workdir)
+                self._send_json(200, dict(result, top_domains=result['top_domains'].to_dict(orient='records')))
+            elif method == 'POST' and parts == ['jobs']:
+                params, workdir = self._read_upload()
+                job = self.jobs.submit(params, workdir)
+                self._send_json(202, dict(job.describe(), status_url=f"/jobs/{job.job_id}",
+                                          result_url=f"/jobs/{job.job_id}/result"))
+            elif method == 'GET' and parts == ['jobs']:
+                self._send_json(200, {'jobs': self.jobs.list()})
+            elif method == 'GET' and len(parts) == 2 and parts[0] == 'jobs':
+                self._send_json(200, self.jobs.get(parts[1]).describe())
+            elif method == 'GET' and len(parts) == 3 and parts[0] == 'jobs' and parts[2] == 'result':
+                self._send_result(self.jobs.get(parts[1]), fmt)
+            elif method == 'POST' and len(parts) == 3 and parts[0] == 'jobs' and parts[2] == 'cancel':
+                job = self.jobs.cancel(parts[1])
+                self._send_json(202, dict(job.describe(), cancel_requested=True))
+            elif method == 'DELETE' and len(parts) == 2 and parts[0] == 'jobs':
+                self.jobs.delete(parts[1])
+                self._send_json(200, {'job_id': parts[1], 'deleted': True})
+            else:
+                raise ApiError(404, f"지원하지 않는 경로입니다: {method} {url.path}")
+        except ApiError as e:
+            self._send_json(e.status, {'error': str(e)})
+        except (BrokenPipeError, ConnectionResetError):
+            pass
+
+    def do_GET(self):
+        self._route('GET')
+
+    def do_POST(self):
+        self._route('POST')
+
+    def do_DELETE(self):
+        self._route('DELETE')
+
+
+def create_server(host="127.0.0.1", port=8600, workers=API_WORKERS, max_pending=API_MAX_PENDING):
+    handler = type('Handler', (ValidationRequestHandler,),
+                   {'jobs': JobManager(workers=workers, max_pending=max_pending)})
+    server  = ThreadingHTTPServer((host, port), handler)
+    server.daemon_threads = True
+    return server
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="EDC Validation HTTP API")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8600)
+    parser.add_argument("--workers", type=int, default=API_WORKERS)
+    parser.add_argument("--max-pending", type=int, default=API_MAX_PENDING)
+    parser.add_argument("--no-warmup", action="store_true", help="기동 시 템플릿 캐시 적재 생략")
+    args = parser.parse_args(argv)
+
+    # 상대 경로 템플릿을 찾을 수 있도록 앱 폴더에서 실행
+    os.chdir(os.path.dirname(os.path.abspath(__file__)))
+    if not args.no_warmup:
+        engine.warm_up()
+
+    server = create_server(args.host, args.port, args.workers, args.max_pending)
+    print(f"EDC Validation API — http://{args.host}:{args.port} (workers={args.workers})", flush=True)
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.server_close()
+
+
+if __name__ == "__main__":
+    main()
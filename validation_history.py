@@ -0,0 +1,313 @@
+"""
+검증 이력 저장소 (SQLite)
+
+매 검증 실행의 표준화된 DB Spec, EDC Export, Dataset Long format, Entry Screen 비교 결과를
+로컬 SQLite 파일에 누적 저장하고, 스터디/버전/JOIN_KEY 인덱스로 과거 이력을 조회합니다.
+
+사용 예:
+    record_run(db_path, study="ABC-101", versions={'db': '1.2'}, df_spec=..., merged=...)
+    first_failure(db_path, item_id="LBORRES", visit="V3")
+    studies_with_mismatch(db_path, column="TYPE", item_id="AETERM")
+
+CLI:
+    python validation_history.py first-failure LBORRES --visit V3
+    python validation_history.py studies-with-mismatch TYPE --item AETERM
+"""
+import argparse
+import json
+import os
+import sqlite3
+from contextlib import closing
+from datetime import datetime, timezone
+
+import pandas as pd
+
+HISTORY_DB_PATH = os.environ.get("EDC_HISTORY_DB", "validation_history.db")
+
+# 이력에 보관하는 표준 컬럼 (process_data_final 결과 컬럼과 동일)
+SPEC_COLS = ['DOMAIN', 'DOMAIN LABEL', 'PAGE', 'PAGE LABEL', 'VISIT',
+             'ITEM ID', 'ITEM LABEL', 'ITEM SEQ', 'VERSION', 'CODE',
+             'LAYOUT', 'TYPE', 'MAX_LEN', 'MIN_VAL', 'MAX_VAL']
+
+# 조회 키로 쓰는 결과 컬럼 — 저장 시 앞뒤 공백 제거 + 대문자 (조회 인자도 같은 방식으로 정규화)
+LOOKUP_COLS = ['VISIT', 'ITEM ID']
+
+# 스키마 버전 (PRAGMA user_version) — 1: results / result_mismatches의 item_id, visit 대문자 정규화
+SCHEMA_VERSION = 1
+
+# 결과 상태 코드 (build_comparison의 _merge + MISMATCH 기준)
+STATUS_MATCH      = 'both'
+STATUS_MISMATCH   = 'mismatch'
+STATUS_SPEC_ONLY  = 'left_only'
+STATUS_EXPORT_ONLY = 'right_only'
+
+
+def _sql_name(col: str) -> str:
+    """표준 컬럼명을 SQL 컬럼명으로 변환 ('ITEM ID' → item_id)"""
+    return col.lower().replace(' ', '_')
+
+
+_SPEC_SQL_COLS = ", ".join(f"{_sql_name(c)} TEXT" for c in SPEC_COLS)
+
+SCHEMA = f"""
+CREATE TABLE IF NOT EXISTS runs (
+    run_id            INTEGER PRIMARY KEY AUTOINCREMENT,
+    study             TEXT NOT NULL,
+    db_version        TEXT,
+    blank_version     TEXT,
+    annotated_version TEXT,
+    created_at        TEXT NOT NULL,
+    meta              TEXT
+);
+CREATE TABLE IF NOT EXISTS spec_rows (
+    run_id   INTEGER NOT NULL REFERENCES runs(run_id) ON DELETE CASCADE,
+    join_key TEXT NOT NULL,
+    {_SPEC_SQL_COLS}
+);
+CREATE TABLE IF NOT EXISTS export_rows (
+    run_id   INTEGER NOT NULL REFERENCES runs(run_id) ON DELETE CASCADE,
+    join_key TEXT NOT NULL,
+    {_SPEC_SQL_COLS}
+);
+CREATE TABLE IF NOT EXISTS dataset_long (
+    run_id    INTEGER NOT NULL REFERENCES runs(run_id) ON DELETE CASCADE,
+    domain    TEXT,
+    item_id   TEXT,
+    ds_type   TEXT,
+    ds_subjid TEXT
+);
+CREATE TABLE IF NOT EXISTS results (
+    run_id     INTEGER NOT NULL REFERENCES runs(run_id) ON DELETE CASCADE,
+    study      TEXT NOT NULL,
+    db_version TEXT,
+    created_at TEXT NOT NULL,
+    join_key   TEXT NOT NULL,
+    domain     TEXT,
+    page       TEXT,
+    visit      TEXT,
+    item_id    TEXT,
+    status     TEXT NOT NULL,
+    mismatch   TEXT
+);
+CREATE TABLE IF NOT EXISTS result_mismatches (
+    run_id     INTEGER NOT NULL REFERENCES runs(run_id) ON DELETE CASCADE,
+    study      TEXT NOT NULL,
+    created_at TEXT NOT NULL,
+    join_key   TEXT NOT NULL,
+    item_id    TEXT,
+    visit      TEXT,
+    col_name   TEXT NOT NULL
+);
+
+CREATE INDEX IF NOT EXISTS ix_runs_study_ver     ON runs (study, db_version, created_at);
+CREATE INDEX IF NOT EXISTS ix_spec_run_key       ON spec_rows (run_id, join_key);
+CREATE INDEX IF NOT EXISTS ix_export_run_key     ON export_rows (run_id, join_key);
+CREATE INDEX IF NOT EXISTS ix_dataset_run_item   ON dataset_long (run_id, domain, item_id);
+CREATE INDEX IF NOT EXISTS ix_results_study_key  ON results (study, db_version, join_key);
+CREATE INDEX IF NOT EXISTS ix_results_key        ON results (join_key, created_at);
+CREATE INDEX IF NOT EXISTS ix_results_item       ON results (item_id, visit, status, created_at);
+CREATE INDEX IF NOT EXISTS ix_mismatch_col_item  ON result_mismatches (col_name, item_id, study);
+"""
+
+
+def connect(db_path: str = HISTORY_DB_PATH) -> sqlite3.Connection:
+    """이력 DB 연결 (없으면 스키마 생성). 여러 세션 동시 기록을 위해 WAL 모드 사용."""
+    conn = sqlite3.connect(db_path, timeout=30)
+    conn.execute("PRAGMA journal_mode=WAL")
+    conn.execute("PRAGMA foreign_keys=ON")
+    conn.executescript(SCHEMA)
+    _migrate(conn)
+    return conn
+
+
+def _migrate(conn: sqlite3.Connection):
+    """이전 버전에서 기록한 이력 DB를 현재 스키마 버전으로 갱신 (버전별 한 번)"""
+    version = conn.execute("PRAGMA user_version").fetchone()[0]
+    if version >= SCHEMA_VERSION:
+        return
+    with conn:
+        if version < 1:
+            # 정규화 전 기록된 item_id / visit를 대문자로 통일 (이후 조회와 같은 기준)
+            for table in ('results', 'result_mismatches'):
+                conn.execute(f"UPDATE {table} SET item_id = UPPER(TRIM(item_id)), visit = UPPER(TRIM(visit))")
+        conn.execute(f"PRAGMA user_version = {SCHEMA_VERSION}")
+
+
+def _spec_records(run_id: int, df: pd.DataFrame):
+    """표준화된 DataFrame을 (run_id, join_key, 표준 컬럼...) 튜플로 변환"""
+    if df is None or df.empty:
+        return []
+    cols = ['JOIN_KEY'] + SPEC_COLS
+    frame = df.reindex(columns=cols).fillna('').astype(str)
+    return [(run_id, *values) for values in frame.itertuples(index=False, name=None)]
+
+
+def _result_frame(merged: pd.DataFrame) -> pd.DataFrame:
+    """build_comparison() 결과를 결과 테이블용 프레임으로 정리"""
+    out = pd.DataFrame(index=merged.index)
+    out['JOIN_KEY'] = merged['JOIN_KEY']
+    for c in ['DOMAIN', 'PAGE', 'VISIT', 'ITEM ID']:
+        out[c] = merged[f"{c}_Doc"].fillna(merged[f"{c}_EDC"]).fillna('').astype(str)
+    # 조회 조건(item_id / visit)은 대소문자 구분 없이 비교하므로 저장 시 대문자로 통일 (JOIN_KEY와 같은 기준)
+    for c in LOOKUP_COLS:
+        out[c] = out[c].str.strip().str.upper()
+    status = merged['_merge'].astype(str)
+    out['STATUS']   = status.where(~((status == STATUS_MATCH) & (merged['MISMATCH'] != '')),
+                                   STATUS_MISMATCH)
+    out['MISMATCH'] = merged['MISMATCH'].fillna('')
+    return out
+
+
+def record_run(db_path: str, study: str, versions: dict, df_spec: pd.DataFrame,
+               df_export: pd.DataFrame = None, df_dataset_long: pd.DataFrame = None,
+               merged: pd.DataFrame = None, meta: dict = None) -> int:
+    """
+    한 번의 검증 실행을 이력 DB에 저장하고 run_id를 반환합니다.
+
+    Args:
+        study          : 스터디 식별자
+        versions       : {'blank': .., 'db': .., 'annotated': ..}
+        df_spec        : 표준화된 DB Spec (process_data_final 결과)
+        df_export      : 표준화된 EDC Export
+        df_dataset_long: build_dataset_long 결과
+        merged         : build_comparison 결과
+        meta           : 입력 파일명 등 부가 정보 (JSON 저장)
+    """
+    created_at   = datetime.now(timezone.utc).strftime('%Y-%m-%dT%H:%M:%S.%fZ')
+    placeholders = ", ".join("?" * (len(SPEC_COLS) + 2))
+    spec_cols    = ", ".join(_sql_name(c) for c in SPEC_COLS)
+    db_version   = str(versions.get('db', ''))
+
+    with closing(connect(db_path)) as conn, conn:
+        cur = conn.execute(
+            "INSERT INTO runs (study, db_version, blank_version, annotated_version, created_at, meta) "
+            "VALUES (?, ?, ?, ?, ?, ?)",
+            (study, db_version, str(versions.get('blank', '')),
+             str(versions.get('annotated', '')), created_at,
+             json.dumps(meta or {}, ensure_ascii=False)),
+        )
+        run_id = cur.lastrowid
+
+        conn.executemany(f"INSERT INTO spec_rows (run_id, join_key, {spec_cols}) VALUES ({placeholders})",
+                         _spec_records(run_id, df_spec))
+        conn.executemany(f"INSERT INTO export_rows (run_id, join_key, {spec_cols}) VALUES ({placeholders})",
+                         _spec_records(run_id, df_export))
+
+        if df_dataset_long is not None and not df_dataset_long.empty:
+            ds = df_dataset_long.reindex(columns=['DOMAIN', 'ITEM ID', 'DS_TYPE', 'DS_SUBJID']).fillna('')
+            conn.executemany(
+                "INSERT INTO dataset_long (run_id, domain, item_id, ds_type, ds_subjid) VALUES (?, ?, ?, ?, ?)",
+                ((run_id, *values) for values in ds.astype(str).itertuples(index=False, name=None)),
+            )
+
+        if merged is not None and not merged.empty:
+            res = _result_frame(merged)
+            conn.executemany(
+                "INSERT INTO results (run_id, study, db_version, created_at, join_key, domain, page, "
+                "visit, item_id, status, mismatch) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)",
+                ((run_id, study, db_version, created_at, *values)
+                 for values in res.itertuples(index=False, name=None)),
+            )
+            flagged = res[res['MISMATCH'] != '']
+            conn.executemany(
+                "INSERT INTO result_mismatches (run_id, study, created_at, join_key, item_id, visit, col_name) "
+                "VALUES (?, ?, ?, ?, ?, ?, ?)",
+                ((run_id, study, created_at, key, item_id, visit, column)
+                 for key, item_id, visit, flag in flagged[['JOIN_KEY', 'ITEM ID', 'VISIT', 'MISMATCH']]
+                 .itertuples(index=False, name=None)
+                 for column in flag.strip('|').split('|')),
+            )
+    return run_id
+
+
+# ============================================================
+# 조회 API
+# ============================================================
+
+def _query(db_path: str, sql: str, params=()) -> pd.DataFrame:
+    with closing(connect(db_path)) as conn:
+        return pd.read_sql_query(sql, conn, params=params)
+
+
+def list_runs(db_path: str = HISTORY_DB_PATH, study: str = None) -> pd.DataFrame:
+    """저장된 실행 목록 (최근 순)"""
+    sql, params = "SELECT * FROM runs", ()
+    if study:
+        sql, params = sql + " WHERE study = ?", (study,)
+    return _query(db_path, sql + " ORDER BY created_at DESC", params)
+
+
+def item_history(db_path: str, item_id: str, visit: str = None, study: str = None) -> pd.DataFrame:
+    """항목(ITEM ID, 선택적으로 VISIT/스터디)의 실행별 결과 이력 (시간 순, ITEM ID/VISIT 대소문자 무시)"""
+    sql    = ("SELECT run_id, study, db_version, created_at, domain, page, visit, item_id, status, mismatch "
+              "FROM results WHERE item_id = ?")
+    params = [item_id.strip().upper()]
+    if visit:
+        sql += " AND visit = ?"
+        params.append(visit.strip().upper())
+    if study:
+        sql += " AND study = ?"
+        params.append(study)
+    return _query(db_path, sql + " ORDER BY created_at", params)
+
+
+def first_failure(db_path: str, item_id: str, visit: str = None, study: str = None) -> pd.DataFrame:
+    """
+    항목이 처음으로 실패(불일치/한쪽에만 존재)한 실행을 스터디·JOIN_KEY별로 반환합니다.
+    예: first_failure(db, "LBORRES", visit="V3")
+    """
+    sql    = ("SELECT study, join_key, domain, page, visit, item_id, MIN(created_at) AS first_failed_at, "
+              "run_id, status, mismatch FROM results WHERE item_id = ? AND status != ?")
+    params = [item_id.strip().upper(), STATUS_MATCH]
+    if visit:
+        sql += " AND visit = ?"
+        params.append(visit.strip().upper())
+    if study:
+        sql += " AND study = ?"
+        params.append(study)
+    return _query(db_path, sql + " GROUP BY study, join_key ORDER BY first_failed_at", params)
+
+
+def studies_with_mismatch(db_path: str, column: str, item_id: str = None) -> pd.DataFrame:
+    """
+    특정 컬럼(예: TYPE)에서 불일치가 기록된 스터디 목록.
+    예: studies_with_mismatch(db, "TYPE", item_id="AETERM")
+    """
+    sql    = ("SELECT study, COUNT(DISTINCT run_id) AS runs, MIN(created_at) AS first_seen, "
+              "MAX(created_at) AS last_seen FROM result_mismatches WHERE col_name = ?")
+    params = [column.strip().upper()]
+    if item_id:
+        sql += " AND item_id = ?"
+        params.append(item_id.strip().upper())
+    return _query(db_path, sql + " GROUP BY study ORDER BY study", params)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="EDC Validation 이력 조회")
+    parser.add_argument("--db", default=HISTORY_DB_PATH, help="이력 DB 경로")
+    sub = parser.add_subparsers(dest="command", required=True)
+
+    p_runs = sub.add_parser("runs", help="실행 목록")
+    p_runs.add_argument("--study")
+
+    p_first = sub.add_parser("first-failure", help="항목이 처음 실패한 시점")
+    p_first.add_argument("item_id")
+    p_first.add_argument("--visit")
+    p_first.add_argument("--study")
+
+    p_mis = sub.add_parser("studies-with-mismatch", help="컬럼 불일치가 있는 스터디")
+    p_mis.add_argument("column")
+    p_mis.add_argument("--item")
+
+    args = parser.parse_args(argv)
+    if args.command == "runs":
+        result = list_runs(args.db, args.study)
+    elif args.command == "first-failure":
+        result = first_failure(args.db, args.item_id, args.visit, args.study)
+    else:
+        result = studies_with_mismatch(args.db, args.column, args.item)
+    print(result.to_string(index=False) if not result.empty else "(결과 없음)")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,321 @@
+"""
+감시 폴더 자동 검증 (Watch-folder daemon)
+
+CDMS 빌드 후 공유 폴더에 떨어지는 EDC Export / CDMS Dataset 워크북을 주기적으로 확인하여,
+스터디별로 등록된 DB Spec과 함께 검증(run_validation — 화면/API와 같은 엔진)을 자동 실행합니다.
+
+동작:
+  - 스터디 폴더마다 export_glob / dataset_glob에 맞는 파일 중 가장 최근 파일을 입력으로 사용
+  - 쓰는 중인 파일은 건너뜀 (debounce): 마지막 수정 후 WATCH_SETTLE_S가 지나고,
+    직전 확인 때와 크기/수정 시각이 같고, xlsx라면 zip 목록을 읽을 수 있어야 안정된 파일로 봄
+  - 입력(DB Spec / Export / Dataset) 내용 해시가 마지막 실행과 같으면 다시 실행하지 않음
+    (실패한 실행도 기록하므로 입력이 바뀔 때까지 재시도하지 않음)
+  - record=true 스터디의 검증 이력 저장 실패는 검증 상태와 별개로 처리: 리포트는 그대로 두고 실행은 ok,
+    상태 파일의 history_error와 실행 로그의 counts.history_failed로 남김 (입력이 바뀌면 다시 저장)
+  - 결과 리포트와 실행 로그(JSON Lines, run_metrics 레코드)는 입력 파일과 같은 폴더에 기록
+
+설정 파일 (JSON):
+    {"studies": [
+        {"study": "ABC-101", "folder": "/shared/cdms/ABC-101",
+         "spec": "DB_Spec_ABC-101.xlsx", "spec_sheet": "Spec", "spec_header": 1,
+         "export_glob": "*Export*.xlsx", "export_sheet": null, "export_header": 0,
+         "dataset_glob": "*Dataset*.xlsx",
+         "ver_info": {"blank": "1.0", "db": "1.0", "annotated": "1.0"},
+         "record": false}
+    ]}
+    spec / glob은 folder 기준 상대 경로, 생략한 항목은 STUDY_DEFAULTS 값을 사용합니다.
+    DB Spec이 여러 시트/파일로 나뉘어 있으면 spec을 목록으로 적습니다 (목록 순서대로 이어 붙임):
+        "spec": ["Spec_Module1.xlsx", {"file": "Spec_Module2.xlsx", "sheet": "AE", "header": 0}]
+    (sheet / header를 생략하면 spec_sheet / spec_header 사용)
+
+사용법:
+    python watch_folder.py watch_studies.json                 # 계속 감시 (Ctrl+C로 종료)
+    python watch_folder.py watch_studies.json --once          # 한 번만 확인 후 종료 (테스트/cron용)
+"""
+import argparse
+import fnmatch
+import json
+import os
+import sys
+import time
+import zipfile
+
+import edc_engine as engine
+import report_cache
+import run_metrics
+
+# ============================================================
+# [유지보수 포인트] 감시 설정 (환경변수로 덮어쓰기 가능)
+# ============================================================
+WATCH_INTERVAL_S = float(os.environ.get("EDC_WATCH_INTERVAL", "30"))   # 폴더 확인 주기(초)
+WATCH_SETTLE_S   = float(os.environ.get("EDC_WATCH_SETTLE", "10"))     # 마지막 수정 후 대기 시간(초)
+
+STATE_FILE   = ".edc_watch_state.json"      # 스터디 폴더별 마지막 실행 상태
+RUN_LOG_FILE = "edc_validation_runs.jsonl"  # 스터디 폴더별 실행 로그
+REPORT_PREFIX = "EDC Validation List_"
+
+# 복사 중 임시 파일 / Office 잠금 파일 / 이 모듈이 만든 결과는 입력으로 보지 않음
+IGNORE_PATTERNS = ("~$*", ".~*", "*.part", "*.tmp", f"{REPORT_PREFIX}*")
+
+STUDY_DEFAULTS = {
+    'spec_sheet'   : None,
+    'spec_header'  : 1,
+    'export_glob'  : "*Export*.xlsx",
+    'export_sheet' : None,
+    'export_header': 0,
+    'dataset_glob' : None,
+    'ver_info'     : {'blank': '1.0', 'db': '1.0', 'annotated': '1.0'},
+    'record'       : False,
+}
+
+
+def load_config(path) -> list:
+    """설정 파일 → 기본값을 채운 스터디 설정 목록 (folder / spec 누락 시 ValueError)"""
+    with open(path, encoding='utf-8') as f:
+        config = json.load(f)
+    base    = os.path.dirname(os.path.abspath(path))
+    studies = []
+    for entry in config.get('studies', []):
+        missing = [k for k in ('study', 'folder', 'spec') if not entry.get(k)]
+        if missing:
+            raise ValueError(f"스터디 설정 누락 항목: {', '.join(missing)} — {entry}")
+        study = dict(STUDY_DEFAULTS, **entry)
+        study['folder'] = os.path.join(base, os.path.expanduser(study['folder']))
+        studies.append(study)
+    return studies
+
+
+# ============================================================
+# 1. 입력 파일 찾기 (debounce)
+# ============================================================
+
+def _is_complete(path) -> bool:
+    """xlsx/xlsm은 zip 중앙 디렉터리까지 쓰여 있어야 완료된 파일로 봄"""
+    if os.path.splitext(path)[1].lower() not in ('.xlsx', '.xlsm'):
+        return True
+    try:
+        with zipfile.ZipFile(path) as zf:
+            return bool(zf.namelist())
+    except (OSError, zipfile.BadZipFile):
+        return False
+
+
+class FolderWatcher:
+    """
+    스터디 폴더 감시기.
+    poll()마다 파일 크기/수정 시각을 기억해 두고, 두 번 연속 같고 WATCH_SETTLE_S가 지난 파일만 입력으로 씁니다.
+    (--once처럼 직전 기록이 없으면 수정 후 경과 시간 + zip 완료 여부만 확인)
+    """
+
+    def __init__(self, studies, settle_s=WATCH_SETTLE_S, log=print):
+        self.studies  = studies
+        self.settle_s = settle_s
+        self.log      = log
+        self._seen    = {}      # 경로 → (크기, mtime_ns)
+        self._missing = set()   # 없다고 이미 알린 DB Spec 경로
+
+    def _stable(self, path, now) -> bool:
+        try:
+            stat = os.stat(path)
+        except OSError:
+            return False
+        signature = (stat.st_size, stat.st_mtime_ns)
+        previous  = self._seen.get(path)
+        self._seen[path] = signature
+        if stat.st_size == 0 or now - stat.st_mtime < self.settle_s:
+            return False
+        if previous is not None and previous != signature:
+            return False
+        return _is_complete(path)
+
+    def latest_input(self, folder, pattern, now):
+        """
+        pattern에 맞는 가장 최근 파일 → (경로, 대기 여부).
+        없으면 (None, False), 아직 쓰는 중이면 (None, True) — 이전 파일로 검증하지 않고 다음 확인까지 기다림
+        """
+        if not pattern:
+            return None, False
+        candidates = []
+        for name in os.listdir(folder):
+            path = os.path.join(folder, name)
+            if (not fnmatch.fnmatch(name, pattern) or not os.path.isfile(path)
+                    or any(fnmatch.fnmatch(name, p) for p in IGNORE_PATTERNS)):
+                continue
+            candidates.append((os.path.getmtime(path), name, path))
+        if not candidates:
+            return None, False
+        latest = max(candidates)[2]
+        return (latest, False) if self._stable(latest, now) else (None, True)
+
+    # ========================================================
+    # 2. 스터디별 실행
+    # ========================================================
+
+    def poll(self, now=None) -> list:
+        """모든 스터디를 한 번 확인하고 검증을 실행한 스터디의 실행 레코드 목록 반환"""
+        now     = time.time() if now is None else now
+        records = []
+        for study in self.studies:
+            try:
+                record = self.check_study(study, now)
+            except OSError as e:
+                self.log(f"[{study['study']}] 폴더 확인 실패: {e}")
+                continue
+            if record is not None:
+                records.append(record)
+        return records
+
+    def check_study(self, study, now):
+        """입력이 바뀐 스터디만 검증 실행 → run_metrics 레코드 (실행하지 않았으면 None)"""
+        folder = study['folder']
+        spec   = study_spec(study)
+        files  = [spec] if isinstance(spec, str) else list(dict.fromkeys(p.source for p in spec))
+        missing = [path for path in files if not os.path.isfile(path)]
+        if missing:
+            if missing[0] not in self._missing:
+                self.log(f"[{study['study']}] 등록된 DB Spec이 없습니다: {', '.join(missing)}")
+                self._missing.add(missing[0])
+            return None
+        self._missing.difference_update(files)
+
+        export, export_waiting   = self.latest_input(folder, study['export_glob'], now)
+        dataset, dataset_waiting = self.latest_input(folder, study['dataset_glob'], now)
+        if export is None or export_waiting or dataset_waiting:
+            return None
+
+        inputs = {'spec'   : ([os.path.basename(spec), report_cache.file_digest(spec)] if isinstance(spec, str) else
+                              [[os.path.basename(p.source), report_cache.file_digest(p.source), p.sheet, p.header]
+                               for p in spec]),
+                  'export' : [os.path.basename(export), report_cache.file_digest(export)],
+                  'dataset': [os.path.basename(dataset), report_cache.file_digest(dataset)] if dataset else None,
+                  'options': {k: study[k] for k in ('spec_sheet', 'spec_header', 'export_sheet',
+                                                    'export_header', 'ver_info')}}
+        state = read_state(folder)
+        if state.get('inputs') == inputs:
+            return None
+
+        self.log(f"[{study['study']}] 검증 시작 — Export: {os.path.basename(export)}"
+                 + (f", Dataset: {os.path.basename(dataset)}" if dataset else ""))
+        record, report_path, history_error = run_study(study, spec, export, dataset)
+        write_state(folder, {'inputs': inputs, 'status': record['status'], 'error': record['error'],
+                             'history_error': history_error,
+                             'report': report_path and os.path.basename(report_path),
+                             'run_id': record['run_id'], 'finished_at': time.time()})
+        if record['status'] == run_metrics.STATUS_OK:
+            self.log(f"[{study['study']}] 완료 ({record['duration_s']}s) → {os.path.basename(report_path)}")
+            if history_error:
+                self.log(f"[{study['study']}] 검증 이력 저장 실패: {history_error}")
+        else:
+            self.log(f"[{study['study']}] {record['status']}: {record['error']}")
+        return record
+
+    def run_forever(self, interval=WATCH_INTERVAL_S):
+        self.log(f"감시 시작 — 스터디 {len(self.studies)}개, 주기 {interval:g}초 (Ctrl+C로 종료)")
+        while True:
+            self.poll()
+            time.sleep(interval)
+
+
+def study_spec(study):
+    """스터디 설정의 spec → 파일 경로(단일) 또는 engine.SpecPart 목록(여러 시트/파일)"""
+    if not isinstance(study['spec'], list):
+        return os.path.join(study['folder'], study['spec'])
+    parts = []
+    for entry in study['spec']:
+        entry = entry if isinstance(entry, dict) else {'file': entry}
+        parts.append(engine.SpecPart(os.path.join(study['folder'], entry['file']),
+                                     entry.get('sheet', study['spec_sheet']),
+                                     entry.get('header', study['spec_header'])))
+    return parts
+
+
+def read_state(folder) -> dict:
+    try:
+        with open(os.path.join(folder, STATE_FILE), encoding='utf-8') as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return {}
+
+
+def write_state(folder, state: dict):
+    path     = os.path.join(folder, STATE_FILE)
+    tmp_path = f"{path}.part"
+    with open(tmp_path, 'w', encoding='utf-8') as f:
+        json.dump(state, f, ensure_ascii=False, indent=2)
+    os.replace(tmp_path, path)
+
+
+def run_study(study, spec, export, dataset):
+    """
+    스터디 하나 검증 → (run_metrics 레코드, 리포트 경로 또는 None, 검증 이력 저장 오류 또는 None).
+    spec: 파일 경로 또는 SpecPart 목록 (study_spec)
+    리포트는 '<REPORT_PREFIX><스터디>_<시각>.xlsx', 실행 로그는 RUN_LOG_FILE로 스터디 폴더에 기록합니다.
+    검증 이력 저장 실패는 실행 상태를 바꾸지 않습니다 (counts.history_failed = 1).
+    """
+    folder   = study['folder']
+    log_path = os.path.join(folder, RUN_LOG_FILE)
+    metrics  = run_metrics.RunMetrics('watch', inputs={'spec': spec, 'export': export, 'dataset': dataset})
+    try:
+        result = engine.run_validation(spec, study['spec_sheet'], study['spec_header'],
+                                       export, study['export_sheet'], study['export_header'],
+                                       dataset_source=dataset, ver_info=study['ver_info'], metrics=metrics)
+        report_path = os.path.join(folder, f"{REPORT_PREFIX}{study['study']}_{time.strftime('%Y%m%d_%H%M%S')}.xlsx")
+        tmp_path    = f"{report_path}.part"
+        with open(tmp_path, 'wb') as f:
+            f.write(result['report'].getbuffer())
+        os.replace(tmp_path, report_path)
+
+        history_error = None
+        if study['record']:
+            try:
+                record_history(study, spec, export, dataset, result, metrics)
+            except Exception as e:
+                history_error = f"{type(e).__name__}: {e}"
+                metrics.count(history_failed=1)
+    except engine.ValidationInputError as e:
+        return metrics.finish(run_metrics.STATUS_INVALID, str(e), log_path=log_path), None, None
+    except Exception as e:
+        return metrics.finish(run_metrics.STATUS_FAILED, f"{type(e).__name__}: {e}", log_path=log_path), None, None
+    return metrics.finish(run_metrics.STATUS_OK, log_path=log_path), report_path, history_error
+
+
+def record_history(study, spec, export, dataset, result, metrics):
+    """검증 결과를 이력 DB에 저장 (validation_history.record_run)"""
+    import validation_history
+    with metrics.stage('history'):
+        validation_history.record_run(
+            validation_history.HISTORY_DB_PATH, study['study'], study['ver_info'],
+            df_spec=result['df_doc_full'], df_export=result['df_edc'],
+            df_dataset_long=result['df_dataset_long'], merged=result['merged'],
+            meta={'spec_file'   : (os.path.basename(spec) if isinstance(spec, str) else
+                                   ', '.join(dict.fromkeys(os.path.basename(p.source) for p in spec))),
+                  'export_file' : os.path.basename(export),
+                  'dataset_file': dataset and os.path.basename(dataset),
+                  'source'      : 'watch'},
+        )
+
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(description="EDC Validation 감시 폴더 자동 검증")
+    parser.add_argument("config", help="스터디 설정 JSON")
+    parser.add_argument("--once", action="store_true", help="한 번만 확인하고 종료")
+    parser.add_argument("--interval", type=float, default=WATCH_INTERVAL_S, help="폴더 확인 주기(초)")
+    parser.add_argument("--settle", type=float, default=WATCH_SETTLE_S, help="마지막 수정 후 대기 시간(초)")
+    args = parser.parse_args(argv)
+
+    studies = load_config(args.config)
+    # 상대 경로 템플릿을 찾을 수 있도록 앱 폴더에서 실행
+    os.chdir(os.path.dirname(os.path.abspath(__file__)))
+    watcher = FolderWatcher(studies, settle_s=args.settle,
+                            log=lambda msg: print(f"{time.strftime('%Y-%m-%d %H:%M:%S')} {msg}", flush=True))
+    if args.once:
+        records = watcher.poll()
+        return 1 if any(r['status'] != run_metrics.STATUS_OK for r in records) else 0
+    try:
+        watcher.run_forever(args.interval)
+    except KeyboardInterrupt:
+        return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,54 @@
+"""
+작업 프로세스 풀 (spawn)
+
+DB Spec 조각 읽기, DOMAIN shard 비교, Data Structure 시트 생성, Dataset 시트 프로파일이
+같은 방식으로 프로세스 풀을 만들고 정리하도록 한곳에 모았습니다.
+
+spawn을 쓰는 이유:
+  Streamlit 서버 / HTTP API / 폴더 감시처럼 스레드가 있는 프로세스에서 fork 하면 다른 스레드가
+  잡고 있던 잠금까지 복제되어 작업 프로세스가 멈출 수 있습니다. spawn은 새 인터프리터에서
+  모듈을 다시 import 하므로, 작업 함수는 모듈 최상위 함수여야 하고 인자/결과는 pickle 됩니다.
+"""
+import multiprocessing
+from concurrent.futures import FIRST_COMPLETED, ProcessPoolExecutor, wait
+from contextlib import contextmanager
+
+# [유지보수 포인트] 작업 결과를 기다리는 동안 중지 요청을 확인하는 주기(초)
+WORKER_POLL_S = 0.2
+
+
+@contextmanager
+def process_pool(max_workers: int):
+    """
+    spawn 방식 ProcessPoolExecutor (max_workers는 최소 1).
+
+    블록이 정상 종료되면 남은 작업을 기다려 정리하고, 예외 / 중지 요청 / 제너레이터 close()로
+    빠져나가면 대기 중인 작업을 취소하고 기다리지 않습니다 (실행 중인 작업은 끝난 뒤 프로세스 종료).
+    """
+    pool = ProcessPoolExecutor(max_workers=max(1, max_workers),
+                               mp_context=multiprocessing.get_context('spawn'))
+    done = False
+    try:
+        yield pool
+        done = True
+    finally:
+        pool.shutdown(wait=done, cancel_futures=not done)
+
+
+def iter_completed(futures, cancel=None, poll_s=WORKER_POLL_S):
+    """
+    끝난 순서대로 future를 돌려주는 as_completed — 기다리는 동안 poll_s 초마다 cancel.check()를 호출해
+    중지 요청이 있으면 결과를 기다리지 않고 예외(ValidationCancelled)를 그대로 전달합니다.
+    """
+    pending = set(futures)
+    while pending:
+        if cancel is not None:
+            cancel.check()
+        done, pending = wait(pending, timeout=poll_s, return_when=FIRST_COMPLETED)
+        yield from done
+
+
+def wait_result(future, cancel=None, poll_s=WORKER_POLL_S):
+    """future.result() — 기다리는 동안 중지 요청 확인 (iter_completed와 같은 방식)"""
+    for done in iter_completed([future], cancel, poll_s):
+        return done.result()
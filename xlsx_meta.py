@@ -0,0 +1,102 @@
+"""
+XLSX 워크북 메타데이터 (시트 목록 / 범위 / 행 수)
+
+시트 선택 목록, CDMS Dataset 도메인 시트 인식처럼 시트 이름만 필요할 때
+pd.ExcelFile(openpyxl)로 워크북 전체(서식, 공유 문자열 등)를 여는 대신
+패키지의 색인 파트(xl/workbook.xml + 관계 파일)와 각 시트 XML 앞부분의 <dimension>만 읽습니다.
+시트 데이터(<sheetData>)는 압축 해제하지 않습니다.
+
+표준 라이브러리만 사용합니다. (.xls 등 zip 패키지가 아니면 pd.ExcelFile로 대체)
+"""
+import io
+import os
+import re
+import zipfile
+from collections import namedtuple
+
+from xlsx_stitch import sheet_parts
+
+# [유지보수 포인트] <dimension>을 찾기 위해 시트 XML 앞부분에서 읽는 최대 바이트 수
+DIMENSION_PROBE_BYTES = 16 * 1024
+
+_DIMENSION = re.compile(rb'<(?:\w+:)?dimension\b[^>]*\bref="([^"]+)"')
+_CELL_REF  = re.compile(r'\$?([A-Z]+)\$?(\d+)')
+
+# max_row / max_col: <dimension> 기준 마지막 행 번호 / 열 번호 (없으면 None)
+# xml_bytes        : 시트 XML 압축 해제 크기 (zip 목록 정보)
+SheetMeta = namedtuple('SheetMeta', ['name', 'part', 'dimension', 'max_row', 'max_col', 'xml_bytes'])
+
+
+def _column_number(letters: str) -> int:
+    number = 0
+    for ch in letters:
+        number = number * 26 + (ord(ch) - 64)
+    return number
+
+
+def _parse_dimension(ref: str):
+    """'A1:Q20003' → (20003, 17), 'A1' → (1, 1)"""
+    cells = _CELL_REF.findall(ref.split(':')[-1])
+    if not cells:
+        return None, None
+    letters, row = cells[-1]
+    return int(row), _column_number(letters)
+
+
+def _sheet_dimension(zf: zipfile.ZipFile, part: str):
+    with zf.open(part) as stream:
+        head = stream.read(DIMENSION_PROBE_BYTES)
+    m = _DIMENSION.search(head)
+    return m.group(1).decode('ascii') if m else None
+
+
+def read_workbook_meta(source) -> list:
+    """
+    워크북의 시트별 메타데이터 (워크북 시트 순서).
+    source: 파일 경로 / bytes / file-like
+
+    Returns:
+        [SheetMeta, ...] — zip 패키지가 아니면(.xls) 이름만 채운 SheetMeta
+    """
+    if isinstance(source, (bytes, bytearray)):
+        source = io.BytesIO(source)
+    try:
+        zf = zipfile.ZipFile(source)
+    except zipfile.BadZipFile:
+        import pandas as pd
+        if hasattr(source, 'seek'):
+            source.seek(0)
+        with pd.ExcelFile(source) as excel:
+            return [SheetMeta(name, None, None, None, None, None) for name in excel.sheet_names]
+
+    with zf:
+        sheets = []
+        for name, part in sheet_parts(zf).items():
+            try:
+                info = zf.getinfo(part)
+            except KeyError:
+                sheets.append(SheetMeta(name, part, None, None, None, None))
+                continue
+            dimension = _sheet_dimension(zf, part)
+            max_row, max_col = _parse_dimension(dimension) if dimension else (None, None)
+            sheets.append(SheetMeta(name, part, dimension, max_row, max_col, info.file_size))
+        return sheets
+
+
+def sheet_names(source) -> list:
+    """시트 이름 목록 (워크북 순서)"""
+    return [sheet.name for sheet in read_workbook_meta(source)]
+
+
+def total_rows(sheets) -> int:
+    """<dimension>이 있는 시트들의 행 수 합계 (크기 기준 판단용, 헤더 행 포함)"""
+    return sum(sheet.max_row or 0 for sheet in sheets)
+
+
+if __name__ == "__main__":
+    import sys
+    for path in sys.argv[1:]:
+        print(os.path.basename(path))
+        for sheet in read_workbook_meta(path):
+            print(f"  {sheet.name:<32} {sheet.dimension or '-':<14} rows={sheet.max_row} "
+                  f"cols={sheet.max_col} xml={sheet.xml_bytes}")
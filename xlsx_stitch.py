@@ -0,0 +1,198 @@
+"""
+XLSX 패키지 시트 교체 (워크시트 XML 이어붙이기)
+
+같은 템플릿에서 출발해 서로 다른 시트를 채운 두 결과 파일(.xlsx)을 하나로 합칩니다.
+base 패키지의 지정 시트 XML을 donor 패키지의 같은 이름 시트 XML로 바꾸고,
+donor 쪽에서 새로 등록된 셀 서식(cellXfs/fonts/fills/borders/numFmts)과
+조건부 서식 서식(dxfs)을 base의 styles.xml에 병합한 뒤 시트 XML의 서식 번호를 다시 매깁니다.
+
+openpyxl 저장 결과(문자열은 inlineStr, 공유 문자열 없음)를 전제로 하며,
+전제가 맞지 않으면 StitchError를 발생시키므로 호출 측에서 순차 저장으로 대체하면 됩니다.
+"""
+import io
+import posixpath
+import re
+import zipfile
+import xml.etree.ElementTree as ET
+
+MAIN_NS = "http://schemas.openxmlformats.org/spreadsheetml/2006/main"
+REL_NS  = "http://schemas.openxmlformats.org/officeDocument/2006/relationships"
+PKG_REL_NS = "http://schemas.openxmlformats.org/package/2006/relationships"
+
+STYLES_PART = "xl/styles.xml"
+
+# 사용자 정의 숫자 서식 번호 시작값 (0~163은 Excel 내장 서식)
+CUSTOM_NUMFMT_START = 164
+
+_CELL_STYLE_REF = re.compile(r'(<(?:c|row)\b[^>]*?\bs="|<col\b[^>]*?\bstyle=")(\d+)(")')
+_DXF_REF        = re.compile(r'(<cfRule\b[^>]*?\bdxfId=")(\d+)(")')
+
+
+class StitchError(Exception):
+    """패키지 구조가 예상과 달라 시트를 이어붙일 수 없는 경우"""
+
+
+def _q(tag):
+    return f"{{{MAIN_NS}}}{tag}"
+
+
+def sheet_parts(zf: zipfile.ZipFile) -> dict:
+    """시트명 → 워크시트 XML 파트 경로 (예: 'xl/worksheets/sheet3.xml')"""
+    workbook = ET.fromstring(zf.read("xl/workbook.xml"))
+    rels     = ET.fromstring(zf.read("xl/_rels/workbook.xml.rels"))
+    targets  = {}
+    for rel in rels.iter(f"{{{PKG_REL_NS}}}Relationship"):
+        target = rel.get("Target")
+        if target.startswith("/"):
+            target = target.lstrip("/")
+        else:
+            target = posixpath.normpath(posixpath.join("xl", target))
+        targets[rel.get("Id")] = target
+    return {sheet.get("name"): targets[sheet.get(f"{{{REL_NS}}}id")]
+            for sheet in workbook.iter(_q("sheet"))}
+
+
+def _sheet_rels_part(part):
+    folder, name = posixpath.split(part)
+    return posixpath.join(folder, "_rels", f"{name}.rels")
+
+
+# ── styles.xml 병합 ──────────────────────────────────────────
+
+def _section(root, tag, create_before=None):
+    node = root.find(_q(tag))
+    if node is None:
+        node = ET.Element(_q(tag))
+        index = len(root)
+        if create_before is not None:
+            for i, child in enumerate(root):
+                if child.tag == _q(create_before):
+                    index = i
+                    break
+        root.insert(index, node)
+    return node
+
+
+def _merge_list(base_node, donor_node, remap=None) -> list:
+    """
+    donor 목록의 각 항목을 base 목록에서 찾아(같은 XML) 번호를 돌려주고, 없으면 뒤에 추가합니다.
+    Returns: donor 번호 → base 번호 목록
+    """
+    index = {}
+    for i, child in enumerate(base_node):
+        index.setdefault(ET.tostring(child), i)
+
+    mapping = []
+    for child in (donor_node if donor_node is not None else []):
+        if remap:
+            child = remap(child)
+        key = ET.tostring(child)
+        if key not in index:
+            base_node.append(child)
+            index[key] = len(base_node) - 1
+        mapping.append(index[key])
+    base_node.set("count", str(len(base_node)))
+    return mapping
+
+
+def merge_styles(base_xml: bytes, donor_xml: bytes):
+    """
+    donor styles.xml의 서식을 base styles.xml에 병합합니다.
+
+    Returns:
+        (병합된 styles.xml bytes, cellXfs 번호 매핑 list, dxfs 번호 매핑 list)
+    """
+    namespaces = dict(ns for _, ns in ET.iterparse(io.BytesIO(base_xml), events=("start-ns",)))
+    for prefix, uri in namespaces.items():
+        ET.register_namespace(prefix, uri)
+
+    base  = ET.fromstring(base_xml)
+    donor = ET.fromstring(donor_xml)
+
+    # 명명 스타일(cellStyleXfs)은 같은 템플릿에서 왔으므로 동일해야 함
+    base_named  = base.find(_q("cellStyleXfs"))
+    donor_named = donor.find(_q("cellStyleXfs"))
+    if [ET.tostring(x) for x in (base_named if base_named is not None else [])] != \
+       [ET.tostring(x) for x in (donor_named if donor_named is not None else [])]:
+        raise StitchError("cellStyleXfs(명명 스타일)가 서로 다릅니다.")
+
+    # 숫자 서식: 사용자 정의(164~)는 formatCode 기준으로 병합
+    base_fmts  = _section(base, "numFmts", create_before="fonts")
+    fmt_ids    = {f.get("formatCode"): int(f.get("numFmtId")) for f in base_fmts}
+    next_id    = max([CUSTOM_NUMFMT_START - 1] + list(fmt_ids.values())) + 1
+    numfmt_map = {}
+    donor_fmts = donor.find(_q("numFmts"))
+    for f in (donor_fmts if donor_fmts is not None else []):
+        code = f.get("formatCode")
+        if code not in fmt_ids:
+            fmt_ids[code] = next_id
+            ET.SubElement(base_fmts, _q("numFmt"), numFmtId=str(next_id), formatCode=code)
+            next_id += 1
+        numfmt_map[int(f.get("numFmtId"))] = fmt_ids[code]
+    base_fmts.set("count", str(len(base_fmts)))
+
+    font_map   = _merge_list(_section(base, "fonts"),   donor.find(_q("fonts")))
+    fill_map   = _merge_list(_section(base, "fills"),   donor.find(_q("fills")))
+    border_map = _merge_list(_section(base, "borders"), donor.find(_q("borders")))
+
+    def remap_xf(xf):
+        xf = ET.fromstring(ET.tostring(xf))
+        for attr, mapping in (("fontId", font_map), ("fillId", fill_map), ("borderId", border_map)):
+            if xf.get(attr) is not None:
+                xf.set(attr, str(mapping[int(xf.get(attr))]))
+        if xf.get("numFmtId") is not None:
+            num = int(xf.get("numFmtId"))
+            xf.set("numFmtId", str(numfmt_map.get(num, num)))
+        return xf
+
+    xf_map  = _merge_list(_section(base, "cellXfs"), donor.find(_q("cellXfs")), remap_xf)
+    dxf_map = _merge_list(_section(base, "dxfs", create_before="tableStyles"), donor.find(_q("dxfs")))
+
+    return ET.tostring(base, xml_declaration=True, encoding="UTF-8"), xf_map, dxf_map
+
+
+def remap_sheet_styles(sheet_xml: bytes, xf_map: list, dxf_map: list) -> bytes:
+    """워크시트 XML의 셀/행/열 서식 번호와 조건부 서식 dxfId를 병합 후 번호로 변경"""
+    text = sheet_xml.decode("utf-8")
+    text = _CELL_STYLE_REF.sub(lambda m: f"{m.group(1)}{xf_map[int(m.group(2))]}{m.group(3)}", text)
+    text = _DXF_REF.sub(lambda m: f"{m.group(1)}{dxf_map[int(m.group(2))]}{m.group(3)}", text)
+    return text.encode("utf-8")
+
+
+# ── 패키지 조립 ──────────────────────────────────────────────
+
+def replace_sheet(base_bytes: bytes, donor_bytes: bytes, sheet_name: str) -> bytes:
+    """
+    base 패키지의 sheet_name 시트를 donor 패키지의 같은 시트로 교체한 새 패키지를 반환합니다.
+    (두 패키지는 같은 템플릿에서 저장된 것이어야 함)
+    """
+    with zipfile.ZipFile(io.BytesIO(base_bytes)) as base_zf, \
+            zipfile.ZipFile(io.BytesIO(donor_bytes)) as donor_zf:
+        base_parts  = sheet_parts(base_zf)
+        donor_parts = sheet_parts(donor_zf)
+        if sheet_name not in base_parts or sheet_name not in donor_parts:
+            raise StitchError(f"'{sheet_name}' 시트가 두 패키지에 모두 있어야 합니다.")
+        base_part, donor_part = base_parts[sheet_name], donor_parts[sheet_name]
+
+        base_names  = set(base_zf.namelist())
+        donor_names = set(donor_zf.namelist())
+        if "xl/sharedStrings.xml" in donor_names:
+            raise StitchError("공유 문자열(sharedStrings)을 쓰는 패키지는 지원하지 않습니다.")
+        base_rels, donor_rels = _sheet_rels_part(base_part), _sheet_rels_part(donor_part)
+        if (base_zf.read(base_rels) if base_rels in base_names else None) != \
+                (donor_zf.read(donor_rels) if donor_rels in donor_names else None):
+            raise StitchError(f"'{sheet_name}' 시트의 관계(rels) 파트가 서로 다릅니다.")
+
+        styles, xf_map, dxf_map = merge_styles(base_zf.read(STYLES_PART), donor_zf.read(STYLES_PART))
+        sheet_xml = remap_sheet_styles(donor_zf.read(donor_part), xf_map, dxf_map)
+
+        output = io.BytesIO()
+        with zipfile.ZipFile(output, "w", zipfile.ZIP_DEFLATED) as out_zf:
+            for info in base_zf.infolist():
+                if info.filename == STYLES_PART:
+                    out_zf.writestr(info, styles)
+                elif info.filename == base_part:
+                    out_zf.writestr(info, sheet_xml)
+                else:
+                    out_zf.writestr(info, base_zf.read(info.filename))
+        return output.getvalue()